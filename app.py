@@ -25,18 +25,19 @@ from database import (
     get_connection,
     iter_tracks_with_playlists,
     iter_tracks_with_playlists_filtered,
-    get_distinct_resolutions,
-    get_distinct_filetypes,
     get_tracks_with_filters_page,
-    get_resolution_counts,
-    get_filetype_counts,
+    get_tracks_facets,
     get_history_page,
     get_user_setting,
     set_user_setting,
     get_track_with_playlists,
-    get_youtube_metadata_by_id,
+    get_youtube_metadata_with_blobs,
     get_youtube_metadata_batch,
+    get_youtube_metadata_blobs,
+    compute_max_quality_from_formats_json,
 )
+from utils.media_serving import build_media_response, configure_media_serving
+from utils.page_cursor import decode_cursor, encode_cursor
 
 import re
 YT_ID_RE = re.compile(r"^[A-Za-z0-9_-]{11}$")
@@ -256,6 +257,20 @@ def playlist_page(playlist_path: str):
     return render_template("index.html", server_ip=_get_local_ip(), 
                           playlist_rel=playlist_path, playlist_name=Path(playlist_path).name)
 
+_CURSOR_ARGS = ("page", "after", "before")
+
+
+def _paged_url(**cursor_args) -> str:
+    """Current URL with its filters kept and the pagination args replaced."""
+    args = request.args.to_dict(flat=False)
+    for key in _CURSOR_ARGS:
+        args.pop(key, None)
+    for key, value in cursor_args.items():
+        if value is not None:
+            args[key] = value
+    return url_for(request.endpoint, **args)
+
+
 @app.route("/tracks")
 def tracks_page():
     """DB Tracks Page with optional search functionality."""
@@ -351,15 +366,34 @@ def tracks_page():
 
     conn = get_connection()
     try:
-        # Facets: list of available resolutions
-        facets_resolutions = get_distinct_resolutions(conn)
-        facets_filetypes = get_distinct_filetypes(conn)
+        # Total, facet values and facet counts from one grouped query
+        facet_data = get_tracks_facets(
+            conn,
+            search_query=search_query if search_query else None,
+            include_deleted=include_deleted,
+            resolutions=resolutions_selected if resolutions_selected else None,
+            filetypes=filetypes_selected if filetypes_selected else None,
+            min_duration=min_duration_val,
+            max_duration=max_duration_val,
+            min_bitrate_bps=min_bitrate_bps,
+            max_bitrate_bps=max_bitrate_bps,
+            min_size_bytes=min_size_bytes,
+            max_size_bytes=max_size_bytes,
+            min_likes=min_likes,
+            min_max_quality=min_max_quality,
+        )
+        facets_resolutions = facet_data["resolutions"]
+        facets_filetypes = facet_data["filetypes"]
+        resolution_counts = facet_data["resolution_counts"]
+        filetype_counts = facet_data["filetype_counts"]
 
-        # Pagination
-        page = request.args.get("page", default=1, type=int)
+        # Pagination: keyset cursors (after/before); page is kept for display
+        page = max(1, request.args.get("page", default=1, type=int) or 1)
         per_page = request.args.get("per_page", default=200, type=int)
         if per_page <= 0 or per_page > 1000:
             per_page = 200
+        after_cursor = decode_cursor(request.args.get("after"), 2)
+        before_cursor = None if after_cursor else decode_cursor(request.args.get("before"), 2)
 
         tracks, total_count = get_tracks_with_filters_page(
             conn,
@@ -377,69 +411,43 @@ def tracks_page():
             min_max_quality=min_max_quality,
             page=page,
             per_page=per_page,
+            after=after_cursor,
+            before=before_cursor,
+            total_count=facet_data["total"],
         )
 
-        # Compute Max YouTube Quality per track for the current page using batch metadata fetch
+        # Max YouTube Quality per track from the denormalized columns (no formats JSON)
         max_quality_map = {}
         try:
             video_ids = [t['video_id'] for t in tracks] if tracks else []
             if video_ids:
-                metadata_map = get_youtube_metadata_batch(conn, video_ids) or {}
+                metadata_map = get_youtube_metadata_batch(
+                    conn, video_ids, columns=["max_available_height", "max_quality_label"]
+                ) or {}
+                missing = []
                 for vid, row in metadata_map.items():
-                    raw_formats = None
-                    try:
-                        raw_formats = row['available_formats']
-                    except Exception:
-                        raw_formats = None
-                    formats = None
-                    try:
-                        formats = json.loads(raw_formats) if raw_formats else None
-                    except Exception:
-                        formats = None
-                    max_height = 0
-                    if isinstance(formats, list):
-                        for f in formats:
-                            if not isinstance(f, dict):
-                                continue
-                            vcodec = str(f.get('vcodec') or '').lower()
-                            if not vcodec or vcodec == 'none':
-                                continue
-                            height = f.get('height')
-                            if isinstance(height, (int, float)) and height and height > max_height:
-                                max_height = int(height)
-                    if max_height > 0:
-                        max_quality_map[vid] = f"{max_height}p"
+                    height = row['max_available_height']
+                    if height:
+                        max_quality_map[vid] = row['max_quality_label'] or f"{int(height)}p"
+                    else:
+                        missing.append(vid)
+                # Rows predating the columns: parse formats for those only and
+                # queue a backfill so later views skip this path
+                if missing:
+                    formats_map = get_youtube_metadata_blobs(conn, missing, ("available_formats",)) or {}
+                    backfill_needed = False
+                    for vid, row in formats_map.items():
+                        height, label = compute_max_quality_from_formats_json(row['available_formats'])
+                        if height:
+                            max_quality_map[vid] = label
+                            backfill_needed = True
+                    if backfill_needed:
+                        from services.job_workers.max_quality_backfill_worker import request_max_quality_backfill
+                        request_max_quality_backfill("tracks_page")
         except Exception:
             # Fail-safe: do not block page rendering on unexpected errors
             max_quality_map = {}
 
-        # Faceted counts (computed excluding the facet itself)
-        resolution_counts = get_resolution_counts(
-            conn,
-            search_query=search_query if search_query else None,
-            include_deleted=include_deleted,
-            filetypes=filetypes_selected if filetypes_selected else None,
-            min_duration=min_duration_val,
-            max_duration=max_duration_val,
-            min_bitrate_bps=min_bitrate_bps,
-            max_bitrate_bps=max_bitrate_bps,
-            min_size_bytes=min_size_bytes,
-            max_size_bytes=max_size_bytes,
-            min_likes=min_likes,
-        )
-        filetype_counts = get_filetype_counts(
-            conn,
-            search_query=search_query if search_query else None,
-            include_deleted=include_deleted,
-            resolutions=resolutions_selected if resolutions_selected else None,
-            min_duration=min_duration_val,
-            max_duration=max_duration_val,
-            min_bitrate_bps=min_bitrate_bps,
-            max_bitrate_bps=max_bitrate_bps,
-            min_size_bytes=min_size_bytes,
-            max_size_bytes=max_size_bytes,
-            min_likes=min_likes,
-        )
     finally:
         conn.close()
     
@@ -464,12 +472,26 @@ def tracks_page():
         "filetype_counts": filetype_counts if 'filetype_counts' in locals() else {},
     }
 
-    # Pagination info
+    # Pagination info (prev/next links carry keyset cursors of the boundary rows)
     pagination = {
         "page": page,
         "per_page": per_page,
         "total": total_count if 'total_count' in locals() else len(tracks),
+        "prev_url": None,
+        "next_url": None,
     }
+    if tracks:
+        total_pages = -(-pagination["total"] // per_page)
+        if page > 1:
+            first = tracks[0]
+            pagination["prev_url"] = _paged_url(
+                page=page - 1, before=encode_cursor([first["sort_key"], first["id"]])
+            )
+        if page < total_pages:
+            last = tracks[-1]
+            pagination["next_url"] = _paged_url(
+                page=page + 1, after=encode_cursor([last["sort_key"], last["id"]])
+            )
 
     return render_template(
         "tracks.html",
@@ -511,9 +533,8 @@ def track_page(video_id: str):
         track = get_track_with_playlists(conn, video_id)
         if not track:
             abort(404)
-        metadata_row = get_youtube_metadata_by_id(conn, video_id)
-        # Ensure template receives JSON-serializable dict
-        metadata = dict(metadata_row) if metadata_row else None
+        # JSON-serializable dict, description/formats loaded from the blob table
+        metadata = get_youtube_metadata_with_blobs(conn, video_id)
     finally:
         conn.close()
 
@@ -682,18 +703,31 @@ def events_page():
     track_filter = track_filter if track_filter else None
     video_id_filter = video_id_filter if video_id_filter else None
     
+    # Keyset cursors on play_history.id (before = older page, after = newer page)
+    before_id = request.args.get("before", type=int)
+    after_id = None if before_id is not None else request.args.get("after", type=int)
+    
     conn = get_connection()
-    rows, has_next = get_history_page(
+    rows, has_more = get_history_page(
         conn, 
         page=page, 
         per_page=1000,
         event_types=event_types,
         track_filter=track_filter,
-        video_id_filter=video_id_filter
+        video_id_filter=video_id_filter,
+        before_id=before_id,
+        after_id=after_id,
     )
     rows = [dict(r) for r in rows]
     conn.close()
     
+    if after_id is not None:
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, page > 1
+    prev_url = _paged_url(page=page - 1, after=rows[0]["id"]) if (rows and has_prev) else None
+    next_url = _paged_url(page=page + 1, before=rows[-1]["id"]) if (rows and has_next) else None
+    
     # Pass filter parameters to template for maintaining state
     filter_params = {
         'event_types': event_types if event_types is not None else None,
@@ -702,7 +736,8 @@ def events_page():
         'video_id_filter': video_id_filter or ''
     }
     
-    return render_template("history.html", history=rows, page=page, has_next=has_next, filters=filter_params, request=request)
+    return render_template("history.html", history=rows, page=page, has_next=has_next,
+                           prev_url=prev_url, next_url=next_url, filters=filter_params, request=request)
 
 @app.route("/backups")
 def backups_page():
@@ -716,9 +751,8 @@ def favicon():
 
 @app.route("/media/<path:filename>")
 def media(filename: str):
-    """Serve media files."""
-    # conditional=True enables Range / 206 — required for reliable seek and mobile playback.
-    return send_from_directory(ROOT_DIR, filename, as_attachment=False, conditional=True)
+    """Serve media files (Range / 206 for seeking, sendfile or proxy offload for the body)."""
+    return build_media_response(request.environ, ROOT_DIR, filename)
 
 def _list_log_files():
     """Return sorted list of *.log paths inside LOGS_DIR (main log first, then newest first)."""
@@ -792,10 +826,18 @@ def log_view(log_name: str):
 
 @app.route("/stream_log/<path:log_name>")
 def stream_log(log_name: str):
-    """Stream log file content via Server-Sent Events with tail functionality."""
-    import time
-    from collections import deque
-    from flask import Response
+    """Stream log file content via Server-Sent Events with tail functionality.
+
+    All viewers of a file share one follower thread. Event ids are byte offsets,
+    so an EventSource reconnect (Last-Event-ID) resumes where it left off.
+    """
+    import queue
+    from services.log_follow_service import (
+        MAX_RESUME_BYTES,
+        get_log_follower,
+        read_lines_between,
+        read_tail_lines,
+    )
     
     # Security checks like original
     if "/" in log_name or ".." in log_name or not log_name.endswith(".log"):
@@ -804,29 +846,63 @@ def stream_log(log_name: str):
     log_path = LOGS_DIR / log_name
     if not log_path.exists() or not log_path.is_file():
         abort(404)
+
+    resume_raw = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    try:
+        resume_offset = int(resume_raw) if resume_raw not in (None, "") else None
+    except ValueError:
+        resume_offset = None
     
     def generate():
-        # Send last 200 lines first (like tail)
+        follower = get_log_follower(log_path)
+        client_queue, published = follower.subscribe()
         try:
-            with open(log_path, "r", encoding="utf-8", errors="ignore") as f:
-                last_lines = deque(f, maxlen=200)
-                for line in last_lines:
-                    yield f"data: {line.rstrip()}\n\n"
-
-                # Follow file for new content
-                f.seek(0, 2)  # move to end
-                while True:
-                    line = f.readline()
-                    if line:
-                        yield f"data: {line.rstrip()}\n\n"
-                    else:
-                        time.sleep(1)
+            try:
+                if (resume_offset is not None and 0 <= resume_offset <= published
+                        and published - resume_offset <= MAX_RESUME_BYTES):
+                    backlog = read_lines_between(log_path, resume_offset, published)
+                else:
+                    # Send last 200 lines first (like tail)
+                    backlog = read_tail_lines(log_path, 200, end_offset=published)
+            except OSError:
+                backlog = []
+                yield "data: Error reading log file\n\n"
+            for offset, line in backlog:
+                yield f"id: {offset}\ndata: {line}\n\n"
+            sent_upto = published
+
+            # Follow file for new content
+            while True:
+                try:
+                    offset, line = client_queue.get(timeout=15)
+                except queue.Empty:
+                    # Comment line keeps proxies open and surfaces dead clients
+                    yield ": keepalive\n\n"
+                    continue
+                if offset == -1:
+                    # File truncated/rotated or this client fell behind: resync from tail
+                    sent_upto = follower.offset
+                    try:
+                        resync = read_tail_lines(log_path, 200, end_offset=sent_upto)
+                    except OSError:
+                        resync = []
+                    for r_offset, r_line in resync:
+                        yield f"id: {r_offset}\ndata: {r_line}\n\n"
+                    continue
+                if offset <= sent_upto:
+                    continue
+                sent_upto = offset
+                yield f"id: {offset}\ndata: {line}\n\n"
         except GeneratorExit:
             return
-        except Exception:
-            yield f"data: Error reading log file\n\n"
+        finally:
+            follower.unsubscribe(client_queue)
     
-    return Response(generate(), mimetype="text/event-stream")
+    return Response(
+        generate(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @app.route("/static_log/<path:log_name>")
 def static_log(log_name: str):
@@ -1182,6 +1258,16 @@ def main():
     except Exception as _:
         thumbnails_dir = None
     init_api_router(ROOT_DIR, thumbnails_dir, yt_timeout, yt_order, preview_priority)
+
+    # Media delivery: optional reverse-proxy offload and browser cache lifetime
+    try:
+        configure_media_serving(
+            accel_mode=env_config.get('MEDIA_ACCEL_MODE'),
+            accel_prefix=env_config.get('MEDIA_ACCEL_PREFIX'),
+            cache_max_age=int(env_config['MEDIA_CACHE_MAX_AGE']) if env_config.get('MEDIA_CACHE_MAX_AGE') else None,
+        )
+    except Exception as e:
+        print(f"Warning: Invalid media serving settings in .env: {e}")
     
     # Make LOGS_DIR available globally for API controller
     from utils.logging_utils import set_logs_dir
@@ -1203,7 +1289,7 @@ def main():
     
     # Initialize and start Job Queue Service
     from services.job_queue_service import get_job_queue_service
-    from services.job_workers import ChannelDownloadWorker, MetadataExtractionWorker, CleanupWorker, PlaylistDownloadWorker, BackupWorker, QuickSyncWorker, LibraryScanWorker
+    from services.job_workers import ChannelDownloadWorker, MetadataExtractionWorker, CleanupWorker, PlaylistDownloadWorker, BackupWorker, QuickSyncWorker, LibraryScanWorker, MaxQualityBackfillWorker, PreviewPrewarmWorker, SpriteSheetWorker, DatabaseMaintenanceWorker, QuickSyncGroupWorker, BulkRestoreWorker
     
     # Force reload the single video metadata worker to ensure latest code
     import importlib
@@ -1224,6 +1310,12 @@ def main():
         job_service.register_worker(SingleVideoMetadataWorker())
         job_service.register_worker(QuickSyncWorker())
         job_service.register_worker(LibraryScanWorker())
+        job_service.register_worker(MaxQualityBackfillWorker())
+        job_service.register_worker(PreviewPrewarmWorker())
+        job_service.register_worker(SpriteSheetWorker())
+        job_service.register_worker(DatabaseMaintenanceWorker())
+        job_service.register_worker(QuickSyncGroupWorker())
+        job_service.register_worker(BulkRestoreWorker())
         
         # Start the service
         job_service.start()
@@ -3,11 +3,14 @@
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context, url_for
 from .shared import get_root_dir, get_connection, log_message, record_event
 import database as db
-from services.playlist_service import scan_tracks, _ensure_subdir, list_playlists
+from services.playlist_service import (
+    scan_tracks, iter_compact_tracks_json, get_track_details, _ensure_subdir, list_playlists,
+)
 from services.download_service import get_active_downloads
+from utils.http_compression import compress_response, compress_stream, negotiate_stream_encoding
 
 # Create blueprint
 base_bp = Blueprint('base', __name__)
@@ -15,13 +18,38 @@ base_bp = Blueprint('base', __name__)
 @base_bp.route("/tracks", defaults={"subpath": ""})
 @base_bp.route("/tracks/<path:subpath>")
 def api_tracks(subpath: str):
-    """Get tracks from a directory."""
+    """Get tracks from a directory.
+
+    ?format=compact streams a columnar document (field names once, rows as
+    arrays, tooltip-only fields omitted) compressed with br/gzip as it is
+    generated. Without it the legacy list of track objects is returned.
+    """
     root_dir = get_root_dir()
     if not root_dir:
         return jsonify({"error": "Server configuration error"}), 500
     base_dir = _ensure_subdir(Path(subpath)) if subpath else root_dir
+    if request.args.get("format") == "compact":
+        media_prefix = url_for("media", filename="_")[:-1]
+        encoding = negotiate_stream_encoding()
+        body = compress_stream(iter_compact_tracks_json(base_dir, media_prefix), encoding)
+        response = Response(stream_with_context(body), mimetype="application/json")
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        response.headers["Vary"] = "Accept-Encoding"
+        response.headers["Cache-Control"] = "no-cache"
+        return response
     tracks = scan_tracks(base_dir)
-    return jsonify(tracks)
+    return compress_response(jsonify(tracks))
+
+@base_bp.route("/track_details/<video_id>")
+def api_track_details(video_id: str):
+    """Tooltip-only fields left out of the compact /api/tracks payload."""
+    if not video_id or len(video_id) > 64:
+        return jsonify({"status": "error", "message": "bad video_id"}), 400
+    details = get_track_details(video_id)
+    if details is None:
+        return jsonify({"status": "error", "message": "not found"}), 404
+    return jsonify({"status": "ok", "video_id": video_id, "details": details})
 
 @base_bp.route("/playlists")
 def api_playlists():
@@ -91,34 +119,53 @@ def api_backups():
     except Exception as exc:
         return jsonify({"status": "error", "message": str(exc)}), 500
 
-@base_bp.route("/database/maintenance", methods=["POST"])
-def api_database_maintenance():
-    """Run database maintenance operations."""
+@base_bp.route("/backups/<folder_name>/restore", methods=["POST"])
+def api_restore_backup(folder_name: str):
+    """Rebuild a backup into a standalone database file (the live DB is not replaced)."""
     try:
-        log_message("Starting database maintenance...")
-        
-        # Import database optimizer
-        from utils.database_optimizer import DatabaseOptimizer
-        
-        # Create optimizer instance
-        optimizer = DatabaseOptimizer()
-        
-        # Run maintenance with force=True to execute immediately
-        result = optimizer.run_maintenance(force=True)
-        
-        if result.get('success', False):
-            log_message(f"Database maintenance completed successfully in {result.get('duration', 0):.2f}s")
+        root_dir = get_root_dir()
+        if not root_dir:
+            return jsonify({"error": "Server configuration error"}), 500
+        from database import restore_backup
+        result = restore_backup(root_dir, folder_name)
+        if result['success']:
+            log_message(f"Database backup {folder_name} restored to {result['restored_path']}")
             return jsonify({
                 "status": "ok",
-                "message": "Database maintenance completed successfully",
-                "details": result
+                "restored_path": result['restored_path'],
+                "size_bytes": result['size_bytes']
             })
-        else:
-            log_message(f"Database maintenance failed: {result.get('reason', 'Unknown error')}")
-            return jsonify({
-                "status": "error",
-                "message": result.get('reason', 'Database maintenance failed')
-            }), 500
+        log_message(f"Database backup restore failed: {result['error']}")
+        return jsonify({"status": "error", "message": result['error']}), 500
+    except Exception as exc:
+        log_message(f"Database backup restore error: {exc}")
+        return jsonify({"status": "error", "message": str(exc)}), 500
+
+@base_bp.route("/database/maintenance", methods=["POST"])
+def api_database_maintenance():
+    """Queue database maintenance as a background job.
+    
+    Maintenance runs in short steps (see utils.database_optimizer.MaintenanceScheduler)
+    so it no longer blocks this request or other writers.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        from services.job_queue_service import get_job_queue_service
+        from services.job_types import JobType, JobPriority
+        
+        job_id = get_job_queue_service().create_and_add_job(
+            JobType.SYSTEM_MAINTENANCE,
+            priority=JobPriority.NORMAL,
+            convert_auto_vacuum=bool(data.get('convert_auto_vacuum', False)),
+            ignore_player=True,
+            reason='manual',
+        )
+        log_message(f"Database maintenance queued as job #{job_id}")
+        return jsonify({
+            "status": "ok",
+            "message": f"Database maintenance queued as job #{job_id}",
+            "job_id": job_id
+        }), 202
             
     except Exception as exc:
         log_message(f"Database maintenance error: {exc}")
@@ -10,6 +10,7 @@ from flask import Blueprint, request, jsonify
 
 from .shared import get_connection, log_message, get_root_dir, record_event
 import database as db
+from services.disk_usage_service import get_disk_usage_service
 
 # Create blueprint
 channels_files_bp = Blueprint('channels_files', __name__)
@@ -367,6 +368,8 @@ def api_delete_track():
                 log_message(f"[Delete] ERROR: {error_msg}")
                 return jsonify({"status": "error", "error": error_msg}), 500
             
+            get_disk_usage_service().note_file_moved(source_path, target_path)
+            
             # Calculate trash_path relative to ROOT_DIR parent (D:\music\Youtube)
             trash_path = str(target_file.relative_to(root_dir.parent))
             log_message(f"[Delete] SUCCESS: Moved to trash: {track_name} → {trash_path}")
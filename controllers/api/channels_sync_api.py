@@ -220,8 +220,11 @@ def api_quick_sync_channel_group(group_id: int):
         # Use ChannelSyncService for quick sync business logic
         sync_service = ChannelSyncService()
         
+        # Manual runs sync every channel unless the caller opts into the feed check
+        data = request.get_json(silent=True) or {}
+        
         # Execute quick sync for the entire group
-        result = sync_service.quick_sync_channel_group(group_id=group_id)
+        result = sync_service.quick_sync_channel_group(group_id=group_id, feed_check=bool(data.get('feed_check', False)))
         
         # Log the operation
         if result.get('status') == 'started':
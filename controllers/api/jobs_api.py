@@ -1,5 +1,6 @@
 """Jobs API endpoints."""
 
+import re
 from pathlib import Path
 from flask import Blueprint, request, jsonify
 from datetime import datetime
@@ -7,6 +8,8 @@ from datetime import datetime
 from .shared import log_message
 from services.job_queue_service import get_job_queue_service
 from services.job_types import JobType, JobPriority, JobStatus
+from utils.http_compression import compress_response
+from utils.job_logging import DEFAULT_LOG_PAGE_BYTES, JOB_LOG_FILES, grep_log, read_log_range
 
 # Create blueprint
 jobs_bp = Blueprint('jobs', __name__)
@@ -357,7 +360,11 @@ def api_get_queue_status():
 
 @jobs_bp.route("/jobs/logs/<int:job_id>", methods=["GET"])
 def api_get_job_logs(job_id: int):
-    """Get log content for a specific job."""
+    """Get log index for a specific job with the tail of each log.
+
+    Only the last ``tail_bytes`` (default 64 KB) of each file is returned;
+    use /jobs/logs/<job_id>/<log_type> to page through the rest.
+    """
     try:
         # Get job queue service
         service = get_job_queue_service()
@@ -366,48 +373,132 @@ def api_get_job_logs(job_id: int):
         job = service.get_job(job_id)
         if not job:
             return jsonify({"status": "error", "error": "Job not found"}), 404
+
+        tail_bytes = request.args.get('tail_bytes', default=DEFAULT_LOG_PAGE_BYTES, type=int)
         
-        # Read log files if they exist
+        # Read log tails if they exist
         logs = {}
+        log_info = {}
         
         if job.log_file_path:
             log_dir = Path(job.log_file_path)
             
-            log_files = {
-                'job': 'job.log',
-                'stdout': 'stdout.log', 
-                'stderr': 'stderr.log',
-                'progress': 'progress.log',
-                'summary': 'summary.txt'
-            }
-            
-            for log_type, filename in log_files.items():
+            for log_type, filename in JOB_LOG_FILES.items():
                 log_file = log_dir / filename
                 if log_file.exists():
                     try:
-                        with open(log_file, 'r', encoding='utf-8') as f:
-                            logs[log_type] = f.read()
+                        page = read_log_range(log_file, None, tail_bytes)
+                        logs[log_type] = page['content']
+                        log_info[log_type] = {
+                            'size': page['size'],
+                            'start': page['start'],
+                            'end': page['end'],
+                            'truncated': page['has_more_before'],
+                        }
                     except Exception as e:
                         logs[log_type] = f"Error reading log: {e}"
                 else:
                     logs[log_type] = "Log file not found"
         
-        return jsonify({
+        return compress_response(jsonify({
             "status": "ok",
             "job_id": job_id,
-            "logs": logs
-        })
+            "logs": logs,
+            "log_info": log_info
+        }))
         
     except Exception as e:
         log_message(f"[Jobs API] Error getting logs for job {job_id}: {e}")
         return jsonify({"status": "error", "error": str(e)}), 500
 
 
-        return jsonify({
-            "status": "error",
-            "error": str(e),
-            "traceback": traceback.format_exc()
-        }), 500
+def _resolve_job_log_file(job_id: int, log_type: str):
+    """Return (log_file, error_response) for a job log type."""
+    filename = JOB_LOG_FILES.get(log_type)
+    if not filename:
+        return None, (jsonify({"status": "error", "error": f"Invalid log type: {log_type}"}), 400)
+    job = get_job_queue_service().get_job(job_id)
+    if not job:
+        return None, (jsonify({"status": "error", "error": "Job not found"}), 404)
+    if not job.log_file_path:
+        return None, (jsonify({"status": "error", "error": "Job has no logs"}), 404)
+    log_file = Path(job.log_file_path) / filename
+    if not log_file.exists():
+        return None, (jsonify({"status": "error", "error": "Log file not found"}), 404)
+    return log_file, None
+
+
+@jobs_bp.route("/jobs/logs/<int:job_id>/<log_type>", methods=["GET"])
+def api_get_job_log_page(job_id: int, log_type: str):
+    """Get one page of a job log by byte range.
+
+    Query params:
+        offset: byte offset of the page start (omit for the tail)
+        limit: page size in bytes (default 64 KB, max 2 MB)
+    """
+    try:
+        log_file, error = _resolve_job_log_file(job_id, log_type)
+        if error:
+            return error
+
+        offset = request.args.get('offset', type=int)
+        limit = request.args.get('limit', default=DEFAULT_LOG_PAGE_BYTES, type=int)
+        page = read_log_range(log_file, offset, limit)
+
+        return compress_response(jsonify({
+            "status": "ok",
+            "job_id": job_id,
+            "log_type": log_type,
+            **page
+        }))
+
+    except Exception as e:
+        log_message(f"[Jobs API] Error reading {log_type} log for job {job_id}: {e}")
+        return jsonify({"status": "error", "error": str(e)}), 500
+
+
+@jobs_bp.route("/jobs/logs/<int:job_id>/<log_type>/search", methods=["GET"])
+def api_search_job_log(job_id: int, log_type: str):
+    """Search a single job log server-side.
+
+    Query params:
+        q: search text (required)
+        regex: 1 to treat q as a regular expression
+        case: 1 for case-sensitive matching
+        max_matches: cap on returned matches (default 500, max 5000)
+    """
+    try:
+        pattern = (request.args.get('q') or '').strip()
+        if not pattern:
+            return jsonify({"status": "error", "error": "q is required"}), 400
+
+        log_file, error = _resolve_job_log_file(job_id, log_type)
+        if error:
+            return error
+
+        max_matches = max(1, min(request.args.get('max_matches', default=500, type=int), 5000))
+        try:
+            result = grep_log(
+                log_file,
+                pattern,
+                regex=request.args.get('regex') == '1',
+                ignore_case=request.args.get('case') != '1',
+                max_matches=max_matches,
+            )
+        except re.error as e:
+            return jsonify({"status": "error", "error": f"Invalid pattern: {e}"}), 400
+
+        return compress_response(jsonify({
+            "status": "ok",
+            "job_id": job_id,
+            "log_type": log_type,
+            "query": pattern,
+            **result
+        }))
+
+    except Exception as e:
+        log_message(f"[Jobs API] Error searching {log_type} log for job {job_id}: {e}")
+        return jsonify({"status": "error", "error": str(e)}), 500
 
 @jobs_bp.route("/jobs/clear_queue", methods=["POST"])
 def api_clear_job_queue():
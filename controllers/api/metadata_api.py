@@ -234,8 +234,9 @@ def api_scan_missing_youtube_qualities():
       - Looks for tracks not marked deleted.
       - Missing qualities criteria:
           yvm.youtube_id IS NULL OR
-          yvm.available_formats IS NULL OR TRIM(yvm.available_formats) = '' OR
           yvm.max_available_height IS NULL
+        (max_available_height is derived from the formats, which are stored
+        compressed in youtube_metadata_blobs)
     """
     try:
         data = request.get_json(silent=True) or {}
@@ -259,7 +260,6 @@ def api_scan_missing_youtube_qualities():
             )
             AND (
                 yvm.youtube_id IS NULL OR
-                yvm.available_formats IS NULL OR TRIM(yvm.available_formats) = '' OR
                 yvm.max_available_height IS NULL
             )
             ORDER BY t.id ASC
@@ -525,7 +525,7 @@ def api_metadata_statistics():
         # Coverage percentage
         coverage_percent = (tracks_with_metadata / total_tracks * 100) if total_tracks > 0 else 0
 
-        # Tracks WITH YouTube qualities (yvm present, available_formats non-empty, max_available_height not null)
+        # Tracks WITH YouTube qualities (yvm present, max_available_height not null)
         cur.execute(
             """
             SELECT COUNT(*) FROM tracks t
@@ -534,7 +534,6 @@ def api_metadata_statistics():
                 SELECT dt.video_id FROM deleted_tracks dt
                 WHERE dt.restored_at IS NULL
             )
-            AND yvm.available_formats IS NOT NULL AND TRIM(yvm.available_formats) <> ''
             AND yvm.max_available_height IS NOT NULL
             """
         )
@@ -6,6 +6,9 @@ from pathlib import Path
 from flask import Blueprint, request, jsonify
 
 from .shared import get_root_dir, get_connection, log_message
+from utils.aggregate_cache import (
+    TAG_LIBRARY, TAG_LIKES, etag_matches, get_or_compute, invalidate_on_version_change, make_etag,
+)
 from services.download_service import add_active_download, update_download_status, remove_active_download
 import database as db
 
@@ -539,19 +542,44 @@ def compute_like_stats_list(conn):
     return like_stats
 
 
+def get_like_stats_cached():
+    """compute_like_stats_list served from the aggregate cache.
+
+    Invalidated on like/dislike writes in this process and whenever the
+    tracks change counter moves (library scans run in a subprocess).
+    """
+    conn = get_connection()
+    try:
+        invalidate_on_version_change("tracks", db.get_data_version(conn, "tracks"), TAG_LIBRARY, TAG_LIKES)
+    finally:
+        conn.close()
+
+    def _compute():
+        conn = get_connection()
+        try:
+            return compute_like_stats_list(conn)
+        finally:
+            conn.close()
+
+    return get_or_compute("like_stats", _compute, tags=(TAG_LIKES,))
+
+
 @playlist_bp.route("/like_stats", methods=["GET"])
 def api_like_stats():
     """Get statistics about tracks grouped by like count."""
     try:
-        conn = get_connection()
-        like_stats = compute_like_stats_list(conn)
-        conn.close()
-
-        return jsonify({
+        like_stats = get_like_stats_cached()
+        payload = {
             "status": "ok",
             "like_stats": like_stats,
             "total_categories": len(like_stats),
-        })
+        }
+
+        etag = make_etag(payload)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("If-None-Match"), etag):
+            return "", 304, headers
+        return jsonify(payload), 200, headers
 
     except Exception as e:
         log_message(f"[Virtual Playlist] Error getting like stats: {e}")
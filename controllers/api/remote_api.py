@@ -17,6 +17,7 @@ from .shared import (
     record_event,
 )
 from services.playlist_service import list_playlists
+from utils.aggregate_cache import etag_matches, make_etag
 import database as db
 
 _LIKES_PLAYER_PATH = re.compile(r"^/likes_player/(\d+)/?$")
@@ -400,11 +401,9 @@ def api_remote_playlist_sources():
     if not root_dir:
         return jsonify({"status": "error", "message": "Server configuration error"}), 500
     try:
-        from .playlist_api import compute_like_stats_list
+        from .playlist_api import get_like_stats_cached
 
-        conn = get_connection()
-        like_stats = compute_like_stats_list(conn)
-        conn.close()
+        like_stats = get_like_stats_cached()
     except Exception as e:
         log_message(f"[Remote] playlist_sources like_stats failed: {e}")
         like_stats = []
@@ -434,7 +433,13 @@ def api_remote_playlist_sources():
             }
         )
 
-    return jsonify({"status": "ok", "regular": regular, "virtual": virtual})
+    # Hash of the payload: it also carries live per-folder counts from the DB
+    payload = {"status": "ok", "regular": regular, "virtual": virtual}
+    etag = make_etag(payload)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        return "", 304, headers
+    return jsonify(payload), 200, headers
 
 
 @remote_bp.route("/remote/switch_source", methods=["POST"])
@@ -12,6 +12,7 @@ from flask import Blueprint, request, jsonify
 import database as db
 from .shared import get_connection, log_message
 from services.recurring_scheduler_service import (
+    SUPPORTED_TASK_TYPES,
     get_recurring_scheduler_service,
 )
 
@@ -55,6 +56,8 @@ def _validate_schedule_payload(data: Dict[str, Any], is_update: bool = False) ->
 
     # Task-specific validation
     t = (data.get("task_type") or "").upper()
+    if (not is_update or "task_type" in data) and t not in SUPPORTED_TASK_TYPES:
+        return f"Invalid task_type (expected one of: {', '.join(SUPPORTED_TASK_TYPES)})"
     if t == "QUICK_SYNC_GROUP":
         params = data.get("params") or {}
         if not isinstance(params.get("group_id"), int):
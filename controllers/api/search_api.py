@@ -0,0 +1,65 @@
+"""Full-text search API (FTS5 index over track names and YouTube metadata)."""
+
+from flask import Blueprint, request, jsonify
+
+from .shared import get_connection, log_message
+import database as db
+
+search_bp = Blueprint('search', __name__)
+
+MAX_SEARCH_LIMIT = 200
+
+
+@search_bp.route("/search", methods=["GET"])
+def api_search():
+    """Ranked search: ?q=<text>&limit=&offset=&tracks_only=1&include_deleted=1."""
+    query = (request.args.get("q") or "").strip()
+    if not query:
+        return jsonify({"status": "error", "message": "Missing q parameter"}), 400
+    limit = request.args.get("limit", default=50, type=int) or 50
+    limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+    offset = max(0, request.args.get("offset", default=0, type=int) or 0)
+    tracks_only = request.args.get("tracks_only", "").lower() in ("1", "true", "yes")
+    include_deleted = request.args.get("include_deleted", "").lower() in ("1", "true", "yes")
+
+    try:
+        conn = get_connection()
+        try:
+            if not db.is_search_index_available():
+                return jsonify({"status": "error", "message": "Full-text search is not available (SQLite without FTS5)"}), 503
+            rows = db.search_library(
+                conn,
+                query,
+                limit=limit + 1,
+                offset=offset,
+                tracks_only=tracks_only,
+                include_deleted=include_deleted,
+            )
+        finally:
+            conn.close()
+
+        results = [
+            {
+                "video_id": r["video_id"],
+                "in_library": r["track_id"] is not None,
+                "name": r["title"] or r["name"],
+                "file_name": r["name"],
+                "channel": r["channel"] or r["uploader"],
+                "relpath": r["relpath"],
+                "is_deleted": bool(r["is_deleted"]),
+                "score": -float(r["rank"]),
+                "snippet": r["snippet"],
+            }
+            for r in rows[:limit]
+        ]
+        return jsonify({
+            "status": "ok",
+            "query": query,
+            "results": results,
+            "offset": offset,
+            "limit": limit,
+            "has_more": len(rows) > limit,
+        })
+    except Exception as e:
+        log_message(f"[Search] query failed: {e}")
+        return jsonify({"status": "error", "message": str(e)}), 500
@@ -243,4 +243,14 @@ def api_cookies_health():
             'files': files,
         })
     except Exception as e:
-        return jsonify({'status': 'error', 'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'status': 'error', 'error': str(e)}), 500
+
+@system_bp.route("/cache/stats", methods=["GET"])
+def api_cache_stats():
+    """Hit/miss counters of the server-side aggregate cache (like stats, playlist sources)."""
+    try:
+        from utils.aggregate_cache import get_cache_stats
+        return jsonify({'status': 'ok', 'cache': get_cache_stats()})
+    except Exception as e:
+        log_message(f"[Cache] stats failed: {e}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -10,13 +10,20 @@ from pathlib import Path
 import json
 from typing import Any, Dict
 
-from flask import Blueprint, jsonify, request, send_file, current_app
+from flask import Blueprint, jsonify, redirect, request, send_file, current_app
 
 from .shared import get_connection, get_root_dir, get_thumbnails_dir, get_youtube_thumb_config, get_preview_priority, log_message
 import database as db
 from utils.media_probe import ffprobe_media_properties, ffprobe_media_properties_ex
 from services.job_queue_service import get_job_queue_service
 from services.job_types import JobType, JobPriority
+from services.preview_service import (
+    PLACEHOLDER_PNG,
+    PREVIEW_RETRY_AFTER_SECONDS,
+    STATIC_PREVIEWS_DIR,
+    get_preview_service,
+)
+from services.thumbnail_store import get_thumbnail_store, invalidate_thumbnails, snap_width
 import subprocess
 import os
 import tempfile
@@ -292,151 +299,6 @@ def _get_previews_dir() -> Path:
     return base
 
 
-def _find_adjacent_thumbnail(root_dir: Path, relpath: str, video_id: str) -> Path | None:
-    """Search only in the media file's parent directory for a YouTube thumbnail like *[VIDEO_ID].webp/jpg/png."""
-    try:
-        import re as _re
-        media_abs = (root_dir / relpath).resolve()
-        parent = media_abs.parent
-        pattern = _re.compile(r"\\[" + _re.escape(video_id) + r"\\]")
-        for p in parent.iterdir():
-            try:
-                if not p.is_file():
-                    continue
-                if p.suffix.lower() not in {".webp", ".jpg", ".jpeg", ".png"}:
-                    continue
-                if pattern.search(p.stem):
-                    return p
-            except Exception:
-                continue
-    except Exception:
-        return None
-    return None
-
-
-def _find_in_thumbnails_dir(video_id: str) -> Path | None:
-    """If THUMBNAILS_DIR is configured, search there for files named *[VIDEO_ID].webp/jpg/png or <video_id>_*.png."""
-    try:
-        import re as _re
-        tdir = get_thumbnails_dir()
-        if not tdir:
-            return None
-        p = Path(tdir)
-        if not p.exists() or not p.is_dir():
-            return None
-        # Prefer explicit centralized names first
-        preferred = [
-            p / f"{video_id}_manual.png",
-            p / f"{video_id}_from_youtube.png",
-            p / f"{video_id}_from_media_file.png",
-        ]
-        for cand in preferred:
-            if cand.exists() and cand.is_file():
-                return cand
-        # Otherwise scan for legacy downloaded thumbnails with [VIDEO_ID]
-        pattern = _re.compile(r"\\[" + _re.escape(video_id) + r"\\]")
-        for fp in p.iterdir():
-            try:
-                if not fp.is_file():
-                    continue
-                if fp.suffix.lower() not in {".webp", ".jpg", ".jpeg", ".png"}:
-                    continue
-                if pattern.search(fp.stem):
-                    return fp
-            except Exception:
-                continue
-    except Exception:
-        return None
-    return None
-
-
-def _ensure_from_youtube_png(previews_dir: Path, src_image: Path, video_id: str) -> Path | None:
-    """Convert/copy found thumbnail to centralized PNG path and return it."""
-    out_path = previews_dir / f"{video_id}_from_youtube.png"
-    # If already exists, return
-    if out_path.exists():
-        return out_path
-    # Try convert with ffmpeg (handles webp/jpg/png to png)
-    cmd = [
-        "ffmpeg",
-        "-hide_banner",
-        "-loglevel",
-        "error",
-        "-nostdin",
-        "-i",
-        str(src_image),
-        "-vf",
-        "scale=640:-2:flags=bicubic",
-        "-q:v",
-        "2",
-        "-y",
-        str(out_path),
-    ]
-    try:
-        subprocess.run(cmd, check=True)
-        return out_path if out_path.exists() else None
-    except Exception:
-        # Fallback: try saving to static/previews when writing to THUMBNAILS_DIR fails
-        try:
-            fb_dir = _get_previews_dir()
-            fb_dir.mkdir(parents=True, exist_ok=True)
-            fb_out = fb_dir / f"{video_id}_from_youtube.png"
-            cmd[-1] = str(fb_out)
-            subprocess.run(cmd, check=True)
-            return fb_out if fb_out.exists() else None
-        except Exception:
-            try:
-                if out_path.exists():
-                    out_path.unlink(missing_ok=True)
-            except Exception:
-                pass
-            return None
-
-
-def _ensure_from_media_png(previews_dir: Path, src_media: Path, video_id: str, timestamp: float = 1.0, width: int = 640) -> Path | None:
-    out_path = previews_dir / f"{video_id}_from_media_file.png"
-    if out_path.exists():
-        return out_path
-    cmd = [
-        "ffmpeg",
-        "-hide_banner",
-        "-loglevel",
-        "error",
-        "-nostdin",
-        "-ss",
-        str(timestamp),
-        "-i",
-        str(src_media),
-        "-frames:v",
-        "1",
-        "-vf",
-        f"scale={width}:-2:flags=bicubic",
-        "-q:v",
-        "2",
-        "-y",
-        str(out_path),
-    ]
-    try:
-        subprocess.run(cmd, check=True)
-        return out_path if out_path.exists() else None
-    except Exception:
-        # Fallback: save under static/previews if writing to THUMBNAILS_DIR failed
-        try:
-            fb_dir = _get_previews_dir()
-            fb_dir.mkdir(parents=True, exist_ok=True)
-            fb_out = fb_dir / f"{video_id}_from_media_file.png"
-            cmd[-1] = str(fb_out)
-            subprocess.run(cmd, check=True)
-            return fb_out if fb_out.exists() else None
-        except Exception:
-            try:
-                if out_path.exists():
-                    out_path.unlink(missing_ok=True)
-            except Exception:
-                pass
-            return None
-
-
 def _resolve_preview_files_all(video_id: str, primary_dir: Path) -> Dict[str, Path]:
     """Return dictionaries of Paths for manual/youtube/media, preferring primary_dir
     but falling back to static/previews if a file exists there. Keys:
@@ -462,11 +324,27 @@ def _resolve_preview_files_all(video_id: str, primary_dir: Path) -> Dict[str, Pa
     return result
 
 
+# preview_info is a diagnostic call, so it may wait longer than preview.png
+PREVIEW_INFO_WAIT_SECONDS = 30.0
+
+
+def _preview_placeholder_response():
+    """Neutral tile returned while the preview is still being generated."""
+    resp = current_app.response_class(PLACEHOLDER_PNG, status=202, mimetype="image/png")
+    resp.headers["Retry-After"] = str(PREVIEW_RETRY_AFTER_SECONDS)
+    resp.headers["Cache-Control"] = "no-store"
+    resp.headers["X-Preview-Status"] = "pending"
+    return resp
+
+
 @tracks_bp.route("/track/<video_id>/preview.png", methods=["GET"])
 def api_central_preview_png(video_id: str):
     """Serve centralized preview PNG from static/previews with priority:
     manual -> from_youtube -> from_media_file. If none exist, attempt to
     create from YouTube thumbnail (adjacent .webp/.jpg) or extract from media.
+
+    Generation runs in the shared preview pool. If it takes longer than a
+    short wait, a placeholder PNG is returned with 202 and Retry-After.
     """
     try:
         if not _YT_ID_RE.match(video_id or ""):
@@ -548,21 +426,15 @@ def api_central_preview_png(video_id: str):
         finally:
             conn.close()
 
-        # Try thumbnails dir first (if configured) for an existing image
-        adj = _find_in_thumbnails_dir(video_id)
-        if not adj:
-            # Try adjacent thumbnail conversion on demand
-            adj = _find_adjacent_thumbnail(root_dir, relpath, video_id)
-        if adj and adj.exists():
-            conv = _ensure_from_youtube_png(previews_dir, adj, video_id)
-            if conv and conv.exists():
-                return send_file(str(conv), mimetype="image/png", max_age=0)
-
-        # Fallback: extract first frame from media
-        media_abs = (root_dir / relpath).resolve()
-        gen = _ensure_from_media_png(previews_dir, media_abs, video_id, timestamp=1.0, width=640)
+        # Generate in the preview pool (thumbnail conversion, else a media frame);
+        # concurrent requests for the same video share one ffmpeg run
+        gen, pending = get_preview_service().ensure(
+            video_id, previews_dir, root_dir, relpath, thumbnails_dir=configured_tdir
+        )
         if gen and gen.exists():
             return send_file(str(gen), mimetype="image/png", max_age=0)
+        if pending:
+            return _preview_placeholder_response()
 
         return jsonify({"status": "error", "error": "Failed to create preview"}), 500
     except Exception as exc:
@@ -648,27 +520,258 @@ def api_preview_info(video_id: str):
         if from_media.exists():
             return jsonify({"status": "ok", "source": "from_media_file", "path": str(from_media), "available_previews": available_previews})
 
-        # Try find adjacent or in thumbnails dir and convert
-        adj = _find_in_thumbnails_dir(video_id) or _find_adjacent_thumbnail(root_dir, relpath, video_id)
-        if adj and adj.exists():
-            conv = _ensure_from_youtube_png(previews_dir, adj, video_id)
-            if conv and conv.exists():
-                # Update available previews after conversion
-                available_previews.append({"source": "from_youtube", "path": str(conv)})
-                return jsonify({"status": "ok", "source": "from_youtube", "path": str(conv), "available_previews": available_previews, "youtube_url_tried": [], "selected_youtube_url": None})
-
-        # Fallback generate from media
-        media_abs = (root_dir / relpath).resolve()
-        gen = _ensure_from_media_png(previews_dir, media_abs, video_id, timestamp=1.0, width=640)
+        # Generate via the preview pool: thumbnail conversion first, then media frame
+        gen, pending = get_preview_service().ensure(
+            video_id, previews_dir, root_dir, relpath,
+            thumbnails_dir=configured_tdir, wait=PREVIEW_INFO_WAIT_SECONDS,
+        )
         if gen and gen.exists():
+            if gen.name.endswith("_from_youtube.png"):
+                available_previews.append({"source": "from_youtube", "path": str(gen)})
+                return jsonify({"status": "ok", "source": "from_youtube", "path": str(gen), "available_previews": available_previews, "youtube_url_tried": [], "selected_youtube_url": None})
             available_previews.append({"source": "from_media_file", "path": str(gen)})
             return jsonify({"status": "ok", "source": "from_media_file", "path": str(gen), "available_previews": available_previews})
+        if pending:
+            resp = jsonify({"status": "pending", "available_previews": available_previews})
+            resp.status_code = 202
+            resp.headers["Retry-After"] = str(PREVIEW_RETRY_AFTER_SECONDS)
+            return resp
 
         return jsonify({"status": "error", "error": "Failed to resolve preview"}), 500
     except Exception as exc:
         return jsonify({"status": "error", "error": str(exc)}), 500
 
 
+# ------------------------------
+# WebP thumbnail variants
+# ------------------------------
+
+# Hashed variant URLs never change content
+THUMB_IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Endpoints that write or delete preview PNGs; the thumbnail index is refreshed after them
+_PREVIEW_MUTATING_ENDPOINTS = {
+    "tracks.api_fetch_youtube_thumbnail",
+    "tracks.api_promote_preview_to_manual",
+    "tracks.api_set_manual_from_timestamp",
+}
+
+
+@tracks_bp.after_request
+def _refresh_thumbnail_index(response):
+    try:
+        video_id = (request.view_args or {}).get("video_id")
+        if not video_id:
+            return response
+        refreshed = str(request.args.get("refresh", "0")).lower() in {"1", "true", "yes"}
+        if request.endpoint in _PREVIEW_MUTATING_ENDPOINTS or refreshed:
+            invalidate_thumbnails(video_id)
+    except Exception:
+        pass
+    return response
+
+
+def _thumbnail_store():
+    configured_tdir = get_thumbnails_dir()
+    if configured_tdir:
+        return get_thumbnail_store(Path(configured_tdir), fallback_dir=STATIC_PREVIEWS_DIR)
+    return get_thumbnail_store(_get_previews_dir())
+
+
+def _thumb_file_url(filename: str) -> str:
+    return f"/api/thumbs/{filename}"
+
+
+def _thumb_resolver_url(video_id: str, width: int) -> str:
+    return f"/api/track/{video_id}/thumb?w={width}"
+
+
+@tracks_bp.route("/track/<video_id>/thumb", methods=["GET"])
+def api_track_thumbnail(video_id: str):
+    """Redirect to the content-hashed WebP variant of the track preview.
+
+    Query params:
+      - w: wanted width; snapped up to one of THUMB_WIDTHS (default: largest)
+
+    Builds the variant (and the preview itself, if there is none yet) in the
+    preview pool. While that is still running, returns the placeholder with
+    202 and Retry-After.
+    """
+    try:
+        if not _YT_ID_RE.match(video_id or ""):
+            return jsonify({"status": "error", "error": "Invalid video_id"}), 400
+        try:
+            width = snap_width(int(request.args.get("w", 0)))
+        except Exception:
+            width = snap_width(None)
+
+        store = _thumbnail_store()
+        order = get_preview_priority() or ["manual", "youtube", "media"]
+        service = get_preview_service()
+
+        source = store.source_for(video_id, order)
+        if source is None:
+            root_dir = get_root_dir()
+            if not root_dir:
+                return jsonify({"status": "error", "error": "Server not initialized"}), 500
+            conn = get_connection()
+            try:
+                row = conn.execute(
+                    "SELECT relpath FROM tracks WHERE video_id = ? LIMIT 1",
+                    (video_id,),
+                ).fetchone()
+            finally:
+                conn.close()
+            if not row:
+                return jsonify({"status": "error", "error": "Track not found"}), 404
+            configured_tdir = get_thumbnails_dir()
+            gen, pending = service.ensure(
+                video_id, store.previews_dir, root_dir, row[0],
+                thumbnails_dir=Path(configured_tdir) if configured_tdir else None,
+            )
+            if pending:
+                return _preview_placeholder_response()
+            source = store.source_for(video_id, order)
+            if source is None:
+                return jsonify({"status": "error", "error": "Failed to create preview"}), 500
+
+        kind, source_path = source
+        filename = store.variant_name(video_id, kind, width)
+        if not filename:
+            future = service.run_single_flight(
+                f"thumb:{video_id}:{kind}:{width}", store.build_variant, video_id, kind, source_path, width
+            )
+            try:
+                filename = future.result(timeout=2.0)
+            except Exception:
+                return _preview_placeholder_response()
+        if not filename:
+            # Encoder unavailable (ffmpeg without libwebp): serve the PNG as before
+            return send_file(str(source_path), mimetype="image/png", max_age=0)
+
+        resp = redirect(_thumb_file_url(filename), code=302)
+        resp.headers["Cache-Control"] = "no-cache"
+        return resp
+    except Exception as exc:
+        return jsonify({"status": "error", "error": str(exc)}), 500
+
+
+@tracks_bp.route("/thumbs/<filename>", methods=["GET"])
+def api_thumbnail_file(filename: str):
+    """Serve a WebP variant by its content-hashed name (cacheable forever)."""
+    store = _thumbnail_store()
+    path = store.variant_path(filename)
+    if path is None:
+        return jsonify({"status": "error", "error": "Invalid thumbnail name"}), 400
+    try:
+        resp = send_file(str(path), mimetype="image/webp", max_age=THUMB_IMMUTABLE_MAX_AGE, conditional=True)
+    except FileNotFoundError:
+        return jsonify({"status": "error", "error": "Thumbnail not found"}), 404
+    resp.cache_control.public = True
+    resp.cache_control.immutable = True
+    return resp
+
+
+@tracks_bp.route("/thumbs", methods=["GET"])
+def api_thumbnail_urls():
+    """Batch URL lookup for galleries: ?ids=a,b,c&w=320.
+
+    Returns the immutable variant URL where it already exists and the
+    /track/<id>/thumb resolver URL otherwise, so a page can render every
+    tile without a redirect per already-built thumbnail.
+    """
+    ids = [v for v in (request.args.get("ids") or "").split(",") if _YT_ID_RE.match(v)]
+    if len(ids) > 1000:
+        return jsonify({"status": "error", "error": "Too many ids (max 1000)"}), 400
+    try:
+        width = snap_width(int(request.args.get("w", 0)))
+    except Exception:
+        width = snap_width(None)
+    order = get_preview_priority() or ["manual", "youtube", "media"]
+    found = _thumbnail_store().lookup_many(ids, order, width)
+    urls = {
+        vid: (_thumb_file_url(name) if name else _thumb_resolver_url(vid, width))
+        for vid, name in found.items()
+    }
+    return jsonify({"status": "ok", "width": width, "urls": urls})
+
+
+# ------------------------------
+# Scrub sprite sheets
+# ------------------------------
+
+def _primary_previews_dir() -> Path:
+    configured_tdir = get_thumbnails_dir()
+    return Path(configured_tdir) if configured_tdir else _get_previews_dir()
+
+
+def _sprite_urls(video_id: str, index: Dict[str, Any]) -> Dict[str, str]:
+    version = index.get("version") or 0
+    return {
+        "image_url": f"/api/track/{video_id}/sprite.jpg?v={version}",
+        "vtt_url": f"/api/track/{video_id}/sprite.vtt?v={version}",
+    }
+
+
+@tracks_bp.route("/track/<video_id>/sprite", methods=["GET"])
+def api_track_sprite_index(video_id: str):
+    """Sprite sheet index for scrub previews.
+
+    Query params:
+      - enqueue: 0 to skip queueing a sprite_sheet job when none exists (default 1)
+
+    Frame i covers [i*interval, (i+1)*interval) and sits at
+    x = (i % columns) * tile_width, y = (i // columns) * tile_height.
+    """
+    if not _YT_ID_RE.match(video_id or ""):
+        return jsonify({"status": "error", "error": "Invalid video_id"}), 400
+    from services.sprite_sheet_service import load_sprite_index
+
+    index = load_sprite_index(_primary_previews_dir(), video_id)
+    if index:
+        return jsonify({"status": "ok", "video_id": video_id, "index": index, **_sprite_urls(video_id, index)})
+
+    queued = False
+    if str(request.args.get("enqueue", "1")).lower() not in {"0", "false", "no"}:
+        from services.job_workers.sprite_sheet_worker import request_sprite_sheet
+        queued = request_sprite_sheet(video_id)
+    return jsonify({"status": "missing", "video_id": video_id, "queued": queued}), 404
+
+
+@tracks_bp.route("/track/<video_id>/sprite.jpg", methods=["GET"])
+def api_track_sprite_image(video_id: str):
+    """Serve the sprite sheet; versioned URLs (?v=) are cacheable forever."""
+    if not _YT_ID_RE.match(video_id or ""):
+        return jsonify({"status": "error", "error": "Invalid video_id"}), 400
+    from services.sprite_sheet_service import sprite_paths
+
+    path = sprite_paths(_primary_previews_dir(), video_id)["image"]
+    versioned = bool(request.args.get("v"))
+    try:
+        resp = send_file(str(path), mimetype="image/jpeg", max_age=THUMB_IMMUTABLE_MAX_AGE if versioned else 0)
+    except FileNotFoundError:
+        return jsonify({"status": "error", "error": "Sprite sheet not generated"}), 404
+    if versioned:
+        resp.cache_control.immutable = True
+    return resp
+
+
+@tracks_bp.route("/track/<video_id>/sprite.vtt", methods=["GET"])
+def api_track_sprite_vtt(video_id: str):
+    """WebVTT thumbnails track pointing at sprite.jpg regions (#xywh=)."""
+    if not _YT_ID_RE.match(video_id or ""):
+        return jsonify({"status": "error", "error": "Invalid video_id"}), 400
+    from services.sprite_sheet_service import build_vtt, load_sprite_index
+
+    index = load_sprite_index(_primary_previews_dir(), video_id)
+    if not index:
+        return jsonify({"status": "error", "error": "Sprite sheet not generated"}), 404
+    body = build_vtt(index, _sprite_urls(video_id, index)["image_url"])
+    resp = current_app.response_class(body, mimetype="text/vtt")
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+
 # ------------------------------
 # YouTube Thumbnail: Fetch Logic
 # ------------------------------
@@ -1041,7 +1144,7 @@ def api_get_youtube_formats(video_id: str):
       {
         status: 'ok',
         video_id: str,
-        available_formats: list | null,      # parsed from JSON TEXT
+        available_formats: list | null,      # decompressed from youtube_metadata_blobs
         available_qualities_summary: str | null,
         updated_at: str | null
       }
@@ -1051,7 +1154,9 @@ def api_get_youtube_formats(video_id: str):
 
     conn = get_connection()
     try:
-        row = db.get_youtube_metadata_by_id(conn, video_id)
+        row = db.get_youtube_metadata_by_id(
+            conn, video_id, columns=["available_qualities_summary", "updated_at"]
+        )
         if not row:
             return jsonify({
                 "status": "ok",
@@ -1061,9 +1166,10 @@ def api_get_youtube_formats(video_id: str):
                 "updated_at": None,
             })
 
-        # Parse JSON TEXT field available_formats safely
+        # Formats are loaded on demand from the compressed blob table
         row_dict = dict(row)
-        raw_formats = row_dict.get("available_formats")
+        raw_formats = (db.get_youtube_metadata_blobs(conn, [video_id], ("available_formats",))
+                       .get(video_id) or {}).get("available_formats")
         try:
             parsed_formats = json.loads(raw_formats) if raw_formats else None
         except Exception:
@@ -8,6 +8,8 @@ import datetime
 
 from .shared import get_connection, log_message, get_root_dir, record_event, _format_file_size
 import database as db
+from services.disk_usage_service import get_disk_usage_service
+from services.bulk_restore_engine import BulkRestoreEngine, INLINE_RESTORE_LIMIT
 
 # Create blueprint
 trash_bp = Blueprint('trash', __name__)
@@ -607,6 +609,7 @@ def api_restore_track():
                 
                 # Use shutil.move for reliable file operations
                 shutil.move(str(full_trash_path), str(full_original_path))
+                get_disk_usage_service().note_file_moved(full_trash_path, full_original_path)
                 
                 log_message(f"[Restore] SUCCESS: File restored successfully")
                 log_message(f"[Restore] DEBUG: File moved to: {full_original_path}")
@@ -716,6 +719,41 @@ def api_restore_track():
         log_message(f"[Restore] Error restoring track: {e}")
         return jsonify({"status": "error", "error": str(e)}), 500
 
+def _bulk_file_restore(track_ids):
+    """Restore files from trash: inline for small selections, as a BULK_RESTORE job otherwise."""
+    root_dir = get_root_dir()
+    if not root_dir:
+        return jsonify({"status": "error", "error": "Server configuration error"}), 500
+    
+    if len(track_ids) > INLINE_RESTORE_LIMIT:
+        from services.job_queue_service import get_job_queue_service
+        from services.job_types import JobType
+        
+        job_id = get_job_queue_service().create_and_add_job(
+            JobType.BULK_RESTORE,
+            track_ids=track_ids,
+            root_dir=str(root_dir)
+        )
+        log_message(f"[Restore] Bulk: queued job #{job_id} to restore {len(track_ids)} tracks from trash")
+        return jsonify({
+            "status": "queued",
+            "message": f"Bulk restore of {len(track_ids)} tracks queued as job #{job_id}",
+            "method": "file_restore",
+            "job_id": job_id,
+            "total_requested": len(track_ids)
+        })
+    
+    conn = get_connection()
+    try:
+        summary = BulkRestoreEngine(conn, root_dir).run(track_ids)
+    finally:
+        conn.close()
+    return jsonify({
+        "status": "ok",
+        "message": f"Bulk restore completed: {summary['total_successful']}/{summary['total_requested']} successful",
+        **summary
+    })
+
 @trash_bp.route("/bulk_restore_tracks", methods=["POST"])
 def api_bulk_restore_tracks():
     """Bulk restore multiple deleted tracks."""
@@ -734,9 +772,12 @@ def api_bulk_restore_tracks():
         if restore_method not in ['file_restore', 'redownload']:
             return jsonify({"status": "error", "error": "Invalid restore method. Must be 'file_restore' or 'redownload'"}), 400
         
+        if restore_method == 'file_restore':
+            return _bulk_file_restore(track_ids)
+        
         conn = get_connection()
         
-        # Process each track
+        # Process each track (re-download jobs)
         results = []
         successful_jobs = []
         failed_tracks = []
@@ -813,37 +854,6 @@ def api_bulk_restore_tracks():
                         })
                         continue
                 
-                # Check if can be restored (for file_restore method)
-                if restore_method in ['file', 'file_restore'] and not track_dict.get('can_restore', False):
-                    # Check where the restored file should be located
-                    original_relpath = track_dict.get('original_relpath', '')
-                    restored_file_path = None
-                    file_exists = False
-                    file_size = None
-                    
-                    if original_relpath:
-                        root_dir = get_root_dir()
-                        if root_dir:
-                            full_restored_path = root_dir / original_relpath
-                            restored_file_path = str(full_restored_path)
-                            file_exists = full_restored_path.exists()
-                            if file_exists:
-                                try:
-                                    file_size = full_restored_path.stat().st_size
-                                except:
-                                    file_size = None
-                    
-                    # can_restore=0: allow when file missing or when file already at library path (in-place restore).
-                    if not file_exists:
-                        log_message(f"[Restore] DEBUG: Track {track_id} has can_restore=0 but file not found, allowing re-restoration")
-                        log_message(f"[Restore] DEBUG: Expected path: {restored_file_path}")
-                        log_message(f"[Restore] DEBUG: File exists: {file_exists}")
-                    else:
-                        log_message(
-                            f"[Restore] INFO: Bulk track {track_id} has can_restore=0 but file exists at library path; "
-                            f"allowing in-place restore: {restored_file_path}"
-                        )
-                
                 # Determine target folder (cross-platform)
                 original_path = track_dict.get('original_relpath', '')
                 if original_path:
@@ -935,258 +945,6 @@ def api_bulk_restore_tracks():
                             'error': f'Failed to create download job: {str(e)}'
                         })
                         
-                else:  # file_restore
-                    # Implement file restoration from trash
-                    log_message(f"[Restore] DEBUG: Bulk file restoration for track {track_id}")
-                    
-                    trash_path = track_dict.get('trash_path')
-                    if not trash_path:
-                        original_relpath = track_dict.get('original_relpath', '')
-                        restored_file_path = None
-                        file_exists = False
-                        file_size = None
-                        full_library_path = None
-                        if original_relpath:
-                            root_dir = get_root_dir()
-                            if root_dir:
-                                full_library_path = root_dir / original_relpath
-                                restored_file_path = str(full_library_path)
-                                file_exists = full_library_path.exists()
-                                if file_exists:
-                                    try:
-                                        file_size = full_library_path.stat().st_size
-                                    except Exception:
-                                        file_size = None
-
-                        if full_library_path and full_library_path.exists():
-                            try:
-                                restored_file_size = full_library_path.stat().st_size
-                            except Exception:
-                                restored_file_size = None
-                            log_message(
-                                f"[Restore] INFO: Bulk in-place restore (no trash_path) for track {track_id}: {full_library_path}"
-                            )
-                            db.restore_deleted_track(conn, track_id)
-                            try:
-                                additional_data = json.dumps({
-                                    "track_id": track_id,
-                                    "video_id": track_dict.get('video_id'),
-                                    "original_name": track_dict.get('original_name'),
-                                    "target_folder": target_folder,
-                                    "channel_folder": channel_folder,
-                                    "channel_group": track_dict.get('channel_group'),
-                                    "method": restore_method,
-                                    "original_relpath": track_dict.get('original_relpath'),
-                                    "trash_path": track_dict.get('trash_path'),
-                                    "restored_file_path": str(full_library_path),
-                                    "restored_file_size": restored_file_size,
-                                    "restoration_successful": True,
-                                    "bulk_operation": True,
-                                    "in_place_no_trash": True,
-                                })
-                                record_event(
-                                    conn,
-                                    track_dict.get('video_id'),
-                                    "track_restored",
-                                    additional_data=additional_data,
-                                )
-                                log_message(f"[Restore] DEBUG: Bulk in-place event recorded for track {track_id}")
-                            except Exception as e:
-                                log_message(f"[Restore] ERROR: Failed to record bulk in-place event for track {track_id}: {e}")
-                                import traceback
-                                log_message(f"[Restore] ERROR: Traceback: {traceback.format_exc()}")
-                            successful_jobs.append({
-                                'track_id': track_id,
-                                'job_id': None,
-                                'video_id': track_dict.get('video_id'),
-                                'target_folder': target_folder,
-                                'restored_file_path': str(full_library_path),
-                                'restored_file_size': restored_file_size,
-                                'in_place_no_trash': True,
-                            })
-                            log_message(f"[Restore] Bulk: In-place restored track {track_id} ({track_dict.get('video_id')})")
-                            continue
-
-                        failed_tracks.append({
-                            'track_id': track_id,
-                            'error': 'No trash path available for restoration',
-                            'diagnostic': 'trash_path is NULL or empty and library file not found at original_relpath',
-                            'details': diagnostic_info,
-                            'restored_file_path': restored_file_path,
-                            'file_exists': file_exists,
-                            'file_size': file_size,
-                            'restored_at': track_dict.get('restored_at')
-                        })
-                        continue
-                    
-                    # Get root directory
-                    root_dir = get_root_dir()
-                    if not root_dir:
-                        # Get path information for error message
-                        original_relpath = track_dict.get('original_relpath', '')
-                        restored_file_path = None
-                        file_exists = False
-                        file_size = None
-                        
-                        if original_relpath:
-                            # Try to construct path even without root_dir
-                            restored_file_path = f"ERROR: root_dir not available / {original_relpath}"
-                        
-                        failed_tracks.append({
-                            'track_id': track_id,
-                            'error': 'Server configuration error',
-                            'diagnostic': 'get_root_dir() returned None',
-                            'details': diagnostic_info,
-                            'restored_file_path': restored_file_path,
-                            'file_exists': file_exists,
-                            'file_size': file_size,
-                            'restored_at': track_dict.get('restored_at')
-                        })
-                        continue
-                    
-                    # Construct full paths
-                    full_trash_path = root_dir.parent / trash_path  # trash_path is relative to root_dir.parent
-                    original_relpath = track_dict.get('original_relpath', '')
-                    
-                    if not original_relpath:
-                        failed_tracks.append({
-                            'track_id': track_id,
-                            'error': 'No original path available for restoration',
-                            'diagnostic': 'original_relpath is NULL or empty',
-                            'details': diagnostic_info,
-                            'restored_file_path': None,
-                            'file_exists': False,
-                            'file_size': None,
-                            'restored_at': track_dict.get('restored_at')
-                        })
-                        continue
-                    
-                    full_original_path = root_dir / original_relpath
-                    
-                    log_message(f"[Restore] DEBUG: Bulk restore paths for track {track_id}:")
-                    log_message(f"  - Trash file: {full_trash_path}")
-                    log_message(f"  - Original destination: {full_original_path}")
-                    
-                    # Check if trash file exists
-                    if not full_trash_path.exists():
-                        failed_tracks.append({
-                            'track_id': track_id,
-                            'error': 'File not found in trash folder',
-                            'diagnostic': f'trash file missing: {full_trash_path}',
-                            'details': diagnostic_info,
-                            'restored_file_path': str(full_original_path),
-                            'file_exists': full_original_path.exists(),
-                            'file_size': full_original_path.stat().st_size if full_original_path.exists() else None,
-                            'restored_at': track_dict.get('restored_at'),
-                            'trash_path': str(full_trash_path)
-                        })
-                        continue
-                    
-                    # Create target directory if it doesn't exist
-                    target_dir = full_original_path.parent
-                    try:
-                        target_dir.mkdir(parents=True, exist_ok=True)
-                        log_message(f"[Restore] DEBUG: Created target directory for track {track_id}: {target_dir}")
-                    except Exception as e:
-                        failed_tracks.append({
-                            'track_id': track_id,
-                            'error': f'Failed to create target directory: {e}'
-                        })
-                        continue
-                    
-                    # Check if target file already exists
-                    if full_original_path.exists():
-                        # Generate unique filename to avoid conflicts
-                        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-                        name_parts = full_original_path.name.rsplit('.', 1)
-                        if len(name_parts) == 2:
-                            new_name = f"{name_parts[0]}_restored_{timestamp}.{name_parts[1]}"
-                        else:
-                            new_name = f"{full_original_path.name}_restored_{timestamp}"
-                        full_original_path = target_dir / new_name
-                        log_message(f"[Restore] DEBUG: Target file exists for track {track_id}, using new name: {new_name}")
-                    
-                    # Move file from trash back to original location
-                    try:
-                        log_message(f"[Restore] DEBUG: Moving file from trash for track {track_id}")
-                        log_message(f"[Restore] DEBUG: Source: {full_trash_path}")
-                        log_message(f"[Restore] DEBUG: Target: {full_original_path}")
-                        
-                        # Use shutil.move for reliable file operations
-                        shutil.move(str(full_trash_path), str(full_original_path))
-                        
-                        log_message(f"[Restore] SUCCESS: File restored successfully for track {track_id}")
-                        log_message(f"[Restore] DEBUG: File moved to: {full_original_path}")
-                        
-                        # Verify file was moved successfully
-                        if not full_original_path.exists():
-                            failed_tracks.append({
-                                'track_id': track_id,
-                                'error': 'File restoration failed - file not found after move'
-                            })
-                            continue
-                        
-                        # Get file size for verification
-                        restored_file_size = full_original_path.stat().st_size
-                        log_message(f"[Restore] DEBUG: Restored file size for track {track_id}: {restored_file_size} bytes")
-                        
-                    except Exception as e:
-                        failed_tracks.append({
-                            'track_id': track_id,
-                            'error': f'Failed to restore file from trash: {e}'
-                        })
-                        continue
-                    
-                    # Mark as restored in database
-                    db.restore_deleted_track(conn, track_id)
-                    
-                    # Record event for bulk file restoration
-                    log_message(f"[Restore] DEBUG: Recording bulk file 'track_restored' event for track {track_id}")
-                    try:
-                        # Prepare additional data as JSON string
-                        additional_data = json.dumps({
-                            "track_id": track_id,
-                            "video_id": track_dict.get('video_id'),
-                            "original_name": track_dict.get('original_name'),
-                            "target_folder": target_folder,
-                            "channel_folder": channel_folder,
-                            "channel_group": track_dict.get('channel_group'),
-                            "method": restore_method,
-                            "original_relpath": track_dict.get('original_relpath'),
-                            "trash_path": track_dict.get('trash_path'),
-                            "restored_file_path": str(full_original_path),
-                            "restored_file_size": restored_file_size,
-                            "restoration_successful": True,
-                            "bulk_operation": True
-                        })
-                        
-                        record_event(
-                            conn,
-                            track_dict.get('video_id'),
-                            "track_restored",
-                            additional_data=additional_data
-                        )
-                        log_message(f"[Restore] DEBUG: Bulk file event recorded successfully for track {track_id}")
-                    except Exception as e:
-                        log_message(f"[Restore] ERROR: Failed to record bulk file event for track {track_id}: {e}")
-                        import traceback
-                        log_message(f"[Restore] ERROR: Traceback: {traceback.format_exc()}")
-                    
-                    successful_jobs.append({
-                        'track_id': track_id,
-                        'job_id': None,
-                        'video_id': track_dict.get('video_id'),
-                        'target_folder': target_folder,
-                        'restored_file_path': str(full_original_path),
-                        'restored_file_size': restored_file_size,
-                        'trash_path': trash_path,
-                        'original_relpath': original_relpath,
-                        'full_trash_path': str(full_trash_path),
-                        'full_original_path': str(full_original_path)
-                    })
-                    
-                    log_message(f"[Restore] Bulk: Successfully restored file for track {track_id} ({track_dict.get('video_id')})")
-                    
             except Exception as e:
                 failed_tracks.append({
                     'track_id': track_id,
@@ -1283,76 +1041,37 @@ def api_get_trash_stats():
             disk_used_formatted = "Unknown"
             disk_used_percentage = 0
         
-        # Calculate storage directory size
-        storage_size = 0
-        storage_files = 0
+        # Sizes come from the dir_usage cache; stale or missing trees are
+        # re-walked in the background by the disk usage service
+        usage_service = get_disk_usage_service()
         try:
-            for file_path in root_dir.rglob("*"):
-                if file_path.is_file():
-                    try:
-                        file_size = file_path.stat().st_size
-                        storage_size += file_size
-                        storage_files += 1
-                    except (OSError, PermissionError) as e:
-                        log_message(f"[Trash] Warning: Could not access storage file {file_path}: {e}")
-                        continue
-            
+            storage_usage = usage_service.get_usage(root_dir)
+            storage_size = storage_usage["bytes"]
+            storage_files = storage_usage["files"]
             storage_size_formatted = _format_file_size(storage_size)
-            log_message(f"[Trash] Storage size: {storage_files} files, {storage_size_formatted}")
-            
         except Exception as e:
-            log_message(f"[Trash] Warning: Could not calculate storage size: {e}")
+            log_message(f"[Trash] Warning: Could not read storage size: {e}")
+            storage_usage = {"pending": True, "reconciling": False, "reconciled_at": None}
             storage_size = 0
             storage_files = 0
             storage_size_formatted = "Unknown"
         
-        if not trash_dir.exists():
-            return jsonify({
-                "status": "ok",
-                "total_size": 0,
-                "total_files": 0,
-                "formatted_size": "0 B",
-                "trash_path": str(trash_dir),
-                "disk_info": {
-                    "total": disk_total,
-                    "free": disk_free,
-                    "used": disk_used,
-                    "total_formatted": disk_total_formatted,
-                    "free_formatted": disk_free_formatted,
-                    "used_formatted": disk_used_formatted,
-                    "used_percentage": disk_used_percentage,
-                    "storage_path": str(root_dir),
-                    "storage_size": storage_size,
-                    "storage_files": storage_files,
-                    "storage_size_formatted": storage_size_formatted
-                }
-            })
-        
-        total_size = 0
-        total_files = 0
-        
-        # Recursively calculate size of all files in trash
-        for file_path in trash_dir.rglob("*"):
-            if file_path.is_file():
-                try:
-                    file_size = file_path.stat().st_size
-                    total_size += file_size
-                    total_files += 1
-                except (OSError, PermissionError) as e:
-                    log_message(f"[Trash] Warning: Could not access {file_path}: {e}")
-                    continue
+        trash_usage = usage_service.get_usage(trash_dir)
+        total_size = trash_usage["bytes"]
+        total_files = trash_usage["files"]
         
         # Format size for display
         formatted_size = _format_file_size(total_size)
         
-        log_message(f"[Trash] Statistics: {total_files} files, {formatted_size}")
-        
         return jsonify({
             "status": "ok",
             "total_size": total_size,
             "total_files": total_files,
             "formatted_size": formatted_size,
             "trash_path": str(trash_dir),
+            "pending": bool(trash_usage["pending"] or storage_usage["pending"]),
+            "reconciling": bool(trash_usage["reconciling"] or storage_usage["reconciling"]),
+            "reconciled_at": trash_usage["reconciled_at"],
             "disk_info": {
                 "total": disk_total,
                 "free": disk_free,
@@ -1364,7 +1083,8 @@ def api_get_trash_stats():
                 "storage_path": str(root_dir),
                 "storage_size": storage_size,
                 "storage_files": storage_files,
-                "storage_size_formatted": storage_size_formatted
+                "storage_size_formatted": storage_size_formatted,
+                "storage_reconciled_at": storage_usage["reconciled_at"]
             }
         })
         
@@ -1421,6 +1141,9 @@ def api_clear_trash():
         except Exception as e:
             log_message(f"[Trash] Warning: Could not remove some empty directories: {e}")
         
+        # The trash is (nearly) empty now, so a fresh walk is cheap
+        get_disk_usage_service().reconcile_async(trash_dir)
+        
         # Update database: mark all deleted tracks as not restorable from file 
         conn = get_connection()
         cursor = conn.cursor()
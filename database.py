@@ -1,6 +1,11 @@
 import sqlite3
+import hashlib
 import json
+import os
+import re
+import threading
 import time
+import zlib
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Iterator, Optional, Union, List, Dict, Callable, TypeVar
@@ -32,6 +37,40 @@ DB_PATH = Path(_env_config.get('DB_PATH', 'tracks.db'))
 
 # ---------- Connection helpers ----------
 
+def _invalidate_aggregates(*tags: str) -> None:
+    """Drop cached library aggregates (see utils.aggregate_cache) after a write."""
+    try:
+        from utils.aggregate_cache import invalidate_tags
+        invalidate_tags(*tags)
+    except Exception:
+        pass
+
+
+# Callbacks run after record_event stores a history row:
+# listener(video_id, event, position, history_id). Keep them cheap; they run
+# on the request thread.
+_event_listeners: List[Callable] = []
+
+
+def add_event_listener(listener: Callable) -> None:
+    """Register a callback for recorded play_history events (idempotent)."""
+    if listener not in _event_listeners:
+        _event_listeners.append(listener)
+
+
+def remove_event_listener(listener: Callable) -> None:
+    if listener in _event_listeners:
+        _event_listeners.remove(listener)
+
+
+def _notify_event_listeners(video_id: str, event: str, position: Optional[float], history_id: Optional[int]) -> None:
+    for listener in list(_event_listeners):
+        try:
+            listener(video_id, event, position, history_id)
+        except Exception as e:
+            print(f"[DB] Event listener failed for {event} {video_id}: {e}")
+
+
 def set_db_path(path: Union[str, Path]):
     """Override default DB path (should be done before get_connection())."""
     global DB_PATH
@@ -286,6 +325,60 @@ def _ensure_schema(conn: sqlite3.Connection):
             created_at TEXT DEFAULT (datetime('now')),
             updated_at TEXT DEFAULT (datetime('now'))
         );
+
+        -- Change counters maintained by triggers (cache keys for derived data) --
+        CREATE TABLE IF NOT EXISTS data_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        );
+        INSERT OR IGNORE INTO data_versions (name, version) VALUES ('tracks', 0);
+
+        CREATE TRIGGER IF NOT EXISTS trg_tracks_version_ai AFTER INSERT ON tracks
+        BEGIN UPDATE data_versions SET version = version + 1 WHERE name = 'tracks'; END;
+        CREATE TRIGGER IF NOT EXISTS trg_tracks_version_ad AFTER DELETE ON tracks
+        BEGIN UPDATE data_versions SET version = version + 1 WHERE name = 'tracks'; END;
+        CREATE TRIGGER IF NOT EXISTS trg_tracks_version_au AFTER UPDATE OF resolution, filetype, video_id ON tracks
+        BEGIN UPDATE data_versions SET version = version + 1 WHERE name = 'tracks'; END;
+        CREATE TRIGGER IF NOT EXISTS trg_deleted_tracks_version_ai AFTER INSERT ON deleted_tracks
+        BEGIN UPDATE data_versions SET version = version + 1 WHERE name = 'tracks'; END;
+        CREATE TRIGGER IF NOT EXISTS trg_deleted_tracks_version_ad AFTER DELETE ON deleted_tracks
+        BEGIN UPDATE data_versions SET version = version + 1 WHERE name = 'tracks'; END;
+        CREATE TRIGGER IF NOT EXISTS trg_deleted_tracks_version_au AFTER UPDATE OF restored_at, video_id ON deleted_tracks
+        BEGIN UPDATE data_versions SET version = version + 1 WHERE name = 'tracks'; END;
+
+        -- Uploads-feed state per channel for quick sync change detection --
+        CREATE TABLE IF NOT EXISTS channel_feed_state (
+            channel_id INTEGER PRIMARY KEY REFERENCES channels(id) ON DELETE CASCADE,
+            youtube_channel_id TEXT,
+            etag TEXT,
+            last_modified TEXT,
+            video_ids TEXT,
+            checked_at TEXT,
+            changed_at TEXT
+        );
+
+        -- Cold YouTube metadata (description, available_formats), compressed --
+        CREATE TABLE IF NOT EXISTS youtube_metadata_blobs (
+            youtube_id TEXT PRIMARY KEY,
+            codec TEXT NOT NULL DEFAULT 'zlib',
+            description BLOB,
+            available_formats BLOB,
+            raw_bytes INTEGER,
+            updated_at TEXT DEFAULT (datetime('now'))
+        );
+        CREATE TRIGGER IF NOT EXISTS trg_ym_blobs_ad AFTER DELETE ON youtube_video_metadata
+        BEGIN DELETE FROM youtube_metadata_blobs WHERE youtube_id = OLD.youtube_id; END;
+        -- Cached disk usage: files directly inside each directory (not recursive)
+        CREATE TABLE IF NOT EXISTS dir_usage (
+            path TEXT PRIMARY KEY,
+            bytes INTEGER NOT NULL DEFAULT 0,
+            files INTEGER NOT NULL DEFAULT 0,
+            updated_at TEXT DEFAULT (datetime('now'))
+        );
+        CREATE TABLE IF NOT EXISTS dir_usage_roots (
+            root TEXT PRIMARY KEY,
+            reconciled_at TEXT
+        );
         """
     )
     conn.commit()
@@ -344,6 +437,8 @@ def _ensure_schema(conn: sqlite3.Connection):
         cur.execute("ALTER TABLE play_history ADD COLUMN seek_to REAL")
     if 'additional_data' not in hcols:
         cur.execute("ALTER TABLE play_history ADD COLUMN additional_data TEXT")
+    # Per-video event lookups (like/next/start after a finish, reactions)
+    cur.execute(_PLAY_HISTORY_INDEX_SQL)
     conn.commit()
 
     cur.execute("PRAGMA table_info(playlists)")
@@ -381,18 +476,331 @@ def _ensure_schema(conn: sqlite3.Connection):
         cur.execute("ALTER TABLE youtube_video_metadata ADD COLUMN max_available_height INTEGER")
     if "max_quality_label" not in ycols:
         cur.execute("ALTER TABLE youtube_video_metadata ADD COLUMN max_quality_label TEXT")
+    if "content_hash" not in ycols:
+        cur.execute("ALTER TABLE youtube_video_metadata ADD COLUMN content_hash TEXT")
     conn.commit()
 
+    _ensure_track_sort_name(conn)
+
+    _ensure_search_index(conn)
+
     # Ensure valid event types include new channel events
     _add_valid_event_types()
 
 
+_PLAY_HISTORY_INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS idx_play_history_video_event ON play_history(video_id, event)"
+)
+
+
+# tracks.sort_name mirrors COALESCE(metadata title, track name, '') -- the /tracks
+# display order -- so keyset pages seek on idx_tracks_sort_name instead of
+# sorting the tracks/metadata join for every page. The column is declared
+# COLLATE NOCASE so plain comparisons and row-value seeks use the index.
+_TRACK_SORT_NAME_SQL = """
+    CREATE INDEX IF NOT EXISTS idx_tracks_sort_name ON tracks(sort_name, id);
+
+    CREATE TRIGGER IF NOT EXISTS trg_tracks_sort_name_ai AFTER INSERT ON tracks
+    BEGIN
+        UPDATE tracks SET sort_name = COALESCE(
+            (SELECT title FROM youtube_video_metadata WHERE youtube_id = NEW.video_id), NEW.name, ''
+        ) WHERE id = NEW.id;
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_tracks_sort_name_au AFTER UPDATE OF name, video_id ON tracks
+    BEGIN
+        UPDATE tracks SET sort_name = COALESCE(
+            (SELECT title FROM youtube_video_metadata WHERE youtube_id = NEW.video_id), NEW.name, ''
+        ) WHERE id = NEW.id;
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_ym_sort_name_ai AFTER INSERT ON youtube_video_metadata
+    BEGIN
+        UPDATE tracks SET sort_name = COALESCE(NEW.title, name, '') WHERE video_id = NEW.youtube_id;
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_ym_sort_name_au AFTER UPDATE OF title, youtube_id ON youtube_video_metadata
+    BEGIN
+        UPDATE tracks SET sort_name = COALESCE(name, '')
+        WHERE video_id = OLD.youtube_id AND OLD.youtube_id IS NOT NEW.youtube_id;
+        UPDATE tracks SET sort_name = COALESCE(NEW.title, name, '') WHERE video_id = NEW.youtube_id;
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_ym_sort_name_ad AFTER DELETE ON youtube_video_metadata
+    BEGIN
+        UPDATE tracks SET sort_name = COALESCE(name, '') WHERE video_id = OLD.youtube_id;
+    END;
+"""
+
+
+def _ensure_track_sort_name(conn: sqlite3.Connection) -> None:
+    """Add tracks.sort_name with its index and sync triggers; backfill it when the column is new."""
+    cols = {row[1] for row in conn.execute("PRAGMA table_info(tracks)")}
+    added = "sort_name" not in cols
+    if added:
+        conn.execute("ALTER TABLE tracks ADD COLUMN sort_name TEXT COLLATE NOCASE")
+    conn.executescript(_TRACK_SORT_NAME_SQL)
+    if added:
+        conn.execute(
+            """
+            UPDATE tracks SET sort_name = COALESCE(
+                (SELECT ym.title FROM youtube_video_metadata ym WHERE ym.youtube_id = tracks.video_id), name, ''
+            )
+            """
+        )
+        conn.commit()
+
+
 def _add_valid_event_types():
     """Add new event types for channel system"""
     # This will be used in record_event validation
     pass
 
 
+# ---------- Full-text search ----------
+
+# FTS5 index over tracks.name and youtube_video_metadata title/channel/uploader/
+# description, one document per video_id. search_docs maps video_id to a stable
+# integer rowid so triggers can replace a document without scanning the index.
+# unicode61 case-folds non-ASCII text (Cyrillic titles) which LIKE/NOCASE does not.
+SEARCH_COLUMNS = ("name", "title", "channel", "uploader", "description")
+# bm25 column weights, same order as SEARCH_COLUMNS
+SEARCH_WEIGHTS = (10.0, 10.0, 4.0, 4.0, 1.0)
+# Columns used when filtering the track library (descriptions are too noisy there)
+LIBRARY_SEARCH_COLUMNS = ("name", "title", "channel", "uploader")
+
+_fts_available: Optional[bool] = None
+
+# Descriptions live compressed in youtube_metadata_blobs, which SQL cannot read,
+# so the triggers refresh the other columns in place and keep the indexed
+# description; the metadata writers set it (``_index_descriptions``). Rows not
+# yet moved to the blob table still carry an inline description, which wins.
+_SEARCH_REFRESH_SQL = """
+        DELETE FROM search_index WHERE rowid = (SELECT id FROM search_docs WHERE video_id = {vid})
+        AND NOT EXISTS (SELECT 1 FROM tracks WHERE video_id = {vid})
+        AND NOT EXISTS (SELECT 1 FROM youtube_video_metadata WHERE youtube_id = {vid});
+        INSERT INTO search_docs (video_id) SELECT {vid}
+        WHERE NOT EXISTS (SELECT 1 FROM search_docs WHERE video_id = {vid});
+        UPDATE search_index SET
+            name = (SELECT name FROM tracks WHERE video_id = {vid} LIMIT 1),
+            title = (SELECT title FROM youtube_video_metadata WHERE youtube_id = {vid}),
+            channel = (SELECT channel FROM youtube_video_metadata WHERE youtube_id = {vid}),
+            uploader = (SELECT uploader FROM youtube_video_metadata WHERE youtube_id = {vid}),
+            description = CASE WHEN EXISTS (SELECT 1 FROM youtube_video_metadata WHERE youtube_id = {vid})
+                THEN COALESCE((SELECT description FROM youtube_video_metadata WHERE youtube_id = {vid}), description)
+                END
+        WHERE rowid = (SELECT id FROM search_docs WHERE video_id = {vid});
+        INSERT INTO search_index (rowid, name, title, channel, uploader, description)
+        SELECT d.id, t.name, ym.title, ym.channel, ym.uploader, ym.description
+        FROM search_docs d
+        LEFT JOIN tracks t ON t.video_id = d.video_id
+        LEFT JOIN youtube_video_metadata ym ON ym.youtube_id = d.video_id
+        WHERE d.video_id = {vid} AND (t.id IS NOT NULL OR ym.id IS NOT NULL)
+        AND NOT EXISTS (SELECT 1 FROM search_index WHERE rowid = d.id);
+"""
+
+
+def _search_trigger(name: str, timing: str, table: str, refs: tuple) -> str:
+    body = "".join(_SEARCH_REFRESH_SQL.format(vid=ref) for ref in refs)
+    return f"CREATE TRIGGER IF NOT EXISTS {name} {timing} ON {table} BEGIN{body}    END;\n"
+
+
+_SEARCH_TRIGGER_NAMES = (
+    "trg_search_tracks_ai", "trg_search_tracks_au", "trg_search_tracks_ad",
+    "trg_search_ym_ai", "trg_search_ym_au", "trg_search_ym_ad",
+)
+
+
+def _search_triggers_sql() -> str:
+    return (
+        _search_trigger("trg_search_tracks_ai", "AFTER INSERT", "tracks", ("NEW.video_id",))
+        + _search_trigger("trg_search_tracks_au", "AFTER UPDATE OF name, video_id", "tracks", ("OLD.video_id", "NEW.video_id"))
+        + _search_trigger("trg_search_tracks_ad", "AFTER DELETE", "tracks", ("OLD.video_id",))
+        + _search_trigger("trg_search_ym_ai", "AFTER INSERT", "youtube_video_metadata", ("NEW.youtube_id",))
+        + _search_trigger(
+            "trg_search_ym_au",
+            "AFTER UPDATE OF title, channel, uploader, description, youtube_id",
+            "youtube_video_metadata",
+            ("OLD.youtube_id", "NEW.youtube_id"),
+        )
+        + _search_trigger("trg_search_ym_ad", "AFTER DELETE", "youtube_video_metadata", ("OLD.youtube_id",))
+    )
+
+
+def _upgrade_search_triggers(conn: sqlite3.Connection) -> None:
+    """Replace search triggers that rebuilt the whole document.
+
+    They would drop descriptions that moved to youtube_metadata_blobs.
+    """
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_search_ym_au'").fetchone()
+    if row and "UPDATE search_index" in (row[0] or ""):
+        return
+    conn.executescript(
+        "".join(f"DROP TRIGGER IF EXISTS {name};\n" for name in _SEARCH_TRIGGER_NAMES) + _search_triggers_sql()
+    )
+
+
+def _ensure_search_index(conn: sqlite3.Connection) -> None:
+    """Create the FTS5 search index and its sync triggers on first use (no-op without FTS5)."""
+    global _fts_available
+    if _fts_available is False:
+        return
+    try:
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'").fetchone():
+            _upgrade_search_triggers(conn)
+            _fts_available = True
+            return
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS search_docs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                video_id TEXT NOT NULL UNIQUE
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+                name, title, channel, uploader, description,
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '2 3'
+            );
+            """
+            + _search_triggers_sql()
+        )
+        rebuild_search_index(conn)
+        _fts_available = True
+    except sqlite3.OperationalError as e:
+        if "fts5" in str(e).lower():
+            # SQLite built without FTS5: searches fall back to LIKE
+            _fts_available = False
+            print(f"[DB] FTS5 unavailable, search falls back to LIKE: {e}")
+        else:
+            raise
+
+
+def rebuild_search_index(conn: sqlite3.Connection) -> int:
+    """Repopulate the search index from tracks and YouTube metadata. Returns document count."""
+    conn.execute("DELETE FROM search_index")
+    conn.execute(
+        """
+        INSERT OR IGNORE INTO search_docs (video_id)
+        SELECT video_id FROM tracks
+        UNION
+        SELECT youtube_id FROM youtube_video_metadata
+        """
+    )
+    cur = conn.execute(
+        """
+        INSERT INTO search_index (rowid, name, title, channel, uploader, description)
+        SELECT d.id, t.name, ym.title, ym.channel, ym.uploader, ym.description
+        FROM search_docs d
+        LEFT JOIN tracks t ON t.video_id = d.video_id
+        LEFT JOIN youtube_video_metadata ym ON ym.youtube_id = d.video_id
+        WHERE t.id IS NOT NULL OR ym.id IS NOT NULL
+        """
+    )
+    count = cur.rowcount
+    conn.commit()
+    # Descriptions moved to youtube_metadata_blobs are decompressed in Python
+    blobs = conn.execute(
+        "SELECT youtube_id, codec, description FROM youtube_metadata_blobs WHERE description IS NOT NULL"
+    )
+    while True:
+        chunk = blobs.fetchmany(YOUTUBE_METADATA_BULK_BATCH_SIZE)
+        if not chunk:
+            break
+        _index_descriptions(conn, [(row[0], _unpack_metadata_blob(row[1], row[2])) for row in chunk])
+    conn.commit()
+    return count
+
+
+def is_search_index_available() -> bool:
+    return bool(_fts_available)
+
+
+def build_fts_query(text: Optional[str], columns: Optional[tuple] = None) -> Optional[str]:
+    """Turn free user text into a safe FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term (``"wor"*``) and all terms must
+    match. Returns None when the text has no searchable words.
+    """
+    if not text:
+        return None
+    words = re.findall(r"\w+", text, flags=re.UNICODE)
+    if not words:
+        return None
+    expr = " ".join('"' + w.replace('"', '""') + '"*' for w in words)
+    if columns:
+        return "{" + " ".join(columns) + "} : (" + expr + ")"
+    return expr
+
+
+def search_filter_clause(
+    video_id_sql: str,
+    text: Optional[str],
+    like_sql: str,
+    columns: Optional[tuple] = LIBRARY_SEARCH_COLUMNS,
+) -> tuple[Optional[str], List]:
+    """WHERE fragment restricting video_id_sql to documents matching text.
+
+    Uses the FTS index when available; otherwise falls back to
+    ``like_sql LIKE %text%`` (like_sql is the SQL expression to match).
+    Returns (None, []) when text is empty.
+    """
+    term = (text or "").strip()
+    if not term:
+        return None, []
+    match = build_fts_query(term, columns) if _fts_available else None
+    if match:
+        return (
+            f"{video_id_sql} IN (SELECT d.video_id FROM search_index s "
+            "JOIN search_docs d ON d.id = s.rowid WHERE search_index MATCH ?)",
+            [match],
+        )
+    return f"{like_sql} LIKE ? COLLATE NOCASE", [f"%{term}%"]
+
+
+def search_library(
+    conn: sqlite3.Connection,
+    text: str,
+    *,
+    limit: int = 50,
+    offset: int = 0,
+    columns: Optional[tuple] = None,
+    tracks_only: bool = False,
+    include_deleted: bool = False,
+) -> List[sqlite3.Row]:
+    """Ranked full-text search (bm25) over tracks and YouTube metadata.
+
+    Rows: video_id, track_id (NULL for metadata-only videos), name, title,
+    channel, uploader, relpath, is_deleted, rank (lower is better), snippet.
+    """
+    match = build_fts_query(text, columns)
+    if not match or not _fts_available:
+        return []
+    weights = ", ".join(str(w) for w in SEARCH_WEIGHTS)
+    where = ["search_index MATCH ?"]
+    if tracks_only:
+        where.append("t.id IS NOT NULL")
+    if not include_deleted:
+        where.append("NOT EXISTS (SELECT 1 FROM deleted_tracks dt WHERE dt.video_id = d.video_id AND dt.restored_at IS NULL)")
+    sql = f"""
+        SELECT d.video_id,
+               t.id AS track_id,
+               t.name,
+               ym.title,
+               ym.channel,
+               ym.uploader,
+               t.relpath,
+               CASE WHEN EXISTS (
+                   SELECT 1 FROM deleted_tracks dt WHERE dt.video_id = d.video_id AND dt.restored_at IS NULL
+               ) THEN 1 ELSE 0 END AS is_deleted,
+               bm25(search_index, {weights}) AS rank,
+               snippet(search_index, -1, '[', ']', '…', 12) AS snippet
+        FROM search_index
+        JOIN search_docs d ON d.id = search_index.rowid
+        LEFT JOIN tracks t ON t.video_id = d.video_id
+        LEFT JOIN youtube_video_metadata ym ON ym.youtube_id = d.video_id
+        WHERE {" AND ".join(where)}
+        ORDER BY rank
+        LIMIT ? OFFSET ?
+    """
+    return conn.execute(sql, (match, int(limit), int(offset))).fetchall()
+
+
 # ---------- Convenience queries ----------
 
 
@@ -574,18 +982,24 @@ def iter_tracks_with_playlists(conn: sqlite3.Connection, search_query: str = Non
         LEFT JOIN playlists p ON p.id = tp.playlist_id
         LEFT JOIN youtube_video_metadata ym ON ym.youtube_id = t.video_id
         LEFT JOIN deleted_tracks dt ON dt.video_id = t.video_id AND dt.restored_at IS NULL
+        {where}
         GROUP BY t.id
         ORDER BY COALESCE(ym.title, t.name) COLLATE NOCASE
     """
     
-    # Get all tracks first
-    for row in conn.execute(base_query):
+    # Search through the FTS index (Unicode case folding); Python substring
+    # matching is only used when SQLite lacks FTS5
+    search_sql, search_params = (None, [])
+    if search_query and _fts_available:
+        search_sql, search_params = search_filter_clause("t.video_id", search_query, "COALESCE(ym.title, t.name)")
+    
+    for row in conn.execute(base_query.format(where=f"WHERE {search_sql}" if search_sql else ""), search_params):
         # Apply deleted filter
         if not include_deleted and row['is_deleted']:
             continue
             
         # If no search query, yield matching tracks
-        if not search_query:
+        if not search_query or search_sql:
             yield row
         else:
             # Perform case-insensitive search in Python for proper Unicode support
@@ -613,7 +1027,7 @@ def iter_tracks_with_playlists_filtered(
     """Yield tracks with playlists and optional server-side filtering.
 
     Filters:
-        - search_query: case-insensitive LIKE match against COALESCE(ym.title, t.name)
+        - search_query: full-text prefix match on name/title/channel/uploader (LIKE fallback)
         - include_deleted: include rows with deleted marker (default False excludes)
         - resolutions: list of resolution strings (exact match, IN clause)
         - min_likes: minimum likes threshold (t.play_likes >= min_likes)
@@ -703,10 +1117,10 @@ def iter_tracks_with_playlists_filtered(
         params.append(int(max_size_bytes))
 
     if search_query:
-        term = (search_query or "").strip()
-        if term:
-            where_clauses.append("COALESCE(ym.title, t.name) LIKE ? COLLATE NOCASE")
-            params.append(f"%{term}%")
+        search_sql, search_params = search_filter_clause("t.video_id", search_query, "COALESCE(ym.title, t.name)")
+        if search_sql:
+            where_clauses.append(search_sql)
+            params.extend(search_params)
 
     if not include_deleted:
         where_clauses.append("dt.video_id IS NULL")
@@ -725,8 +1139,12 @@ def iter_tracks_with_playlists_filtered(
         yield row
 
 
-def get_tracks_with_filters_page(
-    conn: sqlite3.Connection,
+def _clean_list(values: Optional[List[str]]) -> List[str]:
+    cleaned = [v.strip() for v in (values or []) if v and v.strip()]
+    return list(dict.fromkeys(cleaned))
+
+
+def _track_filter_clauses(
     *,
     search_query: Optional[str] = None,
     include_deleted: bool = False,
@@ -740,107 +1158,178 @@ def get_tracks_with_filters_page(
     max_size_bytes: Optional[int] = None,
     min_likes: Optional[int] = None,
     min_max_quality: Optional[int] = None,
-    page: int = 1,
-    per_page: int = 100,
-) -> tuple[list[sqlite3.Row], int]:
-    """Return a page of filtered tracks and total count for pagination.
-
-    Returns (rows, total_count).
-    """
+) -> tuple[List[str], List]:
+    """WHERE clauses/params for the /tracks filters over ``tracks t`` joined with
+    ``youtube_video_metadata ym`` and active ``deleted_tracks dt``."""
     where_clauses: List[str] = ["1=1"]
     params: List = []
 
-    # Filters (same as iter_tracks_with_playlists_filtered)
-    if resolutions:
-        cleaned = [r.strip() for r in resolutions if r and r.strip()]
-        cleaned = list(dict.fromkeys(cleaned))
-        if cleaned:
-            placeholders = ",".join(["?"] * len(cleaned))
-            where_clauses.append(f"t.resolution IN ({placeholders})")
-            params.extend(cleaned)
+    cleaned = _clean_list(resolutions)
+    if cleaned:
+        placeholders = ",".join(["?"] * len(cleaned))
+        where_clauses.append(f"t.resolution IN ({placeholders})")
+        params.extend(cleaned)
 
-    if filetypes:
-        cleaned_ft = [ft.strip() for ft in filetypes if ft and ft.strip()]
-        cleaned_ft = list(dict.fromkeys(cleaned_ft))
-        if cleaned_ft:
-            placeholders = ",".join(["?"] * len(cleaned_ft))
-            where_clauses.append(f"LOWER(t.filetype) IN ({placeholders})")
-            params.extend([ft.lower() for ft in cleaned_ft])
+    cleaned_ft = _clean_list(filetypes)
+    if cleaned_ft:
+        placeholders = ",".join(["?"] * len(cleaned_ft))
+        where_clauses.append(f"LOWER(t.filetype) IN ({placeholders})")
+        params.extend([ft.lower() for ft in cleaned_ft])
 
-    if isinstance(min_likes, int) and min_likes is not None:
-        if min_likes < 0:
-            min_likes = 0
+    if isinstance(min_likes, int):
         where_clauses.append("t.play_likes >= ?")
-        params.append(int(min_likes))
+        params.append(max(0, int(min_likes)))
 
-    if isinstance(min_duration, (int, float)) and min_duration is not None:
-        if min_duration < 0:
-            min_duration = 0
+    if isinstance(min_duration, (int, float)):
         where_clauses.append("t.duration >= ?")
-        params.append(float(min_duration))
-    if isinstance(max_duration, (int, float)) and max_duration is not None:
-        if max_duration < 0:
-            max_duration = 0
+        params.append(max(0.0, float(min_duration)))
+    if isinstance(max_duration, (int, float)):
         where_clauses.append("t.duration <= ?")
-        params.append(float(max_duration))
+        params.append(max(0.0, float(max_duration)))
 
-    if isinstance(min_bitrate_bps, int) and min_bitrate_bps is not None:
-        if min_bitrate_bps < 0:
-            min_bitrate_bps = 0
+    if isinstance(min_bitrate_bps, int):
         where_clauses.append("t.bitrate >= ?")
-        params.append(int(min_bitrate_bps))
-    if isinstance(max_bitrate_bps, int) and max_bitrate_bps is not None:
-        if max_bitrate_bps < 0:
-            max_bitrate_bps = 0
+        params.append(max(0, int(min_bitrate_bps)))
+    if isinstance(max_bitrate_bps, int):
         where_clauses.append("t.bitrate <= ?")
-        params.append(int(max_bitrate_bps))
+        params.append(max(0, int(max_bitrate_bps)))
 
-    # Size range (bytes)
-    if isinstance(min_size_bytes, int) and min_size_bytes is not None:
-        if min_size_bytes < 0:
-            min_size_bytes = 0
+    if isinstance(min_size_bytes, int):
         where_clauses.append("t.size_bytes >= ?")
-        params.append(int(min_size_bytes))
-    if isinstance(max_size_bytes, int) and max_size_bytes is not None:
-        if max_size_bytes < 0:
-            max_size_bytes = 0
+        params.append(max(0, int(min_size_bytes)))
+    if isinstance(max_size_bytes, int):
         where_clauses.append("t.size_bytes <= ?")
-        params.append(int(max_size_bytes))
+        params.append(max(0, int(max_size_bytes)))
 
     if search_query:
-        term = (search_query or "").strip()
-        if term:
-            where_clauses.append("COALESCE(ym.title, t.name) LIKE ? COLLATE NOCASE")
-            params.append(f"%{term}%")
+        search_sql, search_params = search_filter_clause("t.video_id", search_query, "COALESCE(ym.title, t.name)")
+        if search_sql:
+            where_clauses.append(search_sql)
+            params.extend(search_params)
 
     if not include_deleted:
         where_clauses.append("dt.video_id IS NULL")
 
     # Max YouTube Quality threshold (server-side filter)
-    if isinstance(min_max_quality, int) and min_max_quality is not None:
+    if isinstance(min_max_quality, int):
         where_clauses.append("(ym.max_available_height IS NOT NULL AND ym.max_available_height >= ?)")
         params.append(int(min_max_quality))
 
+    return where_clauses, params
+
+
+# Seconds a /tracks total count may be reused for the same filter set.
+TRACKS_COUNT_CACHE_TTL = 60.0
+
+
+def get_tracks_with_filters_page(
+    conn: sqlite3.Connection,
+    *,
+    search_query: Optional[str] = None,
+    include_deleted: bool = False,
+    resolutions: Optional[List[str]] = None,
+    filetypes: Optional[List[str]] = None,
+    min_duration: Optional[int] = None,
+    max_duration: Optional[int] = None,
+    min_bitrate_bps: Optional[int] = None,
+    max_bitrate_bps: Optional[int] = None,
+    min_size_bytes: Optional[int] = None,
+    max_size_bytes: Optional[int] = None,
+    min_likes: Optional[int] = None,
+    min_max_quality: Optional[int] = None,
+    page: int = 1,
+    per_page: int = 100,
+    after: Optional[tuple] = None,
+    before: Optional[tuple] = None,
+    total_count: Optional[int] = None,
+) -> tuple[list[sqlite3.Row], int]:
+    """Return a page of filtered tracks and total count for pagination.
+
+    Pages are ordered by (display name NOCASE, t.id). When ``after`` or
+    ``before`` is given (the ``(sort_key, id)`` of the last/first row of the
+    neighbouring page, exposed on each row as ``sort_key``), the page is
+    fetched by keyset seek and ``page`` is ignored; otherwise ``page`` falls
+    back to OFFSET (kept for old links). The page is selected on tracks +
+    metadata only and playlists are aggregated for the selected ids alone.
+    The total count is cached briefly per filter set; pass ``total_count``
+    when it is already known (see get_tracks_facets) to skip it.
+
+    Returns (rows, total_count).
+    """
+    where_clauses, params = _track_filter_clauses(
+        search_query=search_query,
+        include_deleted=include_deleted,
+        resolutions=resolutions,
+        filetypes=filetypes,
+        min_duration=min_duration,
+        max_duration=max_duration,
+        min_bitrate_bps=min_bitrate_bps,
+        max_bitrate_bps=max_bitrate_bps,
+        min_size_bytes=min_size_bytes,
+        max_size_bytes=max_size_bytes,
+        min_likes=min_likes,
+        min_max_quality=min_max_quality,
+    )
+
     where_sql = " WHERE " + " AND ".join(where_clauses) if where_clauses else ""
 
-    # Total count (distinct t.id)
-    count_sql = (
-        "SELECT COUNT(DISTINCT t.id) FROM tracks t "
-        "LEFT JOIN track_playlists tp ON tp.track_id = t.id "
-        "LEFT JOIN playlists p ON p.id = tp.playlist_id "
+    from_sql = (
+        "FROM tracks t "
         "LEFT JOIN youtube_video_metadata ym ON ym.youtube_id = t.video_id "
         "LEFT JOIN deleted_tracks dt ON dt.video_id = t.video_id AND dt.restored_at IS NULL "
-        + where_sql
     )
 
     cur = conn.cursor()
-    total_count = cur.execute(count_sql, params).fetchone()[0]
 
-    # Page query
-    offset = max(0, (max(1, int(page)) - 1) * max(1, int(per_page)))
+    # Total count (distinct t.id); filters never touch playlists, so the
+    # playlist joins are not needed here.
+    def _count() -> int:
+        return int(cur.execute("SELECT COUNT(DISTINCT t.id) " + from_sql + where_sql, params).fetchone()[0])
+
+    if total_count is None:
+        try:
+            from utils.aggregate_cache import TAG_LIBRARY, TAG_LIKES, get_or_compute
+            count_key = "tracks_count:" + json.dumps([where_sql, params], default=str)
+            total_count = get_or_compute(
+                count_key, _count, tags=(TAG_LIBRARY, TAG_LIKES), ttl=TRACKS_COUNT_CACHE_TTL
+            )
+        except ImportError:
+            total_count = _count()
+
+    # Page of ids: keyset seek on (sort_key, id) over idx_tracks_sort_name,
+    # OFFSET only for legacy page links
+    sort_expr = "t.sort_name"
+    seek_sql = ""
+    seek_params: List = []
+    descending = False
+    offset = 0
+    if after is not None:
+        seek_sql = f" AND ({sort_expr}, t.id) > (?, ?)"
+        seek_params = [after[0], int(after[1])]
+    elif before is not None:
+        seek_sql = f" AND ({sort_expr}, t.id) < (?, ?)"
+        seek_params = [before[0], int(before[1])]
+        descending = True
+    else:
+        offset = max(0, (max(1, int(page)) - 1) * max(1, int(per_page)))
+
+    direction = "DESC" if descending else "ASC"
+    ids_sql = (
+        f"SELECT DISTINCT t.id, {sort_expr} AS sort_key "
+        + from_sql + where_sql + seek_sql +
+        f" ORDER BY {sort_expr} {direction}, t.id {direction} LIMIT ? OFFSET ?"
+    )
+    page_ids = cur.execute(ids_sql, list(params) + seek_params + [int(per_page), int(offset)]).fetchall()
+    if descending:
+        page_ids.reverse()
+    if not page_ids:
+        return [], int(total_count)
+
+    placeholders = ",".join(["?"] * len(page_ids))
     page_sql = (
         "SELECT t.*, GROUP_CONCAT(p.name, ', ') AS playlists, "
         "COALESCE(ym.title, t.name) AS display_name, "
+        f"{sort_expr} AS sort_key, "
         "CASE WHEN dt.video_id IS NOT NULL THEN 1 ELSE 0 END AS is_deleted, "
         "dt.deleted_at AS deletion_date, dt.deletion_reason AS deletion_reason "
         "FROM tracks t "
@@ -848,17 +1337,143 @@ def get_tracks_with_filters_page(
         "LEFT JOIN playlists p ON p.id = tp.playlist_id "
         "LEFT JOIN youtube_video_metadata ym ON ym.youtube_id = t.video_id "
         "LEFT JOIN deleted_tracks dt ON dt.video_id = t.video_id AND dt.restored_at IS NULL "
-        + where_sql +
-        " GROUP BY t.id ORDER BY COALESCE(ym.title, t.name) COLLATE NOCASE "
-        " LIMIT ? OFFSET ?"
+        f"WHERE t.id IN ({placeholders}) "
+        "GROUP BY t.id"
     )
-
-    page_params = list(params)
-    page_params.extend([int(per_page), int(offset)])
-    rows = cur.execute(page_sql, page_params).fetchall()
+    by_id = {row["id"]: row for row in cur.execute(page_sql, [r[0] for r in page_ids]).fetchall()}
+    rows = [by_id[r[0]] for r in page_ids if r[0] in by_id]
     return rows, int(total_count)
 
 
+# Unfiltered facet cross-tab, reused until data_versions['tracks'] changes
+_library_facets_cache: Dict[str, object] = {"version": None, "cells": None}
+_library_facets_lock = threading.Lock()
+
+
+def get_data_version(conn: sqlite3.Connection, name: str = "tracks") -> int:
+    """Trigger-maintained change counter (see data_versions in _ensure_schema)."""
+    row = conn.execute("SELECT version FROM data_versions WHERE name = ?", (name,)).fetchone()
+    return int(row[0]) if row else 0
+
+
+def _facet_cells(conn: sqlite3.Connection, where_clauses: List[str], params: List) -> List[tuple]:
+    """One grouped pass: (resolution, filetype, is_deleted, count) cells for the filter set."""
+    sql = (
+        "SELECT t.resolution, t.filetype, "
+        "CASE WHEN dt.video_id IS NOT NULL THEN 1 ELSE 0 END AS is_deleted, "
+        "COUNT(DISTINCT t.id) "
+        "FROM tracks t "
+        "LEFT JOIN youtube_video_metadata ym ON ym.youtube_id = t.video_id "
+        "LEFT JOIN deleted_tracks dt ON dt.video_id = t.video_id AND dt.restored_at IS NULL "
+        "WHERE " + " AND ".join(where_clauses) +
+        " GROUP BY 1, 2, 3"
+    )
+    return [(r[0], r[1], int(r[2]), int(r[3])) for r in conn.execute(sql, params).fetchall()]
+
+
+def _library_facet_cells(conn: sqlite3.Connection) -> List[tuple]:
+    version = get_data_version(conn, "tracks")
+    with _library_facets_lock:
+        if _library_facets_cache["version"] == version and _library_facets_cache["cells"] is not None:
+            return _library_facets_cache["cells"]
+    cells = _facet_cells(conn, ["1=1"], [])
+    with _library_facets_lock:
+        _library_facets_cache["version"] = version
+        _library_facets_cache["cells"] = cells
+    return cells
+
+
+def _resolution_sort_key(resolution: str) -> tuple:
+    width, _, height = resolution.lower().partition("x")
+    def _num(value: str) -> int:
+        digits = ""
+        for ch in value.strip():
+            if not ch.isdigit():
+                break
+            digits += ch
+        return int(digits) if digits else 0
+    return (_num(height), _num(width), resolution)
+
+
+def get_tracks_facets(
+    conn: sqlite3.Connection,
+    *,
+    search_query: Optional[str] = None,
+    include_deleted: bool = False,
+    resolutions: Optional[List[str]] = None,
+    filetypes: Optional[List[str]] = None,
+    min_duration: Optional[int] = None,
+    max_duration: Optional[int] = None,
+    min_bitrate_bps: Optional[int] = None,
+    max_bitrate_bps: Optional[int] = None,
+    min_size_bytes: Optional[int] = None,
+    max_size_bytes: Optional[int] = None,
+    min_likes: Optional[int] = None,
+    min_max_quality: Optional[int] = None,
+) -> dict:
+    """Total, per-facet counts and facet values for /tracks from one grouped query.
+
+    Groups the rows matching every filter except the resolution/filetype
+    selections by (resolution, filetype, deleted). The total and the
+    "exclude own facet" counts (same semantics as get_resolution_counts /
+    get_filetype_counts) are summed from those cells in Python. When only
+    facet selections are active the library-wide cells are reused from a
+    cache keyed by the tracks data version.
+
+    Returns {"total", "resolution_counts", "filetype_counts", "resolutions", "filetypes"}.
+    """
+    library_cells = _library_facet_cells(conn)
+    has_other_filters = any(
+        v is not None
+        for v in (min_duration, max_duration, min_bitrate_bps, max_bitrate_bps,
+                  min_size_bytes, max_size_bytes, min_likes, min_max_quality)
+    ) or bool((search_query or "").strip())
+    if has_other_filters:
+        where_clauses, params = _track_filter_clauses(
+            search_query=search_query,
+            include_deleted=include_deleted,
+            min_duration=min_duration,
+            max_duration=max_duration,
+            min_bitrate_bps=min_bitrate_bps,
+            max_bitrate_bps=max_bitrate_bps,
+            min_size_bytes=min_size_bytes,
+            max_size_bytes=max_size_bytes,
+            min_likes=min_likes,
+            min_max_quality=min_max_quality,
+        )
+        cells = _facet_cells(conn, where_clauses, params)
+    else:
+        cells = library_cells
+
+    selected_res = set(_clean_list(resolutions))
+    selected_ft = {ft.lower() for ft in _clean_list(filetypes)}
+    total = 0
+    resolution_counts: Dict[str, int] = {}
+    filetype_counts: Dict[str, int] = {}
+    for res, ft, is_deleted, cnt in cells:
+        if is_deleted and not include_deleted:
+            continue
+        ft_key = (ft or "").strip() and ft.lower()
+        res_ok = not selected_res or res in selected_res
+        ft_ok = not selected_ft or (ft or "").lower() in selected_ft
+        if res_ok and ft_ok:
+            total += cnt
+        if ft_ok and res and res.strip() and "x" in res.lower():
+            resolution_counts[res] = resolution_counts.get(res, 0) + cnt
+        if res_ok and ft_key:
+            filetype_counts[ft_key] = filetype_counts.get(ft_key, 0) + cnt
+
+    all_resolutions = {res for res, _, _, _ in library_cells if res and res.strip() and "x" in res.lower()}
+    all_filetypes = {ft for _, ft, _, _ in library_cells if ft and ft.strip()}
+    return {
+        "total": total,
+        "resolution_counts": resolution_counts,
+        "filetype_counts": filetype_counts,
+        "resolutions": sorted(all_resolutions, key=_resolution_sort_key, reverse=True),
+        "filetypes": sorted(all_filetypes, key=lambda ft: (ft.lower(), ft)),
+    }
+
+
 def get_resolution_counts(
     conn: sqlite3.Connection,
     *,
@@ -923,10 +1538,10 @@ def get_resolution_counts(
         params.append(int(max_size_bytes))
 
     if search_query:
-        term = (search_query or "").strip()
-        if term:
-            where_clauses.append("COALESCE(ym.title, t.name) LIKE ? COLLATE NOCASE")
-            params.append(f"%{term}%")
+        search_sql, search_params = search_filter_clause("t.video_id", search_query, "COALESCE(ym.title, t.name)")
+        if search_sql:
+            where_clauses.append(search_sql)
+            params.extend(search_params)
 
     if not include_deleted:
         where_clauses.append("dt.video_id IS NULL")
@@ -1013,10 +1628,10 @@ def get_filetype_counts(
         params.append(int(max_size_bytes))
 
     if search_query:
-        term = (search_query or "").strip()
-        if term:
-            where_clauses.append("COALESCE(ym.title, t.name) LIKE ? COLLATE NOCASE")
-            params.append(f"%{term}%")
+        search_sql, search_params = search_filter_clause("t.video_id", search_query, "COALESCE(ym.title, t.name)")
+        if search_sql:
+            where_clauses.append(search_sql)
+            params.extend(search_params)
 
     if not include_deleted:
         where_clauses.append("dt.video_id IS NULL")
@@ -1185,6 +1800,7 @@ def record_event(conn: sqlite3.Connection, video_id: str, event: str, position:
         execute_with_retry(_update_track_counters)
 
     # log history
+    history_id = None
     try:
         def _insert_history() -> bool:
             cur.execute(
@@ -1195,6 +1811,7 @@ def record_event(conn: sqlite3.Connection, video_id: str, event: str, position:
             return True
 
         execute_with_retry(_insert_history)
+        history_id = cur.lastrowid
     except sqlite3.IntegrityError as e:
         # Likely due to old CHECK constraint only allowing start/finish
         if "CHECK" in str(e):
@@ -1208,9 +1825,41 @@ def record_event(conn: sqlite3.Connection, video_id: str, event: str, position:
                 return True
 
             execute_with_retry(_reinsert_history)
+            history_id = cur.lastrowid
         else:
             raise
 
+    if event in ("like", "dislike"):
+        _invalidate_aggregates("likes")
+    if _event_listeners:
+        _notify_event_listeners(video_id, event, position, history_id)
+
+
+# Events the web player sends while someone is listening
+PLAYER_ACTIVITY_EVENTS = ("start", "finish", "next", "prev", "play", "pause", "seek", "volume_change", "like", "dislike")
+
+
+def get_player_idle_seconds(conn: sqlite3.Connection) -> Optional[float]:
+    """Seconds since the last player event, or None if nothing was ever played.
+
+    Walks play_history backwards by rowid, so it stops at the newest player
+    event without scanning the table.
+    """
+    placeholders = ",".join("?" * len(PLAYER_ACTIVITY_EVENTS))
+    row = conn.execute(
+        f"""
+        SELECT (julianday('now') - julianday(ts)) * 86400.0
+        FROM play_history
+        WHERE event IN ({placeholders})
+        ORDER BY id DESC
+        LIMIT 1
+        """,
+        PLAYER_ACTIVITY_EVENTS,
+    ).fetchone()
+    if not row or row[0] is None:
+        return None
+    return max(0.0, float(row[0]))
+
 
 def _migrate_history_table(conn: sqlite3.Connection):
     cur = conn.cursor()
@@ -1235,6 +1884,7 @@ def _migrate_history_table(conn: sqlite3.Connection):
         DROP TABLE play_history_old;
         """
     )
+    cur.execute(_PLAY_HISTORY_INDEX_SQL)
     conn.commit()
 
 
@@ -1316,23 +1966,26 @@ def iter_history(conn: sqlite3.Connection, limit: int = 500):
 
 
 def get_history_page(conn: sqlite3.Connection, page: int = 1, per_page: int = 1000, 
-                     event_types: list = None, track_filter: str = None, video_id_filter: str = None):
+                     event_types: list = None, track_filter: str = None, video_id_filter: str = None,
+                     before_id: Optional[int] = None, after_id: Optional[int] = None):
     """Get paginated history with optional server-side filtering.
     
     Args:
         conn: Database connection
-        page: Page number (1-based)
+        page: Page number (1-based); only used when no cursor is given
         per_page: Items per page
         event_types: List of event types to include (e.g. ['like', 'start'])
         track_filter: Filter by track name (partial match)
         video_id_filter: Filter by video ID (partial match)
+        before_id: Keyset cursor - return events older than this ph.id (next page)
+        after_id: Keyset cursor - return events newer than this ph.id (previous page)
         
     Returns:
-        tuple: (rows, has_next)
+        tuple: (rows, has_next) - with after_id, has_next means "more newer rows"
     """
     if page < 1:
         page = 1
-    offset = (page - 1) * per_page
+    offset = 0 if (before_id is not None or after_id is not None) else (page - 1) * per_page
     
     # Build WHERE clause based on filters
     where_conditions = []
@@ -1347,16 +2000,26 @@ def get_history_page(conn: sqlite3.Connection, page: int = 1, per_page: int = 10
         else:  # Empty list - show no events
             where_conditions.append("1 = 0")  # Always false condition
     
-    # Track name filter
+    # Track name filter (full-text index, LIKE fallback)
     if track_filter:
-        where_conditions.append("t.name LIKE ?")
-        params.append(f"%{track_filter}%")
+        search_sql, search_params = search_filter_clause("ph.video_id", track_filter, "t.name")
+        if search_sql:
+            where_conditions.append(search_sql)
+            params.extend(search_params)
     
     # Video ID filter
     if video_id_filter:
         where_conditions.append("ph.video_id LIKE ?")
         params.append(f"%{video_id_filter}%")
     
+    # Keyset cursor on the primary key (seek instead of OFFSET)
+    if before_id is not None:
+        where_conditions.append("ph.id < ?")
+        params.append(int(before_id))
+    elif after_id is not None:
+        where_conditions.append("ph.id > ?")
+        params.append(int(after_id))
+    
     # Construct SQL query with YouTube metadata
     base_query = """SELECT ph.*, 
                            COALESCE(ym.title, t.name) as name,
@@ -1371,14 +2034,18 @@ def get_history_page(conn: sqlite3.Connection, page: int = 1, per_page: int = 10
     if where_conditions:
         base_query += " WHERE " + " AND ".join(where_conditions)
     
-    base_query += " ORDER BY ph.id DESC LIMIT ? OFFSET ?"
+    order = "ASC" if (after_id is not None and before_id is None) else "DESC"
+    base_query += f" ORDER BY ph.id {order} LIMIT ? OFFSET ?"
     params.extend([per_page + 1, offset])
     
     cur = conn.cursor()
     cur.execute(base_query, params)
     rows = cur.fetchall()
     has_next = len(rows) > per_page
-    return rows[:per_page], has_next 
+    rows = rows[:per_page]
+    if order == "ASC":
+        rows.reverse()
+    return rows, has_next 
 
 
 # ---------- Extra helpers ----------
@@ -1391,31 +2058,48 @@ def get_playlist_by_relpath(conn: sqlite3.Connection, relpath: str):
 # ---------- Database Backup Functions ----------
 
 
-def create_backup(root_dir: Path) -> dict:
+def _backup_base_dir(root_dir: Path) -> Path:
+    """Directory holding DB/ and Backups/ for either root_dir layout."""
+    # If root_dir ends with 'Playlists', go up one level to find DB
+    if root_dir.name == "Playlists":
+        return root_dir.parent
+    return root_dir
+
+
+def _backups_dir(root_dir: Path) -> Path:
+    return _backup_base_dir(root_dir) / "Backups" / "DB"
+
+
+def _valid_backup_name(folder_name: str) -> bool:
+    return bool(folder_name) and Path(folder_name).name == folder_name and folder_name not in (".", "..", "pages")
+
+
+def create_backup(root_dir: Path, backup_type: str = "incremental") -> dict:
     """Create a backup of the database with timestamp.
     
+    Backups are snapshots in the page store (see utils.backup_store): only
+    pages that changed since the previous snapshot are listed, and only page
+    contents not already stored are written, compressed.
+    
     Args:
         root_dir: Root directory containing DB folder
+        backup_type: 'incremental' (delta over the latest snapshot) or
+            'full' (self-contained base snapshot; unchanged pages are still
+            shared with earlier snapshots)
         
     Returns:
         dict with backup info: {'success': bool, 'backup_path': str, 'error': str}
+        plus size_bytes (newly stored bytes), db_size_bytes and changed_pages
     """
     try:
-        # Determine base directory - handle both root_dir patterns
-        # If root_dir ends with 'Playlists', go up one level to find DB
-        if root_dir.name == "Playlists":
-            base_dir = root_dir.parent
-        else:
-            base_dir = root_dir
+        from utils.backup_store import create_snapshot, manifest_path
         
-        # Create backup directory structure
-        backups_dir = base_dir / "Backups" / "DB"
+        base_dir = _backup_base_dir(root_dir)
+        backups_dir = _backups_dir(root_dir)
         backups_dir.mkdir(parents=True, exist_ok=True)
         
         # Generate timestamp folder name (UTC)
         timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S_UTC")
-        backup_folder = backups_dir / timestamp
-        backup_folder.mkdir(exist_ok=True)
         
         # Source database path
         db_dir = base_dir / "DB"
@@ -1428,37 +2112,29 @@ def create_backup(root_dir: Path) -> dict:
                 'error': f'Database not found at {source_db}'
             }
         
-        # Backup file path
-        backup_db = backup_folder / "tracks.db"
-        
-        # Create backup using SQLite backup API (safer than file copy)
-        source_conn = sqlite3.connect(str(source_db))
-        backup_conn = sqlite3.connect(str(backup_db))
-        
-        # Perform backup
-        source_conn.backup(backup_conn)
-        
-        # Close connections
-        backup_conn.close()
-        source_conn.close()
-        
-        # Get backup file size
-        backup_size = backup_db.stat().st_size
+        manifest = create_snapshot(source_db, backups_dir, timestamp, full=(backup_type == "full"))
+        manifest_file = manifest_path(backups_dir, timestamp)
+        backup_size = manifest['stored_bytes'] + manifest_file.stat().st_size
         
         # Record backup event in history
         try:
             conn = get_connection()
-            record_event(conn, "system", "backup_created", position=float(backup_size))
+            record_event(conn, "system", "backup_created", position=float(manifest['db_size_bytes']))
             conn.close()
         except Exception:
             pass  # Don't fail backup if history recording fails
         
         return {
             'success': True,
-            'backup_path': str(backup_db),
-            'backup_folder': str(backup_folder),
+            'backup_path': str(manifest_file),
+            'backup_folder': str(manifest_file.parent),
             'timestamp': timestamp,
+            'kind': manifest['kind'],
             'size_bytes': backup_size,
+            'db_size_bytes': manifest['db_size_bytes'],
+            'changed_pages': manifest['changed_pages'],
+            'page_count': manifest['page_count'],
+            'duration_seconds': manifest['duration_seconds'],
             'error': ''
         }
         
@@ -1470,9 +2146,22 @@ def create_backup(root_dir: Path) -> dict:
         }
 
 
+def _backup_datetime(folder_name: str, fallback_mtime: float) -> datetime:
+    """Parse timestamp from folder name, falling back to a file modification time."""
+    try:
+        timestamp_str = folder_name.replace("_UTC", "")
+        backup_datetime = datetime.strptime(timestamp_str, "%Y%m%d_%H%M%S")
+        return backup_datetime.replace(tzinfo=timezone.utc)
+    except ValueError:
+        return datetime.fromtimestamp(fallback_mtime, tz=timezone.utc)
+
+
 def list_backups(root_dir: Path) -> list:
     """List all database backups with metadata.
     
+    Includes page-store snapshots (kind 'base' or 'incremental', size_bytes is
+    what the snapshot added to the store) and older full copies (kind 'full').
+    
     Args:
         root_dir: Root directory containing Backups folder
         
@@ -1480,41 +2169,54 @@ def list_backups(root_dir: Path) -> list:
         list of backup info dicts sorted by date (newest first)
     """
     try:
-        # Handle both root_dir patterns - same logic as create_backup
-        if root_dir.name == "Playlists":
-            base_dir = root_dir.parent
-        else:
-            base_dir = root_dir
-            
-        backups_dir = base_dir / "Backups" / "DB"
+        from utils.backup_store import MANIFEST_NAME, load_manifest
+        
+        backups_dir = _backups_dir(root_dir)
         if not backups_dir.exists():
             return []
         
         backups = []
         
         for backup_folder in backups_dir.iterdir():
-            if backup_folder.is_dir():
-                backup_db = backup_folder / "tracks.db"
-                if backup_db.exists():
-                    stat = backup_db.stat()
-                    
-                    # Parse timestamp from folder name
-                    try:
-                        timestamp_str = backup_folder.name.replace("_UTC", "")
-                        backup_datetime = datetime.strptime(timestamp_str, "%Y%m%d_%H%M%S")
-                        backup_datetime = backup_datetime.replace(tzinfo=timezone.utc)
-                    except ValueError:
-                        # Fallback to file modification time
-                        backup_datetime = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
-                    
-                    backups.append({
-                        'folder_name': backup_folder.name,
-                        'backup_path': str(backup_db),
-                        'timestamp': backup_datetime.isoformat(),
-                        'timestamp_display': backup_datetime.strftime("%Y-%m-%d %H:%M:%S UTC"),
-                        'size_bytes': stat.st_size,
-                        'size_display': _format_file_size(stat.st_size)
-                    })
+            if not backup_folder.is_dir() or not _valid_backup_name(backup_folder.name):
+                continue
+            manifest_file = backup_folder / MANIFEST_NAME
+            backup_db = backup_folder / "tracks.db"
+            if manifest_file.exists():
+                manifest = load_manifest(backups_dir, backup_folder.name)
+                if manifest is None:
+                    continue
+                stat = manifest_file.stat()
+                size_bytes = manifest.get('stored_bytes', 0) + stat.st_size
+                entry = {
+                    'backup_path': str(manifest_file),
+                    'kind': manifest.get('kind', 'incremental'),
+                    'parent': manifest.get('parent'),
+                    'db_size_bytes': manifest.get('db_size_bytes', 0),
+                    'changed_pages': manifest.get('changed_pages', 0),
+                    'page_count': manifest.get('page_count', 0),
+                }
+            elif backup_db.exists():
+                stat = backup_db.stat()
+                size_bytes = stat.st_size
+                entry = {
+                    'backup_path': str(backup_db),
+                    'kind': 'full',
+                    'parent': None,
+                    'db_size_bytes': stat.st_size,
+                }
+            else:
+                continue
+            
+            backup_datetime = _backup_datetime(backup_folder.name, stat.st_mtime)
+            entry.update({
+                'folder_name': backup_folder.name,
+                'timestamp': backup_datetime.isoformat(),
+                'timestamp_display': backup_datetime.strftime("%Y-%m-%d %H:%M:%S UTC"),
+                'size_bytes': size_bytes,
+                'size_display': _format_file_size(size_bytes)
+            })
+            backups.append(entry)
         
         # Sort by timestamp (newest first)
         backups.sort(key=lambda x: x['timestamp'], reverse=True)
@@ -1524,8 +2226,102 @@ def list_backups(root_dir: Path) -> list:
         return []
 
 
-def _format_file_size(size_bytes: int) -> str:
-    """Format file size in human readable format."""
+def restore_backup(root_dir: Path, folder_name: str, target_path: Optional[Path] = None) -> dict:
+    """Rebuild a standalone database file from a backup.
+    
+    Page-store snapshots are rebuilt by replaying their chain; older full
+    copies are copied with the SQLite backup API. The live database is never
+    touched; by default the file is written to Backups/Restored/.
+    
+    Returns:
+        dict: {'success': bool, 'restored_path': str, 'size_bytes': int, 'error': str}
+    """
+    try:
+        if not _valid_backup_name(folder_name):
+            return {'success': False, 'restored_path': '', 'error': f'Invalid backup name: {folder_name}'}
+        
+        from utils.backup_store import MANIFEST_NAME, restore_snapshot
+        
+        backups_dir = _backups_dir(root_dir)
+        backup_folder = backups_dir / folder_name
+        if target_path is None:
+            target_path = _backup_base_dir(root_dir) / "Backups" / "Restored" / f"{folder_name}_tracks.db"
+        target_path = Path(target_path)
+        
+        if (backup_folder / MANIFEST_NAME).exists():
+            restore_snapshot(backups_dir, folder_name, target_path)
+        elif (backup_folder / "tracks.db").exists():
+            target_path.parent.mkdir(parents=True, exist_ok=True)
+            source_conn = sqlite3.connect(str(backup_folder / "tracks.db"))
+            target_conn = sqlite3.connect(str(target_path))
+            try:
+                source_conn.backup(target_conn)
+            finally:
+                target_conn.close()
+                source_conn.close()
+        else:
+            return {'success': False, 'restored_path': '', 'error': f'Backup not found: {folder_name}'}
+        
+        return {
+            'success': True,
+            'restored_path': str(target_path),
+            'size_bytes': target_path.stat().st_size,
+            'error': ''
+        }
+        
+    except Exception as e:
+        return {
+            'success': False,
+            'restored_path': '',
+            'error': str(e)
+        }
+
+
+def delete_backups(root_dir: Path, folder_names: List[str]) -> dict:
+    """Delete backups and free page blobs no remaining snapshot references.
+    
+    Deleting a snapshot folds its pages into snapshots built on top of it, so
+    removing old backups never breaks newer ones.
+    
+    Returns:
+        dict: {'deleted': [names], 'failed': {name: error}, 'freed_bytes': int}
+    """
+    import shutil
+    from utils.backup_store import MANIFEST_NAME, collect_garbage, delete_snapshot
+    
+    backups_dir = _backups_dir(root_dir)
+    deleted: List[str] = []
+    failed: Dict[str, str] = {}
+    freed = 0
+    
+    for folder_name in folder_names:
+        try:
+            if not _valid_backup_name(folder_name):
+                raise ValueError("invalid backup name")
+            backup_folder = backups_dir / folder_name
+            if (backup_folder / MANIFEST_NAME).exists():
+                delete_snapshot(backups_dir, folder_name)
+            elif backup_folder.is_dir():
+                backup_db = backup_folder / "tracks.db"
+                freed += backup_db.stat().st_size if backup_db.exists() else 0
+                shutil.rmtree(backup_folder)
+            else:
+                raise FileNotFoundError("backup not found")
+            deleted.append(folder_name)
+        except Exception as e:
+            failed[folder_name] = str(e)
+    
+    if deleted:
+        try:
+            freed += collect_garbage(backups_dir)['freed_bytes']
+        except Exception as e:
+            failed['<garbage collection>'] = str(e)
+    
+    return {'deleted': deleted, 'failed': failed, 'freed_bytes': freed}
+
+
+def _format_file_size(size_bytes: int) -> str:
+    """Format file size in human readable format."""
     if size_bytes < 1024:
         return f"{size_bytes} B"
     elif size_bytes < 1024 * 1024:
@@ -1536,6 +2332,118 @@ def _format_file_size(size_bytes: int) -> str:
         return f"{size_bytes / (1024 * 1024 * 1024):.1f} GB"
 
 
+
+# ---------- Disk Usage Cache ----------
+# dir_usage holds the size and count of the files directly inside a directory;
+# totals of a tree are the sum over the path prefix. Rows are adjusted when
+# the app adds, moves or removes files and rewritten by a reconcile walk
+# (services.disk_usage_service), which also fixes drift from outside changes.
+
+
+def normalize_usage_path(path: Union[str, Path]) -> str:
+    """Canonical dir_usage key: absolute, case-folded on Windows, '/' separators."""
+    normalized = os.path.normcase(os.path.abspath(str(path))).replace("\\", "/")
+    return normalized.rstrip("/") or "/"
+
+
+def _usage_subtree_clause(root: str) -> tuple:
+    # '0' sorts right after '/', so the range covers exactly root/...
+    if root == "/":
+        return "1 = 1", ()
+    return "(path = ? OR (path >= ? AND path < ?))", (root, root + "/", root + "0")
+
+
+def adjust_dir_usage(conn: sqlite3.Connection, deltas: Dict[str, tuple]) -> None:
+    """Add (bytes, files) deltas to directories, keyed by directory path."""
+    rows = [
+        (normalize_usage_path(path), int(size), int(files))
+        for path, (size, files) in deltas.items()
+        if size or files
+    ]
+    if not rows:
+        return
+
+    def _apply():
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                """
+                INSERT INTO dir_usage (path, bytes, files, updated_at) VALUES (?1, MAX(?2, 0), MAX(?3, 0), datetime('now'))
+                ON CONFLICT(path) DO UPDATE SET
+                    bytes = MAX(dir_usage.bytes + ?2, 0),
+                    files = MAX(dir_usage.files + ?3, 0),
+                    updated_at = excluded.updated_at
+                """,
+                rows,
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    execute_with_retry(_apply)
+
+
+def set_dir_usage(conn: sqlite3.Connection, path: Union[str, Path], size: int, files: int) -> None:
+    """Replace the totals of a single directory (after rescanning it)."""
+    execute_with_retry(lambda: conn.execute(
+        """
+        INSERT INTO dir_usage (path, bytes, files, updated_at) VALUES (?, ?, ?, datetime('now'))
+        ON CONFLICT(path) DO UPDATE SET bytes = excluded.bytes, files = excluded.files, updated_at = excluded.updated_at
+        """,
+        (normalize_usage_path(path), int(size), int(files)),
+    ))
+
+
+def replace_dir_usage_tree(conn: sqlite3.Connection, root: Union[str, Path], totals: Dict[str, tuple]) -> None:
+    """Swap all rows under ``root`` for a fresh walk and mark the root reconciled."""
+    root_key = normalize_usage_path(root)
+    clause, params = _usage_subtree_clause(root_key)
+    rows = [(normalize_usage_path(path), int(size), int(files)) for path, (size, files) in totals.items()]
+
+    def _apply():
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(f"DELETE FROM dir_usage WHERE {clause}", params)
+            conn.executemany("INSERT OR REPLACE INTO dir_usage (path, bytes, files) VALUES (?, ?, ?)", rows)
+            conn.execute(
+                "INSERT INTO dir_usage_roots (root, reconciled_at) VALUES (?, datetime('now')) "
+                "ON CONFLICT(root) DO UPDATE SET reconciled_at = excluded.reconciled_at",
+                (root_key,),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    execute_with_retry(_apply)
+
+
+def get_dir_usage_totals(conn: sqlite3.Connection, root: Union[str, Path]) -> dict:
+    """Cached size and file count of a directory tree.
+
+    ``reconciled_at`` is the last full walk of this root (None: never walked,
+    the totals only reflect incremental updates) and ``reconciled_age_seconds``
+    its age.
+    """
+    root_key = normalize_usage_path(root)
+    clause, params = _usage_subtree_clause(root_key)
+    row = conn.execute(
+        f"SELECT COALESCE(SUM(bytes), 0), COALESCE(SUM(files), 0) FROM dir_usage WHERE {clause}",
+        params,
+    ).fetchone()
+    reconciled = conn.execute(
+        "SELECT reconciled_at, (julianday('now') - julianday(reconciled_at)) * 86400 "
+        "FROM dir_usage_roots WHERE root = ?",
+        (root_key,),
+    ).fetchone()
+    return {
+        "path": root_key,
+        "bytes": row[0],
+        "files": row[1],
+        "reconciled_at": reconciled[0] if reconciled else None,
+        "reconciled_age_seconds": reconciled[1] if reconciled else None,
+    }
+
+
 # ---------- User Settings Functions ----------
 
 
@@ -1847,6 +2755,8 @@ def update_channel_group(conn: sqlite3.Connection, group_id: int, **kwargs):
     
     cur.execute(f"UPDATE channel_groups SET {set_clause} WHERE id = ?", values)
     conn.commit()
+    # include_in_likes (and group membership) drive the likes aggregates
+    _invalidate_aggregates("likes")
     
     return cur.rowcount > 0
 
@@ -1883,6 +2793,7 @@ def delete_channel_group(conn: sqlite3.Connection, group_id: int) -> bool:
     # Delete the group
     cur.execute("DELETE FROM channel_groups WHERE id = ?", (group_id,))
     conn.commit()
+    _invalidate_aggregates("likes")
     
     return cur.rowcount > 0
 
@@ -1911,6 +2822,7 @@ def create_channel(conn: sqlite3.Connection, name: str, url: str, channel_group_
         (name, url, channel_group_id, date_from, enabled)
     )
     conn.commit()
+    _invalidate_aggregates("likes")
     return cur.lastrowid
 
 
@@ -2149,6 +3061,7 @@ def record_track_deletion(conn: sqlite3.Connection, video_id: str, original_name
         return True
 
     execute_with_retry(_insert_deleted)
+    _invalidate_aggregates("likes", "library")
     
     # Also record as event in play_history
     record_event(conn, video_id, 'auto_deleted' if deletion_reason == 'auto_delete' else 'removed',
@@ -2247,6 +3160,42 @@ def restore_deleted_track(conn: sqlite3.Connection, deleted_track_id: int):
         return True
 
     execute_with_retry(_mark_restored)
+    _invalidate_aggregates("likes", "library")
+
+
+
+def restore_deleted_tracks_batch(conn: sqlite3.Connection, restored: List[tuple]) -> int:
+    """Mark many deleted tracks as restored in one transaction.
+
+    Args:
+        conn: Database connection
+        restored: (deleted_track_id, video_id, additional_data) tuples; a
+            'track_restored' history row is written for each, as record_event does
+
+    Returns:
+        Number of records marked
+    """
+    if not restored:
+        return 0
+
+    def _apply():
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "UPDATE deleted_tracks SET restored_at = datetime('now'), can_restore = 0 WHERE id = ?",
+                [(deleted_id,) for deleted_id, _, _ in restored],
+            )
+            conn.executemany(
+                "INSERT INTO play_history (video_id, event, additional_data) VALUES (?, 'track_restored', ?)",
+                [(video_id, additional_data) for _, video_id, additional_data in restored],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    execute_with_retry(_apply)
+    _invalidate_aggregates("likes", "library")
+    return len(restored)
 
 
 def should_auto_delete_track(conn: sqlite3.Connection, video_id: str) -> bool:
@@ -2305,248 +3254,595 @@ def record_channel_synced(conn: sqlite3.Connection, channel_url: str, channel_na
 
 # ---------- YouTube Video Metadata Functions ----------
 
-def upsert_youtube_metadata(conn: sqlite3.Connection, metadata: dict) -> int:
-    """Insert or update YouTube video metadata"""
-    cur = conn.cursor()
-    
-    # Extract all fields from metadata dict
-    fields = [
-        '_type', 'ie_key', 'youtube_id', 'url', 'title', 'description', 'duration',
-        'channel_id', 'channel', 'channel_url', 'uploader', 'uploader_id', 'uploader_url',
-        'timestamp', 'release_timestamp', 'availability', 'view_count', 'live_status',
-        'channel_is_verified', '__x_forwarded_for_ip', 'webpage_url', 'original_url',
-        'webpage_url_basename', 'webpage_url_domain', 'extractor', 'extractor_key',
-        'playlist_count', 'playlist', 'playlist_id', 'playlist_title', 'playlist_uploader',
-        'playlist_uploader_id', 'playlist_channel', 'playlist_channel_id', 'playlist_webpage_url',
-        'n_entries', 'playlist_index', '__last_playlist_index', 'playlist_autonumber',
-        'epoch', 'duration_string', 'release_year',
-        # New available qualities fields
-        'available_formats', 'available_qualities_summary',
-        # Denormalized max quality fields
-        'max_available_height', 'max_quality_label'
-    ]
-    
-    # Build column list and value placeholders
-    columns = ', '.join(fields)
-    placeholders = ', '.join(['?' for _ in fields])
-    update_clause = ', '.join([f'{field}=excluded.{field}' for field in fields if field != 'youtube_id'])
-    
-    incoming_height = metadata.get("max_available_height")
+YOUTUBE_METADATA_FIELDS = (
+    '_type', 'ie_key', 'youtube_id', 'url', 'title', 'description', 'duration',
+    'channel_id', 'channel', 'channel_url', 'uploader', 'uploader_id', 'uploader_url',
+    'timestamp', 'release_timestamp', 'availability', 'view_count', 'live_status',
+    'channel_is_verified', '__x_forwarded_for_ip', 'webpage_url', 'original_url',
+    'webpage_url_basename', 'webpage_url_domain', 'extractor', 'extractor_key',
+    'playlist_count', 'playlist', 'playlist_id', 'playlist_title', 'playlist_uploader',
+    'playlist_uploader_id', 'playlist_channel', 'playlist_channel_id', 'playlist_webpage_url',
+    'n_entries', 'playlist_index', '__last_playlist_index', 'playlist_autonumber',
+    'epoch', 'duration_string', 'release_year',
+    # New available qualities fields
+    'available_formats', 'available_qualities_summary',
+    # Denormalized max quality fields
+    'max_available_height', 'max_quality_label'
+)
+
+# Extraction bookkeeping that changes on every run without the video changing
+_METADATA_HASH_EXCLUDED = frozenset({'epoch', '__x_forwarded_for_ip'})
+
+# Fields kept from the stored row when it knows a higher max quality than the incoming one
+_MAX_QUALITY_KEEP_SQL = (
+    "COALESCE(CAST(youtube_video_metadata.max_available_height AS INTEGER), 0) > "
+    "COALESCE(CAST(excluded.max_available_height AS INTEGER), 0)"
+)
+_MAX_QUALITY_PRESERVED = ('max_quality_label', 'available_qualities_summary')
+
+# Cold fields stored compressed in youtube_metadata_blobs instead of inline;
+# the inline columns stay NULL for rows written since (older rows are read
+# inline until migration 016 or their next upsert moves them).
+YOUTUBE_METADATA_BLOB_FIELDS = ('description', 'available_formats')
+METADATA_BLOB_CODEC = 'zlib'
+_METADATA_BLOB_LEVEL = 6
+
+YOUTUBE_METADATA_BULK_BATCH_SIZE = 500
+
+
+def _to_int(value) -> int:
+    """``COALESCE(CAST(value AS INTEGER), 0)`` in Python."""
     try:
-        incoming_height_int = int(incoming_height) if incoming_height is not None else 0
+        return int(float(value))
     except (TypeError, ValueError):
-        incoming_height_int = 0
-    existing = cur.execute(
-        "SELECT max_available_height, max_quality_label, available_formats, available_qualities_summary "
-        "FROM youtube_video_metadata WHERE youtube_id = ?",
-        (metadata.get("youtube_id"),),
+        return 0
+
+
+def _pack_metadata_blob(text: Optional[str]) -> Optional[bytes]:
+    if text is None or text == '':
+        return None
+    return zlib.compress(str(text).encode('utf-8'), _METADATA_BLOB_LEVEL)
+
+
+def _unpack_metadata_blob(codec: Optional[str], data) -> Optional[str]:
+    if data is None:
+        return None
+    if isinstance(data, str):
+        return data
+    if codec not in (None, 'zlib'):
+        raise ValueError(f"Unknown metadata blob codec: {codec}")
+    return zlib.decompress(data).decode('utf-8')
+
+
+def _index_descriptions(conn: sqlite3.Connection, pairs: List[tuple]) -> None:
+    """Set search_index descriptions for (video_id, text) pairs (the triggers keep them)."""
+    conn.executemany(
+        "UPDATE search_index SET description = ? WHERE rowid = (SELECT id FROM search_docs WHERE video_id = ?)",
+        [(text, video_id) for video_id, text in pairs],
+    )
+
+
+def get_youtube_metadata_blobs(
+    conn: sqlite3.Connection,
+    video_ids: List[str],
+    fields: tuple = YOUTUBE_METADATA_BLOB_FIELDS,
+) -> Dict[str, Dict[str, Optional[str]]]:
+    """Decompressed cold fields (description/available_formats) per video ID.
+
+    Videos whose row was not moved to youtube_metadata_blobs yet are read from
+    the inline columns. Videos without metadata are absent from the result.
+    """
+    fields = tuple(f for f in fields if f in YOUTUBE_METADATA_BLOB_FIELDS)
+    video_ids = list(dict.fromkeys(v for v in video_ids if v))
+    result: Dict[str, Dict[str, Optional[str]]] = {}
+    if not video_ids or not fields:
+        return result
+    blobs = bulk_lookup(conn, "youtube_metadata_blobs", "youtube_id", video_ids, ["codec", *fields])
+    for video_id, row in blobs.items():
+        result[video_id] = {f: _unpack_metadata_blob(row["codec"], row[f]) for f in fields}
+    legacy = [v for v in video_ids if v not in blobs]
+    if legacy:
+        for video_id, row in bulk_lookup(conn, "youtube_video_metadata", "youtube_id", legacy, list(fields)).items():
+            result[video_id] = {f: row[f] for f in fields}
+    return result
+
+
+def get_youtube_metadata_with_blobs(conn: sqlite3.Connection, youtube_id: str) -> Optional[dict]:
+    """Full metadata row as a dict, with description/available_formats loaded from the blob table."""
+    row = get_youtube_metadata_by_id(conn, youtube_id)
+    if row is None:
+        return None
+    metadata = dict(row)
+    metadata.update(get_youtube_metadata_blobs(conn, [youtube_id]).get(youtube_id) or {})
+    return metadata
+
+
+def youtube_metadata_content_hash(metadata: dict) -> str:
+    """Stable hash of the stored metadata fields (ignores per-extraction bookkeeping)."""
+    payload = [
+        metadata.get(field) for field in YOUTUBE_METADATA_FIELDS if field not in _METADATA_HASH_EXCLUDED
+    ]
+    return hashlib.sha1(
+        json.dumps(payload, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+    ).hexdigest()
+
+
+def _youtube_metadata_upsert_sql(skip_unchanged: bool) -> str:
+    """INSERT ... ON CONFLICT for one row; max quality is preserved in SQL.
+
+    When the stored row reports a greater max_available_height, it keeps that
+    height and its non-empty label/summary instead of the incoming ones.
+    """
+    fields = YOUTUBE_METADATA_FIELDS + ('content_hash',)
+    updates = []
+    for field in fields:
+        if field == 'youtube_id':
+            continue
+        if field == 'max_available_height':
+            updates.append(
+                f"{field}=CASE WHEN {_MAX_QUALITY_KEEP_SQL} "
+                f"THEN youtube_video_metadata.{field} ELSE excluded.{field} END"
+            )
+        elif field in _MAX_QUALITY_PRESERVED:
+            updates.append(
+                f"{field}=CASE WHEN {_MAX_QUALITY_KEEP_SQL} AND NULLIF(youtube_video_metadata.{field}, '') IS NOT NULL "
+                f"THEN youtube_video_metadata.{field} ELSE excluded.{field} END"
+            )
+        else:
+            updates.append(f"{field}=excluded.{field}")
+    where = " WHERE youtube_video_metadata.content_hash IS NOT excluded.content_hash" if skip_unchanged else ""
+    return (
+        f"INSERT INTO youtube_video_metadata ({', '.join(fields)}, updated_at) "
+        f"VALUES ({', '.join('?' for _ in fields)}, datetime('now')) "
+        f"ON CONFLICT(youtube_id) DO UPDATE SET {', '.join(updates)}, updated_at=datetime('now'){where}"
+    )
+
+
+def _youtube_metadata_values(metadata: dict, content_hash: str) -> tuple:
+    """Hot-row parameters; the blob fields are written to youtube_metadata_blobs instead."""
+    return tuple(
+        None if field in YOUTUBE_METADATA_BLOB_FIELDS else metadata.get(field)
+        for field in YOUTUBE_METADATA_FIELDS
+    ) + (content_hash,)
+
+
+_METADATA_BLOB_UPSERT_SQL = (
+    "INSERT INTO youtube_metadata_blobs (youtube_id, codec, description, available_formats, raw_bytes, updated_at) "
+    "VALUES (?, ?, ?, ?, ?, datetime('now')) "
+    "ON CONFLICT(youtube_id) DO UPDATE SET codec=excluded.codec, description=excluded.description, "
+    "available_formats=excluded.available_formats, raw_bytes=excluded.raw_bytes, updated_at=excluded.updated_at"
+)
+
+
+def _youtube_metadata_blob_row(video_id: str, description: Optional[str], formats: Optional[str]) -> Optional[tuple]:
+    """Parameters for _METADATA_BLOB_UPSERT_SQL, or None when both fields are empty."""
+    if not description and not formats:
+        return None
+    raw_bytes = sum(len(str(text).encode('utf-8')) for text in (description, formats) if text)
+    return (
+        video_id, METADATA_BLOB_CODEC, _pack_metadata_blob(description), _pack_metadata_blob(formats), raw_bytes,
+    )
+
+
+def upsert_youtube_metadata(conn: sqlite3.Connection, metadata: dict) -> int:
+    """Insert or update YouTube video metadata; returns the row id.
+
+    Rows whose content hash matches the stored one are left untouched.
+    """
+    bulk_upsert_youtube_metadata(conn, [metadata])
+    result = conn.execute(
+        "SELECT id FROM youtube_video_metadata WHERE youtube_id = ?", (metadata.get("youtube_id"),)
     ).fetchone()
-    if existing:
-        try:
-            existing_height = int(existing[0]) if existing[0] is not None else 0
-        except (TypeError, ValueError):
-            existing_height = 0
-        if existing_height > incoming_height_int:
-            metadata["max_available_height"] = existing[0]
-            if existing[1]:
-                metadata["max_quality_label"] = existing[1]
-            if existing[2]:
-                metadata["available_formats"] = existing[2]
-            if existing[3]:
-                metadata["available_qualities_summary"] = existing[3]
-
-    values = [metadata.get(field) for field in fields]
-    
-    cur.execute(f"""
-        INSERT INTO youtube_video_metadata ({columns}, updated_at)
-        VALUES ({placeholders}, datetime('now'))
-        ON CONFLICT(youtube_id) DO UPDATE SET
-            {update_clause},
-            updated_at=datetime('now')
-        RETURNING id
-    """, values)
-    
-    result = cur.fetchone()
-    conn.commit()
     return result[0] if result else None
 
 
-def get_youtube_metadata_by_id(conn: sqlite3.Connection, youtube_id: str) -> Optional[sqlite3.Row]:
-    """Get YouTube video metadata by video ID"""
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM youtube_video_metadata WHERE youtube_id = ?", (youtube_id,))
-    return cur.fetchone()
+def bulk_upsert_youtube_metadata(
+    conn: sqlite3.Connection,
+    rows: List[dict],
+    *,
+    skip_unchanged: bool = True,
+    batch_size: int = YOUTUBE_METADATA_BULK_BATCH_SIZE,
+) -> Dict[str, int]:
+    """Insert or update many metadata rows, one transaction per batch.
+
+    Stored content hashes are read with one bulk lookup; rows whose hash is
+    unchanged are not written at all (unless ``skip_unchanged`` is False).
+    The rest go through ``executemany`` with the same max-quality-preserving
+    statement as ``upsert_youtube_metadata``. Description and
+    available_formats are compressed into youtube_metadata_blobs (the stored
+    formats are kept when the stored row knows a higher max quality). Later
+    duplicates of a youtube_id win.
 
+    Returns:
+        {"inserted", "updated", "unchanged", "invalid"} counts
+    """
+    stats = {"inserted": 0, "updated": 0, "unchanged": 0, "invalid": 0}
+    by_id: Dict[str, tuple] = {}
+    for metadata in rows:
+        video_id = (metadata or {}).get("youtube_id")
+        if not video_id:
+            stats["invalid"] += 1
+            continue
+        by_id[video_id] = (metadata, youtube_metadata_content_hash(metadata))
+    if not by_id:
+        return stats
 
-def get_youtube_metadata_batch(conn: sqlite3.Connection, video_ids: List[str]) -> Dict[str, sqlite3.Row]:
-    """Get YouTube metadata for multiple video IDs in single query for performance optimization"""
-    if not video_ids:
+    stored = bulk_lookup(
+        conn, "youtube_video_metadata", "youtube_id", list(by_id), ["content_hash", "max_available_height"]
+    )
+    pending = []
+    keep_formats = []
+    for video_id, (metadata, content_hash) in by_id.items():
+        existing = stored.get(video_id)
+        if existing is None:
+            stats["inserted"] += 1
+        elif skip_unchanged and existing["content_hash"] == content_hash:
+            stats["unchanged"] += 1
+            continue
+        else:
+            stats["updated"] += 1
+            if _to_int(existing["max_available_height"]) > _to_int(metadata.get("max_available_height")):
+                keep_formats.append(video_id)
+        pending.append((video_id, metadata, content_hash))
+
+    stored_formats = get_youtube_metadata_blobs(conn, keep_formats, ("available_formats",)) if keep_formats else {}
+
+    sql = _youtube_metadata_upsert_sql(skip_unchanged=skip_unchanged)
+    batch_size = max(1, int(batch_size))
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        hot_rows = []
+        blob_rows = []
+        empty_ids = []
+        descriptions = []
+        for video_id, metadata, content_hash in batch:
+            hot_rows.append(_youtube_metadata_values(metadata, content_hash))
+            formats = metadata.get("available_formats")
+            kept = (stored_formats.get(video_id) or {}).get("available_formats")
+            if kept:
+                formats = kept
+            blob_row = _youtube_metadata_blob_row(video_id, metadata.get("description"), formats)
+            if blob_row is None:
+                empty_ids.append((video_id,))
+            else:
+                blob_rows.append(blob_row)
+            descriptions.append((video_id, metadata.get("description") or None))
+
+        def _apply():
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(sql, hot_rows)
+                conn.executemany(_METADATA_BLOB_UPSERT_SQL, blob_rows)
+                conn.executemany("DELETE FROM youtube_metadata_blobs WHERE youtube_id = ?", empty_ids)
+                if _fts_available:
+                    _index_descriptions(conn, descriptions)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        execute_with_retry(_apply)
+    return stats
+
+
+_table_columns_cache: Dict[str, frozenset] = {}
+
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> frozenset:
+    """Column names of a table (cached per process; schema only grows)."""
+    cols = _table_columns_cache.get(table)
+    if cols is None:
+        cols = frozenset(row[1] for row in conn.execute(f"PRAGMA table_info({table})").fetchall())
+        if cols:
+            _table_columns_cache[table] = cols
+    return cols
+
+
+def _projection_sql(conn: sqlite3.Connection, table: str, columns: Optional[List[str]], key_column: str) -> str:
+    """Validated SELECT list for a column projection (``*`` when columns is None).
+
+    The key column is always included so results can be mapped back.
+    Unknown column names raise ValueError instead of reaching the SQL text.
+    """
+    if columns is None:
+        return "*"
+    known = _table_columns(conn, table)
+    wanted = list(dict.fromkeys([key_column, *columns]))
+    unknown = [c for c in wanted if c not in known]
+    if unknown:
+        raise ValueError(f"Unknown {table} columns: {', '.join(unknown)}")
+    return ", ".join(wanted)
+
+
+# Keys per IN (...) statement; far below SQLITE_MAX_VARIABLE_NUMBER on every build
+BULK_LOOKUP_CHUNK_SIZE = 500
+# Optional: from this many keys on, join against a TEMP key table instead of
+# chunked IN lists. Off by default - scripts/benchmark_bulk_lookup.py shows
+# chunked IN ahead at 100, 10k and 100k ids on indexed key columns.
+BULK_LOOKUP_TEMP_TABLE_THRESHOLD: Optional[int] = None
+
+_bulk_temp_counter = 0
+_bulk_temp_lock = threading.Lock()
+
+
+def bulk_lookup(
+    conn: sqlite3.Connection,
+    table: str,
+    key_column: str,
+    keys: List,
+    columns: Optional[List[str]] = None,
+    *,
+    select_sql: Optional[str] = None,
+    where_sql: Optional[str] = None,
+    group_by_key: bool = False,
+    chunk_size: int = BULK_LOOKUP_CHUNK_SIZE,
+    temp_table_threshold: Optional[int] = BULK_LOOKUP_TEMP_TABLE_THRESHOLD,
+) -> Dict:
+    """Fetch rows of ``table`` for many keys, returning {key: row} (one row per key).
+
+    Deduplicates keys, then issues IN (...) queries of at most ``chunk_size``
+    parameters, or, when ``temp_table_threshold`` is set and reached, loads
+    the keys into a TEMP table and runs a single join. Either way no
+    statement exceeds SQLite's variable limit (999 on older builds) and the
+    planner never sees a 40k-term IN list.
+
+    Args:
+        columns: explicit column projection (validated; key column added).
+            None selects ``*`` unless ``select_sql`` is given.
+        select_sql: trusted extra select expressions (e.g. aggregates); the
+            key column is prepended automatically.
+        where_sql: trusted extra condition ANDed to the key match.
+        group_by_key: add ``GROUP BY key_column`` (for aggregates).
+    """
+    if not keys:
         return {}
-    
-    # Remove duplicates while preserving order
-    unique_ids = list(dict.fromkeys(video_ids))
-    
-    placeholders = ','.join(['?' for _ in unique_ids])
-    query = f"SELECT * FROM youtube_video_metadata WHERE youtube_id IN ({placeholders})"
-    
+    unique_keys = list(dict.fromkeys(k for k in keys if k is not None))
+    if not unique_keys:
+        return {}
+
+    if select_sql:
+        select_list = f"{key_column}, {select_sql}"
+    else:
+        select_list = _projection_sql(conn, table, columns, key_column)
+    # Explicit select lists start with the key column; SELECT * is keyed by name
+    key_index = None if select_list == "*" else 0
+    extra_where = f" AND ({where_sql})" if where_sql else ""
+    group_sql = f" GROUP BY {key_column}" if group_by_key else ""
+
+    result: Dict = {}
     cur = conn.cursor()
-    cur.execute(query, unique_ids)
-    
-    result = {}
-    for row in cur.fetchall():
-        result[row['youtube_id']] = row
-    
+    if temp_table_threshold is None or len(unique_keys) < temp_table_threshold:
+        step = max(1, int(chunk_size))
+        for start in range(0, len(unique_keys), step):
+            chunk = unique_keys[start:start + step]
+            placeholders = ",".join("?" * len(chunk))
+            cur.execute(
+                f"SELECT {select_list} FROM {table} WHERE {key_column} IN ({placeholders}){extra_where}{group_sql}",
+                chunk,
+            )
+            for row in cur.fetchall():
+                result[row[key_index] if key_index is not None else row[key_column]] = row
+        return result
+
+    global _bulk_temp_counter
+    with _bulk_temp_lock:
+        _bulk_temp_counter += 1
+        temp_name = f"_bulk_keys_{_bulk_temp_counter}"
+    cur.execute(f"CREATE TEMP TABLE {temp_name} (k PRIMARY KEY) WITHOUT ROWID")
+    try:
+        # One transaction for the key load (autocommit would commit per row)
+        own_txn = not conn.in_transaction
+        if own_txn:
+            cur.execute("BEGIN")
+        try:
+            cur.executemany(f"INSERT INTO temp.{temp_name} (k) VALUES (?)", ((k,) for k in unique_keys))
+        finally:
+            if own_txn:
+                cur.execute("COMMIT")
+        qualified = select_list if select_list != "*" else f"{table}.*"
+        cur.execute(
+            # CROSS JOIN pins the key table as the outer loop (it has no stats,
+            # so the planner would otherwise scan the big table instead)
+            f"SELECT {qualified} FROM temp.{temp_name} bk "
+            f"CROSS JOIN {table} ON {table}.{key_column} = bk.k"
+            f"{(' WHERE ' + where_sql) if where_sql else ''}"
+            f"{(' GROUP BY ' + table + '.' + key_column) if group_by_key else ''}"
+        )
+        for row in cur.fetchall():
+            result[row[key_index] if key_index is not None else row[key_column]] = row
+    finally:
+        cur.execute(f"DROP TABLE IF EXISTS temp.{temp_name}")
     return result
 
 
-def get_track_media_properties_batch(conn: sqlite3.Connection, video_ids: List[str]) -> Dict[str, dict]:
-    """Get media properties for multiple video IDs in a single query.
+def get_youtube_metadata_by_id(
+    conn: sqlite3.Connection, youtube_id: str, columns: Optional[List[str]] = None
+) -> Optional[sqlite3.Row]:
+    """Get YouTube video metadata by video ID (optionally only the given columns)"""
+    cur = conn.cursor()
+    select_sql = _projection_sql(conn, "youtube_video_metadata", columns, "youtube_id")
+    cur.execute(f"SELECT {select_sql} FROM youtube_video_metadata WHERE youtube_id = ?", (youtube_id,))
+    return cur.fetchone()
 
-    Returns mapping: video_id -> {
-        'bitrate', 'resolution', 'filetype', 'video_fps', 'video_codec',
-        'audio_codec', 'audio_bitrate', 'audio_sample_rate'
-    }
+
+def get_youtube_metadata_batch(
+    conn: sqlite3.Connection, video_ids: List[str], columns: Optional[List[str]] = None
+) -> Dict[str, sqlite3.Row]:
+    """Get YouTube metadata for multiple video IDs (chunked bulk lookup).
+
+    Pass ``columns`` to load only what is needed; youtube_id is always
+    included. description/available_formats are NULL here once moved to the
+    blob table, use get_youtube_metadata_blobs for them.
     """
-    if not video_ids:
-        return {}
+    return bulk_lookup(conn, "youtube_video_metadata", "youtube_id", video_ids, columns)
 
-    # Remove duplicates while preserving order
-    unique_ids = list(dict.fromkeys(video_ids))
 
-    placeholders = ','.join(['?' for _ in unique_ids])
-    query = f"""
-        SELECT 
-            video_id, bitrate, resolution, filetype,
-            video_fps, video_codec,
-            audio_codec, audio_bitrate, audio_sample_rate
-        FROM tracks 
-        WHERE video_id IN ({placeholders})
+def compute_max_quality_from_formats_json(formats_json: Optional[str]) -> tuple[Optional[int], Optional[str]]:
+    """(max_available_height, max_quality_label) from a stored available_formats JSON list.
+
+    Only video formats count; returns (None, None) when there is none or the JSON is invalid.
     """
+    try:
+        formats = json.loads(formats_json) if formats_json else None
+    except Exception:
+        return None, None
+    if not isinstance(formats, list):
+        return None, None
+    max_height = 0
+    for f in formats:
+        if not isinstance(f, dict):
+            continue
+        vcodec = str(f.get('vcodec') or '').lower()
+        if not vcodec or vcodec == 'none':
+            continue
+        height = f.get('height')
+        if isinstance(height, (int, float)) and height and height > max_height:
+            max_height = int(height)
+    if max_height > 0:
+        return max_height, f"{max_height}p"
+    return None, None
 
-    cur = conn.cursor()
-    cur.execute(query, unique_ids)
-
-    result: Dict[str, dict] = {}
-    for row in cur.fetchall():
-        result[row['video_id']] = {
-            'bitrate': row['bitrate'],
-            'resolution': row['resolution'],
-            'filetype': row['filetype'],
-            'video_fps': row['video_fps'],
-            'video_codec': row['video_codec'],
-            'audio_codec': row['audio_codec'],
-            'audio_bitrate': row['audio_bitrate'],
-            'audio_sample_rate': row['audio_sample_rate'],
-        }
 
-    return result
+_MISSING_MAX_QUALITY_SQL = (
+    "(b.available_formats IS NOT NULL OR (m.available_formats IS NOT NULL AND TRIM(m.available_formats) != '')) "
+    "AND (m.max_available_height IS NULL OR m.max_quality_label IS NULL)"
+)
+
+
+def count_missing_max_quality(conn: sqlite3.Connection) -> int:
+    """Metadata rows with stored formats but without denormalized max quality fields."""
+    return conn.execute(
+        "SELECT COUNT(*) FROM youtube_video_metadata m "
+        f"LEFT JOIN youtube_metadata_blobs b ON b.youtube_id = m.youtube_id WHERE {_MISSING_MAX_QUALITY_SQL}"
+    ).fetchone()[0]
+
+
+def backfill_max_quality_fields(
+    conn: sqlite3.Connection,
+    batch_size: int = 1000,
+    limit: Optional[int] = None,
+    progress: Optional[Callable[[int, int, int], None]] = None,
+) -> dict:
+    """Fill max_available_height/max_quality_label from available_formats (no network).
+
+    Walks candidates by id (keyset), so rows without video formats, which stay
+    NULL, are not revisited and do not shift later batches. One transaction
+    per batch. ``progress(processed, updated, total)`` is called after each batch.
+    """
+    total = count_missing_max_quality(conn)
+    processed = updated = skipped = 0
+    last_id = 0
+    batch_size = max(1, int(batch_size))
+    while limit is None or processed < limit:
+        fetch = batch_size if limit is None else min(batch_size, limit - processed)
+        rows = conn.execute(
+            f"""
+            SELECT m.id, m.available_formats, b.codec, b.available_formats
+            FROM youtube_video_metadata m
+            LEFT JOIN youtube_metadata_blobs b ON b.youtube_id = m.youtube_id
+            WHERE m.id > ? AND {_MISSING_MAX_QUALITY_SQL}
+            ORDER BY m.id
+            LIMIT ?
+            """,
+            (last_id, fetch),
+        ).fetchall()
+        if not rows:
+            break
+        updates = []
+        for row_id, inline_formats, codec, packed_formats in rows:
+            formats_json = _unpack_metadata_blob(codec, packed_formats) if packed_formats is not None else inline_formats
+            height, label = compute_max_quality_from_formats_json(formats_json)
+            if height is None:
+                skipped += 1
+            else:
+                updates.append((height, label, row_id))
+        if updates:
+            def _apply():
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.executemany(
+                        "UPDATE youtube_video_metadata SET max_available_height = ?, max_quality_label = ?, "
+                        "updated_at = datetime('now') WHERE id = ?",
+                        updates,
+                    )
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+            execute_with_retry(_apply)
+            updated += len(updates)
+        processed += len(rows)
+        last_id = rows[-1][0]
+        if progress:
+            progress(processed, updated, total)
+        if len(rows) < fetch:
+            break
+    return {"total_candidates": total, "processed": processed, "updated": updated, "skipped": skipped}
+
+
+TRACK_MEDIA_PROPERTY_COLUMNS = [
+    'bitrate', 'resolution', 'filetype', 'video_fps', 'video_codec',
+    'audio_codec', 'audio_bitrate', 'audio_sample_rate',
+]
+
+
+def get_track_media_properties_batch(conn: sqlite3.Connection, video_ids: List[str]) -> Dict[str, dict]:
+    """Get media properties for multiple video IDs (chunked bulk lookup).
+
+    Returns mapping: video_id -> {
+        'bitrate', 'resolution', 'filetype', 'video_fps', 'video_codec',
+        'audio_codec', 'audio_bitrate', 'audio_sample_rate'
+    }
+    """
+    rows = bulk_lookup(conn, "tracks", "video_id", video_ids, TRACK_MEDIA_PROPERTY_COLUMNS)
+    return {
+        video_id: {col: row[col] for col in TRACK_MEDIA_PROPERTY_COLUMNS}
+        for video_id, row in rows.items()
+    }
 
 
 def get_track_stats_batch(conn: sqlite3.Connection, video_ids: List[str]) -> Dict[str, dict]:
-    """Get track statistics for multiple video IDs in single query for performance optimization"""
+    """Get track statistics for multiple video IDs (chunked bulk lookups).
+
+    Every requested id gets an entry; unknown ids get zeroed stats.
+    """
     if not video_ids:
         return {}
     
-    # Remove duplicates while preserving order
-    unique_ids = list(dict.fromkeys(video_ids))
-    
-    # Get basic stats from tracks table
-    placeholders = ','.join(['?' for _ in unique_ids])
-    tracks_query = f"""
-        SELECT video_id, play_starts, play_finishes, play_nexts, play_prevs, play_likes 
-        FROM tracks 
-        WHERE video_id IN ({placeholders})
-    """
-    
-    cur = conn.cursor()
-    cur.execute(tracks_query, unique_ids)
+    stat_columns = ["play_starts", "play_finishes", "play_nexts", "play_prevs", "play_likes"]
+    rows = bulk_lookup(conn, "tracks", "video_id", video_ids, stat_columns)
+    dislikes = get_dislike_counts_batch(conn, video_ids)
     
     result = {}
-    for row in cur.fetchall():
-        result[row['video_id']] = {
-            "play_starts": row['play_starts'] or 0,
-            "play_finishes": row['play_finishes'] or 0,
-            "play_nexts": row['play_nexts'] or 0,
-            "play_prevs": row['play_prevs'] or 0,
-            "play_likes": row['play_likes'] or 0,
-            "play_dislikes": 0  # Will be updated below
-        }
-    
-    # Get dislike counts from play_history table
-    dislikes_query = f"""
-        SELECT video_id, COUNT(*) as dislike_count 
-        FROM play_history 
-        WHERE video_id IN ({placeholders}) AND event='dislike'
-        GROUP BY video_id
-    """
-    
-    cur.execute(dislikes_query, unique_ids)
-    
-    for row in cur.fetchall():
-        video_id = row['video_id']
-        if video_id in result:
-            result[video_id]["play_dislikes"] = row['dislike_count'] or 0
-        else:
-            # Track exists in play_history but not in tracks table
-            result[video_id] = {
-                "play_starts": 0,
-                "play_finishes": 0,
-                "play_nexts": 0,
-                "play_prevs": 0,
-                "play_likes": 0,
-                "play_dislikes": row['dislike_count'] or 0
-            }
-    
-    # Add default stats for video_ids not found in database
-    for video_id in unique_ids:
-        if video_id not in result:
-            result[video_id] = {
-                "play_starts": 0,
-                "play_finishes": 0,
-                "play_nexts": 0,
-                "play_prevs": 0,
-                "play_likes": 0,
-                "play_dislikes": 0
-            }
+    for video_id in dict.fromkeys(video_ids):
+        row = rows.get(video_id)
+        stats = {col: (row[col] or 0) if row is not None else 0 for col in stat_columns}
+        stats["play_dislikes"] = dislikes.get(video_id, 0)
+        result[video_id] = stats
     
     return result
 
 
 def get_last_play_timestamps_batch(conn: sqlite3.Connection, video_ids: List[str]) -> Dict[str, Optional[str]]:
-    """Get last play timestamps for multiple video IDs in single query for performance optimization"""
+    """Get last play timestamps for multiple video IDs (chunked bulk lookup)"""
     if not video_ids:
         return {}
     
-    # Remove duplicates while preserving order
-    unique_ids = list(dict.fromkeys(video_ids))
-    
-    placeholders = ','.join(['?' for _ in unique_ids])
-    query = f"""
-        SELECT video_id, last_start_ts, last_finish_ts 
-        FROM tracks 
-        WHERE video_id IN ({placeholders})
-    """
-    
-    cur = conn.cursor()
-    cur.execute(query, unique_ids)
+    rows = bulk_lookup(conn, "tracks", "video_id", video_ids, ["last_start_ts", "last_finish_ts"])
     
     result = {}
-    for row in cur.fetchall():
-        video_id = row['video_id']
+    for video_id in dict.fromkeys(video_ids):
+        row = rows.get(video_id)
+        if row is None:
+            result[video_id] = None
+            continue
         ts1 = row['last_start_ts']
         ts2 = row['last_finish_ts']
-        
         # Return latest timestamp
         if ts1 and ts2:
             result[video_id] = ts1 if ts1 > ts2 else ts2
         else:
             result[video_id] = ts1 or ts2
     
-    # Add None for video_ids not found in database
-    for video_id in unique_ids:
-        if video_id not in result:
-            result[video_id] = None
-    
     return result
 
 
@@ -2597,34 +3893,21 @@ def get_distinct_filetypes(conn: sqlite3.Connection) -> List[str]:
 
 
 def get_dislike_counts_batch(conn: sqlite3.Connection, video_ids: List[str]) -> Dict[str, int]:
-    """Get dislike counts for multiple video IDs in single query for performance optimization"""
+    """Get dislike counts for multiple video IDs (chunked bulk lookup); 0 for ids without dislikes"""
     if not video_ids:
         return {}
     
-    # Remove duplicates while preserving order
-    unique_ids = list(dict.fromkeys(video_ids))
-    
-    placeholders = ','.join(['?' for _ in unique_ids])
-    query = f"""
-        SELECT video_id, COUNT(*) as dislike_count 
-        FROM play_history 
-        WHERE video_id IN ({placeholders}) AND event='dislike'
-        GROUP BY video_id
-    """
-    
-    cur = conn.cursor()
-    cur.execute(query, unique_ids)
-    
-    result = {}
-    for row in cur.fetchall():
-        result[row['video_id']] = row['dislike_count'] or 0
-    
-    # Add 0 for video_ids not found in database
-    for video_id in unique_ids:
-        if video_id not in result:
-            result[video_id] = 0
-    
-    return result
+    rows = bulk_lookup(
+        conn,
+        "play_history",
+        "video_id",
+        video_ids,
+        select_sql="COUNT(*) AS dislike_count",
+        where_sql="event = 'dislike'",
+        group_by_key=True,
+    )
+    return {video_id: (rows[video_id]['dislike_count'] or 0) if video_id in rows else 0
+            for video_id in dict.fromkeys(video_ids)}
 
 
 def get_youtube_metadata_by_playlist(conn: sqlite3.Connection, playlist_id: str) -> Iterator[sqlite3.Row]:
@@ -2643,8 +3926,22 @@ def delete_youtube_metadata(conn: sqlite3.Connection, youtube_id: str) -> bool:
 
 
 def search_youtube_metadata(conn: sqlite3.Connection, query: str, limit: int = 100) -> Iterator[sqlite3.Row]:
-    """Search YouTube video metadata by title or description"""
+    """Search YouTube video metadata by title, channel or description (bm25-ranked when FTS5 is available)"""
     cur = conn.cursor()
+    match = build_fts_query(query, ("title", "channel", "uploader", "description")) if _fts_available else None
+    if match:
+        weights = ", ".join(str(w) for w in SEARCH_WEIGHTS)
+        cur.execute(f"""
+            SELECT ym.* FROM search_index
+            JOIN search_docs d ON d.id = search_index.rowid
+            JOIN youtube_video_metadata ym ON ym.youtube_id = d.video_id
+            WHERE search_index MATCH ?
+            ORDER BY bm25(search_index, {weights})
+            LIMIT ?
+        """, (match, limit))
+        return cur.fetchall()
+    # LIKE fallback: descriptions are compressed in youtube_metadata_blobs, so
+    # only rows that still carry one inline match on it
     search_query = f"%{query}%"
     cur.execute("""
         SELECT * FROM youtube_video_metadata 
@@ -2814,6 +4111,74 @@ def is_track_already_downloaded(conn: sqlite3.Connection, video_id: str) -> bool
     return cur.fetchone() is not None
 
 
+def get_known_video_ids(conn: sqlite3.Connection, video_ids: List[str]) -> Dict[str, str]:
+    """Which of video_ids the library already knows, in one pass.
+    
+    Args:
+        conn: Database connection
+        video_ids: YouTube video IDs (e.g. a channel listing)
+        
+    Returns:
+        {video_id: 'downloaded' | 'deleted'} for IDs present in tracks or in
+        deleted_tracks without a restore; unknown IDs are absent
+    """
+    known: Dict[str, str] = {}
+    for vid in bulk_lookup(
+        conn, "deleted_tracks", "video_id", video_ids, ["video_id"], where_sql="restored_at IS NULL"
+    ):
+        known[vid] = "deleted"
+    for vid in bulk_lookup(conn, "tracks", "video_id", video_ids, ["video_id"]):
+        known[vid] = "downloaded"
+    return known
+
+
+CHANNEL_FEED_STATE_FIELDS = ("youtube_channel_id", "etag", "last_modified", "video_ids", "checked_at", "changed_at")
+
+
+def get_channel_feed_states(conn: sqlite3.Connection, channel_ids: List[int]) -> Dict[int, dict]:
+    """Stored uploads-feed state for channels, keyed by channel id.
+    
+    ``video_ids`` is decoded from its JSON column into a list.
+    """
+    states: Dict[int, dict] = {}
+    for channel_id, row in bulk_lookup(conn, "channel_feed_state", "channel_id", channel_ids).items():
+        state = dict(row)
+        try:
+            state["video_ids"] = json.loads(state.get("video_ids") or "[]")
+        except ValueError:
+            state["video_ids"] = []
+        states[channel_id] = state
+    return states
+
+
+def save_channel_feed_state(conn: sqlite3.Connection, channel_id: int, **fields) -> None:
+    """Insert or update feed state columns for one channel (unknown keys are ignored)."""
+    values = {k: v for k, v in fields.items() if k in CHANNEL_FEED_STATE_FIELDS}
+    if "video_ids" in values and not isinstance(values["video_ids"], str):
+        values["video_ids"] = json.dumps(list(values["video_ids"] or []))
+    if not values:
+        return
+    columns = ", ".join(values)
+    placeholders = ", ".join("?" for _ in values)
+    updates = ", ".join(f"{k} = excluded.{k}" for k in values)
+    conn.execute(
+        f"INSERT INTO channel_feed_state (channel_id, {columns}) VALUES (?, {placeholders}) "
+        f"ON CONFLICT(channel_id) DO UPDATE SET {updates}",
+        (channel_id, *values.values()),
+    )
+    conn.commit()
+
+
+def get_youtube_channel_id_for_url(conn: sqlite3.Connection, channel_url: str) -> Optional[str]:
+    """UC... channel id recorded in video metadata for a channel URL, if any."""
+    row = conn.execute(
+        "SELECT channel_id FROM youtube_video_metadata "
+        "WHERE channel_url = ? AND channel_id LIKE 'UC%' LIMIT 1",
+        (channel_url,),
+    ).fetchone()
+    return row[0] if row else None
+
+
 def get_video_publication_date(conn: sqlite3.Connection, video_id: str) -> Optional[str]:
     """Get publication date for a video from YouTube metadata.
     
@@ -2854,6 +4219,35 @@ def get_video_publication_date(conn: sqlite3.Connection, video_id: str) -> Optio
 # ---------- Recurring Scheduler (Scheduled Tasks) ----------
 
 
+# Callbacks run with the task id after a scheduled task is created, changed
+# or deleted (the recurring scheduler reloads it)
+_scheduled_task_listeners: List[Callable] = []
+
+# Changing any of these invalidates the stored next_run_at
+_SCHEDULE_TIMING_FIELDS = frozenset({
+    'enabled', 'schedule_kind', 'schedule_time', 'schedule_days', 'interval_minutes', 'cron_expr', 'timezone',
+})
+
+
+def add_scheduled_task_listener(listener: Callable) -> None:
+    """Register a callback(task_id) for scheduled task changes (idempotent)."""
+    if listener not in _scheduled_task_listeners:
+        _scheduled_task_listeners.append(listener)
+
+
+def remove_scheduled_task_listener(listener: Callable) -> None:
+    if listener in _scheduled_task_listeners:
+        _scheduled_task_listeners.remove(listener)
+
+
+def _notify_scheduled_task_listeners(task_id: int) -> None:
+    for listener in list(_scheduled_task_listeners):
+        try:
+            listener(task_id)
+        except Exception as e:
+            print(f"[DB] Scheduled task listener failed for #{task_id}: {e}")
+
+
 def create_scheduled_task(
     conn: sqlite3.Connection,
     *,
@@ -2909,6 +4303,7 @@ def create_scheduled_task(
         ),
     )
     conn.commit()
+    _notify_scheduled_task_listeners(cur.lastrowid)
     return cur.lastrowid
 
 
@@ -2955,7 +4350,11 @@ def get_scheduled_task_by_id(conn: sqlite3.Connection, task_id: int) -> Optional
 
 
 def update_scheduled_task(conn: sqlite3.Connection, task_id: int, **kwargs) -> bool:
-    """Update fields of a scheduled task. Returns True if updated."""
+    """Update fields of a scheduled task. Returns True if updated.
+
+    Changing the timing (kind, time, days, interval, enabled) clears
+    next_run_at unless it is passed too; the scheduler recomputes it.
+    """
     valid_fields = {
         'name', 'task_type', 'enabled', 'schedule_kind', 'schedule_time',
         'schedule_days', 'interval_minutes', 'cron_expr', 'timezone',
@@ -2970,6 +4369,8 @@ def update_scheduled_task(conn: sqlite3.Connection, task_id: int, **kwargs) -> b
         update_map['schedule_days'] = json.dumps(update_map['schedule_days']) if update_map['schedule_days'] is not None else None
     if 'params_json' not in update_map and 'params' in kwargs:
         update_map['params_json'] = json.dumps(kwargs['params'] or {})
+    if 'next_run_at' not in update_map and _SCHEDULE_TIMING_FIELDS.intersection(update_map):
+        update_map['next_run_at'] = None
 
     set_parts = []
     values: list = []
@@ -2984,17 +4385,21 @@ def update_scheduled_task(conn: sqlite3.Connection, task_id: int, **kwargs) -> b
     cur = conn.cursor()
     cur.execute(sql, values)
     conn.commit()
+    if cur.rowcount > 0:
+        _notify_scheduled_task_listeners(task_id)
     return cur.rowcount > 0
 
 
 def set_scheduled_task_enabled(conn: sqlite3.Connection, task_id: int, enabled: bool) -> bool:
-    """Enable/disable a scheduled task."""
+    """Enable/disable a scheduled task (clears next_run_at for the scheduler to recompute)."""
     cur = conn.cursor()
     cur.execute(
-        "UPDATE scheduled_tasks SET enabled = ?, updated_at = datetime('now') WHERE id = ?",
+        "UPDATE scheduled_tasks SET enabled = ?, next_run_at = NULL, updated_at = datetime('now') WHERE id = ?",
         (1 if enabled else 0, task_id),
     )
     conn.commit()
+    if cur.rowcount > 0:
+        _notify_scheduled_task_listeners(task_id)
     return cur.rowcount > 0
 
 
@@ -3022,6 +4427,8 @@ def touch_scheduled_task_run(
     cur = conn.cursor()
     cur.execute(sql, params)
     conn.commit()
+    if cur.rowcount > 0:
+        _notify_scheduled_task_listeners(task_id)
     return cur.rowcount > 0
 
 
@@ -3030,4 +4437,6 @@ def delete_scheduled_task(conn: sqlite3.Connection, task_id: int) -> bool:
     cur = conn.cursor()
     cur.execute("DELETE FROM scheduled_tasks WHERE id = ?", (task_id,))
     conn.commit()
+    if cur.rowcount > 0:
+        _notify_scheduled_task_listeners(task_id)
     return cur.rowcount > 0
\ No newline at end of file
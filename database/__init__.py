@@ -42,6 +42,9 @@ update_track_media_properties = database_core.update_track_media_properties
 
 # Event recording
 record_event = database_core.record_event
+add_event_listener = database_core.add_event_listener
+remove_event_listener = database_core.remove_event_listener
+get_player_idle_seconds = database_core.get_player_idle_seconds
 record_volume_change = database_core.record_volume_change
 record_seek_event = database_core.record_seek_event
 record_playlist_addition = database_core.record_playlist_addition
@@ -55,9 +58,18 @@ get_recent_like_dislike_reaction_in_dedup_window = (
 iter_history = database_core.iter_history
 get_history_page = database_core.get_history_page
 
+# Full-text search
+rebuild_search_index = database_core.rebuild_search_index
+is_search_index_available = database_core.is_search_index_available
+build_fts_query = database_core.build_fts_query
+search_filter_clause = database_core.search_filter_clause
+search_library = database_core.search_library
+
 # Backup functionality
 create_backup = database_core.create_backup
 list_backups = database_core.list_backups
+restore_backup = database_core.restore_backup
+delete_backups = database_core.delete_backups
 
 # User settings
 get_user_setting = database_core.get_user_setting
@@ -87,12 +99,24 @@ record_channel_synced = database_core.record_channel_synced
 record_track_deletion = database_core.record_track_deletion
 get_deleted_tracks = database_core.get_deleted_tracks
 restore_deleted_track = database_core.restore_deleted_track
+restore_deleted_tracks_batch = database_core.restore_deleted_tracks_batch
 should_auto_delete_track = database_core.should_auto_delete_track
 
+# Disk usage cache
+normalize_usage_path = database_core.normalize_usage_path
+adjust_dir_usage = database_core.adjust_dir_usage
+set_dir_usage = database_core.set_dir_usage
+replace_dir_usage_tree = database_core.replace_dir_usage_tree
+get_dir_usage_totals = database_core.get_dir_usage_totals
+
 # YouTube metadata
 upsert_youtube_metadata = database_core.upsert_youtube_metadata
+bulk_upsert_youtube_metadata = database_core.bulk_upsert_youtube_metadata
 get_youtube_metadata_by_id = database_core.get_youtube_metadata_by_id
 get_youtube_metadata_batch = database_core.get_youtube_metadata_batch
+get_youtube_metadata_blobs = database_core.get_youtube_metadata_blobs
+get_youtube_metadata_with_blobs = database_core.get_youtube_metadata_with_blobs
+bulk_lookup = database_core.bulk_lookup
 get_track_media_properties_batch = database_core.get_track_media_properties_batch
 get_track_stats_batch = database_core.get_track_stats_batch
 get_last_play_timestamps_batch = database_core.get_last_play_timestamps_batch
@@ -106,11 +130,20 @@ get_distinct_filetypes = database_core.get_distinct_filetypes
 get_tracks_with_filters_page = database_core.get_tracks_with_filters_page
 get_resolution_counts = database_core.get_resolution_counts
 get_filetype_counts = database_core.get_filetype_counts
+get_tracks_facets = database_core.get_tracks_facets
+compute_max_quality_from_formats_json = database_core.compute_max_quality_from_formats_json
+count_missing_max_quality = database_core.count_missing_max_quality
+backfill_max_quality_fields = database_core.backfill_max_quality_fields
+get_data_version = database_core.get_data_version
 
 # Quick Sync functions
 get_latest_downloaded_track_date = database_core.get_latest_downloaded_track_date
 get_channel_latest_video_metadata = database_core.get_channel_latest_video_metadata
 is_track_already_downloaded = database_core.is_track_already_downloaded
+get_known_video_ids = database_core.get_known_video_ids
+get_channel_feed_states = database_core.get_channel_feed_states
+save_channel_feed_state = database_core.save_channel_feed_state
+get_youtube_channel_id_for_url = database_core.get_youtube_channel_id_for_url
 get_video_publication_date = database_core.get_video_publication_date
 
 # Migration utilities
@@ -124,6 +157,8 @@ update_scheduled_task = database_core.update_scheduled_task
 set_scheduled_task_enabled = database_core.set_scheduled_task_enabled
 touch_scheduled_task_run = database_core.touch_scheduled_task_run
 delete_scheduled_task = database_core.delete_scheduled_task
+add_scheduled_task_listener = database_core.add_scheduled_task_listener
+remove_scheduled_task_listener = database_core.remove_scheduled_task_listener
 
 __all__ = [
     # Migration classes
@@ -151,6 +186,9 @@ __all__ = [
     
     # Event recording
     'record_event',
+    'add_event_listener',
+    'remove_event_listener',
+    'get_player_idle_seconds',
     'record_volume_change',
     'record_seek_event',
     'record_playlist_addition',
@@ -162,9 +200,18 @@ __all__ = [
     'iter_history',
     'get_history_page',
     
+    # Full-text search
+    'rebuild_search_index',
+    'is_search_index_available',
+    'build_fts_query',
+    'search_filter_clause',
+    'search_library',
+    
     # Backup functionality
     'create_backup',
     'list_backups',
+    'restore_backup',
+    'delete_backups',
     
     # User settings
     'get_user_setting',
@@ -192,12 +239,24 @@ __all__ = [
     'record_track_deletion',
     'get_deleted_tracks',
     'restore_deleted_track',
+    'restore_deleted_tracks_batch',
     'should_auto_delete_track',
     
+    # Disk usage cache
+    'normalize_usage_path',
+    'adjust_dir_usage',
+    'set_dir_usage',
+    'replace_dir_usage_tree',
+    'get_dir_usage_totals',
+    
     # YouTube metadata
     'upsert_youtube_metadata',
+    'bulk_upsert_youtube_metadata',
     'get_youtube_metadata_by_id',
     'get_youtube_metadata_batch',
+    'get_youtube_metadata_blobs',
+    'get_youtube_metadata_with_blobs',
+    'bulk_lookup',
     'get_track_media_properties_batch',
     'get_track_stats_batch',
     'get_last_play_timestamps_batch',
@@ -211,11 +270,20 @@ __all__ = [
     'get_tracks_with_filters_page',
     'get_resolution_counts',
     'get_filetype_counts',
+    'get_tracks_facets',
+    'compute_max_quality_from_formats_json',
+    'count_missing_max_quality',
+    'backfill_max_quality_fields',
+    'get_data_version',
     
     # Quick Sync functions
     'get_latest_downloaded_track_date',
     'get_channel_latest_video_metadata',
     'is_track_already_downloaded',
+    'get_known_video_ids',
+    'get_channel_feed_states',
+    'save_channel_feed_state',
+    'get_youtube_channel_id_for_url',
     'get_video_publication_date',
     
     # Migration utilities
@@ -229,4 +297,6 @@ __all__ = [
     'set_scheduled_task_enabled',
     'touch_scheduled_task_run',
     'delete_scheduled_task',
+    'add_scheduled_task_listener',
+    'remove_scheduled_task_listener',
 ] 
\ No newline at end of file
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Migration014 - Add channel_feed_state table for quick sync change detection
+"""
+
+import sqlite3
+from database.migration_manager import Migration
+
+
+class Migration014(Migration):
+    def description(self) -> str:
+        return "Add channel_feed_state table (uploads-feed validators and last seen video IDs per channel)"
+
+    def up(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS channel_feed_state (
+                channel_id INTEGER PRIMARY KEY REFERENCES channels(id) ON DELETE CASCADE,
+                youtube_channel_id TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                video_ids TEXT,
+                checked_at TEXT,
+                changed_at TEXT
+            )
+            """
+        )
+
+    def down(self, conn: sqlite3.Connection) -> None:
+        conn.execute("DROP TABLE IF EXISTS channel_feed_state")
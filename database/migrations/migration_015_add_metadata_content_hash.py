@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Migration015 - Add content_hash to youtube_video_metadata
+"""
+
+import sqlite3
+from database.migration_manager import Migration
+
+
+class Migration015(Migration):
+    def description(self) -> str:
+        return "Add content_hash column to youtube_video_metadata so unchanged rows can be skipped on upsert"
+
+    def up(self, conn: sqlite3.Connection) -> None:
+        cur = conn.cursor()
+        cur.execute("PRAGMA table_info(youtube_video_metadata)")
+        cols = {row[1] for row in cur.fetchall()}
+        if "content_hash" not in cols:
+            cur.execute("ALTER TABLE youtube_video_metadata ADD COLUMN content_hash TEXT")
+
+    def down(self, conn: sqlite3.Connection) -> None:
+        pass
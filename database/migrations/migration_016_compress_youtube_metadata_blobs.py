@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Migration016 - Move description/available_formats to youtube_metadata_blobs
+
+The two cold columns are zlib-compressed into a side table keyed by
+youtube_id and the inline columns are set to NULL, so scans of
+youtube_video_metadata no longer page them in. The freed pages go back to the
+file system with the next database maintenance run (incremental_vacuum) or a
+full VACUUM; scripts/report_metadata_blob_storage.py shows the effect on a
+copy of the database first.
+"""
+
+import sqlite3
+import zlib
+
+from database.migration_manager import Migration
+
+BATCH_SIZE = 500
+COMPRESSION_LEVEL = 6
+
+
+def _pack(text):
+    if text is None or text == '':
+        return None
+    return zlib.compress(str(text).encode('utf-8'), COMPRESSION_LEVEL)
+
+
+class Migration016(Migration):
+    def description(self) -> str:
+        return "Move YouTube metadata descriptions and available_formats to the compressed youtube_metadata_blobs table"
+
+    def up(self, conn: sqlite3.Connection) -> None:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS youtube_metadata_blobs (
+                youtube_id TEXT PRIMARY KEY,
+                codec TEXT NOT NULL DEFAULT 'zlib',
+                description BLOB,
+                available_formats BLOB,
+                raw_bytes INTEGER,
+                updated_at TEXT DEFAULT (datetime('now'))
+            )
+            """
+        )
+        cur.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_ym_blobs_ad AFTER DELETE ON youtube_video_metadata
+            BEGIN DELETE FROM youtube_metadata_blobs WHERE youtube_id = OLD.youtube_id; END
+            """
+        )
+        has_search_index = cur.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'"
+        ).fetchone() is not None
+
+        moved = 0
+        last_id = 0
+        while True:
+            rows = cur.execute(
+                """
+                SELECT id, youtube_id, description, available_formats
+                FROM youtube_video_metadata
+                WHERE id > ? AND (description IS NOT NULL OR available_formats IS NOT NULL)
+                ORDER BY id
+                LIMIT ?
+                """,
+                (last_id, BATCH_SIZE),
+            ).fetchall()
+            if not rows:
+                break
+            blobs = []
+            for _, youtube_id, description, formats in rows:
+                if not description and not formats:
+                    continue
+                raw_bytes = sum(len(str(t).encode('utf-8')) for t in (description, formats) if t)
+                blobs.append((youtube_id, _pack(description), _pack(formats), raw_bytes))
+            # A blob row written by the application is newer than inline data
+            cur.executemany(
+                "INSERT OR IGNORE INTO youtube_metadata_blobs (youtube_id, codec, description, available_formats, raw_bytes) "
+                "VALUES (?, 'zlib', ?, ?, ?)",
+                blobs,
+            )
+            cur.executemany(
+                "UPDATE youtube_video_metadata SET description = NULL, available_formats = NULL WHERE id = ?",
+                [(row[0],) for row in rows],
+            )
+            if has_search_index:
+                # Older search triggers rebuild the document from the now-NULL column
+                cur.executemany(
+                    "UPDATE search_index SET description = ? "
+                    "WHERE rowid = (SELECT id FROM search_docs WHERE video_id = ?)",
+                    [(row[2] or None, row[1]) for row in rows],
+                )
+            moved += len(blobs)
+            last_id = rows[-1][0]
+        print(f"✅ Moved cold metadata of {moved} videos to youtube_metadata_blobs")
+
+    def down(self, conn: sqlite3.Connection) -> None:
+        cur = conn.cursor()
+        if not cur.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'youtube_metadata_blobs'"
+        ).fetchone():
+            return
+        rows = cur.execute("SELECT youtube_id, description, available_formats FROM youtube_metadata_blobs").fetchall()
+        cur.executemany(
+            "UPDATE youtube_video_metadata SET description = ?, available_formats = ? WHERE youtube_id = ?",
+            [
+                (
+                    zlib.decompress(d).decode('utf-8') if d is not None else None,
+                    zlib.decompress(f).decode('utf-8') if f is not None else None,
+                    youtube_id,
+                )
+                for youtube_id, d, f in rows
+            ],
+        )
+        cur.execute("DROP TRIGGER IF EXISTS trg_ym_blobs_ad")
+        cur.execute("DROP TABLE youtube_metadata_blobs")
@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""
+Migration017 - Index play_history by (video_id, event)
+"""
+
+import sqlite3
+from database.migration_manager import Migration
+
+
+class Migration017(Migration):
+    def description(self) -> str:
+        return "Add play_history (video_id, event) index for per-video event lookups (auto-delete checks, reactions)"
+
+    def up(self, conn: sqlite3.Connection) -> None:
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_play_history_video_event ON play_history(video_id, event)")
+
+    def down(self, conn: sqlite3.Connection) -> None:
+        conn.execute("DROP INDEX IF EXISTS idx_play_history_video_event")
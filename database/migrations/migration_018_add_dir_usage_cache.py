@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Migration018 - Cached per-directory disk usage
+
+dir_usage keeps the size and count of the files directly inside each
+directory; services.disk_usage_service updates it when files are added,
+moved to the trash or restored, and reconciles whole trees in the background.
+/api/trash_stats sums it instead of walking the library on every request.
+"""
+
+import sqlite3
+from database.migration_manager import Migration
+
+
+class Migration018(Migration):
+    def description(self) -> str:
+        return "Add dir_usage and dir_usage_roots tables for cached storage/trash disk usage"
+
+    def up(self, conn: sqlite3.Connection) -> None:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS dir_usage (
+                path TEXT PRIMARY KEY,
+                bytes INTEGER NOT NULL DEFAULT 0,
+                files INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT DEFAULT (datetime('now'))
+            )
+            """
+        )
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS dir_usage_roots (
+                root TEXT PRIMARY KEY,
+                reconciled_at TEXT
+            )
+            """
+        )
+
+    def down(self, conn: sqlite3.Connection) -> None:
+        conn.execute("DROP TABLE IF EXISTS dir_usage_roots")
+        conn.execute("DROP TABLE IF EXISTS dir_usage")
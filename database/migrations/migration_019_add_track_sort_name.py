@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Migration019 - Denormalized /tracks sort key
+
+tracks.sort_name holds COALESCE(metadata title, track name, '') and is kept
+in sync by triggers on tracks and youtube_video_metadata. With the
+(sort_name, id) index, keyset pages of /tracks seek in the index instead of
+sorting the whole tracks/metadata join for every page.
+
+The column, index and triggers come from database.py (_TRACK_SORT_NAME_SQL),
+the same definitions _ensure_schema applies, so the two cannot drift apart.
+"""
+
+import re
+import sqlite3
+from database.migration_manager import Migration
+
+
+class Migration019(Migration):
+    def description(self) -> str:
+        return "Add tracks.sort_name (display-order key) with sync triggers and (sort_name, id) index for /tracks keyset pages"
+
+    def up(self, conn: sqlite3.Connection) -> None:
+        from database import database_core
+
+        database_core._ensure_track_sort_name(conn)
+
+    def down(self, conn: sqlite3.Connection) -> None:
+        from database import database_core
+
+        for trigger in re.findall(r"CREATE TRIGGER IF NOT EXISTS (\w+)", database_core._TRACK_SORT_NAME_SQL):
+            conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        conn.execute("DROP INDEX IF EXISTS idx_tracks_sort_name")
@@ -443,6 +443,11 @@ def move_to_trash(file_path: pathlib.Path, root_dir: pathlib.Path) -> bool:
         
         shutil.move(str(file_path), str(trash_file_path))
         print(f"[Moved to Trash] {file_path.name} -> {trash_file_path.relative_to(root_dir)}")
+        try:
+            from services.disk_usage_service import get_disk_usage_service  # local import: DB may be absent
+            get_disk_usage_service().note_file_moved(file_path, trash_file_path)
+        except Exception:
+            pass
         return True
         
     except Exception as exc:
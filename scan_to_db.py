@@ -21,6 +21,7 @@ from typing import Optional
 import database as db
 from database import get_connection, upsert_playlist, upsert_track, link_track_playlist, update_playlist_stats
 from utils.logging_utils import log_message  # Unified logging system
+from utils.aggregate_cache import TAG_LIBRARY, TAG_LIKES, invalidate_tags
 
 MEDIA_EXTS = {".mp3", ".m4a", ".opus", ".webm", ".flac", ".mp4", ".mkv", ".mov"}
 VIDEO_ID_RE = re.compile(r"\[([A-Za-z0-9_-]{11})\]$")
@@ -185,6 +186,7 @@ def scan(playlists_dir: Path):
     print(f"[SCAN] All changes auto-committed during processing - {time.strftime('%H:%M:%S')}")
     
     conn.close()
+    invalidate_tags(TAG_LIBRARY, TAG_LIKES)
     
     total_time = time.time() - scan_start
     print(f"\n[SCAN] Scan completed! Total time: {total_time:.2f}s - {time.strftime('%H:%M:%S')}")
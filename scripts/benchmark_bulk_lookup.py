@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Benchmark batch metadata lookups: single IN list vs chunked IN vs TEMP table join.
+
+Builds a throwaway database with synthetic tracks, metadata and dislikes, then
+times each strategy for 100, 10k and 100k ids (configurable). The single IN
+list is what the batch accessors used to do; it fails outright once the id
+count passes SQLite's variable limit (999 before SQLite 3.32, 32766 after,
+unless the build raises it).
+
+Usage:
+    python scripts/benchmark_bulk_lookup.py [--sizes 100,10000,100000] [--repeat 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import database as db
+
+# Roughly the size of real yt-dlp rows that SELECT * used to drag along
+DESCRIPTION = "lorem ipsum " * 150
+FORMATS = "[" + ",".join('{"format_id":"%d","vcodec":"avc1","height":%d}' % (i, 144 * i) for i in range(1, 25)) + "]"
+
+
+def _seed(conn: sqlite3.Connection, rows: int) -> list[str]:
+    ids = [f"id{i:09d}"[:11] for i in range(rows)]
+    conn.execute("BEGIN")
+    conn.executemany(
+        "INSERT INTO tracks (video_id, name, relpath, resolution, filetype, play_likes) VALUES (?, ?, ?, '1920x1080', 'mp4', 1)",
+        ((vid, f"Track {vid}", f"Music/{vid}.mp4") for vid in ids),
+    )
+    conn.executemany(
+        "INSERT INTO youtube_video_metadata (youtube_id, title, channel, description, available_formats, max_available_height) "
+        "VALUES (?, ?, 'Channel', ?, ?, 2160)",
+        ((vid, f"Title {vid}", DESCRIPTION, FORMATS) for vid in ids),
+    )
+    conn.executemany(
+        "INSERT INTO play_history (video_id, event) VALUES (?, 'dislike')",
+        ((vid,) for vid in ids[::7]),
+    )
+    conn.execute("COMMIT")
+    return ids
+
+
+def _single_in_select_star(conn, ids):
+    placeholders = ",".join("?" * len(ids))
+    return conn.execute(f"SELECT * FROM youtube_video_metadata WHERE youtube_id IN ({placeholders})", ids).fetchall()
+
+
+def _timed(fn, repeat: int) -> str:
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        try:
+            fn()
+        except sqlite3.OperationalError as e:
+            return f"error ({e})"
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return f"{best * 1000:9.1f} ms"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark bulk id lookups")
+    parser.add_argument("--sizes", default="100,10000,100000")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.set_db_path(Path(tmp) / "bench.db")
+        conn = db.get_connection()
+        print(f"Seeding {max(sizes)} tracks (SQLite {sqlite3.sqlite_version})...")
+        ids = _seed(conn, max(sizes))
+        narrow = ["title", "channel", "duration"]
+
+        for size in sizes:
+            subset = ids[:size]
+            print(f"\n{size} ids")
+            cases = [
+                ("single IN, SELECT * (old)", lambda: _single_in_select_star(conn, subset)),
+                ("chunked IN, SELECT *", lambda: db.bulk_lookup(
+                    conn, "youtube_video_metadata", "youtube_id", subset)),
+                ("chunked IN, 3 columns", lambda: db.bulk_lookup(
+                    conn, "youtube_video_metadata", "youtube_id", subset, narrow)),
+                ("temp table, 3 columns", lambda: db.bulk_lookup(
+                    conn, "youtube_video_metadata", "youtube_id", subset, narrow, temp_table_threshold=0)),
+                ("get_youtube_metadata_batch, 3 columns", lambda: db.get_youtube_metadata_batch(conn, subset, narrow)),
+                ("get_track_stats_batch", lambda: db.get_track_stats_batch(conn, subset)),
+                ("get_dislike_counts_batch", lambda: db.get_dislike_counts_batch(conn, subset)),
+            ]
+            for label, fn in cases:
+                print(f"  {label:<46} {_timed(fn, args.repeat)}")
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Checks for the uploads-feed change detection against a local stub feed server."""
+
+from __future__ import annotations
+
+import sys
+import tempfile
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import database as db
+from utils.channel_feed import apply_feed_update, check_channel_feeds, parse_feed_video_ids
+
+CHANNEL_A = "UCaaaaaaaaaaaaaaaaaaaaaa"
+CHANNEL_B = "UCbbbbbbbbbbbbbbbbbbbbbb"
+CHANNEL_C = "UCcccccccccccccccccccccc"
+
+
+def _feed(video_ids) -> bytes:
+    entries = "".join(
+        f"<entry><id>yt:video:{v}</id><yt:videoId>{v}</yt:videoId><title>{v}</title></entry>"
+        for v in video_ids
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<feed xmlns:yt="http://www.youtube.com/xml/schemas/2015" xmlns="http://www.w3.org/2005/Atom">'
+        f"<title>stub</title>{entries}</feed>"
+    ).encode("utf-8")
+
+
+class StubFeeds:
+    """Feeds by UC id; each change bumps the ETag and Last-Modified."""
+
+    def __init__(self):
+        self.feeds = {}
+        self.requests = []
+
+    def set(self, channel_id, video_ids, version):
+        self.feeds[channel_id] = {
+            "body": _feed(video_ids),
+            "etag": f'"{channel_id}-{version}"',
+            "last_modified": formatdate(1_700_000_000 + version, usegmt=True),
+        }
+
+
+def _start_server(stub: StubFeeds):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/@pagechannel":
+                body = (
+                    '<html><head><link rel="alternate" type="application/rss+xml" '
+                    f'href="https://www.youtube.com/feeds/videos.xml?channel_id={CHANNEL_C}"></head></html>'
+                ).encode()
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            channel_id = (parse_qs(url.query).get("channel_id") or [""])[0]
+            feed = stub.feeds.get(channel_id)
+            if url.path != "/feeds/videos.xml" or not feed:
+                self.send_error(404)
+                return
+            not_modified = self.headers.get("If-None-Match") == feed["etag"]
+            stub.requests.append((channel_id, 304 if not_modified else 200))
+            if not_modified:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("ETag", feed["etag"])
+            self.send_header("Last-Modified", feed["last_modified"])
+            self.send_header("Content-Length", str(len(feed["body"])))
+            self.end_headers()
+            self.wfile.write(feed["body"])
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _channels(base):
+    recent = "2999-01-01 00:00:00"
+    return [
+        {"id": 1, "name": "A", "url": f"https://www.youtube.com/channel/{CHANNEL_A}", "last_sync_ts": recent},
+        {"id": 2, "name": "B", "url": "https://www.youtube.com/@bee", "last_sync_ts": recent},
+        {"id": 3, "name": "C", "url": f"{base}/@pagechannel/videos", "last_sync_ts": recent},
+    ]
+
+
+def _open_db(tmp: Path):
+    db.set_db_path(tmp / "tracks.db")
+    conn = db.get_connection()
+    for channel_id in (1, 2, 3):
+        conn.execute("INSERT INTO channels (id, name, url) VALUES (?, ?, ?)", (channel_id, f"c{channel_id}", f"u{channel_id}"))
+    # Channel B's UC id is only known from stored video metadata
+    conn.execute(
+        "INSERT INTO youtube_video_metadata (youtube_id, title, channel_id, channel_url) VALUES (?, ?, ?, ?)",
+        ("bbbbbbbbbb1", "b1", CHANNEL_B, "https://www.youtube.com/@bee"),
+    )
+    conn.execute("INSERT INTO tracks (video_id, name, relpath) VALUES ('bbbbbbbbbb1', 'b1', 'B/b1.mp4')")
+    conn.commit()
+    return conn
+
+
+def test_parse_feed_video_ids() -> None:
+    assert parse_feed_video_ids(_feed(["aaaaaaaaaa2", "aaaaaaaaaa1"])) == ["aaaaaaaaaa2", "aaaaaaaaaa1"]
+
+
+def test_feed_check_cycle() -> None:
+    stub = StubFeeds()
+    stub.set(CHANNEL_A, ["aaaaaaaaaa1"], 1)
+    stub.set(CHANNEL_B, ["bbbbbbbbbb1"], 1)
+    stub.set(CHANNEL_C, ["cccccccccc1"], 1)
+    server = _start_server(stub)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    feeds = f"{base}/feeds/videos.xml"
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = _open_db(Path(tmp))
+        try:
+            channels = _channels(base)
+
+            # First run: A and C list unknown videos, B's only video is in the library
+            first = check_channel_feeds(conn, channels, base_url=feeds)
+            assert first[1]["sync"] and first[1]["new_video_ids"] == ["aaaaaaaaaa1"], first[1]
+            assert not first[2]["sync"], first[2]
+            assert first[3]["sync"], first[3]
+            assert db.get_channel_feed_states(conn, [3])[3]["youtube_channel_id"] == CHANNEL_C
+            apply_feed_update(conn, 1, first[1]["feed_update"])
+            # C's sync "failed": its feed update is not applied
+
+            # Second run: A and B answer 304, C is retried with the full feed
+            stub.requests.clear()
+            second = check_channel_feeds(conn, channels, base_url=feeds)
+            assert not second[1]["sync"] and second[1]["reason"] == "feed not modified", second[1]
+            assert not second[2]["sync"], second[2]
+            assert second[3]["sync"], second[3]
+            assert sorted(stub.requests) == [(CHANNEL_A, 304), (CHANNEL_B, 304), (CHANNEL_C, 200)], stub.requests
+
+            # New upload on A: only the new ID counts
+            stub.set(CHANNEL_A, ["aaaaaaaaaa2", "aaaaaaaaaa1"], 2)
+            third = check_channel_feeds(conn, channels, base_url=feeds)
+            assert third[1]["sync"] and third[1]["new_video_ids"] == ["aaaaaaaaaa2"], third[1]
+
+            # Overdue channels sync even when the feed is unchanged
+            stale = [dict(channels[1], last_sync_ts="2000-01-01 00:00:00")]
+            fourth = check_channel_feeds(conn, stale, base_url=feeds)
+            assert fourth[2]["sync"] and fourth[2]["reason"] == "full sync overdue", fourth[2]
+
+            # Unreachable feed server: fail open
+            server.shutdown()
+            server.server_close()
+            fifth = check_channel_feeds(conn, channels[:1], base_url=feeds, timeout=2)
+            assert fifth[1]["sync"] and fifth[1]["reason"].startswith("feed check failed"), fifth[1]
+        finally:
+            conn.close()
+
+
+def main() -> int:
+    test_parse_feed_video_ids()
+    print("[PASS] test_parse_feed_video_ids")
+    test_feed_check_cycle()
+    print("[PASS] test_feed_check_cycle")
+    print("[OK] channel feed checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Checks for the token bucket and the adaptive group sync coordinator (no network)."""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from services.group_sync_coordinator import GroupSyncCoordinator
+from utils.ytdlp_throttle import TokenBucket, ThrottleLogger, get_throttle_monitor
+
+
+def test_token_bucket_paces_after_burst() -> None:
+    bucket = TokenBucket(rate=20.0, capacity=2)
+    started = time.monotonic()
+    for _ in range(6):
+        assert bucket.acquire()
+    elapsed = time.monotonic() - started
+    # 2 from the burst, 4 more at 20/s
+    assert 0.15 <= elapsed < 1.0, elapsed
+    assert not TokenBucket(rate=0.1, capacity=1).acquire(2, timeout=0.1)
+
+
+def test_throttle_logger_detects_403_and_429() -> None:
+    logger = ThrottleLogger()
+    logger.error("ERROR: [youtube] abc: Unable to download webpage: HTTP Error 429: Too Many Requests")
+    assert logger.throttled
+    clean = ThrottleLogger()
+    clean.error("ERROR: [youtube] abc: Video unavailable")
+    assert not clean.throttled
+
+
+def _fake_sync(throttle_from: int, throttle_until: int, peak: list):
+    active = [0]
+    lock = threading.Lock()
+    calls = [0]
+
+    def sync(channel_id: int) -> dict:
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            calls[0] += 1
+            n = calls[0]
+        try:
+            time.sleep(0.01)
+            throttled = throttle_from <= n < throttle_until
+            get_throttle_monitor().record(throttled)
+            if throttled and n % 2:
+                return {"status": "error", "error": "HTTP Error 403: Forbidden"}
+            if throttled:
+                # Quick sync shape: generic error plus the listing's throttled flag
+                return {"status": "error", "error": "Failed to list channel videos", "throttled": True}
+            return {"status": "started", "new_videos": 1, "jobs_created": 1}
+        finally:
+            with lock:
+                active[0] -= 1
+
+    return sync
+
+
+def test_coordinator_grows_without_throttling() -> None:
+    peak = [0]
+    channels = [{"id": i, "name": f"c{i}"} for i in range(40)]
+    summary = GroupSyncCoordinator(_fake_sync(10**6, 10**6, peak), concurrency=2, max_concurrency=5).run(channels)
+    assert summary["completed"] == 40 and summary["failed"] == 0, summary
+    assert summary["new_videos"] == 40
+    assert summary["concurrency_final"] == 5, summary
+    assert peak[0] <= 5, peak
+
+
+def test_coordinator_backs_off_on_throttling() -> None:
+    peak = [0]
+    done = []
+    channels = [{"id": i, "name": f"c{i}"} for i in range(30)]
+    coordinator = GroupSyncCoordinator(
+        _fake_sync(5, 12, peak),
+        concurrency=4,
+        max_concurrency=4,
+        on_channel_done=lambda channel, result: done.append(channel["id"]),
+    )
+    summary = coordinator.run(channels)
+    assert summary["failed"] == 7 and summary["throttled_channels"] == 7, summary
+    assert summary["concurrency_min"] == 1, summary
+    assert summary["throttled_calls"] == 7 and summary["ytdlp_calls"] == 30, summary
+    assert sorted(done) == list(range(30))
+
+
+def main() -> int:
+    test_token_bucket_paces_after_burst()
+    print("[PASS] test_token_bucket_paces_after_burst")
+    test_throttle_logger_detects_403_and_429()
+    print("[PASS] test_throttle_logger_detects_403_and_429")
+    test_coordinator_grows_without_throttling()
+    print("[PASS] test_coordinator_grows_without_throttling")
+    test_coordinator_backs_off_on_throttling()
+    print("[PASS] test_coordinator_backs_off_on_throttling")
+    print("[OK] group sync coordinator checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Smoke checks for the cached library snapshot (utils.library_snapshot)."""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils.library_snapshot import (
+    get_library_snapshot,
+    invalidate_library_snapshot,
+    relpath_key,
+)
+
+
+def test_relpath_key() -> None:
+    assert relpath_key("G\\C\\a.mp4") == relpath_key("G/C/a.mp4")
+    assert relpath_key("G/./C//a.mp4") == relpath_key("G/C/a.mp4")
+    assert relpath_key("../outside.mp4") is None
+    assert relpath_key("") is None
+    assert relpath_key(None) is None
+
+
+def test_snapshot(playlists: Path) -> None:
+    (playlists / "G" / "C").mkdir(parents=True)
+    (playlists / "Other").mkdir()
+    (playlists / "G" / "C" / "Song [abcdefghijk].mp4").write_bytes(b"x")
+    (playlists / "Other" / "Moved [zzzzzzzzzzz].mp4").write_bytes(b"x")
+    (playlists / "Trash" / "G").mkdir(parents=True)
+    (playlists / "Trash" / "G" / "Gone [ttttttttttt].mp4").write_bytes(b"x")
+    (playlists / "Trash" / "G" / "Moved [zzzzzzzzzzz].mp4").write_bytes(b"x")
+
+    snapshot = get_library_snapshot(playlists)
+    assert snapshot.has_relpath("G/C/Song [abcdefghijk].mp4")
+    assert snapshot.has_relpath("G\\C\\Song [abcdefghijk].mp4")
+    assert not snapshot.has_relpath("G/C/Moved [zzzzzzzzzzz].mp4")
+    # Trashed copies are kept apart from live files
+    assert snapshot.video_ids == {"abcdefghijk", "zzzzzzzzzzz"}
+    assert snapshot.trash_video_ids == {"ttttttttttt", "zzzzzzzzzzz"}
+    assert not snapshot.has_video_id("ttttttttttt")
+    assert snapshot.has_trashed_video_id("ttttttttttt")
+    missing = snapshot.missing_relpaths(["G/C/Song [abcdefghijk].mp4", "G/C/ghost.mp4", None])
+    assert missing == {"G/C/ghost.mp4", None}
+
+    # Symlinked folders are followed; a link back to an ancestor does not loop
+    if hasattr(os, "symlink"):
+        external = playlists.parent / (playlists.name + "-external")
+        (external / "Chan").mkdir(parents=True)
+        (external / "Chan" / "Linked [lllllllllll].mp4").write_bytes(b"x")
+        try:
+            (playlists / "G" / "Linked").symlink_to(external / "Chan", target_is_directory=True)
+            (playlists / "G" / "Loop").symlink_to(playlists / "G", target_is_directory=True)
+        except OSError:
+            pass  # no symlink privilege (Windows)
+        else:
+            linked = get_library_snapshot(playlists, max_age=-1)
+            assert linked.has_relpath("G/Linked/Linked [lllllllllll].mp4")
+            assert linked.has_video_id("lllllllllll")
+            (playlists / "G" / "Linked").unlink()
+            (playlists / "G" / "Loop").unlink()
+        snapshot = get_library_snapshot(playlists, max_age=-1)
+
+    # Cached until the TTL expires or the root is invalidated
+    (playlists / "G" / "C" / "new.mp4").write_bytes(b"x")
+    assert get_library_snapshot(playlists) is snapshot
+    assert get_library_snapshot(playlists, max_age=-1).has_relpath("G/C/new.mp4")
+    invalidate_library_snapshot(playlists)
+    assert get_library_snapshot(playlists) is not snapshot
+
+
+def main() -> int:
+    test_relpath_key()
+    print("[PASS] test_relpath_key")
+    with tempfile.TemporaryDirectory() as tmp:
+        test_snapshot(Path(tmp) / "Playlists")
+    print("[PASS] test_snapshot")
+    print("[OK] library snapshot checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
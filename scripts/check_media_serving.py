@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Smoke checks for /media responses (utils.media_serving)."""
+
+from __future__ import annotations
+
+import sys
+import tempfile
+from pathlib import Path
+from urllib.parse import unquote
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from werkzeug.test import EnvironBuilder
+
+from utils.media_serving import build_media_response, configure_media_serving
+
+# Spaces, brackets and Cyrillic, as in real channel folders
+RELPATH = "Группа/Канал [x]/Песня – live [abcdefghijk].mp3"
+
+
+def _environ(**headers) -> dict:
+    return EnvironBuilder(path="/media/x", headers=headers).get_environ()
+
+
+def test_direct(root: Path) -> None:
+    configure_media_serving(accel_mode="none")
+    resp = build_media_response(_environ(), root, RELPATH)
+    assert resp.status_code == 200
+    assert b"".join(resp.response) == b"0123456789"
+    ranged = build_media_response(_environ(Range="bytes=2-4"), root, RELPATH)
+    assert ranged.status_code == 206
+    assert ranged.headers["Content-Range"] == "bytes 2-4/10"
+    not_modified = build_media_response(_environ(**{"If-None-Match": resp.headers["ETag"]}), root, RELPATH)
+    assert not_modified.status_code == 304
+
+
+def test_accel_headers(root: Path) -> None:
+    configure_media_serving(accel_mode="x-accel-redirect", accel_prefix="/_protected_media/")
+    value = build_media_response(_environ(), root, RELPATH).headers["X-Accel-Redirect"]
+    value.encode("latin-1")
+    assert " " not in value and "[" not in value
+    assert value.startswith("/_protected_media/")
+    assert unquote(value) == "/_protected_media/" + RELPATH
+
+    configure_media_serving(accel_mode="x-sendfile")
+    value = build_media_response(_environ(), root, RELPATH).headers["X-Sendfile"]
+    value.encode("latin-1")
+    assert unquote(value) == str(root / RELPATH)
+
+
+def main() -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        (root / RELPATH).parent.mkdir(parents=True)
+        (root / RELPATH).write_bytes(b"0123456789")
+        try:
+            test_direct(root)
+            print("[PASS] test_direct")
+            test_accel_headers(root)
+            print("[PASS] test_accel_headers")
+        finally:
+            configure_media_serving(accel_mode="none")
+    print("[OK] media serving checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -11,6 +11,11 @@ import argparse
 from pathlib import Path
 from typing import List, Dict, Optional
 
+# Корень проекта в sys.path для импорта utils
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.library_snapshot import get_library_snapshot
+
 def load_env_config() -> Dict[str, str]:
     """Загрузить конфигурацию из .env файла."""
     config = {}
@@ -57,22 +62,28 @@ def find_missing_files(db_path: str, playlists_dir: str = None) -> List[Dict]:
         
         print(f"[INFO] Проверка {len(tracks)} треков в базе данных...")
         
-        for i, track in enumerate(tracks):
+        if playlists_dir:
+            # Один проход по диску вместо exists() на каждый трек
+            snapshot = get_library_snapshot(playlists_dir)
+            print(f"[INFO] На диске {len(snapshot.relpaths)} файлов (обход за {snapshot.duration:.1f} с)")
+            missing_relpaths = snapshot.missing_relpaths(track[3] for track in tracks)
+        else:
+            missing_relpaths = None
+        
+        for track in tracks:
             track_id, video_id, name, relpath, play_likes, play_starts, last_start_ts, channel_group, published_date = track
             
-            # Показать прогресс каждые 100 треков
-            if (i + 1) % 100 == 0:
-                print(f"[INFO] Проверено {i + 1}/{len(tracks)} треков...")
-            
             # Проверить существование файла
             if playlists_dir:
                 # Строим полный путь: PLAYLISTS_DIR + relpath
                 file_path = Path(playlists_dir) / relpath
+                is_missing = relpath in missing_relpaths
             else:
                 # Иначе используем путь как есть
                 file_path = Path(relpath)
+                is_missing = not file_path.exists()
             
-            if not file_path.exists():
+            if is_missing:
                 missing_files.append({
                     'track_id': track_id,
                     'video_id': video_id,
@@ -83,7 +94,12 @@ def find_missing_files(db_path: str, playlists_dir: str = None) -> List[Dict]:
                     'play_starts': play_starts or 0,
                     'last_start_ts': last_start_ts,
                     'channel_group': channel_group,
-                    'published_date': published_date
+                    'published_date': published_date,
+                    # Файл с этим video_id есть в другой папке (трек перемещён, relpath устарел)
+                    'file_elsewhere': bool(playlists_dir) and snapshot.has_video_id(video_id),
+                    # Копия есть только в корзине (Trash/) - не считается живым файлом
+                    'file_in_trash': bool(playlists_dir) and not snapshot.has_video_id(video_id)
+                    and snapshot.has_trashed_video_id(video_id),
                 })
         
         conn.close()
@@ -143,6 +159,12 @@ def print_audit_results(missing_files: List[Dict]):
     print(f"  - Треков с лайками: {len(liked_tracks)}")
     print(f"  - Треков с воспроизведениями: {len(played_tracks)}")
     print(f"  - Треков без активности: {len(missing_files) - len(played_tracks)}")
+    moved_tracks = [f for f in missing_files if f.get('file_elsewhere')]
+    if moved_tracks:
+        print(f"  - Файл есть в другой папке (устаревший relpath): {len(moved_tracks)}")
+    trashed_tracks = [f for f in missing_files if f.get('file_in_trash')]
+    if trashed_tracks:
+        print(f"  - Файл есть только в корзине (Trash/): {len(trashed_tracks)}")
     print()
     
     # Показываем первые 20 самых важных треков
@@ -65,11 +65,13 @@ from utils.cookies_manager import get_random_cookie_file
 from database import (
     get_connection, 
     set_db_path,
-    upsert_youtube_metadata, 
-    get_youtube_metadata_by_id,
+    bulk_upsert_youtube_metadata,
     get_channel_by_url
 )
 
+# Metadata rows written per transaction
+METADATA_WRITE_BATCH_SIZE = 500
+
 def get_channel_date_from(channel_url: str) -> Optional[str]:
     """Get date_from setting for channel from database"""
     try:
@@ -709,42 +711,6 @@ def run_ytdlp_extract(url: str, max_entries: int = None, cookies_path: str = Non
         raise RuntimeError(f"Error running yt-dlp: {e}")
 
 
-def compare_metadata(existing: Dict[str, Any], new: Dict[str, Any]) -> bool:
-    """
-    Compare two metadata dictionaries to check if update is needed
-    
-    Args:
-        existing: Existing metadata from database
-        new: New metadata from yt-dlp
-        
-    Returns:
-        True if metadata differs and update is needed, False otherwise
-    """
-    # Fields to compare for changes (skip timestamps and IDs)
-    compare_fields = [
-        'title', 'description', 'duration', 'view_count', 'availability',
-        'live_status', 'channel', 'channel_url', 'playlist_title',
-        'playlist_count', 'n_entries', 'playlist_index'
-    ]
-    
-    for field in compare_fields:
-        existing_val = existing.get(field)
-        new_val = new.get(field)
-        
-        # Handle None values and type mismatches
-        if existing_val != new_val:
-            # Special handling for numeric fields that might be None vs 0
-            if field in ['view_count', 'duration', 'playlist_count', 'n_entries', 'playlist_index']:
-                existing_num = existing_val if existing_val is not None else 0
-                new_num = new_val if new_val is not None else 0
-                if existing_num != new_num:
-                    return True
-            else:
-                return True
-    
-    return False
-
-
 def process_channel_metadata(url: str, force_update: bool = False, max_entries: int = None, 
                              cookies_path: str = None, playlist_items: str = None) -> Dict[str, int]:
     """
@@ -759,7 +725,7 @@ def process_channel_metadata(url: str, force_update: bool = False, max_entries:
         datebefore: Download only videos before this date (optional)
         
     Returns:
-        Dictionary with statistics: total, inserted, updated, errors
+        Dictionary with statistics: total, inserted, updated, unchanged, errors
     """
     start_time = datetime.utcnow()
     log_message(f"=== Channel Metadata Extraction Started ===")
@@ -777,6 +743,7 @@ def process_channel_metadata(url: str, force_update: bool = False, max_entries:
         'total': 0,
         'inserted': 0,
         'updated': 0,
+        'unchanged': 0,
         'errors': 0
     }
     
@@ -794,6 +761,7 @@ def process_channel_metadata(url: str, force_update: bool = False, max_entries:
         # Step 2: Process each metadata record
         conn = get_connection()
         
+        rows = []
         try:
             for i, metadata in enumerate(metadata_list, 1):
                 try:
@@ -864,39 +832,30 @@ def process_channel_metadata(url: str, force_update: bool = False, max_entries:
                     # but callback searches for human-readable URLs  
                     metadata['channel_url'] = url
                     
-                    # Check if record already exists
-                    existing = get_youtube_metadata_by_id(conn, video_id)
-                    
-                    if existing:
-                        # Check if update is needed
-                        if force_update or compare_metadata(dict(existing), metadata):
-                            # Update existing record
-                            upsert_youtube_metadata(conn, metadata)
-                            stats['updated'] += 1
-                            if force_update:
-                                log_message(f"Force updated metadata for video {video_id} ({i}/{stats['total']})")
-                            else:
-                                log_message(f"Updated metadata for video {video_id} ({i}/{stats['total']})")
-                        else:
-                            # No changes needed
-                            log_message(f"No changes for video {video_id} ({i}/{stats['total']})")
-                    else:
-                        # Insert new record
-                        upsert_youtube_metadata(conn, metadata)
-                        stats['inserted'] += 1
-                        log_message(f"Inserted new metadata for video {video_id} ({i}/{stats['total']})")
+                    rows.append(metadata)
                     
-                    # Progress reporting every 50 videos
-                    if i % 50 == 0 or i == stats['total']:
-                        progress = (i / stats['total']) * 100
-                        log_message(f"Progress: {i}/{stats['total']} ({progress:.1f}%) - "
-                                  f"Inserted: {stats['inserted']}, Updated: {stats['updated']}, "
-                                  f"Errors: {stats['errors']}")
-                
                 except Exception as e:
                     log_message(f"Error processing video {i}: {e}")
                     stats['errors'] += 1
                     continue
+            
+            # Step 3: Write all rows in batched transactions; unchanged rows are skipped by content hash
+            for start in range(0, len(rows), METADATA_WRITE_BATCH_SIZE):
+                batch = rows[start:start + METADATA_WRITE_BATCH_SIZE]
+                try:
+                    result = bulk_upsert_youtube_metadata(conn, batch, skip_unchanged=not force_update)
+                except Exception as e:
+                    log_message(f"Error saving metadata batch {start + 1}-{start + len(batch)}: {e}")
+                    stats['errors'] += len(batch)
+                    continue
+                stats['inserted'] += result['inserted']
+                stats['updated'] += result['updated']
+                stats['unchanged'] += result['unchanged']
+                stats['errors'] += result['invalid']
+                done = start + len(batch)
+                log_message(f"Progress: {done}/{len(rows)} ({done / len(rows) * 100:.1f}%) - "
+                          f"Inserted: {stats['inserted']}, Updated: {stats['updated']}, "
+                          f"Unchanged: {stats['unchanged']}, Errors: {stats['errors']}")
         
         finally:
             # Update metadata_last_updated field in channels table
@@ -936,6 +895,7 @@ def process_channel_metadata(url: str, force_update: bool = False, max_entries:
     log_message(f"  - Total videos processed: {stats['total']}")
     log_message(f"  - New records inserted: {stats['inserted']}")
     log_message(f"  - Existing records updated: {stats['updated']}")
+    log_message(f"  - Unchanged records skipped: {stats['unchanged']}")
     log_message(f"  - Errors encountered: {stats['errors']}")
     log_message(f"  - Success rate: {((stats['total'] - stats['errors']) / max(stats['total'], 1) * 100):.1f}%")
     
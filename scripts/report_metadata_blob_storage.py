@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""Report the effect of moving YouTube metadata blobs to youtube_metadata_blobs.
+
+Works on a copy: the source database (``--db-path``, or a synthetic one with
+``--rows`` videos) is copied with the SQLite backup API, measured, migrated
+with migration 016, vacuumed and measured again. Prints the file size, the
+bytes held by description/available_formats inline vs compressed, and the
+best-of-N time of two youtube_video_metadata scans:
+
+- ``SELECT *`` - what listings and exports do
+- hot columns only - what the library/scan code reads
+
+The live database is never modified.
+
+Usage:
+    python scripts/report_metadata_blob_storage.py --db-path D:/music/DB/tracks.db
+    python scripts/report_metadata_blob_storage.py --rows 20000 [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import database as db
+from database.migrations.migration_016_compress_youtube_metadata_blobs import Migration016
+
+HOT_SCAN_SQL = "SELECT youtube_id, title, channel, timestamp, duration, max_available_height FROM youtube_video_metadata"
+
+# Roughly the size of real yt-dlp rows (see scripts/benchmark_bulk_lookup.py)
+DESCRIPTION = "Official video. Lyrics, credits and links below. " * 30
+FORMATS = "[" + ",".join(
+    '{"format_id":"%d","ext":"mp4","vcodec":"avc1.64001f","acodec":"none","height":%d,"fps":30,"tbr":%d}'
+    % (i, 144 * (i % 12 + 1), 100 * i)
+    for i in range(1, 40)
+) + "]"
+
+
+def _seed(path: Path, rows: int) -> None:
+    db.set_db_path(path)
+    conn = db.get_connection()
+    try:
+        conn.execute("BEGIN")
+        # Inline, as rows were stored before the blob table existed
+        conn.executemany(
+            "INSERT INTO youtube_video_metadata (youtube_id, title, channel, description, available_formats, "
+            "max_available_height, timestamp) VALUES (?, ?, ?, ?, ?, 1080, 1700000000)",
+            ((f"v{i:010d}", f"Video {i}", f"Channel {i % 50}", f"{DESCRIPTION} #{i}", FORMATS) for i in range(rows)),
+        )
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+
+def _copy(source: Path, target: Path) -> None:
+    src = sqlite3.connect(f"file:{source}?mode=ro", uri=True)
+    dst = sqlite3.connect(target)
+    try:
+        src.backup(dst)
+    finally:
+        src.close()
+        dst.close()
+
+
+def _best_ms(conn: sqlite3.Connection, sql: str, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        conn.execute(sql).fetchall()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return (best or 0.0) * 1000
+
+
+def _measure(path: Path, repeat: int) -> dict:
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("VACUUM")
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        inline = conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(CAST(description AS BLOB))), 0) "
+            "+ COALESCE(SUM(LENGTH(CAST(available_formats AS BLOB))), 0) FROM youtube_video_metadata"
+        ).fetchone()[0]
+        has_blobs = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'youtube_metadata_blobs'"
+        ).fetchone()
+        compressed = conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(description)), 0) + COALESCE(SUM(LENGTH(available_formats)), 0) "
+            "FROM youtube_metadata_blobs"
+        ).fetchone()[0] if has_blobs else 0
+        return {
+            "rows": conn.execute("SELECT COUNT(*) FROM youtube_video_metadata").fetchone()[0],
+            "file_bytes": conn.execute("PRAGMA page_count").fetchone()[0] * page_size,
+            "inline_bytes": inline,
+            "compressed_bytes": compressed,
+            "scan_all_ms": _best_ms(conn, "SELECT * FROM youtube_video_metadata", repeat),
+            "scan_hot_ms": _best_ms(conn, HOT_SCAN_SQL, repeat),
+        }
+    finally:
+        conn.close()
+
+
+def _mb(value: float) -> str:
+    return f"{value / 1024 / 1024:9.2f} MB"
+
+
+def _change(before: float, after: float) -> str:
+    return f"{(after - before) / before * 100:+6.1f}%" if before else "     -"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Report metadata blob storage size and scan speed")
+    parser.add_argument("--db-path", help="Database to copy and measure (default: synthetic database)")
+    parser.add_argument("--rows", type=int, default=20000, help="Videos in the synthetic database")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work = Path(tmp) / "report.db"
+        if args.db_path:
+            _copy(Path(args.db_path), work)
+            print(f"Copied {args.db_path}")
+        else:
+            print(f"Seeding {args.rows} videos (SQLite {sqlite3.sqlite_version})...")
+            _seed(work, args.rows)
+
+        before = _measure(work, args.repeat)
+        conn = sqlite3.connect(work)
+        try:
+            Migration016().up(conn)
+            conn.commit()
+        finally:
+            conn.close()
+        after = _measure(work, args.repeat)
+
+    print(f"\nyoutube_video_metadata rows: {after['rows']}")
+    print(f"{'':<28}{'before':>12}{'after':>12}{'change':>9}")
+    for label, key, fmt in (
+        ("database file", "file_bytes", _mb),
+        ("cold fields inline", "inline_bytes", _mb),
+        ("cold fields compressed", "compressed_bytes", _mb),
+    ):
+        print(f"{label:<28}{fmt(before[key]):>12}{fmt(after[key]):>12}{_change(before[key], after[key]):>9}")
+    for label, key in (("scan SELECT *", "scan_all_ms"), ("scan hot columns", "scan_hot_ms")):
+        print(f"{label:<28}{before[key]:>9.1f} ms{after[key]:>9.1f} ms{_change(before[key], after[key]):>9}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
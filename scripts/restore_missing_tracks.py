@@ -20,6 +20,7 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from database import get_connection, set_db_path
 from utils.logging_utils import log_message
+from utils.library_snapshot import get_library_snapshot
 
 # Job Queue imports for automatic download
 try:
@@ -71,12 +72,13 @@ def find_missing_tracks(db_path: str, playlists_dir: str) -> List[Dict]:
         cur.execute(query)
         tracks = cur.fetchall()
         
+        # One walk of the library instead of an exists() call per track
+        missing_relpaths = get_library_snapshot(playlists_dir).missing_relpaths(track[3] for track in tracks)
+        
         for track in tracks:
             track_id, video_id, name, relpath, play_likes, play_starts = track
             
-            # Check if file exists on disk
-            file_path = Path(playlists_dir) / relpath
-            if not file_path.exists():
+            if relpath in missing_relpaths:
                 missing_tracks.append({
                     'track_id': track_id,
                     'video_id': video_id,
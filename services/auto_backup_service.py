@@ -161,7 +161,7 @@ class AutoBackupService:
             
             # Create job data
             job_data = JobData(
-                backup_type='full',
+                backup_type='incremental',
                 retention_days=self.retention_days,
                 cleanup_old=False,
                 force_backup=False,
@@ -212,7 +212,7 @@ class AutoBackupService:
             
             # Create job data with force_backup=True
             job_data = JobData(
-                backup_type='full',
+                backup_type='incremental',
                 retention_days=self.retention_days,
                 cleanup_old=False,
                 force_backup=True,
@@ -10,22 +10,49 @@ Safety Rules:
 4. No 'next' events after 'finish' event
 5. Channel group must have auto_delete_enabled=True
 6. Must be from a channel (not playlist)
+
+Finish events reach the service through a database event listener
+(``record_event(..., 'finish')``) and wait in a delayed queue for the grace
+window, so later 'next'/'start' events can veto the deletion. Each finish is
+then evaluated exactly once with indexed per-video lookups. A periodic scan of
+play_history rows newer than the last one seen is kept as a fallback for
+finishes recorded while the listener was not registered (other processes,
+restarts).
 """
 
+import heapq
 import sqlite3
 import time
 import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from utils.logging_utils import log_message
 
+# Seconds after a finish before it is evaluated (rule 4 window)
+AUTO_DELETE_GRACE_SECONDS = 60
+# Fallback scan for finishes the listener did not see
+FALLBACK_SCAN_INTERVAL_SECONDS = 300
+# How far back the first fallback scan after start looks
+FALLBACK_INITIAL_LOOKBACK = '-5 minutes'
+# Finish event ids remembered to keep evaluation at exactly once
+SEEN_FINISH_IDS_LIMIT = 5000
+
 
 class AutoDeleteService:
     def __init__(self):
         self.is_running = False
-        self.check_interval = 30  # Check every 30 seconds
+        self.grace_seconds = AUTO_DELETE_GRACE_SECONDS
+        self.check_interval = FALLBACK_SCAN_INTERVAL_SECONDS
         self.worker_thread = None
         self.root_dir = None
+        self._cond = threading.Condition()
+        # (due monotonic time, sequence, candidate)
+        self._pending: List[Tuple[float, int, Dict[str, Any]]] = []
+        self._seq = 0
+        self._seen_finish_ids: "OrderedDict[int, None]" = OrderedDict()
+        self._last_history_id: Optional[int] = None
+        self._next_fallback_scan = 0.0
         
     def start(self, root_dir: Path):
         """Start the auto-delete service."""
@@ -35,6 +62,12 @@ class AutoDeleteService:
             
         self.root_dir = root_dir
         self.is_running = True
+        self._next_fallback_scan = 0.0
+        try:
+            from database import add_event_listener
+            add_event_listener(self._on_history_event)
+        except Exception as e:
+            log_message(f"[AutoDelete] Could not register finish listener, relying on fallback scan: {e}")
         self.worker_thread = threading.Thread(target=self._worker_loop, daemon=True)
         self.worker_thread.start()
         log_message("[AutoDelete] Service started")
@@ -44,79 +77,185 @@ class AutoDeleteService:
         if not self.is_running:
             return
             
-        self.is_running = False
+        try:
+            from database import remove_event_listener
+            remove_event_listener(self._on_history_event)
+        except Exception:
+            pass
+        with self._cond:
+            self.is_running = False
+            self._cond.notify_all()
         if self.worker_thread:
             self.worker_thread.join(timeout=5)
         log_message("[AutoDelete] Service stopped")
-        
+
+    # ----- delayed evaluation queue -----
+
+    def _on_history_event(self, video_id: str, event: str, position: Optional[float], history_id: Optional[int]):
+        """Database event listener: queue finishes, ignore everything else."""
+        if event == 'finish':
+            self.enqueue_finish(video_id, position, history_id)
+
+    def enqueue_finish(self, video_id: str, position: Optional[float], finish_event_id: Optional[int] = None,
+                       delay: Optional[float] = None) -> bool:
+        """Schedule one evaluation of a finish event after the grace window.
+
+        Returns False when the event was already queued or evaluated.
+        """
+        if not video_id:
+            return False
+        with self._cond:
+            if finish_event_id is not None:
+                if finish_event_id in self._seen_finish_ids:
+                    return False
+                self._remember_locked(finish_event_id)
+            due = time.monotonic() + (self.grace_seconds if delay is None else max(0.0, delay))
+            self._seq += 1
+            heapq.heappush(self._pending, (due, self._seq, {
+                'video_id': video_id,
+                'position': position,
+                'finish_event_id': finish_event_id,
+            }))
+            self._cond.notify_all()
+        return True
+
+    def _remember_locked(self, finish_event_id: int):
+        self._seen_finish_ids[finish_event_id] = None
+        while len(self._seen_finish_ids) > SEEN_FINISH_IDS_LIMIT:
+            self._seen_finish_ids.popitem(last=False)
+
+    def _pop_due(self) -> List[Dict[str, Any]]:
+        """Wait until a queued finish is due or the fallback scan is; return due candidates."""
+        with self._cond:
+            while self.is_running:
+                now = time.monotonic()
+                if self._pending and self._pending[0][0] <= now:
+                    due = []
+                    while self._pending and self._pending[0][0] <= now:
+                        due.append(heapq.heappop(self._pending)[2])
+                    return due
+                if now >= self._next_fallback_scan:
+                    return []
+                wake_at = self._next_fallback_scan
+                if self._pending:
+                    wake_at = min(wake_at, self._pending[0][0])
+                self._cond.wait(timeout=max(0.05, wake_at - now))
+            return []
+
+    def pending_count(self) -> int:
+        with self._cond:
+            return len(self._pending)
+            
     def _worker_loop(self):
-        """Main worker loop that periodically checks for tracks to delete."""
+        """Evaluate queued finishes when due; run the fallback scan every check_interval seconds."""
         while self.is_running:
             try:
-                self._check_for_deletions()
-            except Exception as e:
-                log_message(f"[AutoDelete] Error in worker loop: {e}")
-            
-            # Sleep in small intervals to allow quick shutdown
-            for _ in range(self.check_interval):
+                due = self._pop_due()
                 if not self.is_running:
                     break
+                if due:
+                    self._evaluate_candidates(due)
+                if time.monotonic() >= self._next_fallback_scan:
+                    self._next_fallback_scan = time.monotonic() + self.check_interval
+                    self._check_for_deletions()
+            except Exception as e:
+                log_message(f"[AutoDelete] Error in worker loop: {e}")
                 time.sleep(1)
                 
     def _check_for_deletions(self):
-        """Check for tracks that should be auto-deleted."""
+        """Fallback: queue finish events recorded since the last scan that the listener missed.
+
+        Walks play_history by id from the last seen row (the first scan after
+        start looks back FALLBACK_INITIAL_LOOKBACK), so each run only reads new rows.
+        """
         try:
             from database import get_connection
             
             conn = get_connection()
+            try:
+                if self._last_history_id is None:
+                    rows = conn.execute(
+                        """
+                        SELECT id, video_id, position, (julianday('now') - julianday(ts)) * 86400.0
+                        FROM play_history
+                        WHERE event = 'finish' AND ts >= datetime('now', ?)
+                        """,
+                        (FALLBACK_INITIAL_LOOKBACK,),
+                    ).fetchall()
+                    max_id = conn.execute("SELECT MAX(id) FROM play_history").fetchone()[0]
+                else:
+                    rows = conn.execute(
+                        """
+                        SELECT id, video_id, position, (julianday('now') - julianday(ts)) * 86400.0
+                        FROM play_history
+                        WHERE id > ? AND event = 'finish'
+                        """,
+                        (self._last_history_id,),
+                    ).fetchall()
+                    max_id = conn.execute("SELECT MAX(id) FROM play_history").fetchone()[0]
+            finally:
+                conn.close()
+
+            if max_id is not None:
+                self._last_history_id = max(self._last_history_id or 0, int(max_id))
+            queued = 0
+            for event_id, video_id, position, age_seconds in rows:
+                delay = self.grace_seconds - float(age_seconds or 0.0)
+                if self.enqueue_finish(video_id, position, event_id, delay=delay):
+                    queued += 1
+            if queued:
+                log_message(f"[AutoDelete] Fallback scan queued {queued} finish events")
             
-            # Find tracks that finished playing recently and might need deletion
-            # Look for tracks that:
-            # 1. Have a recent 'finish' event (within last 5 minutes)
-            # 2. Are from channels with auto-delete enabled
-            # 3. Haven't been processed for auto-delete yet
-            
-            query = """
-            SELECT DISTINCT 
-                t.id, t.video_id, t.relpath, t.channel_group,
-                ph.ts, ph.position, ph.id as event_id
+        except Exception as e:
+            log_message(f"[AutoDelete] Error checking for deletions: {e}")
+
+    def _evaluate_candidates(self, candidates: List[Dict[str, Any]]):
+        """Evaluate due finish events once each."""
+        try:
+            from database import get_connection
+
+            conn = get_connection()
+            try:
+                for candidate in candidates:
+                    self._evaluate_candidate(conn, candidate)
+            finally:
+                conn.close()
+        except Exception as e:
+            log_message(f"[AutoDelete] Error evaluating finished tracks: {e}")
+
+    def _evaluate_candidate(self, conn: sqlite3.Connection, candidate: Dict[str, Any]):
+        video_id = candidate['video_id']
+        # Channel track in an auto-delete group (tracks.video_id is unique)
+        track = conn.execute(
+            """
+            SELECT t.id, t.video_id, t.name, t.relpath, t.channel_group
             FROM tracks t
-            JOIN play_history ph ON t.video_id = ph.video_id
-            LEFT JOIN channel_groups cg ON t.channel_group = cg.name
-            WHERE ph.event = 'finish'
-                AND ph.ts >= datetime('now', '-5 minutes')
+            JOIN channel_groups cg ON cg.name = t.channel_group
+            WHERE t.video_id = ?
                 AND t.auto_delete_after_finish = 1
                 AND cg.auto_delete_enabled = 1
-                AND t.channel_group IS NOT NULL
                 AND t.relpath LIKE '%Channel-%'
-            ORDER BY ph.ts DESC
-            """
-            
-            cursor = conn.cursor()
-            cursor.execute(query)
-            candidates = cursor.fetchall()
-            
-            for candidate in candidates:
-                track_id = candidate[0]
-                video_id = candidate[1]
-                relpath = candidate[2]
-                channel_group = candidate[3]
-                finish_ts = candidate[4]
-                finish_position = candidate[5]
-                finish_event_id = candidate[6]
-                
-                # Check if this track should be auto-deleted
-                if self._should_auto_delete(conn, video_id, finish_event_id, finish_position):
-                    success = self._auto_delete_track(conn, track_id, video_id, relpath, channel_group, finish_ts)
-                    if success:
-                        log_message(f"[AutoDelete] Successfully deleted track: {video_id} from {channel_group}")
-                    else:
-                        log_message(f"[AutoDelete] Failed to delete track: {video_id}")
-            
-            conn.close()
-            
-        except Exception as e:
-            log_message(f"[AutoDelete] Error checking for deletions: {e}")
+            """,
+            (video_id,),
+        ).fetchone()
+        if not track:
+            return
+
+        finish_event_id = candidate.get('finish_event_id')
+        if finish_event_id is None:
+            # Queued without a history id (trigger_auto_delete_check): newest finish
+            row = conn.execute(
+                "SELECT MAX(id) FROM play_history WHERE video_id = ? AND event = 'finish'", (video_id,)
+            ).fetchone()
+            finish_event_id = row[0] if row and row[0] is not None else 0
+
+        position = candidate.get('position')
+        if self._should_auto_delete(conn, video_id, finish_event_id, float(position or 0.0)):
+            success = self._auto_delete_track(conn, track[0], video_id, track[3], track[4], track[2])
+            if success:
+                log_message(f"[AutoDelete] Successfully deleted track: {video_id} from {track[4]}")
+            else:
+                log_message(f"[AutoDelete] Failed to delete track: {video_id}")
             
     def _should_auto_delete(self, conn: sqlite3.Connection, video_id: str, 
                            finish_event_id: int, finish_position: float) -> bool:
@@ -127,7 +266,10 @@ class AutoDeleteService:
         1. Play duration ≥5 seconds
         2. Not liked
         3. No 'next' events after the finish event
-        4. No recent play events (track actually finished, not paused)
+        4. No play/start events after the finish (evaluated once the grace
+           window has passed, so the track actually finished, not paused)
+
+        Rules 2-4 are single-row probes on idx_play_history_video_event.
         """
         try:
             cursor = conn.cursor()
@@ -139,35 +281,37 @@ class AutoDeleteService:
             
             # Rule 2: Check if track is liked
             cursor.execute("""
-                SELECT COUNT(*) FROM play_history 
+                SELECT 1 FROM play_history 
                 WHERE video_id = ? AND event = 'like'
+                LIMIT 1
             """, (video_id,))
             
-            if cursor.fetchone()[0] > 0:
+            if cursor.fetchone():
                 log_message(f"[AutoDelete] Skipping {video_id}: track is liked")
                 return False
             
             # Rule 3: Check for 'next' events after the finish event
             cursor.execute("""
-                SELECT COUNT(*) FROM play_history 
+                SELECT 1 FROM play_history 
                 WHERE video_id = ? AND event = 'next' AND id > ?
+                LIMIT 1
             """, (video_id, finish_event_id))
             
-            if cursor.fetchone()[0] > 0:
+            if cursor.fetchone():
                 log_message(f"[AutoDelete] Skipping {video_id}: has 'next' events after finish")
                 return False
             
-            # Rule 4: Check for recent play events (within 1 minute after finish)
+            # Rule 4: Check for play events after the finish (within the grace window)
             cursor.execute("""
-                SELECT COUNT(*) FROM play_history 
+                SELECT 1 FROM play_history 
                 WHERE video_id = ? 
                     AND event IN ('play', 'start') 
                     AND id > ?
-                    AND ts >= datetime('now', '-1 minute')
+                LIMIT 1
             """, (video_id, finish_event_id))
             
-            if cursor.fetchone()[0] > 0:
-                log_message(f"[AutoDelete] Skipping {video_id}: has recent play events after finish")
+            if cursor.fetchone():
+                log_message(f"[AutoDelete] Skipping {video_id}: has play events after finish")
                 return False
             
             log_message(f"[AutoDelete] Track {video_id} passed all safety checks, eligible for deletion")
@@ -178,7 +322,7 @@ class AutoDeleteService:
             return False
             
     def _auto_delete_track(self, conn: sqlite3.Connection, track_id: int, video_id: str, 
-                          relpath: str, channel_group: str, finish_ts: str) -> bool:
+                          relpath: str, channel_group: str, track_name: str) -> bool:
         """
         Auto-delete a track by moving it to trash and recording the deletion.
         """
@@ -202,39 +346,23 @@ class AutoDeleteService:
                 log_message(f"[AutoDelete] Failed to move {video_id} to trash")
                 return False
             
-            # Record deletion in database
-            cursor = conn.cursor()
-            
-            # Add to deleted_tracks table
-            cursor.execute("""
-                INSERT INTO deleted_tracks (
-                    video_id, original_path, channel_group, 
-                    deletion_reason, deleted_at
-                ) VALUES (?, ?, ?, ?, ?)
-            """, (
-                video_id, 
-                file_path, 
-                channel_group,
-                'auto_delete_after_finish',
-                finish_time
-            ))
-            
-            # Record deletion event in play_history
-            cursor.execute("""
-                INSERT INTO play_history (video_id, event, event_time, position, extra_data)
-                VALUES (?, 'auto_deleted', datetime('now'), ?, ?)
-            """, (video_id, 0.0, f'channel_group:{channel_group}'))
-            
-            # Update track record (mark as deleted)
-            cursor.execute("""
-                UPDATE tracks SET 
-                    file_path = NULL,
-                    deleted_at = datetime('now'),
-                    deletion_reason = 'auto_delete_after_finish'
-                WHERE id = ?
-            """, (track_id,))
-            
-            conn.commit()
+            # Trash path relative to the root's parent, as the manual delete records it
+            # (unknown when move_to_trash had to rename a conflicting file)
+            trash_file = self.root_dir / "Trash" / relpath
+            trash_path = str(trash_file.relative_to(self.root_dir.parent)) if trash_file.exists() else None
+
+            # Record deletion in database (deleted_tracks + history event)
+            from database import record_track_deletion
+            record_track_deletion(
+                conn,
+                video_id,
+                track_name or Path(relpath).stem,
+                relpath,
+                deletion_reason='auto_delete',
+                channel_group=channel_group,
+                trash_path=trash_path,
+                additional_data=f"auto_delete_after_finish,track_id:{track_id}",
+            )
             
             log_message(f"[AutoDelete] Successfully processed deletion for {video_id} from {channel_group}")
             return True
@@ -270,17 +398,17 @@ def stop_auto_delete_service():
 
 def trigger_auto_delete_check(video_id: str, finish_position: float):
     """
-    Trigger an immediate auto-delete check for a specific track.
-    This is called when a track finishes playing.
+    Queue an auto-delete check for a specific track that just finished.
+    Finishes stored through record_event are queued automatically; this is
+    for callers that bypass it.
     """
     try:
         service = get_auto_delete_service()
         if not service.is_running:
             return
             
-        # This will be handled by the periodic check, but we could add
-        # immediate processing here if needed
-        log_message(f"[AutoDelete] Finish event received for {video_id} at position {finish_position:.1f}s")
+        if service.enqueue_finish(video_id, finish_position):
+            log_message(f"[AutoDelete] Finish event queued for {video_id} at position {finish_position:.1f}s")
         
     except Exception as e:
-        log_message(f"[AutoDelete] Error in trigger_auto_delete_check: {e}") 
\ No newline at end of file
+        log_message(f"[AutoDelete] Error in trigger_auto_delete_check: {e}")
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Bulk Restore Engine
+
+Restores many deleted tracks from the trash in one pass instead of one
+move + several commits per track:
+
+- ``plan`` loads all deleted_tracks rows in one query, validates them with the
+  same rules as the single restore and picks each destination up front
+  (conflicting names get the usual ``_restored_<timestamp>`` suffix, also
+  between items of the same batch).
+- Moves on the same file system are plain renames and run inline; moves
+  across devices are copies and run in a small thread pool.
+- Every chunk of RESTORE_CHUNK_SIZE tracks is committed in one transaction
+  (restored flags + track_restored history rows), and progress is reported
+  per chunk.
+
+Used inline by /api/bulk_restore_tracks for small selections and by the
+BULK_RESTORE job for large ones.
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.logging_utils import log_message
+
+# Tracks per DB transaction / progress step
+RESTORE_CHUNK_SIZE = 200
+# Parallel cross-device copies
+RESTORE_COPY_WORKERS = 3
+# Selections up to this size are restored inside the HTTP request
+INLINE_RESTORE_LIMIT = 25
+
+
+def _target_folders(original_relpath: str) -> Tuple[str, Optional[str]]:
+    parts = Path(original_relpath).parts if original_relpath else ()
+    if len(parts) >= 2:
+        return parts[0], parts[1]
+    if len(parts) == 1:
+        return parts[0], None
+    return 'Unknown', None
+
+
+def _device_of(path: Path) -> Optional[int]:
+    """st_dev of ``path`` or of its nearest existing parent."""
+    for candidate in (path, *path.parents):
+        try:
+            return os.stat(candidate).st_dev
+        except OSError:
+            continue
+    return None
+
+
+class BulkRestoreEngine:
+    """Plans and executes file restores of deleted tracks in chunks."""
+
+    def __init__(
+        self,
+        conn,
+        root_dir: Path,
+        *,
+        chunk_size: int = RESTORE_CHUNK_SIZE,
+        copy_workers: int = RESTORE_COPY_WORKERS,
+        progress: Optional[Callable[[float, str], None]] = None,
+    ):
+        self.conn = conn
+        self.root_dir = Path(root_dir)
+        self.chunk_size = max(1, int(chunk_size))
+        self.copy_workers = max(1, int(copy_workers))
+        self.progress = progress
+
+    # ----- planning -----
+
+    def plan(self, track_ids: List[int]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Return (items to restore, failures) without touching any file."""
+        from database import bulk_lookup
+
+        items: List[Dict[str, Any]] = []
+        failed: List[Dict[str, Any]] = []
+        ids: List[int] = []
+        for raw_id in track_ids:
+            try:
+                ids.append(int(raw_id))
+            except (TypeError, ValueError):
+                failed.append({'track_id': raw_id, 'error': 'Invalid track id'})
+        ids = list(dict.fromkeys(ids))
+        rows = bulk_lookup(self.conn, "deleted_tracks", "id", ids)
+        reserved = set()
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+
+        for track_id in ids:
+            row = rows.get(track_id)
+            if row is None:
+                failed.append({
+                    'track_id': track_id,
+                    'error': 'Track not found in database',
+                    'diagnostic': 'No record with this ID exists in deleted_tracks table'
+                })
+                continue
+            track = dict(row)
+            original_relpath = track.get('original_relpath') or ''
+            trash_path = track.get('trash_path')
+            library_path = self.root_dir / original_relpath if original_relpath else None
+            library_exists = bool(library_path and library_path.exists())
+            details = {
+                'exists': True,
+                'id': track.get('id'),
+                'video_id': track.get('video_id'),
+                'restored_at': track.get('restored_at'),
+                'can_restore': track.get('can_restore'),
+                'trash_path': trash_path,
+                'original_relpath': original_relpath,
+            }
+
+            if track.get('restored_at') is not None and library_exists:
+                failed.append({
+                    'track_id': track_id,
+                    'error': 'Track already restored',
+                    'diagnostic': f"restored_at = {track.get('restored_at')}",
+                    'details': details,
+                    'restored_file_path': str(library_path),
+                    'file_exists': True,
+                    'restored_at': track.get('restored_at')
+                })
+                continue
+
+            item = {'track_id': track_id, 'track': track, 'source': None, 'destination': library_path}
+            if not trash_path:
+                if library_exists:
+                    item['mode'] = 'in_place'
+                    items.append(item)
+                else:
+                    failed.append({
+                        'track_id': track_id,
+                        'error': 'No trash path available for restoration',
+                        'diagnostic': 'trash_path is NULL or empty and library file not found at original_relpath',
+                        'details': details,
+                        'restored_file_path': str(library_path) if library_path else None,
+                        'file_exists': False,
+                    })
+                continue
+            if not original_relpath:
+                failed.append({
+                    'track_id': track_id,
+                    'error': 'No original path available for restoration',
+                    'diagnostic': 'original_relpath is NULL or empty',
+                    'details': details,
+                })
+                continue
+
+            source = self.root_dir.parent / trash_path  # trash_path is relative to root_dir.parent
+            if not source.exists():
+                failed.append({
+                    'track_id': track_id,
+                    'error': 'File not found in trash folder',
+                    'diagnostic': f'trash file missing: {source}',
+                    'details': details,
+                    'restored_file_path': str(library_path),
+                    'file_exists': library_exists,
+                    'trash_path': str(source)
+                })
+                continue
+
+            destination = library_path
+            if library_exists or str(destination) in reserved:
+                stem, dot, ext = library_path.name.rpartition('.')
+                base = f"{stem}_restored_{timestamp}" if dot else f"{library_path.name}_restored_{timestamp}"
+                counter = 0
+                while True:
+                    name = base + (f"_{counter}" if counter else "")
+                    destination = library_path.parent / (f"{name}.{ext}" if dot else name)
+                    if str(destination) not in reserved and not destination.exists():
+                        break
+                    counter += 1
+            reserved.add(str(destination))
+
+            item['source'] = source
+            item['destination'] = destination
+            item['mode'] = 'rename' if _device_of(source) == _device_of(destination.parent) else 'copy'
+            items.append(item)
+        return items, failed
+
+    # ----- execution -----
+
+    def _move(self, item: Dict[str, Any]) -> Optional[str]:
+        try:
+            if item['mode'] == 'rename':
+                os.rename(item['source'], item['destination'])
+            else:
+                shutil.move(str(item['source']), str(item['destination']))
+            return None
+        except Exception as e:
+            return str(e)
+
+    def _run_chunk(self, chunk: List[Dict[str, Any]], pool: ThreadPoolExecutor):
+        from database import restore_deleted_tracks_batch
+        from services.disk_usage_service import get_disk_usage_service
+
+        for directory in {item['destination'].parent for item in chunk if item['source']}:
+            directory.mkdir(parents=True, exist_ok=True)
+
+        errors: Dict[int, str] = {}
+        copies = [item for item in chunk if item['mode'] == 'copy']
+        copy_futures = [(item, pool.submit(self._move, item)) for item in copies]
+        for item in chunk:
+            if item['mode'] == 'rename':
+                error = self._move(item)
+                if error:
+                    errors[item['track_id']] = error
+        for item, future in copy_futures:
+            error = future.result()
+            if error:
+                errors[item['track_id']] = error
+
+        done: List[Dict[str, Any]] = []
+        failed: List[Dict[str, Any]] = []
+        for item in chunk:
+            if item['track_id'] in errors:
+                failed.append({'track_id': item['track_id'], 'error': f"Failed to restore file from trash: {errors[item['track_id']]}"})
+                continue
+            try:
+                item['size'] = item['destination'].stat().st_size
+            except OSError:
+                failed.append({'track_id': item['track_id'], 'error': 'File restoration failed - file not found after move'})
+                continue
+            done.append(item)
+
+        get_disk_usage_service().note_files_moved(
+            (item['source'], item['destination'], item['size']) for item in done if item['source']
+        )
+
+        records = []
+        for item in done:
+            track = item['track']
+            target_folder, channel_folder = _target_folders(track.get('original_relpath') or '')
+            payload = {
+                "track_id": item['track_id'],
+                "video_id": track.get('video_id'),
+                "original_name": track.get('original_name'),
+                "target_folder": target_folder,
+                "channel_folder": channel_folder,
+                "channel_group": track.get('channel_group'),
+                "method": "file_restore",
+                "original_relpath": track.get('original_relpath'),
+                "trash_path": track.get('trash_path'),
+                "restored_file_path": str(item['destination']),
+                "restored_file_size": item['size'],
+                "restoration_successful": True,
+                "bulk_operation": True,
+            }
+            if item['mode'] == 'in_place':
+                payload["in_place_no_trash"] = True
+            records.append((item['track_id'], track.get('video_id'), json.dumps(payload)))
+        try:
+            restore_deleted_tracks_batch(self.conn, records)
+        except Exception as e:
+            log_message(f"[Restore] Bulk: database update failed for {len(done)} moved files: {e}")
+            failed.extend(
+                {'track_id': item['track_id'], 'error': f'File restored but database update failed: {e}',
+                 'restored_file_path': str(item['destination'])}
+                for item in done
+            )
+            return [], failed
+        return done, failed
+
+    def _result_entry(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        track = item['track']
+        target_folder, _ = _target_folders(track.get('original_relpath') or '')
+        entry = {
+            'track_id': item['track_id'],
+            'job_id': None,
+            'video_id': track.get('video_id'),
+            'target_folder': target_folder,
+            'restored_file_path': str(item['destination']),
+            'restored_file_size': item.get('size'),
+        }
+        if item['mode'] == 'in_place':
+            entry['in_place_no_trash'] = True
+        else:
+            entry.update({
+                'trash_path': track.get('trash_path'),
+                'original_relpath': track.get('original_relpath'),
+                'full_trash_path': str(item['source']),
+                'full_original_path': str(item['destination']),
+            })
+        return entry
+
+    def run(self, track_ids: List[int]) -> Dict[str, Any]:
+        """Restore ``track_ids`` from the trash; returns the bulk restore summary."""
+        started = time.monotonic()
+        items, failed_tracks = self.plan(track_ids)
+        renames = sum(1 for item in items if item['mode'] == 'rename')
+        copies = sum(1 for item in items if item['mode'] == 'copy')
+        log_message(
+            f"[Restore] Bulk: {len(track_ids)} requested, {len(items)} planned "
+            f"({renames} renames, {copies} copies, {len(items) - renames - copies} in place), "
+            f"{len(failed_tracks)} rejected"
+        )
+
+        successful: List[Dict[str, Any]] = []
+        with ThreadPoolExecutor(max_workers=self.copy_workers, thread_name_prefix="bulk-restore") as pool:
+            for start in range(0, len(items), self.chunk_size):
+                done, failed = self._run_chunk(items[start:start + self.chunk_size], pool)
+                successful.extend(self._result_entry(item) for item in done)
+                failed_tracks.extend(failed)
+                processed = min(start + self.chunk_size, len(items))
+                if self.progress:
+                    self.progress(
+                        processed / len(items) * 100,
+                        f"{processed}/{len(items)} tracks processed ({len(successful)} restored)",
+                    )
+
+        summary = {
+            "method": "file_restore",
+            "total_requested": len(track_ids),
+            "total_successful": len(successful),
+            "total_failed": len(failed_tracks),
+            "successful_jobs": successful,
+            "failed_tracks": failed_tracks,
+            "renames": renames,
+            "copies": copies,
+            "duration_seconds": round(time.monotonic() - started, 1),
+        }
+        self._record_summary(summary)
+        log_message(
+            f"[Restore] Bulk restore completed: {summary['total_successful']}/{summary['total_requested']} "
+            f"restored, {summary['total_failed']} failed in {summary['duration_seconds']}s"
+        )
+        return summary
+
+    def _record_summary(self, summary: Dict[str, Any]) -> None:
+        from database import record_event
+
+        try:
+            record_event(
+                self.conn,
+                "system",  # Use "system" as video_id for bulk operations
+                "bulk_track_restore",
+                additional_data=json.dumps({
+                    "method": summary["method"],
+                    "total_requested": summary["total_requested"],
+                    "total_successful": summary["total_successful"],
+                    "total_failed": summary["total_failed"],
+                    "successful_jobs": [],
+                    "failed_track_ids": [failure['track_id'] for failure in summary["failed_tracks"]],
+                    "operation_type": "bulk_restore",
+                }),
+            )
+        except Exception as e:
+            log_message(f"[Restore] ERROR: Failed to record summary event: {e}")
@@ -7,12 +7,25 @@ Provides unified business logic for single channel and group channel synchroniza
 
 import sqlite3
 import threading
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from pathlib import Path
 
 # Database and shared utilities
 from controllers.api.shared import get_connection, log_message, get_root_dir, record_event
 import database as db
+from utils.ytdlp_format_retry import output_is_throttled
+from utils.ytdlp_throttle import ytdlp_request
+from services.group_sync_coordinator import DEFAULT_GROUP_SYNC_CONCURRENCY
+
+# Quick sync lists this many newest videos in one flat request (the old batch
+# loop stopped at 60 batches of 5)
+QUICK_SYNC_LISTING_SIZE = 300
+# Concurrent full-metadata fetches for videos the listing shows as new
+QUICK_SYNC_METADATA_WORKERS = 4
+# User setting toggling the uploads-feed check before group quick syncs
+QUICK_SYNC_FEED_CHECK_SETTING = "quick_sync_feed_check"
+# User setting: channels a group quick sync runs at once (1 = one QUICK_SYNC job per channel)
+QUICK_SYNC_GROUP_CONCURRENCY_SETTING = "quick_sync_group_concurrency"
 
 
 class ChannelSyncService:
@@ -393,16 +406,24 @@ class ChannelSyncService:
     
     def quick_sync_channel_group(
         self,
-        group_id: int
+        group_id: int,
+        feed_check: Optional[bool] = None
     ) -> Dict[str, Any]:
         """
         Quick sync all channels in a group.
         
-        Creates QUICK_SYNC jobs for all channels in the group. Each job will process
-        channels individually with optimized metadata fetching.
+        Creates one QUICK_SYNC_GROUP job that syncs the channels concurrently
+        (services.group_sync_coordinator), or one QUICK_SYNC job per channel when the
+        ``quick_sync_group_concurrency`` setting is 1.
+        
+        With the feed check enabled, each channel's uploads feed is fetched first
+        (conditional request, see utils.channel_feed) and channels whose feed shows
+        nothing new are skipped without starting yt-dlp.
         
         Args:
             group_id: ID of the channel group to quick sync
+            feed_check: Run the feed change-detection stage; None reads the
+                ``quick_sync_feed_check`` user setting (default on)
             
         Returns:
             Dict with sync result: {"status": "started", "message": "...", "jobs_created": 5}
@@ -425,11 +446,27 @@ class ChannelSyncService:
                 return {"status": "error", "error": "No channels found in group"}
             
             channels = [dict(channel) for channel in channels_raw]
+            
+            if feed_check is None:
+                feed_check = (db.get_user_setting(conn, QUICK_SYNC_FEED_CHECK_SETTING, 'true') or 'true').lower() == 'true'
+            feed_decisions = self._check_channel_feeds(conn, channels) if feed_check else {}
+            try:
+                concurrency = int(db.get_user_setting(conn, QUICK_SYNC_GROUP_CONCURRENCY_SETTING, '') or DEFAULT_GROUP_SYNC_CONCURRENCY)
+            except ValueError:
+                concurrency = DEFAULT_GROUP_SYNC_CONCURRENCY
             conn.close()
             
             log_message(f"[Quick Sync Group] Starting quick sync for group: {group['name']}")
             log_message(f"[Quick Sync Group] Found {len(channels)} channels to process")
             
+            skipped_unchanged = [
+                channel for channel in channels
+                if not feed_decisions.get(channel['id'], {}).get('sync', True)
+            ]
+            if skipped_unchanged:
+                channels = [c for c in channels if c not in skipped_unchanged]
+                log_message(f"[Quick Sync Group] Feed unchanged, skipping {len(skipped_unchanged)} channels")
+            
             # Create quick sync jobs for all channels
             try:
                 from services.job_queue_service import get_job_queue_service
@@ -437,11 +474,44 @@ class ChannelSyncService:
                 
                 job_service = get_job_queue_service()
                 
+                if concurrency > 1 and len(channels) > 1:
+                    # One coordinated job runs the channels concurrently behind the shared rate limiter
+                    job_id = job_service.create_and_add_job(
+                        JobType.QUICK_SYNC_GROUP,
+                        priority=JobPriority.HIGH,
+                        group_id=group_id,
+                        group_name=group['name'],
+                        concurrency=concurrency,
+                        channels=[{'id': c['id'], 'name': c['name']} for c in channels],
+                        feed_updates={
+                            str(c['id']): feed_decisions[c['id']]['feed_update']
+                            for c in channels
+                            if (feed_decisions.get(c['id']) or {}).get('feed_update')
+                        }
+                    )
+                    log_message(f"[Quick Sync Group] Created group job #{job_id} for {len(channels)} channels (concurrency {concurrency})")
+                    return {
+                        "status": "started",
+                        "message": f"Quick sync started for {len(channels)} channels in group '{group['name']}'"
+                                   + (f" ({len(skipped_unchanged)} unchanged, skipped)" if skipped_unchanged else ""),
+                        "group_name": group['name'],
+                        "group_id": group_id,
+                        "channels_count": len(channels) + len(skipped_unchanged),
+                        "jobs_created": 1,
+                        "failed_jobs": 0,
+                        "skipped_unchanged": len(skipped_unchanged),
+                        "feed_check": bool(feed_check),
+                        "concurrency": concurrency,
+                        "created_jobs": [{'job_id': job_id, 'group_id': group_id, 'channels': len(channels)}],
+                        "process": "quick_sync_group_coordinated"
+                    }
+                
                 created_jobs = []
                 failed_jobs = 0
                 
                 for channel in channels:
                     try:
+                        decision = feed_decisions.get(channel['id']) or {}
                         # Create quick sync job with high priority
                         job_id = job_service.create_and_add_job(
                             JobType.QUICK_SYNC,
@@ -449,7 +519,9 @@ class ChannelSyncService:
                             channel_id=channel['id'],
                             channel_name=channel['name'],
                             channel_url=channel['url'],
-                            group_name=group['name']
+                            group_name=group['name'],
+                            feed_reason=decision.get('reason'),
+                            feed_update=decision.get('feed_update')
                         )
                         
                         created_jobs.append({
@@ -467,15 +539,19 @@ class ChannelSyncService:
                 log_message(f"[Quick Sync Group] Quick sync group completed:")
                 log_message(f"[Quick Sync Group]   - Jobs created: {len(created_jobs)}")
                 log_message(f"[Quick Sync Group]   - Failed to create: {failed_jobs}")
+                log_message(f"[Quick Sync Group]   - Skipped (feed unchanged): {len(skipped_unchanged)}")
                 
                 return {
                     "status": "started",
-                    "message": f"Quick sync started for {len(created_jobs)} channels in group '{group['name']}'",
+                    "message": f"Quick sync started for {len(created_jobs)} channels in group '{group['name']}'"
+                               + (f" ({len(skipped_unchanged)} unchanged, skipped)" if skipped_unchanged else ""),
                     "group_name": group['name'],
                     "group_id": group_id,
-                    "channels_count": len(channels),
+                    "channels_count": len(channels) + len(skipped_unchanged),
                     "jobs_created": len(created_jobs),
                     "failed_jobs": failed_jobs,
+                    "skipped_unchanged": len(skipped_unchanged),
+                    "feed_check": bool(feed_check),
                     "created_jobs": created_jobs,
                     "process": "quick_sync_group_queued"
                 }
@@ -532,6 +608,17 @@ class ChannelSyncService:
             log_message(f"[Quick Sync Group] Error quick syncing channel group: {e}")
             return {"status": "error", "error": str(e)}
     
+    def _check_channel_feeds(self, conn: sqlite3.Connection, channels: List[Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+        """Feed change-detection decisions; releases channels always sync (not in the uploads feed)."""
+        try:
+            from utils.channel_feed import check_channel_feeds
+            from utils.youtube_channel_urls import is_releases_url
+            candidates = [c for c in channels if not is_releases_url(c['url'])]
+            return check_channel_feeds(conn, candidates) if candidates else {}
+        except Exception as e:
+            log_message(f"[Quick Sync Group] Feed check failed, syncing all channels: {e}")
+            return {}
+    
     def _update_channel_track_count(self, channel_id: int, channel: Dict[str, Any], group: Optional[Dict[str, Any]]) -> int:
         """Persist current downloaded track count for a channel (always recalculated on quick sync)."""
         try:
@@ -648,6 +735,79 @@ class ChannelSyncService:
                 "error": "Quick sync requires job queue system which is not available",
             }
 
+    @staticmethod
+    def _list_newest_videos(
+        channel_url: str, cookie_opts: Dict[str, Any], limit: int
+    ) -> Tuple[Optional[List[Dict[str, Any]]], Optional[Dict[str, Any]]]:
+        """Newest ``limit`` videos of a channel as flat entries (id, title, duration) in one request.
+        
+        Returns (listing, None), or (None, failure) when the listing itself
+        failed; failure holds the yt-dlp error and whether it was a 403/429.
+        """
+        from yt_dlp import YoutubeDL
+        from utils.yt_dlp_js import merge_ytdlp_js_params
+        from utils.youtube_channel_urls import channel_videos_tab_url, is_youtube_video_id
+        
+        ydl_opts = merge_ytdlp_js_params({
+            "quiet": True,
+            "skip_download": True,
+            "extract_flat": "in_playlist",
+            "playlist_items": f"1:{int(limit)}",
+            "ignoreerrors": True,
+            **cookie_opts
+        })
+        try:
+            with ytdlp_request() as ytdlp_logger:
+                with YoutubeDL({**ydl_opts, "logger": ytdlp_logger}) as ydl:
+                    info = ydl.extract_info(channel_videos_tab_url(channel_url), download=False)
+        except Exception as e:
+            log_message(f"[Quick Sync] Flat listing failed: {e}")
+            return None, {"error": str(e), "throttled": output_is_throttled(stderr=str(e))}
+        if not info:
+            if ytdlp_logger.last_error:
+                log_message(f"[Quick Sync] Flat listing failed: {ytdlp_logger.last_error}")
+            return None, {"error": ytdlp_logger.last_error, "throttled": ytdlp_logger.throttled}
+        
+        listing = []
+        seen = set()
+        for entry in info.get('entries') or []:
+            video_id = (entry or {}).get('id')
+            if not is_youtube_video_id(video_id) or video_id in seen:
+                continue
+            seen.add(video_id)
+            listing.append(entry)
+        return listing, None
+    
+    @staticmethod
+    def _fetch_video_metadata(video_ids: List[str], cookie_opts: Dict[str, Any]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Full yt-dlp metadata for each ID, QUICK_SYNC_METADATA_WORKERS at a time."""
+        if not video_ids:
+            return {}
+        from concurrent.futures import ThreadPoolExecutor
+        from yt_dlp import YoutubeDL
+        from utils.yt_dlp_js import merge_ytdlp_js_params
+        
+        ydl_opts = merge_ytdlp_js_params({
+            "quiet": True,
+            "skip_download": True,
+            "ignoreerrors": True,
+            **cookie_opts
+        })
+        
+        def _fetch(video_id: str) -> Optional[Dict[str, Any]]:
+            # YoutubeDL instances are not thread-safe; one per call
+            try:
+                with ytdlp_request() as ytdlp_logger:
+                    with YoutubeDL({**ydl_opts, "logger": ytdlp_logger}) as ydl:
+                        return ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=False)
+            except Exception as e:
+                log_message(f"[Quick Sync] Metadata fetch failed for {video_id}: {e}")
+                return None
+        
+        workers = max(1, min(QUICK_SYNC_METADATA_WORKERS, len(video_ids)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="quick-sync-meta") as pool:
+            return dict(zip(video_ids, pool.map(_fetch, video_ids)))
+    
     def quick_sync_channel_core(
         self,
         channel_id: int
@@ -655,9 +815,9 @@ class ChannelSyncService:
         """
         Quick sync logic for a single channel.
         
-        Fetches metadata directly from YouTube starting from the newest videos,
-        and stops when it reaches already downloaded content. This is much more
-        efficient than full metadata extraction.
+        Lists the newest videos in one flat request, stops at the first ID the
+        library already knows (downloaded or deleted, looked up in one batch),
+        and fetches full metadata concurrently only for the videos before it.
         
         Args:
             channel_id: ID of the channel to quick sync
@@ -690,11 +850,9 @@ class ChannelSyncService:
                 log_message("[Quick Sync] Releases tab detected - syncing missing album tracks from metadata")
                 return self._quick_sync_releases_channel_core(channel, group, channel_id)
             
-            # Step 1: Get latest videos metadata directly from YouTube in batches
+            # Step 1: Find new videos (flat listing + known-ID set) and fetch their metadata
             try:
                 from utils.cookies_manager import get_cookies_for_download
-                from utils.yt_dlp_js import merge_ytdlp_js_params
-                from yt_dlp import YoutubeDL
                 
                 # Get cookies configuration
                 cookies_path, use_browser = get_cookies_for_download(None, False)
@@ -710,132 +868,118 @@ class ChannelSyncService:
                 if use_browser and not cookies_path:
                     common_cookies.setdefault("cookiesfrombrowser", ("chrome",))
                 
-                # Configure yt-dlp for quick metadata extraction (EJS: js runtime + yt-dlp-ejs scripts)
-                ydl_opts = merge_ytdlp_js_params({
-                    "quiet": True,
-                    "skip_download": True,
-                    "extract_flat": False,  # We need full metadata for dates
-                    "ignoreerrors": True,
-                    **common_cookies
-                })
+                # Phase 1: one flat request for the newest video IDs
+                listing, failure = self._list_newest_videos(channel['url'], common_cookies, QUICK_SYNC_LISTING_SIZE)
+                if listing is None:
+                    detail = failure.get("error")
+                    return {
+                        "status": "error",
+                        "error": f"Failed to list channel videos: {detail}" if detail else "Failed to list channel videos",
+                        # Read by GroupSyncCoordinator to back off on 403/429
+                        "throttled": bool(failure.get("throttled")),
+                    }
+                log_message(f"[Quick Sync] Listed {len(listing)} newest videos in one request")
                 
-                new_videos_to_download = []
-                batch_size = 5  # Very small batch for ultra-fast detection of already downloaded videos
-                current_batch = 1
-                found_downloaded_video = False
+                # Phase 2: set difference against IDs the library already knows
+                conn = get_connection()
+                try:
+                    known = db.get_known_video_ids(conn, [entry['id'] for entry in listing])
+                finally:
+                    conn.close()
                 
-                log_message(f"[Quick Sync] Fetching metadata in batches of {batch_size} videos...")
+                candidates = []
+                for entry in listing:
+                    video_id = entry['id']
+                    video_title = entry.get('title') or f'Video {video_id}'
+                    if video_id in known:
+                        log_message(f"[Quick Sync] Found already {known[video_id]} video: {video_title[:50]}...")
+                        log_message(f"[Quick Sync] Stopping here - reached already downloaded content")
+                        break
+                    # Flat entries already carry duration for most videos; skip obvious shorts early
+                    duration = entry.get('duration')
+                    if duration and duration < 60:
+                        log_message(f"[Quick Sync] Skipping short video: {video_title[:50]}... ({duration}s)")
+                        continue
+                    candidates.append(entry)
                 
-                while not found_downloaded_video and current_batch <= 60:  # Limit to 60 batches (300 videos max)
-                    start_index = (current_batch - 1) * batch_size + 1
-                    end_index = current_batch * batch_size
+                log_message(
+                    f"[Quick Sync] {len(candidates)} new of {len(listing)} listed "
+                    f"({len(known)} known); fetching full metadata for new videos only"
+                )
+                
+                # Phase 3: full metadata only for the new IDs, concurrently
+                full_entries = self._fetch_video_metadata(
+                    [entry['id'] for entry in candidates], common_cookies
+                )
+                
+                new_videos_to_download = []
+                for flat_entry in candidates:
+                    video_id = flat_entry['id']
+                    entry = full_entries.get(video_id)
+                    if not entry:
+                        log_message(f"[Quick Sync] Skipping {video_id}: metadata unavailable")
+                        continue
+                    
+                    video_title = entry.get('title') or flat_entry.get('title') or f'Video {video_id}'
+                    
+                    # Check if video is available for download
+                    availability = entry.get('availability', 'public')
+                    if availability in ['private', 'premium_only', 'subscriber_only']:
+                        log_message(f"[Quick Sync] Skipping unavailable video: {video_title[:50]}... ({availability})")
+                        continue
                     
-                    log_message(f"[Quick Sync] Processing batch {current_batch}: videos {start_index}-{end_index}")
+                    # Check if it's a short (duration < 60 seconds)
+                    duration = entry.get('duration')
+                    if duration and duration < 60:
+                        log_message(f"[Quick Sync] Skipping short video: {video_title[:50]}... ({duration}s)")
+                        continue
                     
-                    # Set playlist items for this batch
-                    ydl_opts["playlist_items"] = f"{start_index}:{end_index}"
+                    # Check if it's a live stream (skip until finished)
+                    from utils.youtube_channel_urls import is_active_live_stream
+                    if is_active_live_stream(entry):
+                        live_status = entry.get('live_status') or 'is_live'
+                        log_message(f"[Quick Sync] Skipping live/upcoming video: {video_title[:50]}... ({live_status})")
+                        continue
                     
+                    # Get publication date
+                    timestamp = entry.get('timestamp') or entry.get('release_timestamp')
+                    pub_date = None
+                    if timestamp:
+                        try:
+                            from datetime import datetime
+                            pub_date = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d')
+                        except (ValueError, OSError):
+                            pass
+                    
+                    # This video should be downloaded
+                    new_videos_to_download.append({
+                        'video_id': video_id,
+                        'title': video_title,
+                        'pub_date': pub_date,
+                        'duration': duration,
+                        'availability': availability
+                    })
+                    
+                    # Save metadata to database for later use by scan_to_db.py
                     try:
-                        with YoutubeDL(ydl_opts) as ydl:
-                            # Extract metadata for this batch
-                            info = ydl.extract_info(channel['url'], download=False)
-                            
-                            if not info or 'entries' not in info:
-                                log_message(f"[Quick Sync] No videos found in batch {current_batch}")
-                                break
-                            
-                            entries = info.get('entries', [])
-                            if not entries:
-                                log_message(f"[Quick Sync] Empty batch {current_batch}, stopping")
-                                break
-                            
-                            log_message(f"[Quick Sync] Found {len(entries)} videos in batch {current_batch}")
+                        from utils.metadata_utils import save_video_metadata_from_entry
+                        
+                        # Save metadata using common utility function
+                        success = save_video_metadata_from_entry(
+                            entry=entry,
+                            channel_url=channel['url'],  # Use original channel URL
+                            logger_func=lambda msg: log_message(f"[Quick Sync] {msg}")
+                        )
+                        
+                        if success:
+                            log_message(f"[Quick Sync] Saved metadata for: {video_title[:50]}...")
+                        else:
+                            log_message(f"[Quick Sync] Warning: Failed to save metadata for {video_id}")
                             
-                            # Process each video in this batch
-                            for entry in entries:
-                                if not entry:  # Skip None entries
-                                    continue
-                                    
-                                video_id = entry.get('id')
-                                if not video_id:
-                                    continue
-                                
-                                video_title = entry.get('title', f'Video {video_id}')
-                                
-                                # Check if this video is already downloaded
-                                conn = get_connection()
-                                if db.is_track_already_downloaded(conn, video_id):
-                                    log_message(f"[Quick Sync] Found already downloaded video: {video_title[:50]}...")
-                                    log_message(f"[Quick Sync] Stopping here - reached already downloaded content")
-                                    conn.close()
-                                    found_downloaded_video = True
-                                    break
-                                conn.close()
-                                
-                                # Check if video is available for download
-                                availability = entry.get('availability', 'public')
-                                if availability in ['private', 'premium_only', 'subscriber_only']:
-                                    log_message(f"[Quick Sync] Skipping unavailable video: {video_title[:50]}... ({availability})")
-                                    continue
-                                
-                                # Check if it's a short (duration < 60 seconds)
-                                duration = entry.get('duration')
-                                if duration and duration < 60:
-                                    log_message(f"[Quick Sync] Skipping short video: {video_title[:50]}... ({duration}s)")
-                                    continue
-                                
-                                # Check if it's a live stream (skip until finished)
-                                from utils.youtube_channel_urls import is_active_live_stream
-                                if is_active_live_stream(entry):
-                                    live_status = entry.get('live_status') or 'is_live'
-                                    log_message(f"[Quick Sync] Skipping live/upcoming video: {video_title[:50]}... ({live_status})")
-                                    continue
-                                
-                                # Get publication date
-                                timestamp = entry.get('timestamp') or entry.get('release_timestamp')
-                                pub_date = None
-                                if timestamp:
-                                    try:
-                                        from datetime import datetime
-                                        pub_date = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d')
-                                    except (ValueError, OSError):
-                                        pass
-                                
-                                # This video should be downloaded
-                                new_videos_to_download.append({
-                                    'video_id': video_id,
-                                    'title': video_title,
-                                    'pub_date': pub_date,
-                                    'duration': duration,
-                                    'availability': availability
-                                })
-                                
-                                # Save metadata to database for later use by scan_to_db.py
-                                try:
-                                    from utils.metadata_utils import save_video_metadata_from_entry
-                                    
-                                    # Save metadata using common utility function
-                                    success = save_video_metadata_from_entry(
-                                        entry=entry,
-                                        channel_url=channel['url'],  # Use original channel URL
-                                        logger_func=lambda msg: log_message(f"[Quick Sync] {msg}")
-                                    )
-                                    
-                                    if success:
-                                        log_message(f"[Quick Sync] Saved metadata for: {video_title[:50]}...")
-                                    else:
-                                        log_message(f"[Quick Sync] Warning: Failed to save metadata for {video_id}")
-                                        
-                                except Exception as e:
-                                    log_message(f"[Quick Sync] Warning: Failed to save metadata for {video_id}: {e}")
-                                
-                                log_message(f"[Quick Sync] Will download: {video_title[:50]}... ({pub_date or 'unknown date'})")
-                    
                     except Exception as e:
-                        log_message(f"[Quick Sync] Error processing batch {current_batch}: {e}")
-                        break
+                        log_message(f"[Quick Sync] Warning: Failed to save metadata for {video_id}: {e}")
                     
-                    current_batch += 1
+                    log_message(f"[Quick Sync] Will download: {video_title[:50]}... ({pub_date or 'unknown date'})")
                 
                 log_message(f"[Quick Sync] Metadata extraction completed. Found {len(new_videos_to_download)} new videos to download.")
                 
@@ -845,7 +989,7 @@ class ChannelSyncService:
                         "status": "up_to_date",
                         "message": f"Channel '{channel['name']}' is up to date. No new videos to download.",
                         "channel_name": channel['name'],
-                        "batches_processed": current_batch - 1,
+                        "listed_videos": len(listing),
                         "new_videos": 0,
                         "track_count": track_count,
                     }
@@ -897,7 +1041,7 @@ class ChannelSyncService:
                     
                     log_message(f"[Quick Sync] Quick sync completed:")
                     log_message(f"[Quick Sync]   - Channel: {channel['name']}")
-                    log_message(f"[Quick Sync]   - Batches processed: {current_batch - 1}")
+                    log_message(f"[Quick Sync]   - Videos listed: {len(listing)}")
                     log_message(f"[Quick Sync]   - New videos found: {len(new_videos_to_download)}")
                     log_message(f"[Quick Sync]   - Download jobs created: {created_jobs}")
                     log_message(f"[Quick Sync]   - Failed jobs: {failed_jobs}")
@@ -912,7 +1056,7 @@ class ChannelSyncService:
                         "new_videos": len(new_videos_to_download),
                         "jobs_created": created_jobs,
                         "jobs_failed": failed_jobs,
-                        "batches_processed": current_batch - 1,
+                        "listed_videos": len(listing),
                         "track_count": track_count,
                         "process": "quick_sync_optimized"
                     }
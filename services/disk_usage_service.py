@@ -0,0 +1,244 @@
+"""Disk Usage Service
+
+Keeps the storage and trash totals shown on the deleted-tracks page without
+walking the library on every request.
+
+- Per-directory totals live in the dir_usage table (files directly inside a
+  directory); the total of a tree is a prefix sum over it.
+- Code that adds, moves or removes files reports it (``note_file_*``,
+  ``refresh_directory``), which adjusts only the directories involved.
+- ``get_usage`` returns the cached totals and starts a background walk of the
+  tree when it was never walked or the last walk is older than
+  RECONCILE_MAX_AGE_SECONDS, so changes made outside the app (or missed
+  hooks) are corrected eventually.
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+from utils.logging_utils import log_message
+
+# Re-walk a tree when its last full walk is older than this
+RECONCILE_MAX_AGE_SECONDS = 6 * 3600
+# Walks repeated at most this many times when files change during a walk
+RECONCILE_MAX_PASSES = 2
+
+PathLike = Union[str, Path]
+
+
+def scan_tree(root: PathLike) -> Dict[str, Tuple[int, int]]:
+    """Walk ``root`` with os.scandir; {directory: (bytes, files)} for directories holding files."""
+    totals: Dict[str, Tuple[int, int]] = {}
+    stack = [str(root)]
+    while stack:
+        directory = stack.pop()
+        size = files = 0
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file():
+                            size += entry.stat().st_size
+                            files += 1
+                    except OSError:
+                        continue
+        except OSError as e:
+            log_message(f"[DiskUsage] Warning: Could not scan {directory}: {e}")
+            continue
+        if files:
+            totals[directory] = (size, files)
+    return totals
+
+
+def scan_directory(directory: PathLike) -> Tuple[int, int]:
+    """Size and count of the files directly inside ``directory``."""
+    size = files = 0
+    try:
+        with os.scandir(str(directory)) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file():
+                        size += entry.stat().st_size
+                        files += 1
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return size, files
+
+
+class DiskUsageService:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # normalized root -> walk thread
+        self._reconciling: Dict[str, threading.Thread] = {}
+        # roots that saw a change while being walked
+        self._changed_during_walk: set = set()
+
+    # ----- incremental updates -----
+
+    def _apply(self, deltas: Dict[str, Tuple[int, int]]) -> None:
+        try:
+            from database import get_connection, adjust_dir_usage, normalize_usage_path
+
+            self._mark_changed([normalize_usage_path(path) for path in deltas])
+            conn = get_connection()
+            try:
+                adjust_dir_usage(conn, deltas)
+            finally:
+                conn.close()
+        except Exception as e:
+            log_message(f"[DiskUsage] Warning: Could not update cached usage: {e}")
+
+    def _mark_changed(self, paths) -> None:
+        with self._lock:
+            for root in self._reconciling:
+                if any(path == root or path.startswith(root.rstrip("/") + "/") for path in paths):
+                    self._changed_during_walk.add(root)
+
+    def note_file_added(self, path: PathLike, size: Optional[int] = None) -> None:
+        """A file appeared at ``path`` (size is read from disk when omitted)."""
+        path = Path(path)
+        if size is None:
+            try:
+                size = path.stat().st_size
+            except OSError:
+                return
+        self._apply({str(path.parent): (size, 1)})
+
+    def note_file_removed(self, path: PathLike, size: int) -> None:
+        """A file of ``size`` bytes was deleted from ``path``."""
+        self._apply({str(Path(path).parent): (-int(size), -1)})
+
+    def note_file_moved(self, source: PathLike, target: PathLike, size: Optional[int] = None) -> None:
+        """A file was moved from ``source`` to ``target`` (e.g. to or from the trash)."""
+        source, target = Path(source), Path(target)
+        if size is None:
+            try:
+                size = target.stat().st_size
+            except OSError:
+                return
+        if source.parent == target.parent:
+            return
+        self._apply({str(source.parent): (-size, -1), str(target.parent): (size, 1)})
+
+    def note_files_moved(self, moves) -> None:
+        """Batch form of note_file_moved: iterable of (source, target, size)."""
+        deltas: Dict[str, Tuple[int, int]] = {}
+        for source, target, size in moves:
+            source_dir, target_dir = str(Path(source).parent), str(Path(target).parent)
+            if source_dir == target_dir or size is None:
+                continue
+            for directory, sign in ((source_dir, -1), (target_dir, 1)):
+                size_delta, files_delta = deltas.get(directory, (0, 0))
+                deltas[directory] = (size_delta + sign * size, files_delta + sign)
+        if deltas:
+            self._apply(deltas)
+
+    def refresh_directory(self, directory: PathLike) -> None:
+        """Rescan one directory (not recursive), e.g. a download folder after a job."""
+        try:
+            from database import get_connection, set_dir_usage, normalize_usage_path
+
+            self._mark_changed([normalize_usage_path(directory)])
+            size, files = scan_directory(directory)
+            conn = get_connection()
+            try:
+                set_dir_usage(conn, directory, size, files)
+            finally:
+                conn.close()
+        except Exception as e:
+            log_message(f"[DiskUsage] Warning: Could not refresh {directory}: {e}")
+
+    # ----- reconciliation -----
+
+    def reconcile(self, root: PathLike) -> Dict[str, int]:
+        """Walk ``root`` and replace its cached rows (blocking)."""
+        from database import get_connection, replace_dir_usage_tree, normalize_usage_path
+
+        key = normalize_usage_path(root)
+        totals: Dict[str, Tuple[int, int]] = {}
+        for _ in range(RECONCILE_MAX_PASSES):
+            with self._lock:
+                self._changed_during_walk.discard(key)
+            totals = scan_tree(root) if Path(root).exists() else {}
+            conn = get_connection()
+            try:
+                replace_dir_usage_tree(conn, root, totals)
+            finally:
+                conn.close()
+            with self._lock:
+                if key not in self._changed_during_walk:
+                    break
+        size = sum(value[0] for value in totals.values())
+        files = sum(value[1] for value in totals.values())
+        log_message(f"[DiskUsage] Reconciled {root}: {files} files, {size} bytes")
+        return {"bytes": size, "files": files}
+
+    def reconcile_async(self, root: PathLike) -> bool:
+        """Start a background walk of ``root`` unless one is already running."""
+        from database import normalize_usage_path
+
+        key = normalize_usage_path(root)
+
+        def _run():
+            try:
+                self.reconcile(root)
+            except Exception as e:
+                log_message(f"[DiskUsage] Reconcile of {root} failed: {e}")
+            finally:
+                with self._lock:
+                    self._reconciling.pop(key, None)
+                    self._changed_during_walk.discard(key)
+
+        with self._lock:
+            if key in self._reconciling:
+                return False
+            thread = threading.Thread(target=_run, name="disk-usage-reconcile", daemon=True)
+            self._reconciling[key] = thread
+        thread.start()
+        return True
+
+    def is_reconciling(self, root: PathLike) -> bool:
+        from database import normalize_usage_path
+
+        with self._lock:
+            return normalize_usage_path(root) in self._reconciling
+
+    # ----- reads -----
+
+    def get_usage(self, root: PathLike, max_age: float = RECONCILE_MAX_AGE_SECONDS) -> dict:
+        """Cached totals of ``root``; schedules a walk when they are missing or stale.
+
+        ``pending`` is True while the totals have never been reconciled (they
+        only hold incremental updates so far); ``reconciling`` while a walk runs.
+        """
+        from database import get_connection, get_dir_usage_totals
+
+        conn = get_connection()
+        try:
+            usage = get_dir_usage_totals(conn, root)
+        finally:
+            conn.close()
+        age = usage.get("reconciled_age_seconds")
+        if age is None or age > max_age:
+            self.reconcile_async(root)
+        usage["pending"] = usage["reconciled_at"] is None
+        usage["reconciling"] = self.is_reconciling(root)
+        return usage
+
+
+# Global service instance
+_disk_usage_service = None
+
+
+def get_disk_usage_service() -> DiskUsageService:
+    """Get the global disk usage service instance."""
+    global _disk_usage_service
+    if _disk_usage_service is None:
+        _disk_usage_service = DiskUsageService()
+    return _disk_usage_service
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Group Sync Coordinator
+
+Runs quick sync for the channels of one group K at a time inside a single
+QUICK_SYNC_GROUP job, instead of queueing one QUICK_SYNC job per channel
+that the single worker lane then runs strictly one after another.
+
+- All yt-dlp calls share the per-host token bucket in utils.ytdlp_throttle,
+  so raising K adds overlap (network waits, JS challenges) without raising the
+  request rate seen by YouTube.
+- K adapts (AIMD): it halves when the share of 403/429 answers in the recent
+  window crosses THROTTLE_BACKOFF_RATE and grows by one after a clean streak.
+- ``run`` returns a throughput summary (channels/min, new videos, throttled
+  calls, K range, time spent waiting for tokens).
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.logging_utils import log_message
+from utils.ytdlp_format_retry import output_is_throttled
+from utils.ytdlp_throttle import get_rate_limiter, get_throttle_monitor
+
+DEFAULT_GROUP_SYNC_CONCURRENCY = 3
+MAX_GROUP_SYNC_CONCURRENCY = 8
+# Halve K when at least this share of recent yt-dlp calls was throttled
+THROTTLE_BACKOFF_RATE = 0.2
+# Minimum samples in the window before a backoff decision
+THROTTLE_MIN_SAMPLES = 5
+# Grow K by one after this many clean channel completions per current K
+CLEAN_STREAK_PER_SLOT = 2
+
+SUCCESS_STATUSES = ("started", "up_to_date")
+
+
+class GroupSyncCoordinator:
+    """Adaptive-concurrency quick sync over a list of channels."""
+
+    def __init__(
+        self,
+        sync_fn: Callable[[int], Dict[str, Any]],
+        *,
+        concurrency: int = DEFAULT_GROUP_SYNC_CONCURRENCY,
+        max_concurrency: int = MAX_GROUP_SYNC_CONCURRENCY,
+        on_channel_done: Optional[Callable[[Dict[str, Any], Dict[str, Any]], None]] = None,
+        progress: Optional[Callable[[float, str], None]] = None,
+    ):
+        self.sync_fn = sync_fn
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.concurrency = max(1, min(int(concurrency), self.max_concurrency))
+        self.on_channel_done = on_channel_done
+        self.progress = progress
+        self._cond = threading.Condition()
+        self._active = 0
+        self._clean_streak = 0
+        self._started = 0.0
+        self._window_start = 0.0
+        self._k_history: List[int] = [self.concurrency]
+
+    # ----- concurrency gate -----
+
+    def _enter(self) -> float:
+        with self._cond:
+            while self._active >= self.concurrency:
+                self._cond.wait()
+            self._active += 1
+            return time.monotonic()
+
+    def _leave(self, throttled: bool, entered_at: float) -> None:
+        with self._cond:
+            self._active -= 1
+            self._adapt_locked(throttled, entered_at)
+            self._cond.notify_all()
+
+    def _adapt_locked(self, channel_throttled: bool, entered_at: float) -> None:
+        if entered_at < self._window_start and self._window_start > self._started:
+            # Started before the last backoff: already accounted for
+            return
+        rate, samples = get_throttle_monitor().throttle_rate(since=self._window_start)
+        if channel_throttled or (samples >= THROTTLE_MIN_SAMPLES and rate >= THROTTLE_BACKOFF_RATE):
+            self._clean_streak = 0
+            if self.concurrency > 1:
+                self.concurrency = max(1, self.concurrency // 2)
+                self._k_history.append(self.concurrency)
+                log_message(
+                    f"[Group Sync] Throttling seen ({'channel failed with 403/429' if channel_throttled else f'{rate:.0%} of {samples} calls'}), "
+                    f"concurrency -> {self.concurrency}"
+                )
+            # Judge the new K on fresh samples only
+            self._window_start = time.monotonic()
+            return
+        self._clean_streak += 1
+        if self._clean_streak >= CLEAN_STREAK_PER_SLOT * self.concurrency and self.concurrency < self.max_concurrency:
+            self.concurrency += 1
+            self._clean_streak = 0
+            self._k_history.append(self.concurrency)
+            log_message(f"[Group Sync] No throttling, concurrency -> {self.concurrency}")
+
+    # ----- run -----
+
+    def run(self, channels: List[Dict[str, Any]]) -> Dict[str, Any]:
+        started = time.monotonic()
+        self._started = self._window_start = started
+        monitor = get_throttle_monitor()
+        limiter = get_rate_limiter()
+        calls_before = monitor.totals()
+        waited_before = limiter.stats()["waited_seconds"]
+        lock = threading.Lock()
+        outcome = {"completed": 0, "failed": 0, "new_videos": 0, "jobs_created": 0, "throttled_channels": 0}
+        failures: List[Dict[str, Any]] = []
+        total = len(channels)
+
+        def _one(channel: Dict[str, Any]) -> None:
+            entered_at = self._enter()
+            throttled = False
+            try:
+                try:
+                    result = self.sync_fn(channel["id"]) or {}
+                except Exception as e:
+                    result = {"status": "error", "error": str(e)}
+                ok = result.get("status") in SUCCESS_STATUSES
+                throttled = not ok and (
+                    bool(result.get("throttled"))
+                    or output_is_throttled(stderr=str(result.get("error") or ""))
+                )
+                if self.on_channel_done:
+                    try:
+                        self.on_channel_done(channel, result)
+                    except Exception as e:
+                        log_message(f"[Group Sync] Post-sync hook failed for {channel.get('name')}: {e}")
+                with lock:
+                    if ok:
+                        outcome["completed"] += 1
+                        outcome["new_videos"] += int(result.get("new_videos") or 0)
+                        outcome["jobs_created"] += int(result.get("jobs_created") or 0)
+                    else:
+                        outcome["failed"] += 1
+                        failures.append({"channel_id": channel["id"], "channel_name": channel.get("name"),
+                                         "error": result.get("error") or result.get("status")})
+                    outcome["throttled_channels"] += int(throttled)
+                    done = outcome["completed"] + outcome["failed"]
+                if self.progress:
+                    self.progress(done / total * 100 if total else 100.0,
+                                  f"{done}/{total} channels (concurrency {self.concurrency})")
+            finally:
+                self._leave(throttled, entered_at)
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="group-sync") as pool:
+            list(pool.map(_one, channels))
+
+        duration = time.monotonic() - started
+        calls_after = monitor.totals()
+        calls = calls_after["calls"] - calls_before["calls"]
+        throttled_calls = calls_after["throttled"] - calls_before["throttled"]
+        return {
+            **outcome,
+            "channels": total,
+            "failures": failures,
+            "duration_seconds": round(duration, 1),
+            "channels_per_minute": round(total / duration * 60, 2) if duration > 0 else None,
+            "ytdlp_calls": calls,
+            "throttled_calls": throttled_calls,
+            "throttle_rate": round(throttled_calls / calls, 3) if calls else 0.0,
+            "rate_limit_wait_seconds": round(limiter.stats()["waited_seconds"] - waited_before, 1),
+            "concurrency_initial": self._k_history[0],
+            "concurrency_final": self.concurrency,
+            "concurrency_min": min(self._k_history),
+            "concurrency_max": max(self._k_history),
+        }
+
+
+def format_group_sync_summary(group_name: str, summary: Dict[str, Any]) -> str:
+    """One grep-friendly line per group run."""
+    return (
+        f"[Group Sync] summary group={group_name!r} channels={summary.get('channels')} "
+        f"ok={summary.get('completed')} failed={summary.get('failed')} "
+        f"new_videos={summary.get('new_videos')} duration={summary.get('duration_seconds')}s "
+        f"channels_per_min={summary.get('channels_per_minute')} "
+        f"ytdlp_calls={summary.get('ytdlp_calls')} throttled={summary.get('throttled_calls')} "
+        f"wait={summary.get('rate_limit_wait_seconds')}s "
+        f"K={summary.get('concurrency_initial')}->{summary.get('concurrency_final')} "
+        f"(min {summary.get('concurrency_min')}, max {summary.get('concurrency_max')})"
+    )
@@ -43,12 +43,17 @@ class JobType(Enum):
     DATABASE_CLEANUP = "database_cleanup"
     LOG_CLEANUP = "log_cleanup"
     METADATA_CLEANUP = "metadata_cleanup"
+    MAX_QUALITY_BACKFILL = "max_quality_backfill"
+    PREVIEW_PREWARM = "preview_prewarm"
+    SPRITE_SHEET = "sprite_sheet"
+    BULK_RESTORE = "bulk_restore"
     
     # Synchronization tasks
     CHANNEL_SYNC = "channel_sync"
     PLAYLIST_SYNC = "playlist_sync"
     LIBRARY_SCAN = "library_scan"
     QUICK_SYNC = "quick_sync"
+    QUICK_SYNC_GROUP = "quick_sync_group"
     
     # System tasks
     DATABASE_BACKUP = "database_backup"
@@ -633,10 +638,40 @@ JOB_TYPE_CONFIGS = {
         'max_retries': 2,
         'priority': JobPriority.HIGH
     },
+    JobType.QUICK_SYNC_GROUP: {
+        'timeout_seconds': 14400,  # 4 hours (whole group, K channels at a time)
+        'max_retries': 0,          # failed channels are picked up by the next run
+        'priority': JobPriority.HIGH
+    },
     JobType.LIBRARY_SCAN: {
         'timeout_seconds': 7200,  # 2 hours for large libraries
         'max_retries': 1,
         'priority': JobPriority.LOW
+    },
+    JobType.MAX_QUALITY_BACKFILL: {
+        'timeout_seconds': 1800,  # 30 minutes (local JSON parsing only)
+        'max_retries': 1,
+        'priority': JobPriority.LOW
+    },
+    JobType.PREVIEW_PREWARM: {
+        'timeout_seconds': 7200,  # 2 hours (one ffmpeg frame per track, bounded pool)
+        'max_retries': 1,
+        'priority': JobPriority.LOW
+    },
+    JobType.SPRITE_SHEET: {
+        'timeout_seconds': 14400,  # 4 hours (one decode pass per track; playlists can be large)
+        'max_retries': 1,
+        'priority': JobPriority.LOW
+    },
+    JobType.BULK_RESTORE: {
+        'timeout_seconds': 7200,  # 2 hours (cross-device copies of large selections)
+        'max_retries': 0,         # moved files are already restored; rerun only the failures
+        'priority': JobPriority.HIGH
+    },
+    JobType.SYSTEM_MAINTENANCE: {
+        'timeout_seconds': 3600,  # 1 hour (stepwise; stops itself at max_runtime_seconds)
+        'max_retries': 1,
+        'priority': JobPriority.LOW
     }
 }
 
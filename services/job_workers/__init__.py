@@ -13,6 +13,12 @@ from .backup_worker import BackupWorker
 from .single_video_metadata_worker import SingleVideoMetadataWorker
 from .quick_sync_worker import QuickSyncWorker
 from .library_scan_worker import LibraryScanWorker
+from .max_quality_backfill_worker import MaxQualityBackfillWorker
+from .preview_prewarm_worker import PreviewPrewarmWorker
+from .sprite_sheet_worker import SpriteSheetWorker
+from .database_maintenance_worker import DatabaseMaintenanceWorker
+from .quick_sync_group_worker import QuickSyncGroupWorker
+from .bulk_restore_worker import BulkRestoreWorker
 
 __all__ = [
     'ChannelDownloadWorker',
@@ -22,5 +28,11 @@ __all__ = [
     'BackupWorker',
     'SingleVideoMetadataWorker',
     'QuickSyncWorker',
-    'LibraryScanWorker'
+    'LibraryScanWorker',
+    'MaxQualityBackfillWorker',
+    'PreviewPrewarmWorker',
+    'SpriteSheetWorker',
+    'DatabaseMaintenanceWorker',
+    'QuickSyncGroupWorker',
+    'BulkRestoreWorker'
 ] 
\ No newline at end of file
@@ -36,7 +36,8 @@ class BackupWorker(JobWorker):
         Execute database backup task.
         
         Expected parameters in job.job_data:
-        - backup_type: 'full' (default), 'incremental' (future)
+        - backup_type: 'incremental' (default, pages changed since the last
+          snapshot) or 'full' (self-contained base snapshot)
         - retention_days: number of days to keep backups (default: 30)
         - cleanup_old: whether to cleanup old backups (default: False)
         - force_backup: create backup even if recent one exists (default: False)
@@ -45,7 +46,7 @@ class BackupWorker(JobWorker):
             True if backup successful, False otherwise
         """
         try:
-            backup_type = job.job_data.get('backup_type', 'full')
+            backup_type = job.job_data.get('backup_type', 'incremental')
             retention_days = job.job_data.get('retention_days', 30)
             cleanup_old = job.job_data.get('cleanup_old', False)
             force_backup = job.job_data.get('force_backup', False)
@@ -65,14 +66,20 @@ class BackupWorker(JobWorker):
                 return True
             
             # Create backup
-            backup_result = self._create_database_backup(config, job)
+            backup_result = self._create_database_backup(config, backup_type, job)
             
             if not backup_result['success']:
                 job.log_error(f"Backup creation failed: {backup_result['error']}")
                 return False
             
             job.log_info(f"Backup created successfully: {backup_result['backup_path']}")
-            job.log_info(f"Backup size: {backup_result['size_bytes'] / (1024*1024):.2f} MB")
+            job.log_info(
+                f"Backup stored {backup_result['size_bytes'] / (1024*1024):.2f} MB "
+                f"({backup_result.get('kind', backup_type)}, {backup_result.get('changed_pages', 0)} of "
+                f"{backup_result.get('page_count', 0)} pages changed, database "
+                f"{backup_result.get('db_size_bytes', 0) / (1024*1024):.2f} MB) "
+                f"in {backup_result.get('duration_seconds', 0):.1f}s"
+            )
             
             # Cleanup old backups if requested
             if cleanup_old:
@@ -117,7 +124,7 @@ class BackupWorker(JobWorker):
             # If we can't determine, err on the side of creating backup
             return True
     
-    def _create_database_backup(self, config: Dict[str, str], job: Job) -> Dict[str, Any]:
+    def _create_database_backup(self, config: Dict[str, str], backup_type: str, job: Job) -> Dict[str, Any]:
         """Create database backup using existing backup functionality."""
         try:
             root_dir = self._get_root_dir(config)
@@ -127,7 +134,7 @@ class BackupWorker(JobWorker):
             from database import create_backup
             
             job.log_info("Creating database backup...")
-            result = create_backup(root_dir)
+            result = create_backup(root_dir, backup_type=backup_type)
             
             return result
             
@@ -147,7 +154,7 @@ class BackupWorker(JobWorker):
             
             # Import database functions
             sys.path.append(str(root_dir))
-            from database import list_backups
+            from database import list_backups, delete_backups
             
             backups = list_backups(root_dir)
             
@@ -155,27 +162,24 @@ class BackupWorker(JobWorker):
                 return 0
             
             cutoff_date = datetime.utcnow() - timedelta(days=retention_days)
-            cleaned_count = 0
+            expired = [
+                backup['folder_name'] for backup in backups
+                if datetime.fromisoformat(backup['timestamp']).replace(tzinfo=None) < cutoff_date
+            ]
+            if not expired:
+                return 0
             
-            for backup in backups:
-                backup_date = datetime.fromisoformat(backup['timestamp'])
-                
-                if backup_date < cutoff_date:
-                    try:
-                        backup_path = Path(backup['backup_path'])
-                        backup_folder = backup_path.parent
-                        
-                        # Remove the entire backup folder
-                        if backup_folder.exists():
-                            import shutil
-                            shutil.rmtree(backup_folder)
-                            cleaned_count += 1
-                            job.log_info(f"Removed old backup: {backup['folder_name']}")
-                    
-                    except Exception as e:
-                        job.log_error(f"Failed to remove backup {backup['folder_name']}: {e}")
-            
-            return cleaned_count
+            # Snapshots built on an expired one absorb its pages, then
+            # page blobs no remaining snapshot uses are freed
+            result = delete_backups(root_dir, expired)
+            for name in result['deleted']:
+                job.log_info(f"Removed old backup: {name}")
+            for name, error in result['failed'].items():
+                job.log_error(f"Failed to remove backup {name}: {error}")
+            if result['freed_bytes']:
+                job.log_info(f"Freed {result['freed_bytes'] / (1024*1024):.2f} MB of backup storage")
+            
+            return len(result['deleted'])
             
         except Exception as e:
             job.log_error(f"Error during backup cleanup: {e}")
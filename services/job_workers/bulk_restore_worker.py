@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Bulk Restore Worker
+
+Restores a large selection of deleted tracks from the trash through
+services.bulk_restore_engine.BulkRestoreEngine, reporting progress per chunk
+so the deleted-tracks page can follow it instead of waiting on one long
+HTTP request.
+"""
+
+import os
+import sys
+from pathlib import Path
+from typing import List
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from services.job_types import JobType, JobWorker, Job
+from services.bulk_restore_engine import BulkRestoreEngine
+from controllers.api.shared import get_connection, get_root_dir
+
+
+class BulkRestoreWorker(JobWorker):
+    """Worker for chunked file restores from the trash."""
+
+    def __init__(self, worker_id: str = "bulk_restore_worker"):
+        super().__init__(worker_id)
+
+    def get_supported_job_types(self) -> List[JobType]:
+        """Returns list of supported job types."""
+        return [JobType.BULK_RESTORE]
+
+    def execute_job(self, job: Job) -> bool:
+        """
+        Executes a bulk file restore.
+
+        Job data:
+          - track_ids: deleted_tracks ids to restore
+          - root_dir: library root the trash paths are relative to (default: current ROOT_DIR)
+        """
+        try:
+            track_ids = job.job_data.get('track_ids') or []
+            root_dir = job.job_data.get('root_dir') or get_root_dir()
+            if not track_ids:
+                job.log_info("No tracks to restore")
+                return True
+            if not root_dir:
+                job.log_error("Library root directory is not configured")
+                return False
+
+            job.log_info(f"Restoring {len(track_ids)} tracks from trash under {root_dir}")
+
+            def _progress(percentage: float, message: str) -> None:
+                job.log_progress(message, percentage)
+
+            conn = get_connection()
+            try:
+                summary = BulkRestoreEngine(conn, Path(root_dir), progress=_progress).run(track_ids)
+            finally:
+                conn.close()
+
+            job.log_info(
+                f"Restored {summary['total_successful']}/{summary['total_requested']} tracks "
+                f"({summary['renames']} renames, {summary['copies']} copies) in {summary['duration_seconds']}s"
+            )
+            for failure in summary['failed_tracks'][:50]:
+                job.log_error(f"Track {failure['track_id']}: {failure['error']}")
+            if len(summary['failed_tracks']) > 50:
+                job.log_error(f"... and {len(summary['failed_tracks']) - 50} more failures")
+
+            return not (summary['total_failed'] and not summary['total_successful'])
+
+        except Exception as e:
+            job.log_exception(e, "execute_job in BulkRestoreWorker")
+            return False
+
+
+def main():
+    """Test the worker."""
+    worker = BulkRestoreWorker()
+    print(f"Worker {worker.worker_id} supports: {[jt.value for jt in worker.get_supported_job_types()]}")
+
+
+if __name__ == "__main__":
+    main()
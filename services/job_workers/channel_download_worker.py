@@ -18,6 +18,7 @@ from datetime import datetime
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from services.job_types import JobWorker, Job, JobType
+from services.disk_usage_service import get_disk_usage_service
 import download_content  # Use existing download logic
 
 
@@ -136,6 +137,9 @@ class ChannelDownloadWorker(JobWorker):
                 # AUTOMATIC METADATA CLEANUP after download
                 self._cleanup_metadata_after_download(channel_url, group_name, root_dir)
                 
+                # New files may sit in any channel folder of the group
+                get_disk_usage_service().reconcile_async(group_folder)
+                
                 return True
             else:
                 print(f"Channel download failed with exit code {result.returncode}")
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Database Maintenance Worker
+
+Runs online database maintenance (batched job cleanup, incremental_vacuum,
+PRAGMA optimize with an analysis limit, per-table quick_check) through
+utils.database_optimizer.MaintenanceScheduler. Each step holds locks only
+briefly. When the player becomes active the run ends early instead of
+waiting, so the job queue worker is free for downloads; the next idle tick
+enqueues it again and it continues where it stopped.
+
+The recurring scheduler calls ``maybe_request_idle_maintenance`` every tick;
+it enqueues a low-priority job once the player has been idle for a while and
+the last run is old enough.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+# Ensure project root in path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from services.job_types import JobWorker, Job, JobType, JobPriority
+
+# Player must have been idle this long before maintenance is enqueued
+IDLE_THRESHOLD_SECONDS = 15 * 60
+# While running, pause if a player event happened within this window
+PLAYER_ACTIVE_WINDOW_SECONDS = 120
+# Minimum time between automatic runs (last completion is kept in user_settings)
+MAINTENANCE_INTERVAL_SECONDS = 24 * 3600
+# Do not enqueue again while a requested job may still be pending
+AUTO_ENQUEUE_INTERVAL_SECONDS = 60 * 60
+DEFAULT_MAX_RUNTIME_SECONDS = 30 * 60
+
+LAST_RUN_SETTING = "db_maintenance_last_run"
+
+_auto_enqueue_lock = threading.Lock()
+_last_auto_enqueue = 0.0
+
+
+def _player_idle_seconds() -> Optional[float]:
+    import database as db
+    conn = db.get_connection()
+    try:
+        return db.get_player_idle_seconds(conn)
+    finally:
+        conn.close()
+
+
+def request_database_maintenance(reason: str = "") -> bool:
+    """Enqueue a low-priority maintenance job unless one was requested recently."""
+    global _last_auto_enqueue
+    with _auto_enqueue_lock:
+        now = time.monotonic()
+        if _last_auto_enqueue and now - _last_auto_enqueue < AUTO_ENQUEUE_INTERVAL_SECONDS:
+            return False
+        _last_auto_enqueue = now
+    try:
+        from services.job_queue_service import get_job_queue_service
+        get_job_queue_service().create_and_add_job(
+            JobType.SYSTEM_MAINTENANCE,
+            priority=JobPriority.LOW,
+            reason=reason or "auto",
+        )
+        return True
+    except Exception:
+        return False
+
+
+def maybe_request_idle_maintenance() -> bool:
+    """Enqueue maintenance if the player is idle and the last run is old enough."""
+    try:
+        import database as db
+        conn = db.get_connection()
+        try:
+            last_run = db.get_user_setting(conn, LAST_RUN_SETTING, "")
+            idle = db.get_player_idle_seconds(conn)
+        finally:
+            conn.close()
+        if last_run:
+            elapsed = (datetime.utcnow() - datetime.fromisoformat(last_run)).total_seconds()
+            if elapsed < MAINTENANCE_INTERVAL_SECONDS:
+                return False
+        if idle is not None and idle < IDLE_THRESHOLD_SECONDS:
+            return False
+        return request_database_maintenance(reason="idle")
+    except Exception:
+        return False
+
+
+class DatabaseMaintenanceWorker(JobWorker):
+    """Worker that runs stepwise database maintenance."""
+
+    def __init__(self, worker_id: str = "database_maintenance_worker"):
+        super().__init__(worker_id)
+
+    def get_supported_job_types(self) -> List[JobType]:
+        return [JobType.SYSTEM_MAINTENANCE]
+
+    def execute_job(self, job: Job) -> bool:
+        """
+        Execute maintenance.
+
+        Job data options:
+          - convert_auto_vacuum: bool (default False) switch the file to
+            auto_vacuum=INCREMENTAL; this needs one full VACUUM
+          - max_runtime_seconds: int (default 1800) stop and leave the rest
+            for the next run
+          - ignore_player: bool (default False) do not stop for player activity
+        """
+        try:
+            import database as db
+            from utils.database_optimizer import MaintenanceScheduler
+
+            convert = bool(job.job_data.get("convert_auto_vacuum", False))
+            max_runtime = float(job.job_data.get("max_runtime_seconds") or DEFAULT_MAX_RUNTIME_SECONDS)
+            ignore_player = bool(job.job_data.get("ignore_player", False))
+
+            conn = db.get_connection()
+            try:
+                db_path = conn.execute("PRAGMA database_list").fetchone()[2]
+            finally:
+                conn.close()
+
+            def _should_pause() -> bool:
+                if ignore_player:
+                    return False
+                try:
+                    idle = _player_idle_seconds()
+                except Exception:
+                    return False
+                return idle is not None and idle < PLAYER_ACTIVE_WINDOW_SECONDS
+
+            def _progress(percentage: float, message: str) -> None:
+                job.log_progress(message, percentage)
+
+            job.log_info(f"Starting database maintenance on {db_path} (max runtime {max_runtime:.0f}s)")
+            result = MaintenanceScheduler(
+                db_path,
+                should_pause=_should_pause,
+                progress=_progress,
+                max_runtime_seconds=max_runtime,
+            ).run(convert_auto_vacuum=convert)
+
+            vacuum = result.get("vacuum") or {}
+            integrity = result.get("integrity") or {}
+            lock_hold = result.get("lock_hold") or {}
+            lock_wait = result.get("lock_wait") or {}
+            job.log_info(f"Removed completed jobs: {(result.get('cleanup') or {}).get('removed_jobs', 0)}")
+            job.log_info(
+                f"Vacuum: auto_vacuum={vacuum.get('auto_vacuum')}, "
+                f"freed {vacuum.get('space_freed_mb', 0):.2f} MB in {vacuum.get('steps', 0)} steps"
+                + (f" ({vacuum['note']})" if vacuum.get("note") else "")
+            )
+            job.log_info(
+                f"quick_check: {integrity.get('status')} "
+                f"({integrity.get('tables_checked')}/{integrity.get('tables_total')} tables)"
+            )
+            for message in integrity.get("errors") or []:
+                job.log_error(f"quick_check: {message}")
+            job.log_info(
+                f"Lock hold per step: max {lock_hold.get('max_ms', 0)} ms, avg {lock_hold.get('avg_ms', 0)} ms "
+                f"over {lock_hold.get('steps', 0)} steps; writer wait: max {lock_wait.get('max_ms', 0)} ms, "
+                f"p95 {lock_wait.get('p95_ms', 0)} ms ({lock_wait.get('probes', 0)} probes)"
+            )
+
+            if not result.get("success"):
+                job.log_error(f"Database maintenance failed: {result.get('error')}")
+                return False
+
+            if result.get("completed"):
+                conn = db.get_connection()
+                try:
+                    db.set_user_setting(conn, LAST_RUN_SETTING, datetime.utcnow().isoformat())
+                finally:
+                    conn.close()
+            elif result.get("stopped_reason") == "paused":
+                job.log_info("Stopped because the player is active; remaining steps run at the next idle time")
+            else:
+                job.log_info("Stopped at the runtime limit; remaining steps run next time")
+            job.log_info(f"Database maintenance finished in {result.get('duration', 0):.1f}s")
+            return True
+        except Exception as e:
+            job.log_exception(e, "database maintenance")
+            return False
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Max Quality Backfill Worker
+
+Fills youtube_video_metadata.max_available_height / max_quality_label from the
+stored available_formats JSON for rows that predate those columns, so readers
+(the /tracks page, quality filters) can use the denormalized fields instead of
+parsing formats on every request. No network calls.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import List
+
+# Ensure project root in path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from services.job_types import JobWorker, Job, JobType, JobPriority
+
+# Readers that notice missing fields request a backfill at most this often
+AUTO_ENQUEUE_INTERVAL_SECONDS = 15 * 60
+
+_auto_enqueue_lock = threading.Lock()
+_last_auto_enqueue = 0.0
+
+
+def request_max_quality_backfill(reason: str = "") -> bool:
+    """Enqueue a low-priority backfill job unless one was requested recently."""
+    global _last_auto_enqueue
+    with _auto_enqueue_lock:
+        now = time.monotonic()
+        if _last_auto_enqueue and now - _last_auto_enqueue < AUTO_ENQUEUE_INTERVAL_SECONDS:
+            return False
+        _last_auto_enqueue = now
+    try:
+        from services.job_queue_service import get_job_queue_service
+        get_job_queue_service().create_and_add_job(
+            JobType.MAX_QUALITY_BACKFILL,
+            priority=JobPriority.LOW,
+            reason=reason or "auto",
+        )
+        return True
+    except Exception:
+        return False
+
+
+class MaxQualityBackfillWorker(JobWorker):
+    """Worker that backfills denormalized max YouTube quality fields."""
+
+    def __init__(self, worker_id: str = "max_quality_backfill_worker"):
+        super().__init__(worker_id)
+
+    def get_supported_job_types(self) -> List[JobType]:
+        return [JobType.MAX_QUALITY_BACKFILL]
+
+    def execute_job(self, job: Job) -> bool:
+        """
+        Execute the backfill.
+
+        Job data options:
+          - batch_size: int (default 1000)
+          - limit: int (optional, max rows to examine)
+        """
+        try:
+            import database as db
+
+            batch_size = int(job.job_data.get("batch_size") or 1000)
+            limit = job.job_data.get("limit")
+            limit = int(limit) if limit not in (None, "") else None
+
+            def _progress(processed: int, updated: int, total: int) -> None:
+                job.log_info(f"Progress: {processed}/{total} examined; updated={updated}")
+
+            conn = db.get_connection()
+            try:
+                stats = db.backfill_max_quality_fields(
+                    conn, batch_size=batch_size, limit=limit, progress=_progress
+                )
+            finally:
+                conn.close()
+
+            job.log_info(
+                f"Max quality backfill finished: candidates={stats['total_candidates']}, "
+                f"updated={stats['updated']}, without video formats={stats['skipped']}"
+            )
+            return True
+
+        except Exception as e:
+            job.log_exception(e, "execute_job in MaxQualityBackfillWorker")
+            return False
@@ -19,6 +19,7 @@ import shutil
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from services.job_types import JobWorker, Job, JobType
+from services.disk_usage_service import get_disk_usage_service
 from utils.cookies_manager import get_random_cookie_file, get_cookie_file, record_cookie_outcome
 from utils.yt_dlp_js import extend_ytdlp_cli_cmd, ytdlp_js_runtime_bin_dir
 
@@ -215,6 +216,7 @@ class PlaylistDownloadWorker(JobWorker):
                     self._persist_download_metadata(target_path)
                     self._sync_published_dates_after_scan()
                     self._cleanup_folder_temp_files(target_path)
+                    get_disk_usage_service().refresh_directory(target_path)
                 
                 return True
             else:
@@ -834,6 +836,8 @@ class PlaylistDownloadWorker(JobWorker):
                 conn.close()
             print(f"[QualityUpgrade] Updated track {video_id} -> {relpath}")
             surviving_path = dest
+            for directory in {original_path.parent, dest.parent}:
+                get_disk_usage_service().refresh_directory(directory)
         else:
             print(f"[QualityUpgrade] No rotation ({rotate.get('reason')}); original kept")
 
@@ -895,6 +899,7 @@ class PlaylistDownloadWorker(JobWorker):
 
         self._sync_published_dates_after_scan(video_id or None)
         self._cleanup_folder_temp_files(output_dir)
+        get_disk_usage_service().refresh_directory(output_dir)
 
     def _update_single_track_path_and_probe(self, config: dict, output_dir: Path, video_id: str) -> None:
         """Update a single track's relpath based on the freshly downloaded file and rescan media properties.
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Preview Prewarm Worker
+
+Generates missing preview PNGs for every track of a playlist folder ahead of
+time, so opening its gallery serves files from disk instead of queueing
+ffmpeg work behind the page load. Work goes through the shared PreviewService
+pool, so prewarming never runs more ffmpeg processes than on-demand requests
+would, and a tile requested meanwhile joins the same in-flight generation.
+Tracks are submitted one pool-sized batch at a time, so an interactive
+request queues behind at most one batch instead of the whole library.
+"""
+
+from __future__ import annotations
+
+import sys
+from concurrent.futures import wait
+from pathlib import Path
+from typing import List
+
+# Ensure project root in path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from services.job_types import JobWorker, Job, JobType
+
+
+class PreviewPrewarmWorker(JobWorker):
+    """Worker that pre-generates previews for a playlist folder."""
+
+    def __init__(self, worker_id: str = "preview_prewarm_worker"):
+        super().__init__(worker_id)
+
+    def get_supported_job_types(self) -> List[JobType]:
+        return [JobType.PREVIEW_PREWARM]
+
+    def execute_job(self, job: Job) -> bool:
+        """
+        Execute preview prewarm.
+
+        Job data options:
+          - playlist: str, folder relative to the library root (e.g. "Music/Mix");
+            empty means the whole library
+          - limit: int (optional, max tracks to generate)
+        """
+        try:
+            from controllers.api.shared import get_root_dir, get_thumbnails_dir
+            from services.preview_service import STATIC_PREVIEWS_DIR, existing_preview, get_preview_service
+            import database as db
+
+            root_dir = get_root_dir()
+            if not root_dir:
+                job.log_error("ROOT_DIR not initialized")
+                return False
+
+            playlist = str(job.job_data.get("playlist") or "").strip().strip("/").replace("\\", "/")
+            limit = job.job_data.get("limit")
+            limit = int(limit) if limit not in (None, "") else None
+
+            thumbnails_dir = get_thumbnails_dir()
+            previews_dir = Path(thumbnails_dir) if thumbnails_dir else STATIC_PREVIEWS_DIR
+            previews_dir.mkdir(parents=True, exist_ok=True)
+
+            conn = db.get_connection()
+            try:
+                sql = """
+                    SELECT t.video_id, t.relpath
+                    FROM tracks t
+                    WHERE t.video_id NOT IN (
+                        SELECT dt.video_id FROM deleted_tracks dt
+                        WHERE dt.restored_at IS NULL
+                    )
+                """
+                params: list = []
+                if playlist:
+                    escaped = playlist.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                    sql += " AND t.relpath LIKE ? ESCAPE '\\'"
+                    params.append(escaped + "/%")
+                sql += " ORDER BY t.relpath"
+                rows = [(r[0], r[1]) for r in conn.execute(sql, params).fetchall()]
+            finally:
+                conn.close()
+
+            missing = [(video_id, relpath) for video_id, relpath in rows
+                       if video_id and not existing_preview(video_id, previews_dir)]
+            skipped = len(rows) - len(missing)
+            if limit is not None:
+                missing = missing[:max(0, limit)]
+
+            service = get_preview_service()
+            batch_size = service.max_workers
+            total = len(missing)
+            job.log_info(
+                f"Preview prewarm for '{playlist or '(library)'}': {len(rows)} tracks, "
+                f"{skipped} already have previews, generating {total} "
+                f"(pool size {service.max_workers})"
+            )
+
+            generated = failed = done = 0
+            for start in range(0, total, batch_size):
+                batch = missing[start:start + batch_size]
+                futures = service.prewarm(batch, previews_dir, root_dir, thumbnails_dir=thumbnails_dir)
+                wait(futures.values())
+                for future in futures.values():
+                    if future.result():
+                        generated += 1
+                    else:
+                        failed += 1
+                previous, done = done, done + len(batch)
+                if previous // 25 != done // 25 or done == total:
+                    job.log_info(f"Progress: {done}/{total}; generated={generated}, failed={failed}")
+
+            job.log_info(f"Preview prewarm finished: generated={generated}, failed={failed}")
+            return True
+
+        except Exception as e:
+            job.log_exception(e, "execute_job in PreviewPrewarmWorker")
+            return False
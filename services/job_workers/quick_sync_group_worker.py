@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Quick Sync Group Worker
+
+Runs a whole channel group's quick sync in one job through
+services.group_sync_coordinator.GroupSyncCoordinator: K channels at a time,
+all yt-dlp calls behind the shared rate limiter, K adapted to 403/429 answers.
+"""
+
+import os
+import sys
+from typing import Any, Dict, List
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from services.job_types import JobType, JobWorker, Job
+from services.channel_sync_service import ChannelSyncService
+from services.group_sync_coordinator import (
+    DEFAULT_GROUP_SYNC_CONCURRENCY,
+    GroupSyncCoordinator,
+    format_group_sync_summary,
+)
+from controllers.api.shared import get_connection, log_message
+
+
+class QuickSyncGroupWorker(JobWorker):
+    """Worker for coordinated, concurrent group quick sync jobs."""
+
+    def __init__(self, worker_id: str = "quick_sync_group_worker"):
+        super().__init__(worker_id)
+        self.sync_service = ChannelSyncService()
+
+    def get_supported_job_types(self) -> List[JobType]:
+        """Returns list of supported job types."""
+        return [JobType.QUICK_SYNC_GROUP]
+
+    def execute_job(self, job: Job) -> bool:
+        """
+        Executes a group quick sync.
+
+        Job data:
+          - group_id, group_name
+          - channels: [{"id", "name"}, ...]
+          - concurrency: int, initial K (default 3)
+          - feed_updates: {channel_id: feed state to save after that channel succeeds}
+        """
+        try:
+            channels = job.job_data.get('channels') or []
+            group_name = job.job_data.get('group_name') or f"#{job.job_data.get('group_id')}"
+            feed_updates: Dict[str, Any] = job.job_data.get('feed_updates') or {}
+            concurrency = int(job.job_data.get('concurrency') or DEFAULT_GROUP_SYNC_CONCURRENCY)
+
+            if not channels:
+                job.log_info("No channels to sync")
+                return True
+
+            job.log_info(f"Starting group quick sync for '{group_name}': {len(channels)} channels, concurrency {concurrency}")
+
+            def _on_channel_done(channel: Dict[str, Any], result: Dict[str, Any]) -> None:
+                status = result.get('status')
+                if status == 'started':
+                    job.log_info(f"{channel.get('name')}: {result.get('new_videos', 0)} new videos, "
+                                 f"{result.get('jobs_created', 0)} download jobs")
+                elif status == 'up_to_date':
+                    job.log_info(f"{channel.get('name')}: up to date")
+                else:
+                    job.log_error(f"{channel.get('name')}: {result.get('error') or status}")
+                    return
+                feed_update = feed_updates.get(str(channel['id']))
+                if feed_update:
+                    from utils.channel_feed import apply_feed_update
+                    conn = get_connection()
+                    try:
+                        apply_feed_update(conn, channel['id'], feed_update)
+                    finally:
+                        conn.close()
+
+            def _progress(percentage: float, message: str) -> None:
+                job.log_progress(message, percentage)
+
+            summary = GroupSyncCoordinator(
+                self.sync_service.quick_sync_channel_core,
+                concurrency=concurrency,
+                on_channel_done=_on_channel_done,
+                progress=_progress,
+            ).run(channels)
+
+            line = format_group_sync_summary(group_name, summary)
+            job.log_info(line)
+            log_message(line)
+
+            if summary['failed'] and not summary['completed']:
+                job.log_error(f"All {summary['failed']} channels failed")
+                return False
+            return True
+
+        except Exception as e:
+            job.log_exception(e, "execute_job in QuickSyncGroupWorker")
+            return False
+
+
+def main():
+    """Test the worker."""
+    worker = QuickSyncGroupWorker()
+    print(f"Worker {worker.worker_id} supports: {[jt.value for jt in worker.get_supported_job_types()]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,7 +15,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspa
 
 from services.job_types import JobType, JobWorker, Job
 from services.channel_sync_service import ChannelSyncService
-from controllers.api.shared import log_message
+from controllers.api.shared import get_connection, log_message
 
 
 class QuickSyncWorker(JobWorker):
@@ -48,6 +48,8 @@ class QuickSyncWorker(JobWorker):
                 return False
             
             job.log_info(f"Starting quick sync for channel ID: {channel_id}")
+            if job.job_data.get('feed_reason'):
+                job.log_info(f"Feed check: {job.job_data.get('feed_reason')}")
             
             # Execute quick sync using the service
             result = self.sync_service.quick_sync_channel_core(channel_id)
@@ -56,10 +58,12 @@ class QuickSyncWorker(JobWorker):
             if result.get('status') == 'started':
                 job.log_info(f"Quick sync started successfully: {result.get('new_videos', 0)} new videos found")
                 job.log_info(f"Download jobs created: {result.get('jobs_created', 0)}")
-                job.log_info(f"Batches processed: {result.get('batches_processed', 0)}")
+                job.log_info(f"Videos listed: {result.get('listed_videos', 0)}")
+                self._save_feed_state(job, channel_id)
                 return True
             elif result.get('status') == 'up_to_date':
                 job.log_info("Channel is up to date, no new videos to download")
+                self._save_feed_state(job, channel_id)
                 return True
             elif result.get('status') == 'no_metadata':
                 job.log_error("No metadata found for channel, full sync needed first")
@@ -72,6 +76,21 @@ class QuickSyncWorker(JobWorker):
             job.log_exception(e, "execute_job in QuickSyncWorker")
             return False
 
+    def _save_feed_state(self, job: Job, channel_id: int) -> None:
+        """Record the uploads-feed state this sync covered (group feed check)."""
+        feed_update = job.job_data.get('feed_update')
+        if not feed_update:
+            return
+        try:
+            from utils.channel_feed import apply_feed_update
+            conn = get_connection()
+            try:
+                apply_feed_update(conn, channel_id, feed_update)
+            finally:
+                conn.close()
+        except Exception as e:
+            job.log_error(f"Failed to save feed state: {e}")
+
 
 def main():
     """Test the worker."""
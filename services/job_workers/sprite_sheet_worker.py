@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Sprite Sheet Worker
+
+Generates scrub-preview sprite sheets (see services/sprite_sheet_service.py)
+for one video or for every track of a playlist folder. Existing sheets whose
+source file is unchanged are reused unless ``force`` is set.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Ensure project root in path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from services.job_types import JobWorker, Job, JobType, JobPriority
+
+# Audio-only containers have no frames to sample
+AUDIO_ONLY_SUFFIXES = {".mp3", ".m4a", ".opus", ".flac"}
+
+# Players asking for a missing sheet enqueue at most once per video per interval
+AUTO_ENQUEUE_INTERVAL_SECONDS = 30 * 60
+
+_auto_enqueue_lock = threading.Lock()
+_last_auto_enqueue: Dict[str, float] = {}
+
+
+def request_sprite_sheet(video_id: str) -> bool:
+    """Enqueue a low-priority sprite job for video_id unless requested recently."""
+    with _auto_enqueue_lock:
+        now = time.monotonic()
+        last = _last_auto_enqueue.get(video_id)
+        if last and now - last < AUTO_ENQUEUE_INTERVAL_SECONDS:
+            return False
+        _last_auto_enqueue[video_id] = now
+    try:
+        from services.job_queue_service import get_job_queue_service
+        get_job_queue_service().create_and_add_job(
+            JobType.SPRITE_SHEET,
+            priority=JobPriority.LOW,
+            video_id=video_id,
+        )
+        return True
+    except Exception:
+        return False
+
+
+def _track_duration(row) -> Optional[float]:
+    for value in (row["duration_seconds"], row["duration"], row["yt_duration"]):
+        try:
+            if value and float(value) > 0:
+                return float(value)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+class SpriteSheetWorker(JobWorker):
+    """Worker that builds scrub-preview sprite sheets."""
+
+    def __init__(self, worker_id: str = "sprite_sheet_worker"):
+        super().__init__(worker_id)
+
+    def get_supported_job_types(self) -> List[JobType]:
+        return [JobType.SPRITE_SHEET]
+
+    def execute_job(self, job: Job) -> bool:
+        """
+        Execute sprite sheet generation.
+
+        Job data options:
+          - video_id: str (single video), or
+          - playlist: str, folder relative to the library root
+          - force: bool (default False) — regenerate even if up to date
+        """
+        try:
+            from controllers.api.shared import get_root_dir, get_thumbnails_dir
+            from services.preview_service import STATIC_PREVIEWS_DIR
+            from services.sprite_sheet_service import generate_sprite_sheet
+            import database as db
+
+            root_dir = get_root_dir()
+            if not root_dir:
+                job.log_error("ROOT_DIR not initialized")
+                return False
+
+            video_id = str(job.job_data.get("video_id") or "").strip()
+            playlist = str(job.job_data.get("playlist") or "").strip().strip("/").replace("\\", "/")
+            force = bool(job.job_data.get("force", False))
+            if not video_id and not playlist:
+                job.log_error("Either video_id or playlist is required")
+                return False
+
+            thumbnails_dir = get_thumbnails_dir()
+            previews_dir = Path(thumbnails_dir) if thumbnails_dir else STATIC_PREVIEWS_DIR
+
+            sql = """
+                SELECT t.video_id, t.relpath, t.duration, t.duration_seconds, ym.duration AS yt_duration
+                FROM tracks t
+                LEFT JOIN youtube_video_metadata ym ON ym.youtube_id = t.video_id
+            """
+            if video_id:
+                sql += " WHERE t.video_id = ?"
+                params = [video_id]
+            else:
+                escaped = playlist.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                sql += " WHERE t.relpath LIKE ? ESCAPE '\\' ORDER BY t.relpath"
+                params = [escaped + "/%"]
+            conn = db.get_connection()
+            try:
+                rows = conn.execute(sql, params).fetchall()
+            finally:
+                conn.close()
+
+            total = len(rows)
+            job.log_info(f"Sprite sheets for {video_id or playlist}: {total} tracks (force={force})")
+            generated = skipped = failed = 0
+            for i, row in enumerate(rows, 1):
+                duration = _track_duration(row)
+                media_path = (Path(root_dir) / row["relpath"]).resolve()
+                if not duration or media_path.suffix.lower() in AUDIO_ONLY_SUFFIXES or not media_path.is_file():
+                    skipped += 1
+                    continue
+                index = generate_sprite_sheet(row["video_id"], media_path, previews_dir, duration, force=force)
+                if index:
+                    generated += 1
+                else:
+                    failed += 1
+                if i % 10 == 0 or i == total:
+                    job.log_info(f"Progress: {i}/{total}; ok={generated}, skipped={skipped}, failed={failed}")
+
+            job.log_info(f"Sprite sheets finished: ok={generated}, skipped={skipped}, failed={failed}")
+            return failed == 0 or generated > 0
+
+        except Exception as e:
+            job.log_exception(e, "execute_job in SpriteSheetWorker")
+            return False
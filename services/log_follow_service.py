@@ -0,0 +1,229 @@
+"""Shared log followers for SSE log tailing.
+
+One follower thread per log file watches the file (stat polling; cheap and
+portable, including Windows where inotify is unavailable) and fans new lines
+out to subscriber queues. Each event carries the byte offset just past the
+line, which /stream_log sends as the SSE ``id`` so a reconnecting browser
+resumes from ``Last-Event-ID`` without resending what it already has.
+"""
+
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+POLL_INTERVAL_SECONDS = 0.5
+# Follower threads stop this long after their last subscriber leaves.
+IDLE_STOP_SECONDS = 30.0
+TAIL_BLOCK_BYTES = 64 * 1024
+SUBSCRIBER_QUEUE_SIZE = 2000
+# Upper bound for a Last-Event-ID catch-up; older gaps fall back to a plain tail.
+MAX_RESUME_BYTES = 4 * 1024 * 1024
+
+# Event tuple: (end_offset, line). end_offset == -1 marks truncation/rotation.
+LogEvent = Tuple[int, str]
+
+_followers: Dict[str, "LogFollower"] = {}
+_followers_lock = threading.Lock()
+
+
+def _decode(raw: bytes) -> str:
+    return raw.decode("utf-8", errors="ignore").rstrip("\r\n")
+
+
+def read_tail_lines(path: Path, max_lines: int = 200, end_offset: Optional[int] = None) -> List[LogEvent]:
+    """Return the last max_lines complete lines before end_offset by seeking backwards.
+
+    Reads fixed-size blocks from the end, so the cost depends on the tail
+    length rather than on the file size.
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell() if end_offset is None else min(end_offset, f.tell())
+        pos = end
+        data = b""
+        while pos > 0 and data.count(b"\n") <= max_lines:
+            step = min(TAIL_BLOCK_BYTES, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    # Drop the (possibly partial) first line unless we reached the start of file
+    if pos > 0:
+        cut = data.find(b"\n")
+        data = data[cut + 1:] if cut >= 0 else b""
+        base = pos + cut + 1 if cut >= 0 else end
+    else:
+        base = 0
+    events: List[LogEvent] = []
+    offset = base
+    for raw in data.splitlines(keepends=True):
+        if not raw.endswith(b"\n"):
+            break
+        offset += len(raw)
+        events.append((offset, _decode(raw)))
+    return events[-max_lines:]
+
+
+def read_lines_between(path: Path, start: int, end: int) -> List[LogEvent]:
+    """Return complete lines in the byte range [start, end)."""
+    if end <= start:
+        return []
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    events: List[LogEvent] = []
+    offset = start
+    for raw in data.splitlines(keepends=True):
+        if not raw.endswith(b"\n"):
+            break
+        offset += len(raw)
+        events.append((offset, _decode(raw)))
+    return events
+
+
+class LogFollower:
+    """Watches one log file and publishes complete new lines to subscribers."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._subscribers: List[queue.Queue] = []
+        self._lock = threading.Lock()
+        self._offset = self._current_size()
+        self._inode = self._current_inode()
+        self._last_subscriber_left = time.time()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def _current_size(self) -> int:
+        try:
+            return self.path.stat().st_size
+        except OSError:
+            return 0
+
+    def _current_inode(self) -> Optional[int]:
+        try:
+            return self.path.stat().st_ino
+        except OSError:
+            return None
+
+    @property
+    def offset(self) -> int:
+        """Byte offset up to which lines have been published."""
+        with self._lock:
+            return self._offset
+
+    def subscribe(self) -> Tuple[queue.Queue, int]:
+        """Register a subscriber; returns its queue and the current published offset."""
+        q: queue.Queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.append(q)
+            offset = self._offset
+            if not self._running:
+                self._running = True
+                self._thread = threading.Thread(
+                    target=self._run, name=f"LogFollower[{self.path.name}]", daemon=True
+                )
+                self._thread.start()
+        return q, offset
+
+    def unsubscribe(self, q: queue.Queue) -> None:
+        with self._lock:
+            try:
+                self._subscribers.remove(q)
+            except ValueError:
+                pass
+            if not self._subscribers:
+                self._last_subscriber_left = time.time()
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def _publish(self, events: List[LogEvent]) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for q in subscribers:
+            for event in events:
+                try:
+                    q.put_nowait(event)
+                except queue.Full:
+                    # Slow client: drop its backlog and let it resync from a fresh tail
+                    try:
+                        while True:
+                            q.get_nowait()
+                    except queue.Empty:
+                        pass
+                    q.put_nowait((-1, ""))
+                    break
+
+    def _poll_once(self, partial: bytes) -> bytes:
+        try:
+            st = self.path.stat()
+        except OSError:
+            return partial
+        with self._lock:
+            offset = self._offset
+        if st.st_size < offset or (self._inode is not None and st.st_ino != self._inode):
+            # Truncated or rotated: restart from the beginning of the new file
+            self._inode = st.st_ino
+            with self._lock:
+                self._offset = 0
+            self._publish([(-1, "")])
+            return b""
+        if st.st_size == offset:
+            return partial
+        with open(self.path, "rb") as f:
+            f.seek(offset + len(partial))
+            data = partial + f.read(st.st_size - offset - len(partial))
+        events: List[LogEvent] = []
+        consumed = 0
+        for raw in data.splitlines(keepends=True):
+            if not raw.endswith(b"\n"):
+                break
+            consumed += len(raw)
+            events.append((offset + consumed, _decode(raw)))
+        with self._lock:
+            self._offset = offset + consumed
+        if events:
+            self._publish(events)
+        return data[consumed:]
+
+    def _run(self) -> None:
+        partial = b""
+        while True:
+            try:
+                partial = self._poll_once(partial)
+            except Exception:
+                partial = b""
+            time.sleep(POLL_INTERVAL_SECONDS)
+            with self._lock:
+                idle = not self._subscribers and time.time() - self._last_subscriber_left > IDLE_STOP_SECONDS
+                if idle:
+                    self._running = False
+                    break
+        with _followers_lock:
+            if _followers.get(str(self.path)) is self and not self._running:
+                _followers.pop(str(self.path), None)
+
+
+def get_log_follower(path: Path) -> LogFollower:
+    """Return the shared follower for a log file (created on first use)."""
+    key = str(path)
+    with _followers_lock:
+        follower = _followers.get(key)
+        if follower is None:
+            follower = LogFollower(path)
+            _followers[key] = follower
+        return follower
+
+
+def get_log_followers_status() -> List[Dict]:
+    """Active followers with subscriber counts (diagnostics)."""
+    with _followers_lock:
+        items = list(_followers.values())
+    return [
+        {"log": f.path.name, "subscribers": f.subscriber_count(), "offset": f.offset}
+        for f in items
+    ]
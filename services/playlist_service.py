@@ -68,56 +68,156 @@ def _get_track_stats(video_id: str) -> dict:
     except Exception:
         return {}
 
-def scan_tracks(scan_root: Path) -> List[dict]:
-    """Scan a directory for media files and return track information, using YouTube metadata if available."""
-    from database import (
-        get_connection,
-        get_youtube_metadata_batch,
-        get_track_stats_batch,
-        get_last_play_timestamps_batch,
-        get_track_media_properties_batch,
-    )
-    
-    # Get ROOT_DIR from global scope (set by init function)
-    root_dir = globals().get('ROOT_DIR')
-    if not root_dir:
-        raise RuntimeError("ROOT_DIR not set. Call set_root_dir() first.")
-    
-    conn = get_connection()
-    
-    # Step 1: Scan all files and extract video IDs
-    files_data = []
-    video_ids = []
-    
+# youtube_video_metadata columns scan_tracks reads (skips description/available_formats)
+SCAN_METADATA_COLUMNS = [
+    "title", "channel", "duration", "duration_string", "view_count", "uploader",
+    "timestamp", "release_timestamp", "release_year", "updated_at",
+    "channel_url", "uploader_url", "uploader_id",
+]
+
+# Files per batch of DB lookups while streaming a track list
+SCAN_CHUNK_SIZE = 500
+
+# Compact /api/tracks payload: everything the player needs to list, order and
+# play tracks. "url" is rebuilt client-side from media_prefix + relpath.
+COMPACT_TRACK_FIELDS = [
+    "name", "relpath", "video_id", "last_play", "size_bytes",
+    "play_starts", "play_finishes", "play_nexts", "play_prevs", "play_likes", "play_dislikes",
+    "youtube_channel", "youtube_duration", "youtube_duration_string", "youtube_view_count",
+    "youtube_timestamp", "youtube_release_timestamp", "youtube_release_year",
+    "resolution", "filetype",
+]
+
+# Tooltip-only fields, served per track by /api/track_details/<video_id>
+TRACK_DETAIL_FIELDS = [
+    "youtube_title", "youtube_uploader", "youtube_channel_handle", "youtube_metadata_updated",
+    "bitrate", "video_fps", "video_codec", "audio_codec", "audio_bitrate", "audio_sample_rate",
+]
+
+
+def _channel_handle(metadata_row) -> Optional[str]:
+    """@handle from channel_url/uploader_url/uploader_id, if any."""
+    keys = metadata_row.keys()
+    if 'channel_url' in keys and metadata_row['channel_url'] and '@' in metadata_row['channel_url']:
+        url_parts = metadata_row['channel_url'].split('@')
+        if len(url_parts) > 1:
+            return '@' + url_parts[1].split('/')[0]
+    elif 'uploader_url' in keys and metadata_row['uploader_url'] and '@' in metadata_row['uploader_url']:
+        url_parts = metadata_row['uploader_url'].split('@')
+        if len(url_parts) > 1:
+            return '@' + url_parts[1].split('/')[0]
+    elif 'uploader_id' in keys and metadata_row['uploader_id'] and metadata_row['uploader_id'].startswith('@'):
+        return metadata_row['uploader_id']
+    return None
+
+
+def _youtube_track_fields(youtube_metadata) -> dict:
+    """youtube_* keys of a track dict from a youtube_video_metadata row."""
+    fields = {}
+    keys = youtube_metadata.keys()
+    if 'title' in keys:
+        fields["youtube_title"] = youtube_metadata['title']
+    if 'channel' in keys:
+        fields["youtube_channel"] = youtube_metadata['channel']
+    if 'duration' in keys:
+        fields["youtube_duration"] = youtube_metadata['duration']
+    if 'duration_string' in keys:
+        fields["youtube_duration_string"] = youtube_metadata['duration_string']
+    if 'view_count' in keys:
+        fields["youtube_view_count"] = youtube_metadata['view_count']
+    if 'uploader' in keys:
+        fields["youtube_uploader"] = youtube_metadata['uploader']
+    # Add date fields for tooltip
+    if 'timestamp' in keys:
+        fields["youtube_timestamp"] = youtube_metadata['timestamp']
+    if 'release_timestamp' in keys:
+        fields["youtube_release_timestamp"] = youtube_metadata['release_timestamp']
+    if 'release_year' in keys:
+        fields["youtube_release_year"] = youtube_metadata['release_year']
+    # Add metadata sync information for tooltip
+    if 'updated_at' in keys:
+        fields["youtube_metadata_updated"] = youtube_metadata['updated_at']
+    # Add channel handle (@channelname) for tooltip
+    channel_handle = _channel_handle(youtube_metadata)
+    if channel_handle:
+        fields["youtube_channel_handle"] = channel_handle
+    return fields
+
+
+def _media_property_fields(mp: dict) -> dict:
+    # Keep keys aligned with frontend expectations
+    return {
+        "bitrate": mp.get("bitrate"),
+        "resolution": mp.get("resolution"),
+        "filetype": mp.get("filetype"),
+        "video_fps": mp.get("video_fps"),
+        "video_codec": mp.get("video_codec"),
+        "audio_codec": mp.get("audio_codec"),
+        "audio_bitrate": mp.get("audio_bitrate"),
+        "audio_sample_rate": mp.get("audio_sample_rate"),
+    }
+
+
+def _iter_media_files(scan_root: Path, root_dir: Path):
+    """Yield file_data dicts for media files under scan_root, lazily."""
     for file in scan_root.rglob("*.*"):
-        if file.suffix.lower() in {".mp3", ".m4a", ".opus", ".webm", ".flac", ".mp4", ".mkv", ".mov"} and file.is_file():
+        if file.suffix.lower() in MEDIA_SUFFIXES and file.is_file():
             # Extract video ID from filename pattern: Title [VIDEO_ID].ext (must be at end)
             video_id_match = re.search(r"\[([A-Za-z0-9_-]{11})\]$", file.stem)
-            video_id = video_id_match.group(1) if video_id_match else None
-            
             # Calculate path relative to ROOT_DIR (not scan_root)
             rel_to_root = file.relative_to(root_dir)
-            
-            file_data = {
-                'file': file,
-                'video_id': video_id,
+            yield {
+                'video_id': video_id_match.group(1) if video_id_match else None,
                 'rel_path': str(rel_to_root).replace("\\", "/"),
                 'display_name': file.stem,  # Default to filename
-                'size_bytes': file.stat().st_size
+                'size_bytes': file.stat().st_size,
             }
-            files_data.append(file_data)
-            
-            if video_id:
-                video_ids.append(video_id)
+
+
+def iter_tracks(scan_root: Path, *, with_urls: bool = True, chunk_size: int = SCAN_CHUNK_SIZE):
+    """Yield track dicts for media files under scan_root, using YouTube metadata if available.
+
+    Files are processed in chunks of chunk_size: each chunk gets its own batch
+    lookups, so the first tracks are ready before the whole folder is walked
+    and memory stays proportional to the chunk, not the folder.
+    """
+    from database import get_connection
+    
+    # Get ROOT_DIR from global scope (set by init function)
+    root_dir = globals().get('ROOT_DIR')
+    if not root_dir:
+        raise RuntimeError("ROOT_DIR not set. Call set_root_dir() first.")
     
-    # Step 2: Batch load all metadata, statistics, timestamps and media props
-    metadata_lookup = get_youtube_metadata_batch(conn, video_ids)
+    conn = get_connection()
+    try:
+        chunk = []
+        for file_data in _iter_media_files(scan_root, root_dir):
+            chunk.append(file_data)
+            if len(chunk) >= chunk_size:
+                yield from _build_tracks(conn, chunk, with_urls)
+                chunk = []
+        if chunk:
+            yield from _build_tracks(conn, chunk, with_urls)
+    finally:
+        conn.close()
+
+
+def _build_tracks(conn, files_data: List[dict], with_urls: bool):
+    from database import (
+        get_youtube_metadata_batch,
+        get_track_stats_batch,
+        get_last_play_timestamps_batch,
+        get_track_media_properties_batch,
+    )
+    video_ids = [f['video_id'] for f in files_data if f['video_id']]
+    
+    # Batch load all metadata, statistics, timestamps and media props
+    metadata_lookup = get_youtube_metadata_batch(conn, video_ids, SCAN_METADATA_COLUMNS)
     stats_lookup = get_track_stats_batch(conn, video_ids)
     timestamps_lookup = get_last_play_timestamps_batch(conn, video_ids)
     media_props_lookup = get_track_media_properties_batch(conn, video_ids)
     
-    # Step 3: Process tracks with O(1) lookups
-    tracks = []
+    # Process tracks with O(1) lookups
     for file_data in files_data:
         video_id = file_data['video_id']
         
@@ -134,78 +234,83 @@ def scan_tracks(scan_root: Path) -> List[dict]:
         track_data = {
             "name": display_name,
             "relpath": file_data['rel_path'],
-            "url": url_for("media", filename=file_data['rel_path']),
+        }
+        if with_urls:
+            track_data["url"] = url_for("media", filename=file_data['rel_path'])
+        track_data.update({
             "video_id": video_id,
             "last_play": timestamps_lookup.get(video_id) if video_id else None,
             "size_bytes": file_data['size_bytes'],
-        }
+        })
         
         # Add track statistics if video_id exists
         if video_id and video_id in stats_lookup:
-            track_stats = stats_lookup[video_id]
-            track_data.update(track_stats)
+            track_data.update(stats_lookup[video_id])
         
         # Add YouTube metadata if available
         if youtube_metadata:
             try:
-                keys = youtube_metadata.keys()
-                if 'title' in keys:
-                    track_data["youtube_title"] = youtube_metadata['title']
-                if 'channel' in keys:
-                    track_data["youtube_channel"] = youtube_metadata['channel']
-                if 'duration' in keys:
-                    track_data["youtube_duration"] = youtube_metadata['duration']
-                if 'duration_string' in keys:
-                    track_data["youtube_duration_string"] = youtube_metadata['duration_string']
-                if 'view_count' in keys:
-                    track_data["youtube_view_count"] = youtube_metadata['view_count']
-                if 'uploader' in keys:
-                    track_data["youtube_uploader"] = youtube_metadata['uploader']
-                # Add date fields for tooltip
-                if 'timestamp' in keys:
-                    track_data["youtube_timestamp"] = youtube_metadata['timestamp']
-                if 'release_timestamp' in keys:
-                    track_data["youtube_release_timestamp"] = youtube_metadata['release_timestamp']
-                if 'release_year' in keys:
-                    track_data["youtube_release_year"] = youtube_metadata['release_year']
-                # Add metadata sync information for tooltip
-                if 'updated_at' in keys:
-                    track_data["youtube_metadata_updated"] = youtube_metadata['updated_at']
-                # Add channel handle (@channelname) for tooltip
-                channel_handle = None
-                if 'channel_url' in keys and youtube_metadata['channel_url'] and '@' in youtube_metadata['channel_url']:
-                    url_parts = youtube_metadata['channel_url'].split('@')
-                    if len(url_parts) > 1:
-                        channel_handle = '@' + url_parts[1].split('/')[0]
-                elif 'uploader_url' in keys and youtube_metadata['uploader_url'] and '@' in youtube_metadata['uploader_url']:
-                    url_parts = youtube_metadata['uploader_url'].split('@')
-                    if len(url_parts) > 1:
-                        channel_handle = '@' + url_parts[1].split('/')[0]
-                elif 'uploader_id' in keys and youtube_metadata['uploader_id'] and youtube_metadata['uploader_id'].startswith('@'):
-                    channel_handle = youtube_metadata['uploader_id']
-                
-                if channel_handle:
-                    track_data["youtube_channel_handle"] = channel_handle
+                track_data.update(_youtube_track_fields(youtube_metadata))
             except Exception as e:
                 print(f"Warning: Error processing YouTube metadata for {video_id}: {e}")
         
         # Add media properties if available
         if video_id and video_id in media_props_lookup:
-            mp = media_props_lookup[video_id]
-            # Keep keys aligned with frontend expectations
-            track_data["bitrate"] = mp.get("bitrate")
-            track_data["resolution"] = mp.get("resolution")
-            track_data["filetype"] = mp.get("filetype")
-            track_data["video_fps"] = mp.get("video_fps")
-            track_data["video_codec"] = mp.get("video_codec")
-            track_data["audio_codec"] = mp.get("audio_codec")
-            track_data["audio_bitrate"] = mp.get("audio_bitrate")
-            track_data["audio_sample_rate"] = mp.get("audio_sample_rate")
-
-        tracks.append(track_data)
-    
-    conn.close()
-    return tracks
+            track_data.update(_media_property_fields(media_props_lookup[video_id]))
+
+        yield track_data
+
+
+def scan_tracks(scan_root: Path) -> List[dict]:
+    """Scan a directory for media files and return track information, using YouTube metadata if available."""
+    return list(iter_tracks(scan_root))
+
+
+def iter_compact_tracks_json(scan_root: Path, media_prefix: str):
+    """Yield the compact /api/tracks document as JSON text chunks.
+
+    Shape: {"format": "compact", "media_prefix": ..., "fields": [...],
+    "rows": [[...], ...]}. Field names are sent once, each row is an array in
+    fields order with trailing nulls dropped, and TRACK_DETAIL_FIELDS are
+    left out (see get_track_details).
+    """
+    import json
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    yield '{"format":"compact","media_prefix":%s,"fields":%s,"rows":[' % (
+        dumps(media_prefix), dumps(COMPACT_TRACK_FIELDS))
+    buffered = []
+    first = True
+    for track in iter_tracks(scan_root, with_urls=False):
+        row = [track.get(field) for field in COMPACT_TRACK_FIELDS]
+        while row and row[-1] is None:
+            row.pop()
+        buffered.append(dumps(row))
+        if len(buffered) >= SCAN_CHUNK_SIZE:
+            yield ("" if first else ",") + ",".join(buffered)
+            first = False
+            buffered = []
+    if buffered:
+        yield ("" if first else ",") + ",".join(buffered)
+    yield ']}'
+
+
+def get_track_details(video_id: str) -> Optional[dict]:
+    """Tooltip-only fields (TRACK_DETAIL_FIELDS) for one track; None if unknown."""
+    from database import get_connection, get_youtube_metadata_by_id, get_track_media_properties_batch
+    conn = get_connection()
+    try:
+        details = {}
+        metadata_row = get_youtube_metadata_by_id(conn, video_id, SCAN_METADATA_COLUMNS)
+        if metadata_row and metadata_row['title']:
+            details.update(_youtube_track_fields(metadata_row))
+        media_props = get_track_media_properties_batch(conn, [video_id]).get(video_id)
+        if media_props:
+            details.update(_media_property_fields(media_props))
+    finally:
+        conn.close()
+    if not details:
+        return None
+    return {field: details[field] for field in TRACK_DETAIL_FIELDS if details.get(field) is not None}
 
 def _ensure_subdir(requested: Path) -> Path:
     """Return absolute path under ROOT_DIR or abort 404 if traversal is attempted."""
@@ -222,6 +327,34 @@ def _ensure_subdir(requested: Path) -> Path:
     except Exception:
         abort(404)
 
+MEDIA_SUFFIXES = {".mp3", ".m4a", ".opus", ".webm", ".flac", ".mp4", ".mkv", ".mov"}
+
+
+def _scan_media_dirs(root: Path) -> List[str]:
+    """Names of first-level sub-directories that contain at least one media file."""
+    names = []
+    for d in sorted(root.iterdir()):
+        if not d.is_dir():
+            continue
+        if any(p.suffix.lower() in MEDIA_SUFFIXES for p in d.rglob("*.*")):
+            names.append(d.name)
+    return names
+
+
+def get_media_dir_names(root: Path) -> List[str]:
+    """Cached _scan_media_dirs (the recursive walk dominates list_playlists).
+
+    Invalidated by library scans and track deletions/restores (TAG_LIBRARY).
+    """
+    from utils.aggregate_cache import TAG_LIBRARY, get_or_compute
+
+    return get_or_compute(
+        f"media_dirs:{root}",
+        lambda: _scan_media_dirs(root),
+        tags=(TAG_LIBRARY,),
+    )
+
+
 def list_playlists(root: Path) -> List[dict]:
     """Return first-level sub-directories that contain at least one media file."""
     from database import get_connection
@@ -256,30 +389,25 @@ def list_playlists(root: Path) -> List[dict]:
 
     playlists = []
     # root is now PLAYLISTS_DIR directly (like original)
-    for d in sorted(root.iterdir()):
-        if not d.is_dir():
-            continue
-        # does this dir contain at least one media file (recursively)?
-        has_media = any(p.suffix.lower() in {".mp3", ".m4a", ".opus", ".webm", ".flac", ".mp4", ".mkv", ".mov"} for p in d.rglob("*.*"))
-        if has_media:
-            # Since ROOT_DIR now points to Playlists/, rel should be just the folder name
-            rel = d.name  # Just the folder name, like "TopMusic6"
-            # In the original structure, playlists in DB are stored as folder name only
-            dbinfo = meta.get(d.name)  # Look up by folder name only
-            count = dbinfo["dynamic_track_count"] if dbinfo and dbinfo["dynamic_track_count"] is not None else "?"
-            last_sync_str = dbinfo["last_sync_ts"][:16].replace("T", " ") if dbinfo and dbinfo["last_sync_ts"] else "-"
-            has_source = bool(dbinfo and dbinfo["source_url"])
-            playlists.append({
-                "name": d.name,
-                "relpath": rel,
-                "url": url_for("playlist_page", playlist_path=rel),
-                "count": count,
-                "last_sync": last_sync_str,
-                "has_source": has_source,
-                "plays": dbinfo.get("play_total", 0) if dbinfo else 0,
-                "likes": dbinfo.get("like_total", 0) if dbinfo else 0,
-                "forgotten": dbinfo.get("forgotten_total", 0) if dbinfo else 0,
-            })
+    for name in get_media_dir_names(root):
+        # Since ROOT_DIR now points to Playlists/, rel should be just the folder name
+        rel = name  # Just the folder name, like "TopMusic6"
+        # In the original structure, playlists in DB are stored as folder name only
+        dbinfo = meta.get(name)  # Look up by folder name only
+        count = dbinfo["dynamic_track_count"] if dbinfo and dbinfo["dynamic_track_count"] is not None else "?"
+        last_sync_str = dbinfo["last_sync_ts"][:16].replace("T", " ") if dbinfo and dbinfo["last_sync_ts"] else "-"
+        has_source = bool(dbinfo and dbinfo["source_url"])
+        playlists.append({
+            "name": name,
+            "relpath": rel,
+            "url": url_for("playlist_page", playlist_path=rel),
+            "count": count,
+            "last_sync": last_sync_str,
+            "has_source": has_source,
+            "plays": dbinfo.get("play_total", 0) if dbinfo else 0,
+            "likes": dbinfo.get("like_total", 0) if dbinfo else 0,
+            "forgotten": dbinfo.get("forgotten_total", 0) if dbinfo else 0,
+        })
     
     # Sort by forgotten count (descending) by default
     playlists.sort(key=lambda x: x["forgotten"], reverse=True)
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Preview Service
+
+Generates the centralized per-track preview PNGs (``<video_id>_from_youtube.png``
+converted from a downloaded thumbnail, or ``<video_id>_from_media_file.png``
+extracted from the media with ffmpeg) off the request thread.
+
+- A bounded worker pool caps how many ffmpeg processes run at once.
+- Requests for the same video share one in-flight generation (single-flight),
+  so a gallery of 200 tiles loading at once costs at most one ffmpeg per video.
+- Callers wait briefly for the result and otherwise answer with a placeholder;
+  the next request finds the finished file on disk.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import struct
+import subprocess
+import threading
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from utils.logging_utils import log_message
+
+# Each worker runs one ffmpeg process at a time, so this bounds concurrent ffmpeg
+PREVIEW_WORKERS = max(1, min(4, (os.cpu_count() or 2) // 2))
+
+# How long a request waits for a preview before falling back to the placeholder
+PREVIEW_INLINE_WAIT_SECONDS = 2.0
+
+# Suggested client retry delay while a preview is being generated
+PREVIEW_RETRY_AFTER_SECONDS = 2
+
+# Fallback location used by the API when THUMBNAILS_DIR is not configured
+STATIC_PREVIEWS_DIR = Path(__file__).resolve().parent.parent / "static" / "previews"
+
+PREVIEW_SUFFIXES = ("manual", "from_youtube", "from_media_file")
+
+
+def preview_path(previews_dir: Path, video_id: str, kind: str) -> Path:
+    return previews_dir / f"{video_id}_{kind}.png"
+
+
+def existing_preview(video_id: str, previews_dir: Path) -> Optional[Path]:
+    """First existing preview file in the primary or fallback directory."""
+    for kind in PREVIEW_SUFFIXES:
+        for base in (previews_dir, STATIC_PREVIEWS_DIR):
+            candidate = preview_path(base, video_id, kind)
+            if candidate.exists():
+                return candidate
+    return None
+
+
+def find_adjacent_thumbnail(root_dir: Path, relpath: str, video_id: str) -> Path | None:
+    """Search only in the media file's parent directory for a YouTube thumbnail like *[VIDEO_ID].webp/jpg/png."""
+    try:
+        media_abs = (root_dir / relpath).resolve()
+        parent = media_abs.parent
+        pattern = re.compile(r"\[" + re.escape(video_id) + r"\]")
+        for p in parent.iterdir():
+            try:
+                if not p.is_file():
+                    continue
+                if p.suffix.lower() not in {".webp", ".jpg", ".jpeg", ".png"}:
+                    continue
+                if pattern.search(p.stem):
+                    return p
+            except Exception:
+                continue
+    except Exception:
+        return None
+    return None
+
+
+def find_in_thumbnails_dir(thumbnails_dir: Optional[Path], video_id: str) -> Path | None:
+    """If THUMBNAILS_DIR is configured, search there for files named *[VIDEO_ID].webp/jpg/png or <video_id>_*.png."""
+    try:
+        if not thumbnails_dir:
+            return None
+        p = Path(thumbnails_dir)
+        if not p.exists() or not p.is_dir():
+            return None
+        # Prefer explicit centralized names first
+        for kind in PREVIEW_SUFFIXES:
+            cand = preview_path(p, video_id, kind)
+            if cand.exists() and cand.is_file():
+                return cand
+        # Otherwise scan for legacy downloaded thumbnails with [VIDEO_ID]
+        pattern = re.compile(r"\[" + re.escape(video_id) + r"\]")
+        for fp in p.iterdir():
+            try:
+                if not fp.is_file():
+                    continue
+                if fp.suffix.lower() not in {".webp", ".jpg", ".jpeg", ".png"}:
+                    continue
+                if pattern.search(fp.stem):
+                    return fp
+            except Exception:
+                continue
+    except Exception:
+        return None
+    return None
+
+
+def _run_ffmpeg_png(cmd: list, out_path: Path, video_id: str, kind: str) -> Path | None:
+    """Run cmd writing out_path; retry into static/previews if that fails."""
+    try:
+        subprocess.run(cmd, check=True)
+        return out_path if out_path.exists() else None
+    except Exception:
+        # Fallback: save under static/previews if writing to THUMBNAILS_DIR failed
+        try:
+            STATIC_PREVIEWS_DIR.mkdir(parents=True, exist_ok=True)
+            fb_out = preview_path(STATIC_PREVIEWS_DIR, video_id, kind)
+            cmd[-1] = str(fb_out)
+            subprocess.run(cmd, check=True)
+            return fb_out if fb_out.exists() else None
+        except Exception:
+            try:
+                if out_path.exists():
+                    out_path.unlink(missing_ok=True)
+            except Exception:
+                pass
+            return None
+
+
+def ensure_from_youtube_png(previews_dir: Path, src_image: Path, video_id: str) -> Path | None:
+    """Convert/copy found thumbnail to centralized PNG path and return it."""
+    out_path = preview_path(previews_dir, video_id, "from_youtube")
+    # If already exists, return
+    if out_path.exists():
+        return out_path
+    # Try convert with ffmpeg (handles webp/jpg/png to png)
+    cmd = [
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-nostdin",
+        "-i", str(src_image),
+        "-vf", "scale=640:-2:flags=bicubic",
+        "-q:v", "2",
+        "-y", str(out_path),
+    ]
+    return _run_ffmpeg_png(cmd, out_path, video_id, "from_youtube")
+
+
+def ensure_from_media_png(previews_dir: Path, src_media: Path, video_id: str, timestamp: float = 1.0, width: int = 640) -> Path | None:
+    """Extract a frame from the media file into the centralized PNG path."""
+    out_path = preview_path(previews_dir, video_id, "from_media_file")
+    if out_path.exists():
+        return out_path
+    cmd = [
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-nostdin",
+        "-ss", str(timestamp),
+        "-i", str(src_media),
+        "-frames:v", "1",
+        "-vf", f"scale={width}:-2:flags=bicubic",
+        "-q:v", "2",
+        "-y", str(out_path),
+    ]
+    return _run_ffmpeg_png(cmd, out_path, video_id, "from_media_file")
+
+
+def generate_preview(
+    video_id: str,
+    previews_dir: Path,
+    root_dir: Path,
+    relpath: str,
+    thumbnails_dir: Optional[Path] = None,
+) -> Path | None:
+    """Create a preview for one track: downloaded thumbnail first, then a media frame."""
+    adj = find_in_thumbnails_dir(thumbnails_dir, video_id) or find_adjacent_thumbnail(root_dir, relpath, video_id)
+    if adj and adj.exists():
+        conv = ensure_from_youtube_png(previews_dir, adj, video_id)
+        if conv and conv.exists():
+            return conv
+    media_abs = (root_dir / relpath).resolve()
+    gen = ensure_from_media_png(previews_dir, media_abs, video_id, timestamp=1.0, width=640)
+    if gen and gen.exists():
+        return gen
+    return None
+
+
+def _solid_png(width: int, height: int, rgb: Tuple[int, int, int]) -> bytes:
+    """Encode a single-colour RGB PNG without an imaging library."""
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    row = b"\x00" + bytes(rgb) * width
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(row * height, 9))
+        + chunk(b"IEND", b"")
+    )
+
+
+# 16:9 neutral tile matching the dark card background
+PLACEHOLDER_PNG = _solid_png(64, 36, (0x2a, 0x2a, 0x2a))
+
+
+class PreviewService:
+    """Bounded, single-flight preview generation."""
+
+    def __init__(self, max_workers: int = PREVIEW_WORKERS):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="preview")
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._stats = {"submitted": 0, "coalesced": 0, "generated": 0, "failed": 0}
+
+    def run_single_flight(self, key: str, fn, *args) -> Future:
+        """Run fn(*args) in the pool unless a task with the same key is in flight."""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self._stats["coalesced"] += 1
+                return future
+            future = self._executor.submit(self._run, key, fn, args)
+            self._inflight[key] = future
+            self._stats["submitted"] += 1
+        return future
+
+    def _run(self, key: str, fn, args):
+        try:
+            result = fn(*args)
+            with self._lock:
+                self._stats["generated" if result else "failed"] += 1
+            return result
+        except Exception as e:
+            log_message(f"[Preview] Task {key} failed: {e}")
+            with self._lock:
+                self._stats["failed"] += 1
+            return None
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def submit(
+        self,
+        video_id: str,
+        previews_dir: Path,
+        root_dir: Path,
+        relpath: str,
+        thumbnails_dir: Optional[Path] = None,
+    ) -> Future:
+        """Start (or join) generation for video_id; the future resolves to a Path or None."""
+        return self.run_single_flight(
+            video_id, self._generate, video_id, previews_dir, root_dir, relpath, thumbnails_dir
+        )
+
+    @staticmethod
+    def _generate(video_id, previews_dir, root_dir, relpath, thumbnails_dir) -> Path | None:
+        result = generate_preview(video_id, previews_dir, root_dir, relpath, thumbnails_dir)
+        if result:
+            from services.thumbnail_store import invalidate_thumbnails
+            invalidate_thumbnails(video_id)
+        return result
+
+    def ensure(
+        self,
+        video_id: str,
+        previews_dir: Path,
+        root_dir: Path,
+        relpath: str,
+        thumbnails_dir: Optional[Path] = None,
+        wait: float = PREVIEW_INLINE_WAIT_SECONDS,
+    ) -> Tuple[Optional[Path], bool]:
+        """Return (path, pending). pending is True when generation outlived ``wait``."""
+        future = self.submit(video_id, previews_dir, root_dir, relpath, thumbnails_dir)
+        try:
+            return future.result(timeout=wait), False
+        except FutureTimeoutError:
+            return None, True
+
+    def is_pending(self, video_id: str) -> bool:
+        with self._lock:
+            return video_id in self._inflight
+
+    def prewarm(
+        self,
+        tracks: Iterable[Tuple[str, str]],
+        previews_dir: Path,
+        root_dir: Path,
+        thumbnails_dir: Optional[Path] = None,
+    ) -> Dict[str, Future]:
+        """Queue generation for (video_id, relpath) pairs that have no preview yet."""
+        futures: Dict[str, Future] = {}
+        for video_id, relpath in tracks:
+            if not video_id or existing_preview(video_id, previews_dir):
+                continue
+            futures[video_id] = self.submit(video_id, previews_dir, root_dir, relpath, thumbnails_dir)
+        return futures
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._inflight)
+        stats["max_workers"] = self.max_workers
+        return stats
+
+
+_preview_service: Optional[PreviewService] = None
+_preview_service_lock = threading.Lock()
+
+
+def get_preview_service() -> PreviewService:
+    """Get the process-wide PreviewService instance."""
+    global _preview_service
+    if _preview_service is None:
+        with _preview_service_lock:
+            if _preview_service is None:
+                _preview_service = PreviewService()
+    return _preview_service
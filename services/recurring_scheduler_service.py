@@ -2,46 +2,156 @@
 """
 Recurring Scheduler Service
 
-Background service that evaluates persisted schedules and enqueues jobs accordingly.
+Background service that runs persisted schedules and enqueues jobs accordingly.
 
 Supported task types (initial):
 - DATABASE_BACKUP → enqueue JobType.DATABASE_BACKUP using current backup defaults
 - QUICK_SYNC_GROUP → create Quick Sync jobs for all channels in the group
 
-Time semantics:
+Independent of schedules, every ``check_interval_seconds`` the service may
+enqueue SYSTEM_MAINTENANCE when the player has been idle long enough (see
+database_maintenance_worker).
+
+Timing:
+- Each enabled schedule has a next_run_at (UTC, second precision) kept in a
+  min-heap; the thread sleeps until the earliest one (or the maintenance
+  tick) instead of re-evaluating every schedule each minute.
+- next_run_at is persisted, so a restart resumes the same plan; a run missed
+  while the app was down happens once at startup.
+- Creating, updating, toggling or deleting a schedule (database.*_scheduled_task)
+  wakes the thread through a scheduled-task listener; the schedule is
+  re-read from the database before it is dispatched.
 - All schedules are evaluated in UTC.
-- Tolerates polling by using a small execution window based on evaluation interval.
 """
 
 from __future__ import annotations
 
+import heapq
 import threading
 import logging
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Set, Tuple
 
 from controllers.api.shared import get_connection, log_message
 import database as db
 
+WEEKDAYS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+RUN_AT_FORMAT = '%Y-%m-%d %H:%M:%S'
+# task_type values _dispatch_schedule knows how to run
+SUPPORTED_TASK_TYPES = ('DATABASE_BACKUP', 'QUICK_SYNC_GROUP')
+
+
+def parse_run_at(value: Optional[str]) -> Optional[datetime]:
+    """Parse a stored UTC timestamp ('YYYY-MM-DD HH:MM:SS' or ISO, optional 'Z')."""
+    if not value:
+        return None
+    try:
+        # Accept both with/without timezone suffix
+        if value.endswith('Z'):
+            value = value[:-1]
+        return datetime.fromisoformat(value)
+    except Exception:
+        return None
+
+
+def format_run_at(value: datetime) -> str:
+    return value.strftime(RUN_AT_FORMAT)
+
+
+def compute_next_run(sched: Dict[str, Any], now: datetime) -> Optional[datetime]:
+    """Next UTC run time of a schedule at or after ``now`` (None if it never runs).
+
+    - interval: last_run_at + interval (due immediately if that has passed or
+      the schedule never ran)
+    - daily/weekly: the next HH:MM on an allowed day, skipping days that
+      already had a run
+    - cron: not implemented
+    """
+    kind = (sched.get('schedule_kind') or '').lower()
+    last_run = parse_run_at(sched.get('last_run_at'))
+
+    if kind == 'interval':
+        try:
+            interval_minutes = int(sched.get('interval_minutes') or 0)
+        except (TypeError, ValueError):
+            return None
+        if interval_minutes <= 0:
+            return None
+        if not last_run:
+            return now.replace(microsecond=0)
+        return last_run + timedelta(minutes=interval_minutes)
+
+    if kind not in ('daily', 'weekly'):
+        return None
+
+    sched_time = sched.get('schedule_time')
+    if not sched_time or len(str(sched_time).split(':')) != 2:
+        return None
+    try:
+        hour, minute = [int(x) for x in str(sched_time).split(':')]
+        candidate = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    except Exception:
+        return None
+
+    days: Optional[Set[str]] = None
+    if kind == 'weekly':
+        raw_days = sched.get('schedule_days')
+        # get_scheduled_tasks() already JSON-decodes schedule_days into list
+        days = {str(d).lower() for d in raw_days} if isinstance(raw_days, list) else set()
+        if not days:
+            return None
+
+    if candidate < now.replace(microsecond=0):
+        candidate += timedelta(days=1)
+    for _ in range(8):
+        allowed = days is None or WEEKDAYS[candidate.weekday()] in days
+        # At most one run per day, as before
+        if allowed and not (last_run and last_run.date() == candidate.date()):
+            return candidate
+        candidate += timedelta(days=1)
+    return None
+
+
+def _decode_schedule(row) -> Dict[str, Any]:
+    import json
+    item = dict(row)
+    try:
+        item['schedule_days'] = json.loads(item.get('schedule_days') or 'null')
+    except Exception:
+        item['schedule_days'] = None
+    try:
+        item['params'] = json.loads(item.get('params_json') or '{}')
+    except Exception:
+        item['params'] = {}
+    return item
+
 
 class RecurringSchedulerService:
-    """Evaluates scheduled tasks and dispatches corresponding jobs."""
+    """Runs scheduled tasks at their next_run_at and dispatches corresponding jobs."""
 
     def __init__(self, *, check_interval_seconds: int = 60):
+        # Cadence of the idle-maintenance check (schedules no longer poll)
         self.check_interval_seconds = max(5, int(check_interval_seconds))
         self._stop_event = threading.Event()
+        self._wake = threading.Event()
         self._thread: Optional[threading.Thread] = None
         self.logger = logging.getLogger(__name__)
         self.logger.setLevel(logging.INFO)
+        # (next_run, schedule_id); an entry is live only while it matches _planned
+        self._heap: List[Tuple[datetime, int]] = []
+        self._planned: Dict[int, datetime] = {}
+        self._changed: Set[int] = set()
+        self._changed_lock = threading.Lock()
 
     def start(self) -> None:
         if self._thread and self._thread.is_alive():
             self.logger.warning("RecurringSchedulerService is already running")
             return
         self.logger.info(
-            f"Starting RecurringSchedulerService (interval {self.check_interval_seconds}s)"
+            f"Starting RecurringSchedulerService (maintenance check every {self.check_interval_seconds}s)"
         )
         self._stop_event.clear()
+        db.add_scheduled_task_listener(self.notify_schedule_changed)
         self._thread = threading.Thread(
             target=self._loop, name="RecurringScheduler", daemon=True
         )
@@ -53,156 +163,186 @@ class RecurringSchedulerService:
             self.logger.info("RecurringSchedulerService is not running")
             return
         self.logger.info("Stopping RecurringSchedulerService...")
+        db.remove_scheduled_task_listener(self.notify_schedule_changed)
         self._stop_event.set()
+        self._wake.set()
         self._thread.join(timeout=10)
         if self._thread.is_alive():
             self.logger.warning("RecurringSchedulerService did not stop gracefully")
         else:
             self.logger.info("RecurringSchedulerService stopped")
 
+    def notify_schedule_changed(self, schedule_id: int) -> None:
+        """Re-read one schedule on the scheduler thread (called from any thread)."""
+        with self._changed_lock:
+            self._changed.add(int(schedule_id))
+        self._wake.set()
+
+    def planned_runs(self) -> Dict[int, str]:
+        """Schedule id -> planned next run (UTC) as currently held in the heap."""
+        return {sid: format_run_at(at) for sid, at in sorted(self._planned.items(), key=lambda kv: kv[1])}
+
     # ---------- Core loop ----------
 
     def _loop(self) -> None:
+        try:
+            self._load_all()
+        except Exception as exc:
+            self.logger.error(f"RecurringSchedulerService load error: {exc}")
+        next_maintenance = datetime.utcnow()
         while not self._stop_event.is_set():
             try:
-                self._evaluate_once()
+                self._apply_changes()
+                self._run_due(datetime.utcnow())
             except Exception as exc:
                 self.logger.error(f"RecurringSchedulerService loop error: {exc}")
-            # Wait for next tick or stop
-            if self._stop_event.wait(self.check_interval_seconds):
-                break
+            if datetime.utcnow() >= next_maintenance:
+                next_maintenance = datetime.utcnow() + timedelta(seconds=self.check_interval_seconds)
+                try:
+                    from services.job_workers.database_maintenance_worker import maybe_request_idle_maintenance
+                    if maybe_request_idle_maintenance():
+                        log_message("[Scheduler] Player idle; queued database maintenance")
+                except Exception as exc:
+                    self.logger.error(f"Idle maintenance check failed: {exc}")
+            # Sleep until the earliest schedule, the maintenance tick, a change or stop
+            wake_at = next_maintenance
+            if self._heap:
+                wake_at = min(wake_at, self._heap[0][0])
+            timeout = max(0.0, (wake_at - datetime.utcnow()).total_seconds())
+            self._wake.wait(timeout)
+            self._wake.clear()
+
+    def _plan(self, schedule_id: int, run_at: Optional[datetime]) -> None:
+        if run_at is None:
+            self._planned.pop(schedule_id, None)
+            return
+        self._planned[schedule_id] = run_at
+        heapq.heappush(self._heap, (run_at, schedule_id))
 
-    def _evaluate_once(self) -> None:
+    def _plan_schedule(self, conn, sched: Dict[str, Any], now: datetime) -> None:
+        """Plan from the stored next_run_at, computing and persisting it when missing."""
+        sched_id = sched.get('id')
+        if not sched.get('enabled'):
+            self._plan(sched_id, None)
+            return
+        run_at = parse_run_at(sched.get('next_run_at'))
+        if run_at is None:
+            run_at = compute_next_run(sched, now)
+            if run_at is not None:
+                db.touch_scheduled_task_run(conn, sched_id, next_run_at=format_run_at(run_at))
+        self._plan(sched_id, run_at)
+
+    def _load_all(self) -> None:
+        now = datetime.utcnow()
         conn = get_connection()
         try:
             schedules = db.get_scheduled_tasks(conn, only_enabled=True)
+            for sched in schedules:
+                self._plan_schedule(conn, sched, now)
         finally:
             conn.close()
+        if self._planned:
+            first_id, first_at = min(self._planned.items(), key=lambda kv: kv[1])
+            log_message(
+                f"[Scheduler] {len(self._planned)} schedule(s) planned; next: id={first_id} at {format_run_at(first_at)}Z"
+            )
 
-        if not schedules:
+    def _apply_changes(self) -> None:
+        with self._changed_lock:
+            changed, self._changed = self._changed, set()
+        if not changed:
             return
-
-        now_utc = datetime.utcnow()
-        window = timedelta(seconds=self.check_interval_seconds)
-
+        now = datetime.utcnow()
+        conn = get_connection()
         try:
-            log_message(f"[Scheduler] Evaluating {len(schedules)} enabled schedule(s) at {now_utc.isoformat()}Z")
-        except Exception:
-            self.logger.info(f"[Scheduler] Evaluating {len(schedules)} enabled schedule(s)")
+            for sched_id in changed:
+                row = db.get_scheduled_task_by_id(conn, sched_id)
+                if row is None:
+                    self._plan(sched_id, None)
+                    continue
+                self._plan_schedule(conn, _decode_schedule(row), now)
+        finally:
+            conn.close()
 
-        for sched in schedules:
+    def _run_due(self, now: datetime) -> None:
+        while self._heap and self._heap[0][0] <= now:
+            run_at, sched_id = heapq.heappop(self._heap)
+            if self._planned.get(sched_id) != run_at:
+                continue  # superseded entry
+            del self._planned[sched_id]
+            conn = get_connection()
+            try:
+                row = db.get_scheduled_task_by_id(conn, sched_id)
+            finally:
+                conn.close()
+            if row is None:
+                continue
+            sched = _decode_schedule(row)
+            if not sched.get('enabled'):
+                continue
+            stored_at = parse_run_at(sched.get('next_run_at'))
+            if stored_at is not None and stored_at > now:
+                # Moved by another writer since it was planned
+                self._plan(sched_id, stored_at)
+                continue
             try:
-                if self._should_run(sched, now_utc, window):
-                    try:
-                        log_message(
-                            f"[Scheduler] Due schedule id={sched.get('id')} type={sched.get('task_type')} kind={sched.get('schedule_kind')}"
-                        )
-                    except Exception:
-                        pass
-                    self._dispatch_schedule(sched, now_utc)
+                log_message(
+                    f"[Scheduler] Due schedule id={sched_id} type={sched.get('task_type')} kind={sched.get('schedule_kind')} "
+                    f"planned={format_run_at(run_at)}Z"
+                )
+            except Exception:
+                pass
+            try:
+                self._dispatch_schedule(sched, now)
             except Exception as exc:
-                self.logger.error(f"Schedule dispatch error (id={sched.get('id')}): {exc}")
-
-    # ---------- Evaluation helpers ----------
-
-    def _should_run(self, sched: Dict[str, Any], now: datetime, window: timedelta) -> bool:
-        """Decide if schedule should run in this tick.
-
-        Windowed check to tolerate polling intervals. Uses UTC.
-        """
-        kind = (sched.get('schedule_kind') or '').lower()
-        tz = (sched.get('timezone') or 'UTC').upper()
-        if tz != 'UTC':
-            # For v1 only UTC supported
-            self.logger.warning(
-                f"Schedule id={sched.get('id')} uses unsupported timezone '{tz}', treating as UTC"
-            )
-
-        last_run = self._parse_iso(sched.get('last_run_at'))
-        # Prevent double-run in the same window
-        if last_run and (now - last_run) < window:
-            return False
-
-        if kind == 'interval':
-            interval_minutes = sched.get('interval_minutes') or 0
-            if interval_minutes <= 0:
-                return False
-            if not last_run:
-                return True  # first run
-            return now >= (last_run + timedelta(minutes=int(interval_minutes)))
-
-        # Daily/Weekly share time-of-day logic
-        sched_time = sched.get('schedule_time')
-        if not sched_time or len(sched_time.split(':')) != 2:
-            return False
-        try:
-            hour, minute = [int(x) for x in sched_time.split(':')]
-        except Exception:
-            return False
-
-        scheduled_dt = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
-        if kind == 'daily':
-            # Run if now in [scheduled_dt, scheduled_dt + window) and not already run today
-            if last_run and last_run.date() == now.date():
-                return False
-            return 0 <= (now - scheduled_dt).total_seconds() < window.total_seconds()
-
-        if kind == 'weekly':
-            # Check weekday
-            raw_days = sched.get('schedule_days')
-            days: Optional[List[str]] = raw_days if isinstance(raw_days, list) else None
-            # get_scheduled_tasks() already JSON-decodes schedule_days into list
-            if not days:
-                return False
-            weekday_map = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
-            today = weekday_map[now.weekday()]
-            if today not in {d.lower() for d in days}:
-                return False
-            if last_run and last_run.date() == now.date():
-                return False
-            return 0 <= (now - scheduled_dt).total_seconds() < window.total_seconds()
-
-        if kind == 'cron':
-            # Not implemented in v1
-            return False
-
-        return False
-
-    @staticmethod
-    def _parse_iso(value: Optional[str]) -> Optional[datetime]:
-        if not value:
-            return None
-        try:
-            # Accept both with/without timezone suffix
-            if value.endswith('Z'):
-                value = value[:-1]
-            return datetime.fromisoformat(value)
-        except Exception:
-            return None
+                self.logger.error(f"Schedule dispatch error (id={sched_id}): {exc}")
+            # _dispatch_schedule stored the following run; plan it directly
+            conn = get_connection()
+            try:
+                row = db.get_scheduled_task_by_id(conn, sched_id)
+                if row is not None:
+                    sched = _decode_schedule(row)
+                    stored_at = parse_run_at(sched.get('next_run_at'))
+                    if stored_at is not None and stored_at <= now:
+                        # The run time could not be advanced (e.g. DB error); retry
+                        # on the maintenance cadence instead of spinning on it
+                        self._plan(sched_id, now + timedelta(seconds=self.check_interval_seconds))
+                    else:
+                        self._plan_schedule(conn, sched, now + timedelta(seconds=1))
+            finally:
+                conn.close()
 
     # ---------- Dispatchers ----------
 
     def _dispatch_schedule(self, sched: Dict[str, Any], now: datetime) -> None:
         task_type = (sched.get('task_type') or '').upper()
         sched_id = sched.get('id')
-        if task_type == 'DATABASE_BACKUP':
-            self._dispatch_database_backup(sched)
-        elif task_type == 'QUICK_SYNC_GROUP':
-            self._dispatch_quick_sync_group(sched)
-        else:
-            self.logger.warning(f"Unknown scheduled task_type='{task_type}' (id={sched_id})")
-            return
-
-        # Touch last_run_at; optional next_run_at can be computed later/UI-side
-        conn = get_connection()
+        dispatched = False
         try:
-            db.touch_scheduled_task_run(
-                conn,
-                sched_id,
-                last_run_at=now.strftime('%Y-%m-%d %H:%M:%S'),
-            )
+            if task_type == 'DATABASE_BACKUP':
+                self._dispatch_database_backup(sched)
+                dispatched = True
+            elif task_type == 'QUICK_SYNC_GROUP':
+                self._dispatch_quick_sync_group(sched)
+                dispatched = True
+            else:
+                self.logger.warning(f"Unknown scheduled task_type='{task_type}' (id={sched_id})")
         finally:
-            conn.close()
+            # Always move next_run_at forward, also when the task was skipped or
+            # failed; otherwise the stale run time is due again immediately.
+            # last_run_at is only stored for runs that were actually dispatched.
+            last_run_at = format_run_at(now)
+            next_run = compute_next_run({**sched, 'last_run_at': last_run_at}, now + timedelta(seconds=1))
+            conn = get_connection()
+            try:
+                db.touch_scheduled_task_run(
+                    conn,
+                    sched_id,
+                    last_run_at=last_run_at if dispatched else None,
+                    next_run_at=format_run_at(next_run) if next_run else None,
+                )
+            finally:
+                conn.close()
 
     def _dispatch_database_backup(self, sched: Dict[str, Any]) -> None:
         try:
@@ -215,7 +355,7 @@ class RecurringSchedulerService:
         # Map schedule params to backup job data
         params = sched.get('params') or {}
         job_data = JobData(
-            backup_type=params.get('backup_type', 'full'),
+            backup_type=params.get('backup_type', 'incremental'),
             retention_days=params.get('retention_days', 30),
             cleanup_old=params.get('cleanup_old', False),
             force_backup=False,
@@ -245,14 +385,19 @@ class RecurringSchedulerService:
         try:
             from services.channel_sync_service import ChannelSyncService
             service = ChannelSyncService()
-            result = service.quick_sync_channel_group(group_id=group_id)
+            # Scheduled runs check uploads feeds first unless the schedule or the setting disables it
+            feed_check = params.get('feed_check')
+            result = service.quick_sync_channel_group(
+                group_id=group_id,
+                feed_check=None if feed_check is None else bool(feed_check),
+            )
             status = result.get('status')
             if status != 'started':
                 self.logger.error(f"Quick Sync group schedule failed: {result}")
             else:
                 try:
                     log_message(
-                        f"[Scheduler] Quick Sync group started (schedule id={sched.get('id')}, group_id={group_id}, jobs_created={result.get('jobs_created', 0)})"
+                        f"[Scheduler] Quick Sync group started (schedule id={sched.get('id')}, group_id={group_id}, jobs_created={result.get('jobs_created', 0)}, skipped_unchanged={result.get('skipped_unchanged', 0)})"
                     )
                 except Exception:
                     pass
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Sprite Sheet Service
+
+Builds one tiled JPEG per video with frames sampled at a fixed interval, in a
+single ffmpeg pass (``fps`` + ``scale/pad`` + ``tile`` filters), plus a JSON
+index and a WebVTT thumbnails track describing where each frame sits. Scrub
+previews and the manual-preview picker read frames from this one cached image
+instead of launching ffmpeg per hover.
+
+Files live in ``<previews_dir>/sprites/``:
+    <video_id>.sprite.jpg   the sheet
+    <video_id>.sprite.json  {interval, columns, rows, count, tile_width, ...}
+    <video_id>.sprite.vtt   "start --> end" cues pointing at #xywh= regions
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from utils.logging_utils import log_message
+
+SPRITES_SUBDIR = "sprites"
+
+SPRITE_TILE_WIDTH = 160
+SPRITE_TILE_HEIGHT = 90
+SPRITE_COLUMNS = 10
+# Upper bound on frames per sheet; long videos get a wider interval instead
+SPRITE_MAX_FRAMES = 100
+SPRITE_MIN_INTERVAL_SECONDS = 2.0
+SPRITE_JPEG_QUALITY = 5  # ffmpeg -q:v, 2 (best) .. 31
+SPRITE_FFMPEG_TIMEOUT_SECONDS = 600
+# From this interval on, decoding keyframes only is accurate enough and much cheaper
+SPRITE_KEYFRAMES_ONLY_INTERVAL = 10.0
+
+
+def sprites_dir(previews_dir: Path) -> Path:
+    return Path(previews_dir) / SPRITES_SUBDIR
+
+
+def sprite_paths(previews_dir: Path, video_id: str) -> Dict[str, Path]:
+    base = sprites_dir(previews_dir)
+    return {
+        "image": base / f"{video_id}.sprite.jpg",
+        "index": base / f"{video_id}.sprite.json",
+        "vtt": base / f"{video_id}.sprite.vtt",
+    }
+
+
+def sprite_interval(duration: float) -> float:
+    """Seconds between frames so the sheet stays within SPRITE_MAX_FRAMES."""
+    return max(SPRITE_MIN_INTERVAL_SECONDS, math.ceil(duration / SPRITE_MAX_FRAMES))
+
+
+def load_sprite_index(previews_dir: Path, video_id: str) -> Optional[Dict[str, Any]]:
+    """Parsed index for video_id, or None if no sheet has been generated."""
+    try:
+        with open(sprite_paths(previews_dir, video_id)["index"], "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def _vtt_timestamp(seconds: float) -> str:
+    ms = int(round(seconds * 1000))
+    h, rem = divmod(ms, 3600_000)
+    m, rem = divmod(rem, 60_000)
+    s, ms = divmod(rem, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d}.{ms:03d}"
+
+
+def build_vtt(index: Dict[str, Any], image_url: str) -> str:
+    """WebVTT thumbnails track for an index (cue text is image#xywh=x,y,w,h)."""
+    lines = ["WEBVTT", ""]
+    interval = index["interval"]
+    columns = index["columns"]
+    tw, th = index["tile_width"], index["tile_height"]
+    duration = index.get("duration") or interval * index["count"]
+    for i in range(index["count"]):
+        start = i * interval
+        end = min(duration, start + interval)
+        if end <= start:
+            break
+        x = (i % columns) * tw
+        y = (i // columns) * th
+        lines.append(f"{_vtt_timestamp(start)} --> {_vtt_timestamp(end)}")
+        lines.append(f"{image_url}#xywh={x},{y},{tw},{th}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def generate_sprite_sheet(
+    video_id: str,
+    media_path: Path,
+    previews_dir: Path,
+    duration: float,
+    force: bool = False,
+) -> Optional[Dict[str, Any]]:
+    """Generate (or reuse) the sprite sheet for one video; returns its index.
+
+    One ffmpeg run decodes the file once: ``fps=1/interval`` samples frames,
+    scale+pad letterboxes them into fixed cells and ``tile`` lays them out.
+    """
+    if not duration or duration <= 0:
+        return None
+    paths = sprite_paths(previews_dir, video_id)
+    try:
+        source_mtime = int(media_path.stat().st_mtime)
+    except OSError:
+        return None
+
+    if not force:
+        existing = load_sprite_index(previews_dir, video_id)
+        if existing and existing.get("source_mtime") == source_mtime and paths["image"].exists():
+            return existing
+
+    interval = sprite_interval(duration)
+    count = max(1, min(SPRITE_MAX_FRAMES, int(math.ceil(duration / interval))))
+    columns = min(SPRITE_COLUMNS, count)
+    rows = int(math.ceil(count / columns))
+    tw, th = SPRITE_TILE_WIDTH, SPRITE_TILE_HEIGHT
+
+    vf = (
+        f"fps=1/{interval:g},"
+        f"scale={tw}:{th}:force_original_aspect_ratio=decrease,"
+        f"pad={tw}:{th}:(ow-iw)/2:(oh-ih)/2,"
+        f"tile={columns}x{rows}"
+    )
+    out_dir = sprites_dir(previews_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    fd, tmp_image = tempfile.mkstemp(suffix=".jpg", dir=str(out_dir))
+    os.close(fd)
+    cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-nostdin"]
+    if interval >= SPRITE_KEYFRAMES_ONLY_INTERVAL:
+        cmd += ["-skip_frame", "nokey"]
+    cmd += [
+        "-i", str(media_path),
+        "-an", "-sn",
+        "-vf", vf,
+        "-frames:v", "1",
+        "-q:v", str(SPRITE_JPEG_QUALITY),
+        "-y", tmp_image,
+    ]
+    started = time.monotonic()
+    try:
+        subprocess.run(cmd, check=True, timeout=SPRITE_FFMPEG_TIMEOUT_SECONDS)
+        os.replace(tmp_image, paths["image"])
+    except Exception as e:
+        log_message(f"[Sprites] ffmpeg failed for {video_id}: {e}")
+        return None
+    finally:
+        if os.path.exists(tmp_image):
+            os.remove(tmp_image)
+
+    index = {
+        "video_id": video_id,
+        "interval": interval,
+        "count": count,
+        "columns": columns,
+        "rows": rows,
+        "tile_width": tw,
+        "tile_height": th,
+        "duration": duration,
+        "source_mtime": source_mtime,
+        "generated_at": int(time.time()),
+        # Cache-busting token for the image URL
+        "version": time.time_ns() // 1_000_000,
+    }
+    # Index last: its presence means the sheet is complete
+    paths["vtt"].write_text(build_vtt(index, paths["image"].name), encoding="utf-8")
+    tmp_index = paths["index"].with_suffix(".json.tmp")
+    tmp_index.write_text(json.dumps(index), encoding="utf-8")
+    os.replace(tmp_index, paths["index"])
+    log_message(
+        f"[Sprites] {video_id}: {count} frames every {interval:g}s "
+        f"({columns}x{rows}) in {time.monotonic() - started:.1f}s"
+    )
+    return index
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Thumbnail Store
+
+Serves track previews as small WebP variants at a few fixed widths instead of
+the full-size PNGs (``<video_id>_manual.png``, ``_from_youtube.png``,
+``_from_media_file.png``) that PreviewService writes.
+
+- Variant files are named ``<video_id>.<source>.<width>.<hash>.webp``. The hash
+  comes from the source PNG's content, so a variant URL never changes meaning
+  and can be served with ``Cache-Control: immutable``.
+- Which source PNGs and variants exist is kept in an in-memory index built from
+  one directory listing. Requests do not probe the filesystem with exists().
+  Writers call ``invalidate(video_id)``, and a periodic rescan catches files
+  changed outside the API.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.logging_utils import log_message
+
+THUMB_WIDTHS = (160, 320, 640)
+THUMB_FORMAT = "webp"
+WEBP_QUALITY = 80
+
+# Safety rescan for files added/removed behind the API's back
+INDEX_RESCAN_SECONDS = 600.0
+
+VARIANTS_SUBDIR = "variants"
+
+# Preview priority keys (PREVIEW_PRIORITY) -> source file kind
+SOURCE_KINDS = {"manual": "manual", "youtube": "from_youtube", "media": "from_media_file"}
+
+_SOURCE_RE = re.compile(r"^([A-Za-z0-9_-]{11})_(manual|from_youtube|from_media_file)\.png$")
+_VARIANT_RE = re.compile(
+    r"^([A-Za-z0-9_-]{11})\.(manual|from_youtube|from_media_file)\.(\d+)\.([0-9a-f]{12})\.webp$"
+)
+
+
+def snap_width(requested: Optional[int]) -> int:
+    """Smallest stored width that covers the requested one."""
+    if not requested or requested <= 0:
+        return THUMB_WIDTHS[-1]
+    for width in THUMB_WIDTHS:
+        if width >= requested:
+            return width
+    return THUMB_WIDTHS[-1]
+
+
+def _content_hash(path: Path) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+class ThumbnailStore:
+    """Index of preview sources and their WebP variants for one previews directory."""
+
+    def __init__(self, previews_dir: Path, fallback_dir: Optional[Path] = None):
+        self.previews_dir = Path(previews_dir)
+        self.fallback_dir = Path(fallback_dir) if fallback_dir else None
+        self.variants_dir = self.previews_dir / VARIANTS_SUBDIR
+        self._lock = threading.RLock()
+        # video_id -> {kind: path}
+        self._sources: Dict[str, Dict[str, Path]] = {}
+        # video_id -> {(kind, width): filename}
+        self._variants: Dict[str, Dict[Tuple[str, int], str]] = {}
+        self._scanned_at = 0.0
+
+    # ----- index -----
+
+    def _scan_locked(self) -> None:
+        sources: Dict[str, Dict[str, Path]] = {}
+        # Fallback first so primary files win
+        for base in [d for d in (self.fallback_dir, self.previews_dir) if d]:
+            try:
+                with os.scandir(base) as it:
+                    for entry in it:
+                        m = _SOURCE_RE.match(entry.name)
+                        if m and entry.is_file():
+                            sources.setdefault(m.group(1), {})[m.group(2)] = Path(entry.path)
+            except FileNotFoundError:
+                continue
+        variants: Dict[str, Dict[Tuple[str, int], str]] = {}
+        try:
+            with os.scandir(self.variants_dir) as it:
+                for entry in it:
+                    m = _VARIANT_RE.match(entry.name)
+                    if m:
+                        variants.setdefault(m.group(1), {})[(m.group(2), int(m.group(3)))] = entry.name
+        except FileNotFoundError:
+            pass
+        self._sources = sources
+        self._variants = variants
+        self._scanned_at = time.monotonic()
+
+    def _ensure_index(self) -> None:
+        with self._lock:
+            if not self._scanned_at or time.monotonic() - self._scanned_at > INDEX_RESCAN_SECONDS:
+                self._scan_locked()
+
+    def invalidate(self, video_id: str) -> None:
+        """Re-read one video's sources and drop variants built from replaced sources."""
+        with self._lock:
+            if not self._scanned_at:
+                return
+            found: Dict[str, Path] = {}
+            for base in [d for d in (self.fallback_dir, self.previews_dir) if d]:
+                for kind in SOURCE_KINDS.values():
+                    candidate = base / f"{video_id}_{kind}.png"
+                    if candidate.exists():
+                        found[kind] = candidate
+            if found:
+                self._sources[video_id] = found
+            else:
+                self._sources.pop(video_id, None)
+            stale = self._variants.pop(video_id, {})
+        # Content hashes are cheap to recompute; remove old files so the
+        # directory does not accumulate variants of replaced sources
+        for filename in stale.values():
+            try:
+                (self.variants_dir / filename).unlink(missing_ok=True)
+            except Exception:
+                pass
+
+    def source_for(self, video_id: str, order: Iterable[str]) -> Optional[Tuple[str, Path]]:
+        """(kind, path) of the preferred existing source per PREVIEW_PRIORITY order."""
+        self._ensure_index()
+        with self._lock:
+            sources = self._sources.get(video_id) or {}
+            for key in order:
+                kind = SOURCE_KINDS.get(key)
+                if kind and kind in sources:
+                    return kind, sources[kind]
+        return None
+
+    def variant_name(self, video_id: str, kind: str, width: int) -> Optional[str]:
+        self._ensure_index()
+        with self._lock:
+            return (self._variants.get(video_id) or {}).get((kind, width))
+
+    def variant_path(self, filename: str) -> Optional[Path]:
+        """Absolute path for a variant filename, or None if it is not a known variant."""
+        m = _VARIANT_RE.match(filename or "")
+        if not m:
+            return None
+        return self.variants_dir / filename
+
+    def lookup_many(self, video_ids: Iterable[str], order: List[str], width: int) -> Dict[str, Optional[str]]:
+        """video_id -> existing variant filename (None when it still has to be built)."""
+        self._ensure_index()
+        result: Dict[str, Optional[str]] = {}
+        with self._lock:
+            for video_id in video_ids:
+                sources = self._sources.get(video_id) or {}
+                variants = self._variants.get(video_id) or {}
+                name = None
+                for key in order:
+                    kind = SOURCE_KINDS.get(key)
+                    if kind and kind in sources:
+                        name = variants.get((kind, width))
+                        break
+                result[video_id] = name
+        return result
+
+    # ----- generation -----
+
+    def build_variant(self, video_id: str, kind: str, source: Path, width: int) -> Optional[str]:
+        """Encode source at width into the variants directory; returns the filename."""
+        existing = self.variant_name(video_id, kind, width)
+        if existing:
+            return existing
+        try:
+            content_hash = _content_hash(source)
+        except FileNotFoundError:
+            self.invalidate(video_id)
+            return None
+        filename = f"{video_id}.{kind}.{width}.{content_hash}.{THUMB_FORMAT}"
+        out_path = self.variants_dir / filename
+        try:
+            self.variants_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(suffix=f".{THUMB_FORMAT}", dir=str(self.variants_dir))
+            os.close(fd)
+            cmd = [
+                "ffmpeg", "-hide_banner", "-loglevel", "error", "-nostdin",
+                "-i", str(source),
+                "-vf", f"scale='min({width},iw)':-2:flags=lanczos",
+                "-c:v", "libwebp", "-quality", str(WEBP_QUALITY),
+                "-y", tmp_name,
+            ]
+            try:
+                subprocess.run(cmd, check=True, timeout=60)
+                os.replace(tmp_name, out_path)
+            finally:
+                if os.path.exists(tmp_name):
+                    os.remove(tmp_name)
+        except Exception as e:
+            log_message(f"[Thumbnails] WebP encode failed for {video_id} ({kind}, {width}px): {e}")
+            return None
+        with self._lock:
+            self._variants.setdefault(video_id, {})[(kind, width)] = filename
+        return filename
+
+    def get_stats(self) -> Dict[str, int]:
+        self._ensure_index()
+        with self._lock:
+            return {
+                "videos_with_sources": len(self._sources),
+                "variants": sum(len(v) for v in self._variants.values()),
+            }
+
+
+_stores: Dict[str, ThumbnailStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_thumbnail_store(previews_dir: Path, fallback_dir: Optional[Path] = None) -> ThumbnailStore:
+    """Shared ThumbnailStore for a previews directory."""
+    key = str(Path(previews_dir).resolve())
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = ThumbnailStore(previews_dir, fallback_dir)
+            _stores[key] = store
+        return store
+
+
+def invalidate_thumbnails(video_id: str) -> None:
+    """Tell every store that video_id's preview sources changed."""
+    with _stores_lock:
+        stores = list(_stores.values())
+    for store in stores:
+        store.invalidate(video_id)
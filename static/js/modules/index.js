@@ -142,6 +142,12 @@ export {
 // Re-export unified tracklist renderer
 export { renderTrackList } from './tracklist-render.js';
 
+// Re-export from sprite-preview.js
+export { loadSpriteIndex, attachScrubPreview, renderSpriteStrip } from './sprite-preview.js';
+
+// Re-export from track-payload.js
+export { fetchTrackList, expandCompactTracks, loadTrackDetails } from './track-payload.js';
+
 // Legacy compatibility - re-export everything from the original player-utils.js
 // This ensures existing imports continue to work during the transition
 export * from './player-utils.js';
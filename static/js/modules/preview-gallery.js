@@ -3,6 +3,7 @@
 // navigation, dots rendering, fetching from YouTube, and promote-to-manual.
 
 import { YT_THUMB_BROADCAST } from './youtube-thumbnail-autofetch.js';
+import { loadSpriteIndex, renderSpriteStrip } from './sprite-preview.js';
 
 export function initPreviewGallery(options) {
   const {
@@ -25,6 +26,7 @@ export function initPreviewGallery(options) {
   let available = [];
   let isPlayerActive = false;
   let videoEl = null;
+  let spriteStripEl = null;
   /** Avoid overlapping auto-fetch POSTs if `playing` fires repeatedly (buffering). */
   let autoYoutubeFetchInflight = false;
 
@@ -74,10 +76,32 @@ export function initPreviewGallery(options) {
     return { ok: true };
   }
 
+  /** preview.png answers 202 + Retry-After with a placeholder while the preview is generated. */
+  const PREVIEW_PENDING_MAX_RETRIES = 10;
+  let previewRetryTimer = null;
+  let previewObjectUrl = null;
+
+  function showPreviewImage(src, attempt = 0) {
+    clearTimeout(previewRetryTimer);
+    const url = `/api/track/${videoId}/preview.png?src=${src}&t=${Date.now()}`;
+    fetch(url).then(async (resp) => {
+      if (!resp.ok) { imgEl.src = url; return; }
+      const blob = await resp.blob();
+      // Another source was selected meanwhile
+      if (getActiveSource() !== src) return;
+      if (previewObjectUrl) URL.revokeObjectURL(previewObjectUrl);
+      previewObjectUrl = URL.createObjectURL(blob);
+      imgEl.src = previewObjectUrl;
+      if (resp.status === 202 && attempt < PREVIEW_PENDING_MAX_RETRIES) {
+        const delay = Math.max(1, parseInt(resp.headers.get('Retry-After'), 10) || 2) * 1000;
+        previewRetryTimer = setTimeout(() => showPreviewImage(src, attempt + 1), delay);
+      }
+    }).catch(() => { imgEl.src = url; });
+  }
+
   function setPreviewSource(src) {
     if (!imgEl) return;
-    const base = `/api/track/${videoId}/preview.png?src=${src}`;
-    imgEl.src = `${base}&t=${Date.now()}`;
+    showPreviewImage(src);
     if (captionEl) captionEl.textContent = sourceLabel(src);
     fetch(`/api/track/${videoId}/preview_info`).then(r=>r.json()).then(data => {
       try {
@@ -148,6 +172,20 @@ export function initPreviewGallery(options) {
       };
       videoEl.addEventListener('playing', onInlinePlaying);
 
+      // Frame picker from the sprite sheet: click a frame to seek there, then promote
+      loadSpriteIndex(videoId).then((sprite) => {
+        if (!sprite || !isPlayerActive || !videoEl) return;
+        spriteStripEl = document.createElement('div');
+        spriteStripEl.className = 'sprite-strip';
+        spriteStripEl.style.cssText = 'display:flex; flex-wrap:nowrap; overflow-x:auto; margin-top:6px;';
+        renderSpriteStrip(spriteStripEl, sprite, (seconds) => {
+          if (!videoEl) return;
+          try { videoEl.pause(); } catch {}
+          videoEl.currentTime = seconds;
+        });
+        videoEl.parentElement.insertBefore(spriteStripEl, videoEl.nextSibling);
+      });
+
       // Try to start playback immediately; fall back to starting when ready
       const tryStart = () => {
         try {
@@ -174,6 +212,10 @@ export function initPreviewGallery(options) {
         videoEl.remove();
       }
       videoEl = null;
+      if (spriteStripEl) {
+        spriteStripEl.remove();
+        spriteStripEl = null;
+      }
       imgEl.style.display = '';
       if (dotsEl) dotsEl.style.display = '';
       playBtn && (playBtn.style.display = 'inline-flex');
@@ -1251,7 +1251,8 @@ class RemoteControl {
             : null;
         if (covId) {
           if (trackIdentityChanged) {
-            this.trackCoverImg.src = `/api/track/${encodeURIComponent(covId)}/preview.png?t=${Date.now()}`;
+            // Resolves to an immutable, content-hashed WebP; a changed preview gets a new URL
+            this.trackCoverImg.src = `/api/track/${encodeURIComponent(covId)}/thumb?w=640`;
           }
           this.trackCoverImg.alt = `Cover: ${displayName}`;
           this.trackCoverImg.hidden = false;
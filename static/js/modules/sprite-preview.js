@@ -0,0 +1,131 @@
+/**
+ * Sprite Preview - scrub frames from the per-video sprite sheet
+ *
+ * /api/track/<id>/sprite returns an index describing one tiled JPEG; frame i
+ * covers [i*interval, (i+1)*interval) and sits at column i % columns, row
+ * i / columns. Showing a frame is a background-position change, so hovering
+ * never hits ffmpeg. Missing sheets are queued server-side on first request.
+ */
+
+const spriteCache = new Map();
+// Retry a missing sheet after this long (the job may have finished meanwhile)
+const MISSING_RETRY_MS = 60 * 1000;
+
+/**
+ * Load (and cache) the sprite index for a video
+ * @param {string} videoId
+ * @returns {Promise<Object|null>} { index, image_url } or null when not generated yet
+ */
+export function loadSpriteIndex(videoId) {
+  if (!videoId) return Promise.resolve(null);
+  const cached = spriteCache.get(videoId);
+  if (cached && (cached.sprite || Date.now() - cached.at < MISSING_RETRY_MS)) return cached.promise;
+  const promise = fetch(`/api/track/${encodeURIComponent(videoId)}/sprite`)
+    .then((res) => (res.ok ? res.json() : null))
+    .then((data) => {
+      const sprite = data && data.status === 'ok' ? { index: data.index, image_url: data.image_url } : null;
+      spriteCache.set(videoId, { promise: Promise.resolve(sprite), sprite, at: Date.now() });
+      return sprite;
+    })
+    .catch(() => null);
+  spriteCache.set(videoId, { promise, sprite: null, at: Date.now() });
+  return promise;
+}
+
+/**
+ * Index of the frame shown for a given time
+ * @param {Object} index - sprite index
+ * @param {number} seconds
+ * @returns {number}
+ */
+export function spriteFrameAt(index, seconds) {
+  const i = Math.floor(Math.max(0, seconds) / index.interval);
+  return Math.min(index.count - 1, Math.max(0, i));
+}
+
+/**
+ * Paint frame `frame` of the sheet into an element sized tile_width x tile_height
+ * @param {HTMLElement} el
+ * @param {Object} sprite - { index, image_url }
+ * @param {number} frame
+ */
+export function applySpriteFrame(el, sprite, frame) {
+  const { index, image_url } = sprite;
+  const x = (frame % index.columns) * index.tile_width;
+  const y = Math.floor(frame / index.columns) * index.tile_height;
+  el.style.width = `${index.tile_width}px`;
+  el.style.height = `${index.tile_height}px`;
+  el.style.backgroundImage = `url("${image_url}")`;
+  el.style.backgroundPosition = `-${x}px -${y}px`;
+  el.style.backgroundRepeat = 'no-repeat';
+}
+
+/**
+ * Show a frame preview above a progress bar while hovering it
+ * @param {HTMLElement} progressEl - progress container (click-to-seek area)
+ * @param {Object} options
+ * @param {Function} options.getVideoId - () => current video id
+ * @param {Function} options.getDuration - () => current media duration (seconds)
+ * @param {Function} [options.formatTime] - (seconds) => label
+ */
+export function attachScrubPreview(progressEl, { getVideoId, getDuration, formatTime }) {
+  if (!progressEl) return;
+  const popup = document.createElement('div');
+  popup.className = 'scrub-preview';
+  popup.style.cssText = 'position:fixed; display:none; pointer-events:none; z-index:1000; border:1px solid rgba(255,255,255,0.4); border-radius:4px; background-color:#000; box-shadow:0 2px 8px rgba(0,0,0,0.5);';
+  const label = document.createElement('div');
+  label.style.cssText = 'position:absolute; left:0; right:0; bottom:0; text-align:center; font-size:11px; color:#fff; background:rgba(0,0,0,0.6);';
+  popup.appendChild(label);
+  document.body.appendChild(popup);
+
+  let hovering = false;
+  progressEl.addEventListener('mouseleave', () => { hovering = false; popup.style.display = 'none'; });
+  progressEl.addEventListener('mousemove', async (e) => {
+    hovering = true;
+    const videoId = getVideoId();
+    const duration = getDuration();
+    if (!videoId || !duration || !isFinite(duration)) return;
+    const sprite = await loadSpriteIndex(videoId);
+    if (!sprite || !hovering || getVideoId() !== videoId) return;
+
+    const rect = progressEl.getBoundingClientRect();
+    const pos = Math.min(1, Math.max(0, (e.clientX - rect.left) / rect.width));
+    const seconds = pos * duration;
+    applySpriteFrame(popup, sprite, spriteFrameAt(sprite.index, seconds));
+    label.textContent = typeof formatTime === 'function' ? formatTime(seconds) : '';
+    const half = sprite.index.tile_width / 2;
+    const left = Math.min(window.innerWidth - sprite.index.tile_width - 4, Math.max(4, e.clientX - half));
+    popup.style.left = `${left}px`;
+    popup.style.top = `${rect.top - sprite.index.tile_height - 8}px`;
+    popup.style.display = 'block';
+  });
+}
+
+/**
+ * Render every frame of the sheet as a clickable strip (manual-preview picker)
+ * @param {HTMLElement} container
+ * @param {Object} sprite - { index, image_url }
+ * @param {Function} onPick - (seconds) => void
+ */
+export function renderSpriteStrip(container, sprite, onPick) {
+  container.innerHTML = '';
+  const scale = 0.5;
+  const { index } = sprite;
+  for (let i = 0; i < index.count; i++) {
+    const cell = document.createElement('button');
+    cell.type = 'button';
+    cell.className = 'sprite-frame';
+    cell.title = `${Math.round(i * index.interval)}s`;
+    cell.style.cssText = 'padding:0; margin:2px; border:1px solid var(--border); border-radius:3px; cursor:pointer; flex:0 0 auto;';
+    applySpriteFrame(cell, sprite, i);
+    // Half-size cells: scale the sheet along with the cell
+    cell.style.width = `${index.tile_width * scale}px`;
+    cell.style.height = `${index.tile_height * scale}px`;
+    cell.style.backgroundSize = `${index.columns * index.tile_width * scale}px ${index.rows * index.tile_height * scale}px`;
+    const x = (i % index.columns) * index.tile_width * scale;
+    const y = Math.floor(i / index.columns) * index.tile_height * scale;
+    cell.style.backgroundPosition = `-${x}px -${y}px`;
+    cell.addEventListener('click', () => onPick(i * index.interval));
+    container.appendChild(cell);
+  }
+}
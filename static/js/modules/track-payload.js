@@ -0,0 +1,76 @@
+/**
+ * Track Payload - loads the compact /api/tracks document and lazy tooltip details
+ *
+ * The compact format sends field names once and each track as an array, without
+ * media URLs (rebuilt from media_prefix + relpath) and without tooltip-only
+ * fields, which are fetched per track from /api/track_details/<video_id>.
+ */
+
+// Same escaping as Flask's url_for, so URLs (and browser cache entries) match server-rendered ones
+function encodeMediaPath(relpath) {
+  return relpath
+    .split('/')
+    .map((part) => encodeURIComponent(part).replace(/%(2C|3B|3D|3A|40|26|2B|24)/g, (m) => decodeURIComponent(m)))
+    .join('/');
+}
+
+/**
+ * Expand a compact document ({fields, rows, media_prefix}) into track objects
+ * @param {Object} payload - parsed compact response
+ * @returns {Array<Object>} tracks shaped like the legacy /api/tracks items
+ */
+export function expandCompactTracks(payload) {
+  const fields = payload.fields || [];
+  const prefix = payload.media_prefix || '/media/';
+  return (payload.rows || []).map((row) => {
+    const track = {};
+    for (let i = 0; i < row.length; i++) {
+      if (row[i] !== null) track[fields[i]] = row[i];
+    }
+    if (track.relpath) {
+      track.url = prefix + encodeMediaPath(track.relpath);
+    }
+    return track;
+  });
+}
+
+/**
+ * Fetch a track list, preferring the compact format
+ * @param {string} endpoint - /api/tracks or /api/tracks/<playlist>
+ * @returns {Promise<Array<Object>>}
+ */
+export async function fetchTrackList(endpoint) {
+  const sep = endpoint.includes('?') ? '&' : '?';
+  const res = await fetch(`${endpoint}${sep}format=compact`);
+  const data = await res.json();
+  // Older servers ignore format=compact and return the object list
+  if (Array.isArray(data)) return data;
+  return expandCompactTracks(data);
+}
+
+const detailRequests = new Map();
+
+/**
+ * Merge tooltip-only fields into a track (once per video_id)
+ * @param {Object} track - track object from fetchTrackList
+ * @returns {Promise<Object>} the same track, with details when available
+ */
+export function loadTrackDetails(track) {
+  if (!track || !track.video_id || track._detailsLoaded) return Promise.resolve(track);
+  let pending = detailRequests.get(track.video_id);
+  if (!pending) {
+    pending = fetch(`/api/track_details/${encodeURIComponent(track.video_id)}`)
+      .then((res) => (res.ok ? res.json() : null))
+      .then((data) => (data && data.details) || {})
+      .catch(() => {
+        detailRequests.delete(track.video_id);
+        return {};
+      });
+    detailRequests.set(track.video_id, pending);
+  }
+  return pending.then((details) => {
+    Object.assign(track, details);
+    track._detailsLoaded = true;
+    return track;
+  });
+}
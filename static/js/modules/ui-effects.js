@@ -345,8 +345,13 @@ export function createTrackTooltipHTML(track) {
  * Setup global tooltip system for track elements
  * Creates a single tooltip element and adds handlers for all tracks with data-tooltip-html
  * @param {HTMLElement} listElem - list element to search for tooltip elements
+ * @param {Object} [options]
+ * @param {Function} [options.getTrack] - (li) => track object for the row
+ * @param {Function} [options.loadDetails] - (track) => Promise<track> with tooltip-only fields merged in
  */
-export function setupGlobalTooltip(listElem) {
+export function setupGlobalTooltip(listElem, options = {}) {
+    const { getTrack, loadDetails } = options;
+    let hoveredItem = null;
     const TOOLTIP_VERTICAL_SPACING = 4;
     // Remove existing tooltip if any
     const existingTooltip = document.getElementById('global-tooltip');
@@ -366,62 +371,80 @@ export function setupGlobalTooltip(listElem) {
     
     trackItems.forEach(item => {
         item.addEventListener('mouseenter', (e) => {
+            hoveredItem = item;
             const tooltipHTML = item.getAttribute('data-tooltip-html');
             tooltip.innerHTML = tooltipHTML;
             tooltip.style.display = 'block';
-            
-            // Position tooltip intelligently
-            const rect = item.getBoundingClientRect();
-            const tooltipRect = tooltip.getBoundingClientRect();
-            const windowWidth = window.innerWidth;
-            const windowHeight = window.innerHeight;
-            
-            let left, top;
-            
-            // Check if there's enough space on the right
-            if (rect.right + tooltipRect.width + 20 <= windowWidth) {
-                // Show on the right
-                left = rect.right + 10;
-            } else {
-                // Show on the left
-                left = rect.left - tooltipRect.width - 10;
-            }
-            
-            // Ensure tooltip doesn't go off screen horizontally
-            if (left < 10) left = 10;
-            if (left + tooltipRect.width > windowWidth - 10) {
-                left = windowWidth - tooltipRect.width - 10;
-            }
-            
-            // Position vertically
-            const layoutMode = getCurrentLayoutMode ? getCurrentLayoutMode() : null;
-            const isUnderVideo = layoutMode === LAYOUT_MODES.UNDER_VIDEO;
+            positionTooltip(item);
 
-            if (isUnderVideo) {
-                // Prefer showing the tooltip below the hovered row
-                top = rect.top + rect.height + TOOLTIP_VERTICAL_SPACING;
-                // If it overflows bottom, place it above the row
-                if (top + tooltipRect.height > windowHeight - 10) {
-                    top = rect.top - tooltipRect.height - TOOLTIP_VERTICAL_SPACING;
-                }
-            } else {
-                // Default behavior for side-by-side and other modes
-                top = rect.top;
+            // Fill in fields the compact track list leaves out, then re-render
+            const track = getTrack && loadDetails ? getTrack(item) : null;
+            if (track && !track._detailsLoaded) {
+                loadDetails(track).then((loaded) => {
+                    const html = createTrackTooltipHTML(loaded);
+                    item.setAttribute('data-tooltip-html', html);
+                    if (hoveredItem === item) {
+                        tooltip.innerHTML = html;
+                        positionTooltip(item);
+                    }
+                });
             }
-            
-            // Ensure tooltip doesn't go off screen vertically
-            if (top + tooltipRect.height > windowHeight - 10) {
-                top = windowHeight - tooltipRect.height - 10;
-            }
-            if (top < 10) top = 10;
-            
-            tooltip.style.position = 'fixed';
-            tooltip.style.left = left + 'px';
-            tooltip.style.top = top + 'px';
         });
         
         item.addEventListener('mouseleave', () => {
+            hoveredItem = null;
             tooltip.style.display = 'none';
         });
     });
+
+    function positionTooltip(item) {
+        // Position tooltip intelligently
+        const rect = item.getBoundingClientRect();
+        const tooltipRect = tooltip.getBoundingClientRect();
+        const windowWidth = window.innerWidth;
+        const windowHeight = window.innerHeight;
+        
+        let left, top;
+        
+        // Check if there's enough space on the right
+        if (rect.right + tooltipRect.width + 20 <= windowWidth) {
+            // Show on the right
+            left = rect.right + 10;
+        } else {
+            // Show on the left
+            left = rect.left - tooltipRect.width - 10;
+        }
+        
+        // Ensure tooltip doesn't go off screen horizontally
+        if (left < 10) left = 10;
+        if (left + tooltipRect.width > windowWidth - 10) {
+            left = windowWidth - tooltipRect.width - 10;
+        }
+        
+        // Position vertically
+        const layoutMode = getCurrentLayoutMode ? getCurrentLayoutMode() : null;
+        const isUnderVideo = layoutMode === LAYOUT_MODES.UNDER_VIDEO;
+
+        if (isUnderVideo) {
+            // Prefer showing the tooltip below the hovered row
+            top = rect.top + rect.height + TOOLTIP_VERTICAL_SPACING;
+            // If it overflows bottom, place it above the row
+            if (top + tooltipRect.height > windowHeight - 10) {
+                top = rect.top - tooltipRect.height - TOOLTIP_VERTICAL_SPACING;
+            }
+        } else {
+            // Default behavior for side-by-side and other modes
+            top = rect.top;
+        }
+        
+        // Ensure tooltip doesn't go off screen vertically
+        if (top + tooltipRect.height > windowHeight - 10) {
+            top = windowHeight - tooltipRect.height - 10;
+        }
+        if (top < 10) top = 10;
+        
+        tooltip.style.position = 'fixed';
+        tooltip.style.left = left + 'px';
+        tooltip.style.top = top + 'px';
+    }
 } 
\ No newline at end of file
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""In-process cache for expensive library aggregates (like stats, playlist list).
+
+Entries are grouped by tags. Writers call ``invalidate_tags(...)`` after the
+data behind a tag changes (likes recorded, tracks deleted/restored, library
+scans, channel group settings); every entry carrying that tag is dropped and
+the tag generation is bumped.
+
+Writes made by other processes (scan_to_db.py runs as a subprocess) never
+reach these hooks; readers call ``invalidate_on_version_change`` with a
+trigger-maintained DB change counter to catch them. ETags are hashes of the
+response payload, so a client revalidating with If-None-Match gets a 304 only
+while the data it would receive is unchanged.
+
+A safety TTL bounds staleness for changes that bypass both (for example
+files copied into the library by hand).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+TAG_LIKES = "likes"
+TAG_LIBRARY = "library"
+
+DEFAULT_TTL_SECONDS = 600.0
+
+_lock = threading.RLock()
+_entries: Dict[str, Tuple[float, Tuple[str, ...], Any]] = {}
+_generations: Dict[str, int] = {}
+# Single-flight: one computation per key at a time
+_key_locks: Dict[str, threading.Lock] = {}
+_stats: Dict[str, Dict[str, int]] = {}
+# Last seen value of each DB change counter (invalidate_on_version_change)
+_seen_versions: Dict[str, int] = {}
+
+
+def _key_stats(key: str) -> Dict[str, int]:
+    stats = _stats.get(key)
+    if stats is None:
+        stats = {"hits": 0, "misses": 0, "invalidations": 0}
+        _stats[key] = stats
+    return stats
+
+
+def get_or_compute(
+    key: str,
+    compute: Callable[[], Any],
+    *,
+    tags: Iterable[str],
+    ttl: float = DEFAULT_TTL_SECONDS,
+) -> Any:
+    """Return the cached value for key, computing it on miss or expiry."""
+    tags = tuple(tags)
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(key)
+        if entry and entry[0] > now:
+            _key_stats(key)["hits"] += 1
+            return entry[2]
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+
+    with key_lock:
+        # Another request may have filled the entry while we waited
+        with _lock:
+            entry = _entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                _key_stats(key)["hits"] += 1
+                return entry[2]
+            _key_stats(key)["misses"] += 1
+            generations_before = tuple(_generations.get(t, 0) for t in tags)
+
+        value = compute()
+
+        with _lock:
+            # Skip storing if a write invalidated our tags mid-computation
+            if tuple(_generations.get(t, 0) for t in tags) == generations_before:
+                _entries[key] = (time.monotonic() + ttl, tags, value)
+        return value
+
+
+def invalidate_tags(*tags: str) -> None:
+    """Drop every entry carrying any of the tags and bump their generations."""
+    if not tags:
+        return
+    with _lock:
+        for tag in tags:
+            _generations[tag] = _generations.get(tag, 0) + 1
+        for key, (_, entry_tags, _) in list(_entries.items()):
+            if any(tag in entry_tags for tag in tags):
+                _entries.pop(key, None)
+                _key_stats(key)["invalidations"] += 1
+
+
+def invalidate_on_version_change(name: str, version: int, *tags: str) -> bool:
+    """Invalidate tags when the DB change counter ``name`` moved since the last call."""
+    with _lock:
+        previous = _seen_versions.get(name)
+        _seen_versions[name] = version
+    if previous == version:
+        return False
+    invalidate_tags(*tags)
+    return True
+
+
+def make_etag(payload: Any) -> str:
+    """Weak ETag derived from the JSON form of a response payload."""
+    body = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str, ensure_ascii=False)
+    return f'W/"{hashlib.sha1(body.encode("utf-8")).hexdigest()[:20]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against etag."""
+    if not if_none_match:
+        return False
+    wanted = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == wanted:
+            return True
+    return False
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters per key plus overall hit ratio."""
+    with _lock:
+        keys = {k: dict(v) for k, v in _stats.items()}
+        generations = dict(_generations)
+        cached_keys = sorted(_entries.keys())
+    total_hits = sum(v["hits"] for v in keys.values())
+    total_misses = sum(v["misses"] for v in keys.values())
+    for stats in keys.values():
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else None
+    lookups = total_hits + total_misses
+    return {
+        "hits": total_hits,
+        "misses": total_misses,
+        "hit_ratio": round(total_hits / lookups, 4) if lookups else None,
+        "keys": keys,
+        "cached_keys": cached_keys,
+        "generations": generations,
+    }
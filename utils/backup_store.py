@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Incremental Database Backup Store
+
+Stores database snapshots as content-addressed, compressed pages instead of one
+full ``tracks.db`` copy per backup.
+
+Layout under ``Backups/DB``:
+    pages/<h[:2]>/<sha256>.zst|.gz   one compressed blob per distinct page
+    <timestamp>/manifest.json        page_size, page_count, parent and the
+                                     pages (index -> hash) that differ from
+                                     the parent snapshot
+
+- A snapshot is taken with the SQLite backup API in small steps
+  (``backup(pages=N)``) with a short pause between steps, so readers and
+  writers on the live database are not starved while it runs.
+- Only pages whose hash differs from the parent snapshot are listed in the
+  manifest, and only blobs not already in ``pages/`` are written. Identical
+  pages are stored once across every snapshot.
+- Restoring replays the chain: base manifest first, then each incremental
+  manifest on top, truncated to the final page count.
+- A "base" snapshot lists every page, so it restores without a chain. A new
+  base is written every BACKUP_CHAIN_MAX_LENGTH snapshots to keep chains short;
+  its blobs are mostly shared with earlier snapshots.
+- Deleting a snapshot folds its pages into its children so their chains stay
+  valid; ``collect_garbage`` then removes blobs no manifest references.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import zstandard as zstd
+except ImportError:  # optional, gzip is used without it
+    zstd = None
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_FORMAT = 1
+PAGES_SUBDIR = "pages"
+
+# Pages copied per backup step and the pause between steps
+BACKUP_PAGES_PER_STEP = 256
+BACKUP_STEP_PAUSE_SECONDS = 0.005
+# Wait before retrying a step that hit a locked source
+BACKUP_BUSY_SLEEP_SECONDS = 0.05
+
+# Snapshots per chain (base + incrementals) before a new base is written
+BACKUP_CHAIN_MAX_LENGTH = 7
+
+ZSTD_LEVEL = 3
+GZIP_LEVEL = 6
+
+# Serializes writers (snapshot, delete, gc) within the process so garbage
+# collection never sees a blob whose manifest is still being written
+_store_lock = threading.RLock()
+
+
+# ---------- Compression ----------
+
+
+def _compression() -> str:
+    return "zstd" if zstd is not None else "gzip"
+
+
+def _blob_suffix(compression: str) -> str:
+    return ".zst" if compression == "zstd" else ".gz"
+
+
+def _compress(data: bytes, compression: str) -> bytes:
+    if compression == "zstd":
+        return zstd.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _decompress(data: bytes, compression: str) -> bytes:
+    if compression == "zstd":
+        if zstd is None:
+            raise RuntimeError("zstandard is required to read .zst backup pages")
+        return zstd.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+# ---------- Blobs ----------
+
+
+def _blob_dir(backups_dir: Path, digest: str) -> Path:
+    return backups_dir / PAGES_SUBDIR / digest[:2]
+
+
+def _find_blob(backups_dir: Path, digest: str) -> Optional[Tuple[Path, str]]:
+    base = _blob_dir(backups_dir, digest)
+    for compression in ("zstd", "gzip"):
+        candidate = base / f"{digest}{_blob_suffix(compression)}"
+        if candidate.exists():
+            return candidate, compression
+    return None
+
+
+def _write_blob(backups_dir: Path, digest: str, page: bytes, compression: str) -> int:
+    """Store page under its digest unless present; returns bytes written."""
+    if _find_blob(backups_dir, digest):
+        return 0
+    target_dir = _blob_dir(backups_dir, digest)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    data = _compress(page, compression)
+    fd, tmp_name = tempfile.mkstemp(suffix=".tmp", dir=str(target_dir))
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp_name, target_dir / f"{digest}{_blob_suffix(compression)}")
+    finally:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+    return len(data)
+
+
+def _read_blob(backups_dir: Path, digest: str) -> bytes:
+    found = _find_blob(backups_dir, digest)
+    if not found:
+        raise FileNotFoundError(f"Backup page {digest} is missing")
+    path, compression = found
+    page = _decompress(path.read_bytes(), compression)
+    if hashlib.sha256(page).hexdigest() != digest:
+        raise ValueError(f"Backup page {digest} is corrupt")
+    return page
+
+
+# ---------- Manifests ----------
+
+
+def manifest_path(backups_dir: Path, name: str) -> Path:
+    return backups_dir / name / MANIFEST_NAME
+
+
+def load_manifest(backups_dir: Path, name: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(manifest_path(backups_dir, name), "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(backups_dir: Path, name: str, manifest: Dict[str, Any]) -> Path:
+    path = manifest_path(backups_dir, name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(manifest, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+def list_snapshots(backups_dir: Path) -> List[Tuple[str, Dict[str, Any]]]:
+    """(folder name, manifest) for every snapshot in the store, oldest first."""
+    snapshots = []
+    try:
+        with os.scandir(backups_dir) as it:
+            for entry in it:
+                if entry.is_dir() and entry.name != PAGES_SUBDIR:
+                    manifest = load_manifest(backups_dir, entry.name)
+                    if manifest is not None:
+                        snapshots.append((entry.name, manifest))
+    except FileNotFoundError:
+        return []
+    snapshots.sort(key=lambda item: (item[1].get("created_at", ""), item[0]))
+    return snapshots
+
+
+def _chain(backups_dir: Path, name: str) -> List[Dict[str, Any]]:
+    """Manifests from the base up to name."""
+    chain = []
+    seen = set()
+    current: Optional[str] = name
+    while current:
+        if current in seen:
+            raise ValueError(f"Backup chain loop at {current}")
+        seen.add(current)
+        manifest = load_manifest(backups_dir, current)
+        if manifest is None:
+            raise FileNotFoundError(f"Backup manifest {current} is missing")
+        chain.append(manifest)
+        current = manifest.get("parent")
+    chain.reverse()
+    return chain
+
+
+def resolve_pages(backups_dir: Path, name: str) -> Tuple[Dict[str, Any], List[str]]:
+    """(leaf manifest, page hashes in order) after replaying the chain."""
+    chain = _chain(backups_dir, name)
+    pages: Dict[str, str] = {}
+    for manifest in chain:
+        pages.update(manifest["pages"])
+    leaf = chain[-1]
+    return leaf, [pages[str(i)] for i in range(leaf["page_count"])]
+
+
+# ---------- Snapshot ----------
+
+
+def _stepwise_backup(source_db: Path, target_db: Path) -> None:
+    """Copy source into target a few pages at a time, yielding between steps."""
+    def pause(status, remaining, total):
+        time.sleep(BACKUP_STEP_PAUSE_SECONDS)
+
+    source_conn = sqlite3.connect(str(source_db))
+    try:
+        target_conn = sqlite3.connect(str(target_db))
+        try:
+            source_conn.backup(
+                target_conn,
+                pages=BACKUP_PAGES_PER_STEP,
+                progress=pause,
+                sleep=BACKUP_BUSY_SLEEP_SECONDS,
+            )
+        finally:
+            target_conn.close()
+    finally:
+        source_conn.close()
+
+
+def _iter_pages(db_file: Path, page_size: int) -> Iterator[bytes]:
+    with open(db_file, "rb") as fh:
+        for page in iter(lambda: fh.read(page_size), b""):
+            yield page
+
+
+def _page_size(db_file: Path) -> int:
+    with open(db_file, "rb") as fh:
+        header = fh.read(100)
+    page_size = int.from_bytes(header[16:18], "big")
+    return 65536 if page_size == 1 else page_size
+
+
+def create_snapshot(source_db: Path, backups_dir: Path, name: str, full: bool = False) -> Dict[str, Any]:
+    """Snapshot source_db into the store as folder name; returns the manifest.
+
+    The snapshot is incremental over the newest existing one unless ``full`` is
+    set, there is none yet, or the chain reached BACKUP_CHAIN_MAX_LENGTH.
+    """
+    backups_dir = Path(backups_dir)
+    backups_dir.mkdir(parents=True, exist_ok=True)
+    started = time.monotonic()
+
+    with _store_lock:
+        parent_name: Optional[str] = None
+        parent_pages: List[str] = []
+        if not full:
+            snapshots = list_snapshots(backups_dir)
+            if snapshots:
+                candidate = snapshots[-1][0]
+                try:
+                    chain_length = len(_chain(backups_dir, candidate))
+                    if chain_length < BACKUP_CHAIN_MAX_LENGTH:
+                        _, parent_pages = resolve_pages(backups_dir, candidate)
+                        parent_name = candidate
+                except (OSError, ValueError, KeyError):
+                    # Broken chain: start a new base rather than extend it
+                    parent_name, parent_pages = None, []
+
+        fd, tmp_name = tempfile.mkstemp(prefix=".snapshot_", suffix=".db", dir=str(backups_dir))
+        os.close(fd)
+        tmp_db = Path(tmp_name)
+        try:
+            _stepwise_backup(source_db, tmp_db)
+            page_size = _page_size(tmp_db)
+            compression = _compression()
+            changed: Dict[str, str] = {}
+            stored_bytes = 0
+            new_blobs = 0
+            page_count = 0
+            for index, page in enumerate(_iter_pages(tmp_db, page_size)):
+                page_count += 1
+                digest = hashlib.sha256(page).hexdigest()
+                if index < len(parent_pages) and parent_pages[index] == digest:
+                    continue
+                changed[str(index)] = digest
+                written = _write_blob(backups_dir, digest, page, compression)
+                if written:
+                    stored_bytes += written
+                    new_blobs += 1
+            db_size = tmp_db.stat().st_size
+        finally:
+            tmp_db.unlink(missing_ok=True)
+
+        manifest = {
+            "format": MANIFEST_FORMAT,
+            "kind": "incremental" if parent_name else "base",
+            "parent": parent_name,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "page_size": page_size,
+            "page_count": page_count,
+            "db_size_bytes": db_size,
+            "changed_pages": len(changed),
+            "new_blobs": new_blobs,
+            "stored_bytes": stored_bytes,
+            "compression": compression,
+            "duration_seconds": round(time.monotonic() - started, 3),
+            "pages": changed,
+        }
+        _write_manifest(backups_dir, name, manifest)
+        return manifest
+
+
+# ---------- Restore ----------
+
+
+def restore_snapshot(backups_dir: Path, name: str, target_db: Path) -> Dict[str, Any]:
+    """Rebuild the database file for snapshot name at target_db; returns the manifest."""
+    backups_dir = Path(backups_dir)
+    target_db = Path(target_db)
+    leaf, pages = resolve_pages(backups_dir, name)
+    target_db.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(suffix=".db", dir=str(target_db.parent))
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            for digest in pages:
+                fh.write(_read_blob(backups_dir, digest))
+        check = sqlite3.connect(tmp_name)
+        try:
+            result = check.execute("PRAGMA quick_check").fetchone()[0]
+        finally:
+            check.close()
+        if result != "ok":
+            raise ValueError(f"Restored database failed quick_check: {result}")
+        os.replace(tmp_name, target_db)
+    finally:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+    return leaf
+
+
+# ---------- Retention ----------
+
+
+def delete_snapshot(backups_dir: Path, name: str) -> bool:
+    """Remove snapshot name, folding its pages into any children first.
+
+    Blobs are left in place; call ``collect_garbage`` after a batch of deletes.
+    """
+    backups_dir = Path(backups_dir)
+    with _store_lock:
+        manifest = load_manifest(backups_dir, name)
+        if manifest is None:
+            return False
+        for child_name, child in list_snapshots(backups_dir):
+            if child.get("parent") != name:
+                continue
+            merged = {k: v for k, v in manifest["pages"].items() if int(k) < child["page_count"]}
+            merged.update(child["pages"])
+            child["pages"] = merged
+            child["parent"] = manifest.get("parent")
+            child["kind"] = "incremental" if child["parent"] else "base"
+            child["stored_bytes"] = child.get("stored_bytes", 0) + manifest.get("stored_bytes", 0)
+            _write_manifest(backups_dir, child_name, child)
+        shutil.rmtree(backups_dir / name, ignore_errors=True)
+        return True
+
+
+def collect_garbage(backups_dir: Path) -> Dict[str, int]:
+    """Delete page blobs that no manifest references."""
+    backups_dir = Path(backups_dir)
+    removed = 0
+    freed = 0
+    with _store_lock:
+        referenced = set()
+        for _, manifest in list_snapshots(backups_dir):
+            referenced.update(manifest["pages"].values())
+        pages_root = backups_dir / PAGES_SUBDIR
+        try:
+            shards = list(os.scandir(pages_root))
+        except FileNotFoundError:
+            return {"removed": 0, "freed_bytes": 0}
+        for shard in shards:
+            if not shard.is_dir():
+                continue
+            with os.scandir(shard.path) as it:
+                for entry in it:
+                    digest = entry.name.split(".", 1)[0]
+                    if digest in referenced:
+                        continue
+                    try:
+                        size = entry.stat().st_size
+                        os.remove(entry.path)
+                        removed += 1
+                        freed += size
+                    except OSError:
+                        continue
+    return {"removed": removed, "freed_bytes": freed}
+
+
+def store_size(backups_dir: Path) -> int:
+    """Bytes used by page blobs."""
+    total = 0
+    for root, _, files in os.walk(Path(backups_dir) / PAGES_SUBDIR):
+        for filename in files:
+            try:
+                total += os.path.getsize(os.path.join(root, filename))
+            except OSError:
+                continue
+    return total
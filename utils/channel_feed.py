@@ -0,0 +1,248 @@
+"""Uploads-feed change detection for scheduled quick sync.
+
+Every channel has a small Atom feed of its newest uploads
+(``/feeds/videos.xml?channel_id=UC...``). Fetching it with the validators
+from the previous response (If-None-Match / If-Modified-Since) usually costs a
+single 304, so a group quick sync can skip yt-dlp for channels that have not
+published anything since the last run.
+
+Feed state per channel lives in ``channel_feed_state``: the UC channel id, the
+last validators and the video IDs the feed listed when the channel was last
+synced. A channel needs a full quick sync when the feed shows IDs that are
+neither in that stored list nor already in the library.
+
+Every failure (no channel id, network error, unparsable feed) answers "sync",
+so the stage can only save work, never hide uploads.
+"""
+
+from __future__ import annotations
+
+import re
+import urllib.error
+import urllib.parse
+import urllib.request
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from utils.logging_utils import log_message
+
+FEED_BASE_URL = "https://www.youtube.com/feeds/videos.xml"
+FEED_TIMEOUT_SECONDS = 10.0
+FEED_CHECK_WORKERS = 8
+# Run a full quick sync at least this often even when the feed looks unchanged
+FEED_FULL_SYNC_INTERVAL_SECONDS = 7 * 24 * 3600
+# Channel pages are large; the channel id appears in the <head>
+CHANNEL_PAGE_READ_BYTES = 512 * 1024
+
+USER_AGENT = "Mozilla/5.0 (compatible; SyncPlay-Hub feed check)"
+
+_YT_NS = "{http://www.youtube.com/xml/schemas/2015}"
+_ATOM_NS = "{http://www.w3.org/2005/Atom}"
+
+_URL_CHANNEL_ID_RE = re.compile(r"/channel/(UC[A-Za-z0-9_-]{22})")
+_PAGE_CHANNEL_ID_PATTERNS = [
+    re.compile(r"feeds/videos\.xml\?channel_id=(UC[A-Za-z0-9_-]{22})"),
+    re.compile(r'<meta itemprop="(?:identifier|channelId)" content="(UC[A-Za-z0-9_-]{22})"'),
+    re.compile(r'"(?:externalId|channelId)":"(UC[A-Za-z0-9_-]{22})"'),
+]
+
+
+def feed_url(youtube_channel_id: str, base_url: str = FEED_BASE_URL) -> str:
+    return f"{base_url}?{urllib.parse.urlencode({'channel_id': youtube_channel_id})}"
+
+
+def channel_id_from_url(channel_url: str) -> Optional[str]:
+    """UC... id when the channel URL is of the /channel/<id> form."""
+    match = _URL_CHANNEL_ID_RE.search(channel_url or "")
+    return match.group(1) if match else None
+
+
+def discover_channel_id(channel_url: str, timeout: float = FEED_TIMEOUT_SECONDS) -> Optional[str]:
+    """Read the UC... id from the channel page (its RSS <link> or metadata)."""
+    page_url = re.sub(r"/(?:videos|streams|shorts|releases|featured)/?$", "", (channel_url or "").rstrip("/"))
+    req = urllib.request.Request(page_url, headers={"User-Agent": USER_AGENT, "Accept-Language": "en"})
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        html = resp.read(CHANNEL_PAGE_READ_BYTES).decode("utf-8", errors="replace")
+    for pattern in _PAGE_CHANNEL_ID_PATTERNS:
+        match = pattern.search(html)
+        if match:
+            return match.group(1)
+    return None
+
+
+def parse_feed_video_ids(body: bytes) -> List[str]:
+    """Video IDs in feed order (newest first)."""
+    root = ET.fromstring(body)
+    ids: List[str] = []
+    for entry in root.iter(f"{_ATOM_NS}entry"):
+        vid = (entry.findtext(f"{_YT_NS}videoId") or "").strip()
+        if vid and vid not in ids:
+            ids.append(vid)
+    return ids
+
+
+def fetch_feed(
+    url: str,
+    etag: Optional[str] = None,
+    last_modified: Optional[str] = None,
+    timeout: float = FEED_TIMEOUT_SECONDS,
+) -> Dict[str, Any]:
+    """Conditional GET of a feed.
+
+    Returns {"status": 304} when the validators still match, otherwise
+    {"status": 200, "etag", "last_modified", "video_ids"}. HTTP and network
+    errors propagate.
+    """
+    headers = {"User-Agent": USER_AGENT}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    req = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            body = resp.read()
+            return {
+                "status": resp.status,
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+                "video_ids": parse_feed_video_ids(body),
+            }
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return {"status": 304}
+        raise
+
+
+def _sync_is_overdue(last_sync_ts: Optional[str], now: datetime) -> bool:
+    if not last_sync_ts:
+        return True
+    try:
+        last = datetime.fromisoformat(str(last_sync_ts).replace("Z", "")).replace(tzinfo=None)
+    except ValueError:
+        return True
+    return (now - last).total_seconds() > FEED_FULL_SYNC_INTERVAL_SECONDS
+
+
+def check_channel_feeds(
+    conn,
+    channels: List[Dict[str, Any]],
+    *,
+    base_url: str = FEED_BASE_URL,
+    max_workers: int = FEED_CHECK_WORKERS,
+    timeout: float = FEED_TIMEOUT_SECONDS,
+) -> Dict[int, Dict[str, Any]]:
+    """Decide which channels need a full quick sync.
+
+    Feeds are fetched concurrently; database reads and writes stay on the
+    calling thread. State for skipped channels is saved right away. For
+    channels that need a sync the new validators and IDs are returned as
+    ``feed_update`` and should be saved (``apply_feed_update``) only once that
+    sync succeeds, so a failed sync is retried on the next run.
+
+    Returns:
+        {channel_id: {"sync": bool, "reason": str, "new_video_ids": [...],
+        "feed_update": dict | None}}
+    """
+    import database as db
+
+    now = datetime.utcnow()
+    now_text = now.strftime("%Y-%m-%d %H:%M:%S")
+    states = db.get_channel_feed_states(conn, [c["id"] for c in channels])
+    decisions: Dict[int, Dict[str, Any]] = {}
+    pending: List[Dict[str, Any]] = []
+
+    for channel in channels:
+        state = states.get(channel["id"]) or {}
+        yt_id = (
+            state.get("youtube_channel_id")
+            or channel_id_from_url(channel["url"])
+            or db.get_youtube_channel_id_for_url(conn, channel["url"])
+        )
+        pending.append({"channel": channel, "state": state, "yt_id": yt_id})
+
+    def _check(item: Dict[str, Any]) -> Dict[str, Any]:
+        channel, state = item["channel"], item["state"]
+        try:
+            if not item["yt_id"]:
+                item["yt_id"] = discover_channel_id(channel["url"], timeout=timeout)
+            if not item["yt_id"]:
+                return {"error": "channel id not found"}
+            return fetch_feed(
+                feed_url(item["yt_id"], base_url),
+                etag=state.get("etag"),
+                last_modified=state.get("last_modified"),
+                timeout=timeout,
+            )
+        except Exception as e:
+            return {"error": str(e)}
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending) or 1))) as pool:
+        results = list(pool.map(_check, pending))
+
+    # One known-ID lookup for every feed entry we have not recorded yet
+    candidates = set()
+    for item, result in zip(pending, results):
+        if result.get("status") == 200:
+            seen = set(item["state"].get("video_ids") or [])
+            candidates.update(v for v in result["video_ids"] if v not in seen)
+    known = db.get_known_video_ids(conn, list(candidates)) if candidates else {}
+
+    for item, result in zip(pending, results):
+        channel, state, yt_id = item["channel"], item["state"], item["yt_id"]
+        channel_id = channel["id"]
+        overdue = _sync_is_overdue(channel.get("last_sync_ts"), now)
+
+        if "error" in result:
+            decisions[channel_id] = {"sync": True, "reason": f"feed check failed: {result['error']}",
+                                     "new_video_ids": [], "feed_update": None}
+            if yt_id and yt_id != state.get("youtube_channel_id"):
+                db.save_channel_feed_state(conn, channel_id, youtube_channel_id=yt_id)
+            continue
+
+        if result["status"] == 304:
+            if overdue:
+                decisions[channel_id] = {"sync": True, "reason": "full sync overdue",
+                                         "new_video_ids": [], "feed_update": None}
+            else:
+                decisions[channel_id] = {"sync": False, "reason": "feed not modified",
+                                         "new_video_ids": [], "feed_update": None}
+            db.save_channel_feed_state(conn, channel_id, youtube_channel_id=yt_id, checked_at=now_text)
+            continue
+
+        seen = set(state.get("video_ids") or [])
+        new_ids = [v for v in result["video_ids"] if v not in seen and v not in known]
+        update = {
+            "youtube_channel_id": yt_id,
+            "etag": result.get("etag"),
+            "last_modified": result.get("last_modified"),
+            "video_ids": result["video_ids"],
+            "checked_at": now_text,
+        }
+        if new_ids or overdue:
+            update["changed_at"] = now_text
+            decisions[channel_id] = {
+                "sync": True,
+                "reason": f"{len(new_ids)} new in feed" if new_ids else "full sync overdue",
+                "new_video_ids": new_ids,
+                "feed_update": update,
+            }
+            db.save_channel_feed_state(conn, channel_id, youtube_channel_id=yt_id, checked_at=now_text)
+        else:
+            decisions[channel_id] = {"sync": False, "reason": "no new videos in feed",
+                                     "new_video_ids": [], "feed_update": None}
+            db.save_channel_feed_state(conn, channel_id, **update)
+
+    synced = sum(1 for d in decisions.values() if d["sync"])
+    log_message(f"[Feed Check] {len(channels)} channels checked: {synced} need sync, {len(channels) - synced} unchanged")
+    return decisions
+
+
+def apply_feed_update(conn, channel_id: int, feed_update: Optional[Dict[str, Any]]) -> None:
+    """Record the feed state a successful quick sync was based on."""
+    if not feed_update:
+        return
+    import database as db
+    db.save_channel_feed_state(conn, channel_id, **feed_update)
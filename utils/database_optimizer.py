@@ -17,6 +17,20 @@ from queue import Queue, Empty
 import logging
 
 
+# Online maintenance tuning (see MaintenanceScheduler)
+MAINTENANCE_STEP_TARGET_SECONDS = 0.2  # aim for write-lock holds shorter than this
+MAINTENANCE_STEP_PAUSE_SECONDS = 0.05  # gap between steps for foreground writers
+MAINTENANCE_BUSY_TIMEOUT_MS = 2000
+INCREMENTAL_VACUUM_START_PAGES = 256
+INCREMENTAL_VACUUM_MIN_PAGES = 16
+INCREMENTAL_VACUUM_MAX_PAGES = 8192
+OPTIMIZE_ANALYSIS_LIMIT = 400  # rows sampled per index by PRAGMA optimize
+JOB_CLEANUP_BATCH = 500
+LOCK_PROBE_INTERVAL_SECONDS = 0.25
+# PRAGMA quick_check(TABLE) needs SQLite 3.33
+QUICK_CHECK_PER_TABLE_MIN_VERSION = (3, 33, 0)
+
+
 class ConnectionPool:
     """SQLite Connection Pool for database access optimization."""
     
@@ -320,12 +334,19 @@ class DatabaseOptimizer:
         
         return stats
     
-    def run_maintenance(self, force: bool = False) -> Dict[str, Any]:
+    def run_maintenance(self, force: bool = False, should_pause=None, progress=None,
+                        convert_auto_vacuum: bool = False,
+                        max_runtime_seconds: Optional[float] = None) -> Dict[str, Any]:
         """
-        Runs database maintenance tasks.
+        Runs database maintenance tasks as short steps (see MaintenanceScheduler).
         
         Args:
             force: Force maintenance even if interval hasn't passed
+            should_pause: Callable returning True while maintenance should wait
+            progress: Callable(percentage, message) for progress reporting
+            convert_auto_vacuum: Switch the file to auto_vacuum=INCREMENTAL
+                (one-time full VACUUM) if it is not already
+            max_runtime_seconds: Stop after this long; the next run continues
             
         Returns:
             Dictionary with maintenance results
@@ -333,69 +354,18 @@ class DatabaseOptimizer:
         now = datetime.utcnow()
         
         # Check if maintenance should be run
-        if not force and (now - self.last_maintenance).seconds < self.maintenance_interval:
+        if not force and (now - self.last_maintenance).total_seconds() < self.maintenance_interval:
             return {'skipped': True, 'reason': 'Too early for maintenance'}
         
-        results = {}
-        start_time = time.time()
-        
-        try:
-            with self.connection_pool.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                # 1. VACUUM to free space
-                logging.info("Running VACUUM...")
-                db_size_before = os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0
-                cursor.execute("VACUUM")
-                db_size_after = os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0
-                
-                results['vacuum'] = {
-                    'size_before_mb': db_size_before / (1024 * 1024),
-                    'size_after_mb': db_size_after / (1024 * 1024),
-                    'space_freed_mb': (db_size_before - db_size_after) / (1024 * 1024)
-                }
-                
-                # 2. ANALYZE to update statistics
-                logging.info("Running ANALYZE...")
-                cursor.execute("ANALYZE")
-                
-                # 3. OPTIMIZE to update query planner statistics
-                logging.info("Running OPTIMIZE...")
-                cursor.execute("PRAGMA optimize")
-                
-                # 4. Clean up old completed tasks (older than 7 days)
-                logging.info("Cleaning up old completed jobs...")
-                cutoff_date = now - timedelta(days=7)
-                cursor.execute("""
-                    DELETE FROM job_queue 
-                    WHERE status = 'completed' 
-                    AND completed_at < ?
-                """, (cutoff_date.isoformat(),))
-                
-                cleaned_jobs = cursor.rowcount
-                results['cleanup'] = {'removed_jobs': cleaned_jobs}
-                
-                # 5. Check integrity
-                logging.info("Checking database integrity...")
-                cursor.execute("PRAGMA integrity_check")
-                integrity_result = cursor.fetchone()
-                results['integrity'] = {'status': integrity_result[0] if integrity_result else 'unknown'}
-                
-                conn.commit()
-                
-                # Update last maintenance time
-                self.last_maintenance = now
-                
-                results['success'] = True
-                results['duration'] = time.time() - start_time
-                
-                logging.info(f"Database maintenance completed in {results['duration']:.2f}s")
-                
-        except Exception as e:
-            results['success'] = False
-            results['error'] = str(e)
-            logging.error(f"Database maintenance failed: {e}")
-        
+        scheduler = MaintenanceScheduler(
+            self.db_path,
+            should_pause=should_pause,
+            progress=progress,
+            max_runtime_seconds=max_runtime_seconds,
+        )
+        results = scheduler.run(convert_auto_vacuum=convert_auto_vacuum)
+        if results.get('success'):
+            self.last_maintenance = now
         return results
     
     def get_database_stats(self) -> Dict[str, Any]:
@@ -450,6 +420,283 @@ class DatabaseOptimizer:
         logging.info("Database optimizer closed")
 
 
+class _LockProbe(threading.Thread):
+    """Measures how long a foreground writer would wait for the write lock.
+
+    Periodically opens and rolls back a write transaction on its own
+    connection while maintenance runs.
+    """
+    
+    def __init__(self, db_path: str, interval: float = LOCK_PROBE_INTERVAL_SECONDS):
+        super().__init__(name="MaintenanceLockProbe", daemon=True)
+        self.db_path = db_path
+        self.interval = interval
+        self.waits: List[float] = []
+        self._stop_event = threading.Event()
+    
+    def run(self):
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
+        except sqlite3.Error:
+            return
+        try:
+            while not self._stop_event.wait(self.interval):
+                started = time.perf_counter()
+                try:
+                    conn.execute("BEGIN IMMEDIATE")
+                    conn.execute("ROLLBACK")
+                except sqlite3.Error:
+                    continue
+                self.waits.append(time.perf_counter() - started)
+        finally:
+            conn.close()
+    
+    def stop(self) -> Dict[str, Any]:
+        self._stop_event.set()
+        self.join(timeout=5)
+        waits = sorted(self.waits)
+        if not waits:
+            return {'probes': 0}
+        return {
+            'probes': len(waits),
+            'avg_ms': round(sum(waits) / len(waits) * 1000, 2),
+            'p95_ms': round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 2),
+            'max_ms': round(waits[-1] * 1000, 2),
+        }
+
+
+class MaintenanceScheduler:
+    """Database maintenance split into short steps so writers are never blocked for long.
+    
+    - Old completed jobs are deleted in small batches.
+    - Free pages are returned with ``PRAGMA incremental_vacuum(N)``; N adapts so
+      each step stays near MAINTENANCE_STEP_TARGET_SECONDS. Needs
+      ``auto_vacuum=INCREMENTAL``; converting an existing file takes one full
+      VACUUM and only happens when asked for.
+    - Planner statistics are refreshed with ``PRAGMA optimize`` under an
+      ``analysis_limit``, instead of a full ANALYZE.
+    - ``PRAGMA quick_check`` runs one table at a time (a read, which does not
+      block writers in WAL mode) instead of a full integrity_check.
+    
+    Before each step ``should_pause`` is consulted (e.g. the player became
+    active); when it says so, or once ``max_runtime_seconds`` is spent, the run
+    stops with ``completed=False`` and the next run picks up the rest. It never
+    waits in place, since that would hold the job queue's worker.
+    A background probe records how long a writer waited for the lock
+    meanwhile, reported as ``lock_wait``.
+    """
+    
+    def __init__(self, db_path: str, should_pause=None, progress=None,
+                 max_runtime_seconds: Optional[float] = None,
+                 step_target_seconds: float = MAINTENANCE_STEP_TARGET_SECONDS,
+                 pause_seconds: float = MAINTENANCE_STEP_PAUSE_SECONDS):
+        self.db_path = db_path
+        self.should_pause = should_pause
+        self.progress = progress
+        self.max_runtime_seconds = max_runtime_seconds
+        self.step_target_seconds = step_target_seconds
+        self.pause_seconds = pause_seconds
+        self._started = 0.0
+        self._step_times: List[float] = []
+        self._stopped_reason: Optional[str] = None
+    
+    # ----- step plumbing -----
+    
+    def _out_of_time(self) -> bool:
+        return bool(self.max_runtime_seconds) and time.monotonic() - self._started > self.max_runtime_seconds
+    
+    def _wait_turn(self) -> bool:
+        """Short gap between steps; returns False when the run should stop."""
+        if self._stopped_reason:
+            return False
+        time.sleep(self.pause_seconds)
+        if self.should_pause and self.should_pause():
+            self._stopped_reason = 'paused'
+        elif self._out_of_time():
+            self._stopped_reason = 'runtime_limit'
+        return self._stopped_reason is None
+    
+    def _step(self, conn: sqlite3.Connection, sql: str, params: tuple = ()) -> list:
+        started = time.perf_counter()
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            self._step_times.append(time.perf_counter() - started)
+    
+    def _report(self, percentage: float, message: str):
+        if self.progress:
+            try:
+                self.progress(percentage, message)
+            except Exception:
+                pass
+    
+    # ----- tasks -----
+    
+    def _cleanup_jobs(self, conn: sqlite3.Connection) -> Dict[str, Any]:
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='job_queue'"
+        ).fetchone()
+        if not exists:
+            return {'removed_jobs': 0}
+        cutoff = (datetime.utcnow() - timedelta(days=7)).isoformat()
+        removed = 0
+        while self._wait_turn():
+            started = time.perf_counter()
+            cursor = conn.execute(
+                """
+                DELETE FROM job_queue WHERE rowid IN (
+                    SELECT rowid FROM job_queue
+                    WHERE status = 'completed' AND completed_at < ?
+                    LIMIT ?
+                )
+                """,
+                (cutoff, JOB_CLEANUP_BATCH),
+            )
+            self._step_times.append(time.perf_counter() - started)
+            removed += max(cursor.rowcount, 0)
+            if cursor.rowcount < JOB_CLEANUP_BATCH:
+                break
+        return {'removed_jobs': removed}
+    
+    def _vacuum(self, conn: sqlite3.Connection, convert: bool) -> Dict[str, Any]:
+        mode = self._step(conn, "PRAGMA auto_vacuum")[0][0]
+        page_size = self._step(conn, "PRAGMA page_size")[0][0]
+        result: Dict[str, Any] = {'auto_vacuum': {0: 'none', 1: 'full', 2: 'incremental'}.get(mode, str(mode))}
+        
+        if mode != 2:
+            if not convert:
+                free = self._step(conn, "PRAGMA freelist_count")[0][0]
+                result['free_pages'] = free
+                result['note'] = 'auto_vacuum is not INCREMENTAL; free pages are reused but not returned to the OS'
+                return result
+            # One-time conversion: auto_vacuum only takes effect after a full VACUUM
+            logging.info("Converting database to auto_vacuum=INCREMENTAL (one-time VACUUM)...")
+            size_before = os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0
+            self._step(conn, "PRAGMA auto_vacuum = INCREMENTAL")
+            self._step(conn, "VACUUM")
+            size_after = os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0
+            result.update({
+                'auto_vacuum': 'incremental',
+                'converted': True,
+                'space_freed_mb': (size_before - size_after) / (1024 * 1024),
+            })
+            return result
+        
+        free_before = self._step(conn, "PRAGMA freelist_count")[0][0]
+        free = free_before
+        pages = INCREMENTAL_VACUUM_START_PAGES
+        steps = 0
+        while free > 0 and self._wait_turn():
+            started = time.perf_counter()
+            conn.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+            elapsed = time.perf_counter() - started
+            self._step_times.append(elapsed)
+            steps += 1
+            free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            # Keep each step near the target lock hold time
+            if elapsed < self.step_target_seconds / 2:
+                pages = min(INCREMENTAL_VACUUM_MAX_PAGES, pages * 2)
+            elif elapsed > self.step_target_seconds:
+                pages = max(INCREMENTAL_VACUUM_MIN_PAGES, pages // 2)
+            if free_before:
+                self._report(10 + 40 * (1 - free / free_before), f"incremental_vacuum: {free} free pages left")
+        result.update({
+            'steps': steps,
+            'pages_freed': free_before - free,
+            'space_freed_mb': (free_before - free) * page_size / (1024 * 1024),
+            'free_pages_left': free,
+        })
+        return result
+    
+    def _optimize(self, conn: sqlite3.Connection) -> Dict[str, Any]:
+        if not self._wait_turn():
+            return {'done': False}
+        self._step(conn, f"PRAGMA analysis_limit = {OPTIMIZE_ANALYSIS_LIMIT}")
+        self._step(conn, "PRAGMA optimize")
+        return {'done': True, 'analysis_limit': OPTIMIZE_ANALYSIS_LIMIT}
+    
+    def _quick_check(self, conn: sqlite3.Connection) -> Dict[str, Any]:
+        if sqlite3.sqlite_version_info < QUICK_CHECK_PER_TABLE_MIN_VERSION:
+            if not self._wait_turn():
+                return {'status': 'not run'}
+            rows = self._step(conn, "PRAGMA quick_check")
+            messages = [r[0] for r in rows if r[0] != 'ok']
+            return {'status': 'ok' if not messages else 'errors', 'errors': messages[:20], 'tables_checked': None}
+        
+        tables = [
+            row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' "
+                "AND name NOT LIKE 'sqlite_%' AND sql NOT LIKE 'CREATE VIRTUAL TABLE%' ORDER BY name"
+            ).fetchall()
+        ]
+        messages: List[str] = []
+        checked = 0
+        for table in tables:
+            if not self._wait_turn():
+                break
+            rows = self._step(conn, f"PRAGMA quick_check('{table.replace(chr(39), chr(39) * 2)}')")
+            messages.extend(f"{table}: {r[0]}" for r in rows if r[0] != 'ok')
+            checked += 1
+            self._report(60 + 40 * checked / max(1, len(tables)), f"quick_check: {checked}/{len(tables)} tables")
+        if messages:
+            status = 'errors'
+        elif checked < len(tables):
+            status = 'partial'
+        else:
+            status = 'ok'
+        return {'status': status, 'errors': messages[:20], 'tables_checked': checked, 'tables_total': len(tables)}
+    
+    # ----- entry point -----
+    
+    def run(self, convert_auto_vacuum: bool = False) -> Dict[str, Any]:
+        """Runs all maintenance tasks; returns per-task results and lock impact."""
+        self._started = time.monotonic()
+        results: Dict[str, Any] = {}
+        probe = _LockProbe(self.db_path)
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=MAINTENANCE_BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+        probe.start()
+        try:
+            conn.execute(f"PRAGMA busy_timeout = {MAINTENANCE_BUSY_TIMEOUT_MS}")
+            
+            self._report(0, "cleanup: old completed jobs")
+            results['cleanup'] = self._cleanup_jobs(conn)
+            self._report(10, "incremental_vacuum")
+            results['vacuum'] = self._vacuum(conn, convert_auto_vacuum)
+            self._report(50, "optimize")
+            results['optimize'] = self._optimize(conn)
+            self._report(60, "quick_check")
+            results['integrity'] = self._quick_check(conn)
+            
+            results['success'] = results['integrity'].get('status') != 'errors'
+            if not results['success']:
+                results['error'] = 'quick_check reported problems'
+        except Exception as e:
+            results['success'] = False
+            results['error'] = str(e)
+            logging.error(f"Database maintenance failed: {e}")
+        finally:
+            conn.close()
+            results['lock_wait'] = probe.stop()
+        
+        steps = self._step_times
+        results['lock_hold'] = {
+            'steps': len(steps),
+            'max_ms': round(max(steps) * 1000, 2) if steps else 0.0,
+            'avg_ms': round(sum(steps) / len(steps) * 1000, 2) if steps else 0.0,
+            'total_ms': round(sum(steps) * 1000, 2),
+        }
+        results['completed'] = self._stopped_reason is None
+        results['stopped_reason'] = self._stopped_reason
+        results['duration'] = time.monotonic() - self._started
+        self._report(100, "done" if results['completed'] else "stopped early; will continue next run")
+        logging.info(f"Database maintenance finished in {results['duration']:.2f}s "
+                     f"(max step {results['lock_hold']['max_ms']} ms)")
+        return results
+
+
 class OptimizedConnection:
     """Wrapper for database connection with automatic query monitoring."""
     
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Response compression helpers for large JSON/text API payloads."""
+
+from __future__ import annotations
+
+import gzip
+import zlib
+from typing import Iterable, Iterator, Optional
+
+from flask import Response, request
+
+try:
+    # Pulled in by yt-dlp[default]; gzip is used when it is missing
+    import brotli
+except ImportError:
+    brotli = None
+
+# Payloads smaller than this are not worth the CPU.
+MIN_COMPRESS_BYTES = 1024
+GZIP_LEVEL = 5
+# Streaming favours latency over ratio
+BROTLI_STREAM_QUALITY = 5
+# Buffer this much output before flushing a compressed chunk
+STREAM_FLUSH_BYTES = 64 * 1024
+
+
+def client_accepts(encoding: str) -> bool:
+    """True when the current request's Accept-Encoding allows the encoding."""
+    accept = request.headers.get("Accept-Encoding", "") or ""
+    for part in accept.split(","):
+        token, _, params = part.strip().partition(";")
+        if token.strip().lower() != encoding:
+            continue
+        params = params.replace(" ", "").lower()
+        return params not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def compress_response(response: Response, min_size: int = MIN_COMPRESS_BYTES) -> Response:
+    """Gzip a buffered response in place when the client accepts it."""
+    if response.direct_passthrough or response.is_streamed:
+        return response
+    if response.headers.get("Content-Encoding") or response.status_code < 200 or response.status_code >= 300:
+        return response
+    response.vary.add("Accept-Encoding")
+    if not client_accepts("gzip"):
+        return response
+    body = response.get_data()
+    if len(body) < min_size:
+        return response
+    response.set_data(gzip.compress(body, compresslevel=GZIP_LEVEL))
+    response.headers["Content-Encoding"] = "gzip"
+    return response
+
+
+def negotiate_stream_encoding() -> Optional[str]:
+    """Best Content-Encoding for a streamed response: br, then gzip, else None."""
+    if brotli is not None and client_accepts("br"):
+        return "br"
+    if client_accepts("gzip"):
+        return "gzip"
+    return None
+
+
+def compress_stream(chunks: Iterable[str], encoding: Optional[str]) -> Iterator[bytes]:
+    """Encode and compress text chunks incrementally.
+
+    Output is flushed every STREAM_FLUSH_BYTES of input so the client can
+    start parsing before the whole body has been generated.
+    """
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=BROTLI_STREAM_QUALITY)
+        compress, flush, finish = compressor.process, compressor.flush, compressor.finish
+    elif encoding == "gzip":
+        # wbits=31 -> gzip container
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        compress = compressor.compress
+        flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+        finish = compressor.flush
+    else:
+        compress = flush = finish = None
+
+    pending = 0
+    for chunk in chunks:
+        data = chunk.encode("utf-8")
+        if compress is None:
+            if data:
+                yield data
+            continue
+        out = compress(data)
+        pending += len(data)
+        if pending >= STREAM_FLUSH_BYTES:
+            out += flush()
+            pending = 0
+        if out:
+            yield out
+    if finish is not None:
+        out = finish()
+        if out:
+            yield out
@@ -266,4 +266,92 @@ def cleanup_old_job_logs(logs_root: str = None, days_to_keep: int = 30):
                     print(f"Failed to remove old job log directory {job_dir}: {e}")
     
     if cleaned_count > 0:
-        print(f"Cleaned up {cleaned_count} old job log directories") 
\ No newline at end of file
+        print(f"Cleaned up {cleaned_count} old job log directories") 
+
+# ---------- Paged log reading (jobs API) ----------
+
+JOB_LOG_FILES = {
+    'job': 'job.log',
+    'stdout': 'stdout.log',
+    'stderr': 'stderr.log',
+    'progress': 'progress.log',
+    'summary': 'summary.txt',
+}
+
+DEFAULT_LOG_PAGE_BYTES = 64 * 1024
+MAX_LOG_PAGE_BYTES = 2 * 1024 * 1024
+GREP_READ_BLOCK_BYTES = 256 * 1024
+
+
+def read_log_range(log_file: Path, offset: Optional[int] = None, limit: int = DEFAULT_LOG_PAGE_BYTES) -> dict:
+    """Read a byte window of a log file, aligned to whole lines.
+
+    With offset=None the window is the tail of the file (tail-first paging);
+    clients page backwards by passing ``start - limit`` as the next offset.
+    Only the requested window is read, never the whole file.
+
+    Returns dict: content, start, end, size, has_more_before, has_more_after.
+    """
+    limit = max(1, min(int(limit), MAX_LOG_PAGE_BYTES))
+    size = log_file.stat().st_size
+    if offset is None:
+        start = max(0, size - limit)
+    else:
+        start = max(0, min(int(offset), size))
+    end = min(size, start + limit)
+
+    with open(log_file, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    # Align to line boundaries so pages concatenate cleanly
+    if start > 0:
+        cut = data.find(b'\n')
+        if cut >= 0 and cut + 1 < len(data):
+            data = data[cut + 1:]
+            start += cut + 1
+    if end < size:
+        cut = data.rfind(b'\n')
+        if cut >= 0:
+            end -= len(data) - (cut + 1)
+            data = data[:cut + 1]
+
+    return {
+        'content': data.decode('utf-8', errors='replace'),
+        'start': start,
+        'end': end,
+        'size': size,
+        'has_more_before': start > 0,
+        'has_more_after': end < size,
+    }
+
+
+def grep_log(log_file: Path, pattern: str, *, regex: bool = False, ignore_case: bool = True,
+             max_matches: int = 500) -> dict:
+    """Search one log file line by line without loading it into memory.
+
+    Returns dict: matches (list of {line, offset, text}), truncated, size.
+    """
+    import re
+
+    if regex:
+        compiled = re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+        match_line = lambda text: compiled.search(text) is not None
+    else:
+        needle = pattern.lower() if ignore_case else pattern
+        match_line = (lambda text: needle in text.lower()) if ignore_case else (lambda text: needle in text)
+
+    matches = []
+    truncated = False
+    offset = 0
+    with open(log_file, 'rb') as f:
+        for line_no, raw in enumerate(iter(lambda: f.readline(GREP_READ_BLOCK_BYTES), b''), start=1):
+            text = raw.decode('utf-8', errors='replace').rstrip('\r\n')
+            if match_line(text):
+                if len(matches) >= max_matches:
+                    truncated = True
+                    break
+                matches.append({'line': line_no, 'offset': offset, 'text': text})
+            offset += len(raw)
+
+    return {'matches': matches, 'truncated': truncated, 'size': log_file.stat().st_size}
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""One-walk snapshot of the files under the playlists root.
+
+Audits that compare DB rows with the disk (missing files, quality gaps) used
+to call ``exists()`` once per track. A snapshot walks the tree once with
+``os.scandir`` into a set of relpaths and a set of video IDs (``[id]`` at the
+end of the file name), so those checks become set lookups and differences.
+Video IDs found under a top-level ``Trash`` folder (download_content keeps
+the trash inside the root) are collected separately, so a trashed copy is
+never mistaken for a live file.
+
+Snapshots are cached per root for SNAPSHOT_TTL_SECONDS; concurrent callers
+share one walk. Code that knows it just changed the tree can call
+``invalidate_library_snapshot``.
+"""
+
+from __future__ import annotations
+
+import os
+import posixpath
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set, Union
+
+SNAPSHOT_TTL_SECONDS = 30.0
+
+# Top-level folder under the root that holds deleted files
+TRASH_DIR_NAME = "Trash"
+
+# Same pattern as scan_to_db.VIDEO_ID_RE (matched against the file stem)
+VIDEO_ID_RE = re.compile(r"\[([A-Za-z0-9_-]{11})\]$")
+
+PathLike = Union[str, Path]
+
+
+def relpath_key(relpath) -> Optional[str]:
+    """Comparable form of a library relpath: '/' separators, normalized, case-folded on Windows.
+
+    None for empty paths and paths that leave the root.
+    """
+    raw = str(relpath or "").strip().replace("\\", "/")
+    if not raw:
+        return None
+    key = posixpath.normpath(raw.lstrip("/"))
+    if key in (".", "") or key == ".." or key.startswith("../"):
+        return None
+    return os.path.normcase(key).replace("\\", "/")
+
+
+class LibrarySnapshot:
+    """Relpaths and video IDs of all files under ``root`` at ``taken_at``.
+
+    ``video_ids`` excludes the trash subtree; its IDs are in ``trash_video_ids``.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        relpaths: frozenset,
+        video_ids: frozenset,
+        taken_at: float,
+        duration: float,
+        trash_video_ids: frozenset = frozenset(),
+    ):
+        self.root = root
+        self.relpaths = relpaths
+        self.video_ids = video_ids
+        self.trash_video_ids = trash_video_ids
+        self.taken_at = taken_at
+        self.duration = duration
+
+    @classmethod
+    def take(cls, root: PathLike) -> "LibrarySnapshot":
+        """Walk ``root``, following symlinked directories like the exists() checks it replaces.
+
+        Each directory is entered once per (st_dev, st_ino), so symlink loops
+        and links back to an ancestor end the descent.
+        """
+        root = Path(root)
+        started = time.monotonic()
+        relpaths: Set[str] = set()
+        video_ids: Set[str] = set()
+        trash_video_ids: Set[str] = set()
+        trash_prefix = os.path.normcase(TRASH_DIR_NAME + "/").replace("\\", "/")
+        stack = [(str(root), "")]
+        visited: Set[tuple] = set()
+        while stack:
+            directory, prefix = stack.pop()
+            try:
+                st = os.stat(directory)
+            except OSError:
+                continue
+            if (st.st_dev, st.st_ino) in visited:
+                continue
+            visited.add((st.st_dev, st.st_ino))
+            in_trash = os.path.normcase(prefix).replace("\\", "/").startswith(trash_prefix)
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir():
+                                stack.append((entry.path, prefix + entry.name + "/"))
+                            elif entry.is_file():
+                                relpaths.add(os.path.normcase(prefix + entry.name).replace("\\", "/"))
+                                match = VIDEO_ID_RE.search(os.path.splitext(entry.name)[0])
+                                if match:
+                                    (trash_video_ids if in_trash else video_ids).add(match.group(1))
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        return cls(
+            root, frozenset(relpaths), frozenset(video_ids), time.time(), time.monotonic() - started,
+            trash_video_ids=frozenset(trash_video_ids),
+        )
+
+    @property
+    def age_seconds(self) -> float:
+        return max(0.0, time.time() - self.taken_at)
+
+    def has_relpath(self, relpath) -> bool:
+        key = relpath_key(relpath)
+        return key is not None and key in self.relpaths
+
+    def has_video_id(self, video_id: Optional[str]) -> bool:
+        """A file with this video ID exists outside the trash."""
+        return bool(video_id) and video_id in self.video_ids
+
+    def has_trashed_video_id(self, video_id: Optional[str]) -> bool:
+        """A file with this video ID exists in the trash subtree."""
+        return bool(video_id) and video_id in self.trash_video_ids
+
+    def missing_relpaths(self, relpaths: Iterable) -> Set:
+        """The given relpaths (as passed in) that have no file in the snapshot."""
+        keyed = {relpath: relpath_key(relpath) for relpath in relpaths}
+        present = {key for key in keyed.values() if key is not None} & self.relpaths
+        return {relpath for relpath, key in keyed.items() if key not in present}
+
+
+_lock = threading.Lock()
+_snapshots: Dict[str, LibrarySnapshot] = {}
+_root_locks: Dict[str, threading.Lock] = {}
+
+
+def _cache_key(root: PathLike) -> str:
+    return os.path.normcase(os.path.abspath(str(root)))
+
+
+def get_library_snapshot(root: PathLike, max_age: float = SNAPSHOT_TTL_SECONDS) -> LibrarySnapshot:
+    """Cached snapshot of ``root``, taken anew when older than ``max_age`` seconds."""
+    key = _cache_key(root)
+    with _lock:
+        snapshot = _snapshots.get(key)
+        if snapshot is not None and snapshot.age_seconds <= max_age:
+            return snapshot
+        root_lock = _root_locks.setdefault(key, threading.Lock())
+    with root_lock:
+        # Another caller may have walked the tree while we waited
+        with _lock:
+            snapshot = _snapshots.get(key)
+        if snapshot is not None and snapshot.age_seconds <= max_age:
+            return snapshot
+        snapshot = LibrarySnapshot.take(root)
+        with _lock:
+            _snapshots[key] = snapshot
+        return snapshot
+
+
+def invalidate_library_snapshot(root: Optional[PathLike] = None) -> None:
+    """Drop the cached snapshot of ``root`` (all roots when omitted)."""
+    with _lock:
+        if root is None:
+            _snapshots.clear()
+        else:
+            _snapshots.pop(_cache_key(root), None)
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""Zero-copy media responses for /media with strong validators and Range support.
+
+Three delivery modes, picked per response:
+
+- Accelerated (``MEDIA_ACCEL_MODE``): a reverse proxy sends the bytes.
+  ``x-accel-redirect`` (nginx) emits an internal redirect under
+  ``MEDIA_ACCEL_PREFIX``; ``x-sendfile`` (Apache/lighttpd) emits the absolute path.
+  Both are percent-encoded (UTF-8), since header values must be latin-1 and
+  library names contain spaces, brackets and Cyrillic.
+- Kernel sendfile: on the built-in Werkzeug server the connection socket is
+  exposed as ``werkzeug.socket``; headers are flushed with an empty chunk and
+  the body goes through ``socket.sendfile`` (``os.sendfile`` on plain sockets,
+  a send loop on TLS sockets).
+- ``wsgi.file_wrapper`` for full-body responses on servers that provide one
+  (gunicorn turns it into sendfile), otherwise a bounded chunked reader.
+
+Validators are derived from size/mtime only, so they are stable across
+restarts and cheap to compute (one stat per request).
+"""
+
+from __future__ import annotations
+
+import mimetypes
+import os
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+from urllib.parse import quote
+
+from flask import Response, abort
+from werkzeug.security import safe_join
+
+ACCEL_MODES = ("none", "x-accel-redirect", "x-sendfile")
+DEFAULT_CACHE_MAX_AGE = 7 * 24 * 3600
+READ_CHUNK_BYTES = 1024 * 1024
+# Kernel sendfile slice per call; keeps a single seek from pinning the socket forever.
+SENDFILE_SLICE_BYTES = 8 * 1024 * 1024
+
+_config = {
+    "accel_mode": "none",
+    "accel_prefix": "/_protected_media/",
+    "cache_max_age": DEFAULT_CACHE_MAX_AGE,
+}
+
+# relpath -> (absolute path string, size, mtime_ns). Invalidated on stat mismatch.
+_path_cache: dict[str, Tuple[str, int, int]] = {}
+_path_cache_lock = threading.Lock()
+_PATH_CACHE_MAX = 4096
+
+
+def configure_media_serving(
+    accel_mode: Optional[str] = None,
+    accel_prefix: Optional[str] = None,
+    cache_max_age: Optional[int] = None,
+) -> None:
+    """Apply .env settings (MEDIA_ACCEL_MODE, MEDIA_ACCEL_PREFIX, MEDIA_CACHE_MAX_AGE)."""
+    if accel_mode:
+        mode = accel_mode.strip().lower()
+        if mode in ACCEL_MODES:
+            _config["accel_mode"] = mode
+    if accel_prefix:
+        prefix = accel_prefix.strip()
+        if not prefix.startswith("/"):
+            prefix = "/" + prefix
+        if not prefix.endswith("/"):
+            prefix += "/"
+        _config["accel_prefix"] = prefix
+    if cache_max_age is not None:
+        try:
+            _config["cache_max_age"] = max(0, int(cache_max_age))
+        except (TypeError, ValueError):
+            pass
+
+
+def get_media_serving_config() -> dict:
+    return dict(_config)
+
+
+def make_etag(size: int, mtime_ns: int) -> str:
+    """Strong ETag from size and mtime (hex, quoted)."""
+    return f'"{size:x}-{mtime_ns:x}"'
+
+
+def resolve_media_path(root_dir: Path, relpath: str) -> Optional[Tuple[str, os.stat_result]]:
+    """Resolve relpath under root_dir and stat it; None when missing or outside root."""
+    cached = _path_cache.get(relpath)
+    if cached:
+        abs_path, size, mtime_ns = cached
+        try:
+            st = os.stat(abs_path)
+        except OSError:
+            st = None
+        if st is not None and st.st_size == size and st.st_mtime_ns == mtime_ns:
+            return abs_path, st
+        with _path_cache_lock:
+            _path_cache.pop(relpath, None)
+
+    abs_path = safe_join(str(root_dir), relpath)
+    if abs_path is None:
+        return None
+    try:
+        st = os.stat(abs_path)
+    except OSError:
+        return None
+    if not os.path.isfile(abs_path):
+        return None
+    with _path_cache_lock:
+        if len(_path_cache) >= _PATH_CACHE_MAX:
+            _path_cache.clear()
+        _path_cache[relpath] = (abs_path, st.st_size, st.st_mtime_ns)
+    return abs_path, st
+
+
+def _parse_single_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single 'bytes=' range into inclusive (start, end).
+
+    Returns None when the header is absent or uses multiple ranges (served as a
+    full 200 body), and (-1, -1) when the range cannot be satisfied.
+    """
+    if not header:
+        return None
+    header = header.strip()
+    if not header.lower().startswith("bytes="):
+        return None
+    spec = header[6:].strip()
+    if "," in spec:
+        return None
+    start_raw, sep, end_raw = spec.partition("-")
+    if not sep:
+        return None
+    try:
+        if start_raw == "":
+            suffix = int(end_raw)
+            if suffix <= 0:
+                return (-1, -1)
+            start = max(0, size - suffix)
+            end = size - 1
+        else:
+            start = int(start_raw)
+            end = int(end_raw) if end_raw.strip() else size - 1
+    except ValueError:
+        return None
+    if start >= size or start < 0 or end < start:
+        return (-1, -1)
+    return start, min(end, size - 1)
+
+
+def _if_range_matches(if_range: Optional[str], etag: str, mtime: float) -> bool:
+    if not if_range:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        return if_range == etag
+    try:
+        return int(parsedate_to_datetime(if_range).timestamp()) >= int(mtime)
+    except (TypeError, ValueError):
+        return False
+
+
+def _not_modified(environ: dict, etag: str, mtime: float) -> bool:
+    inm = environ.get("HTTP_IF_NONE_MATCH")
+    if inm:
+        tags = [t.strip() for t in inm.split(",")]
+        return "*" in tags or etag in tags or f"W/{etag}" in tags
+    ims = environ.get("HTTP_IF_MODIFIED_SINCE")
+    if ims:
+        try:
+            return int(mtime) <= int(parsedate_to_datetime(ims).timestamp())
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _sendfile_body(sock, abs_path: str, offset: int, length: int) -> Iterator[bytes]:
+    """Flush headers with an empty write, then push the range via socket.sendfile."""
+    yield b""
+    try:
+        with open(abs_path, "rb") as fh:
+            remaining = length
+            pos = offset
+            while remaining > 0:
+                sent = sock.sendfile(fh, pos, min(remaining, SENDFILE_SLICE_BYTES))
+                if not sent:
+                    break
+                pos += sent
+                remaining -= sent
+    except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError, TimeoutError):
+        # Client seeked elsewhere or closed the tab.
+        return
+
+
+def _chunked_body(abs_path: str, offset: int, length: int) -> Iterator[bytes]:
+    with open(abs_path, "rb") as fh:
+        fh.seek(offset)
+        remaining = length
+        while remaining > 0:
+            chunk = fh.read(min(READ_CHUNK_BYTES, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def build_media_response(environ: dict, root_dir: Path, relpath: str) -> Response:
+    """Build the /media response for relpath under root_dir (aborts 404 when missing)."""
+    if root_dir is None:
+        abort(404)
+    resolved = resolve_media_path(Path(root_dir), relpath)
+    if not resolved:
+        abort(404)
+    abs_path, st = resolved
+    size = st.st_size
+    etag = make_etag(size, st.st_mtime_ns)
+    mimetype = mimetypes.guess_type(abs_path)[0] or "application/octet-stream"
+
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(st.st_mtime, usegmt=True),
+        "Cache-Control": f"public, max-age={_config['cache_max_age']}",
+        "Accept-Ranges": "bytes",
+    }
+
+    if _not_modified(environ, etag, st.st_mtime):
+        return Response(status=304, headers=headers)
+
+    accel_mode = _config["accel_mode"]
+    if accel_mode == "x-accel-redirect":
+        internal = _config["accel_prefix"] + quote(relpath.replace("\\", "/").lstrip("/"), safe="/")
+        headers["X-Accel-Redirect"] = internal
+        return Response(b"", status=200, headers=headers, mimetype=mimetype)
+    if accel_mode == "x-sendfile":
+        headers["X-Sendfile"] = quote(abs_path, safe="/")
+        return Response(b"", status=200, headers=headers, mimetype=mimetype)
+
+    status = 200
+    offset, length = 0, size
+    byte_range = None
+    if _if_range_matches(environ.get("HTTP_IF_RANGE"), etag, st.st_mtime):
+        byte_range = _parse_single_range(environ.get("HTTP_RANGE"), size)
+    if byte_range == (-1, -1):
+        headers["Content-Range"] = f"bytes */{size}"
+        return Response(status=416, headers=headers)
+    if byte_range:
+        start, end = byte_range
+        status = 206
+        offset, length = start, end - start + 1
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(length)
+
+    if environ.get("REQUEST_METHOD") == "HEAD" or length == 0:
+        return Response(b"", status=status, headers=headers, mimetype=mimetype)
+
+    sock = environ.get("werkzeug.socket")
+    if sock is not None and hasattr(sock, "sendfile"):
+        body = _sendfile_body(sock, abs_path, offset, length)
+    elif environ.get("wsgi.file_wrapper") is not None and status == 200:
+        body = environ["wsgi.file_wrapper"](open(abs_path, "rb"), READ_CHUNK_BYTES)
+    else:
+        body = _chunked_body(abs_path, offset, length)
+
+    response = Response(body, status=status, headers=headers, mimetype=mimetype, direct_passthrough=True)
+    # Content-Length is authoritative; keep Werkzeug from recomputing it.
+    response.automatically_set_content_length = False
+    return response
@@ -332,6 +332,56 @@ def persist_download_metadata_from_entry(entry: Dict[str, Any], channel_url: str
     return saved
 
 
+def persist_download_metadata_bulk(entries: List[Dict[str, Any]], channel_url: str = None, logger_func=None) -> int:
+    """Persist many yt-dlp info dicts with one bulk upsert and one published_date pass.
+
+    Returns the number of entries saved (written or already up to date).
+    Failures are logged and do not raise.
+    """
+    if logger_func is None:
+        logger_func = log_message
+    rows: List[Dict[str, Any]] = []
+    dates: List[tuple] = []
+    for entry in entries:
+        if not isinstance(entry, dict) or not (entry.get('id') or entry.get('youtube_id')):
+            continue
+        try:
+            metadata = create_metadata_dict_from_entry(entry, channel_url)
+        except Exception as e:
+            logger_func(f"[Metadata] Error processing metadata for video {entry.get('id', 'unknown')}: {e}")
+            continue
+        rows.append(metadata)
+        formatted_date = format_upload_date(entry.get('upload_date'))
+        if formatted_date:
+            dates.append((formatted_date, metadata['youtube_id']))
+    if not rows:
+        return 0
+    try:
+        conn = get_connection()
+        try:
+            stats = db.bulk_upsert_youtube_metadata(conn, rows)
+            if dates:
+                conn.executemany(
+                    """
+                    UPDATE tracks
+                    SET published_date = ?
+                    WHERE video_id = ? AND (published_date IS NULL OR published_date = '')
+                    """,
+                    dates,
+                )
+                conn.commit()
+        finally:
+            conn.close()
+    except Exception as e:
+        logger_func(f"[Metadata] Error saving metadata for {len(rows)} videos: {e}")
+        return 0
+    logger_func(
+        f"[Metadata] Saved metadata for {len(rows)} videos "
+        f"(inserted {stats['inserted']}, updated {stats['updated']}, unchanged {stats['unchanged']})"
+    )
+    return len(rows) - stats['invalid']
+
+
 def persist_download_metadata_from_progress(status: Dict[str, Any], logger_func=None) -> bool:
     """yt-dlp progress-hook helper: persist metadata when a file finishes."""
     if not isinstance(status, dict) or status.get('status') != 'finished':
@@ -433,10 +483,19 @@ def persist_download_metadata_from_directory(directory: Path, video_id: Optional
     """
     if logger_func is None:
         logger_func = log_message
-    saved = 0
+    entries: List[Dict[str, Any]] = []
     for path in find_infojson_files(directory, video_id=video_id):
-        if persist_download_metadata_from_infojson(path, logger_func=logger_func):
-            saved += 1
+        try:
+            with path.open('r', encoding='utf-8') as handle:
+                entry = json.load(handle)
+        except Exception as e:
+            logger_func(f"[Metadata] Error reading info.json {path}: {e}")
+            continue
+        if isinstance(entry, dict):
+            entries.append(entry)
+        else:
+            logger_func(f"[Metadata] info.json is not an object: {path.name}")
+    saved = persist_download_metadata_bulk(entries, logger_func=logger_func) if entries else 0
     if saved:
         logger_func(f"[Metadata] Persisted download metadata from {saved} info.json file(s)")
     elif video_id:
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""Opaque cursors for keyset (seek) pagination.
+
+A cursor is the sort key of a boundary row, e.g. ``("Song title", 1234)``,
+serialized as URL-safe base64 JSON so it can travel in a query string.
+Pages fetched with a cursor cost the same regardless of how deep they are,
+unlike ``LIMIT/OFFSET`` which has to walk and discard every skipped row.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+from typing import Any, Optional, Sequence, Tuple
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Serialize a boundary sort key into a query-string-safe token."""
+    raw = json.dumps(list(values), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: Optional[str], arity: int) -> Optional[Tuple[Any, ...]]:
+    """Parse a token produced by encode_cursor; None when absent or malformed."""
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except (ValueError, UnicodeError):
+        return None
+    if not isinstance(values, list) or len(values) != arity:
+        return None
+    return tuple(values)
@@ -169,6 +169,19 @@ def library_relpath_exists(
     return path.is_file()
 
 
+def _library_file_checker(playlists_root: Optional[Union[str, Path]]):
+    """Relpath -> exists, answered from one cached library snapshot.
+
+    Without a playlists root existence is unknown and every row counts as
+    present (the old DB-only behavior).
+    """
+    if playlists_root is None:
+        return lambda relpath: True
+    from utils.library_snapshot import get_library_snapshot
+
+    return get_library_snapshot(playlists_root).has_relpath
+
+
 def classify_local_vs_youtube_quality(
     resolution: Any,
     filetype: Any,
@@ -246,9 +259,10 @@ def count_tracks_below_max_youtube_quality(
     unknown_local = 0
     missing_local = 0
 
+    file_exists = _library_file_checker(playlists_root)
     for row in _iter_quality_rows(conn):
         _video_id, _name, relpath, resolution, filetype, size_bytes, track_duration, yvm_duration, max_height = row
-        if not library_relpath_exists(playlists_root, relpath):
+        if not file_exists(relpath):
             missing_local += 1
             continue
         kind = classify_local_vs_youtube_quality(
@@ -281,9 +295,10 @@ def list_tracks_below_max_youtube_quality(
 ) -> list[Dict[str, Any]]:
     """Return below-max video tracks that are candidates for a safe quality upgrade."""
     tracks: list[Dict[str, Any]] = []
+    file_exists = _library_file_checker(playlists_root)
     for row in _iter_quality_rows(conn):
         video_id, name, relpath, resolution, filetype, size_bytes, track_duration, yvm_duration, max_height = row
-        if not library_relpath_exists(playlists_root, relpath):
+        if not file_exists(relpath):
             kind = "missing_file"
         else:
             kind = classify_local_vs_youtube_quality(
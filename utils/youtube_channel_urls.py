@@ -75,6 +75,20 @@ def normalize_channel_url(url: str) -> str:
     return re.sub(r"/@([\w-]+)/videos", r"/@\1", url)
 
 
+def channel_videos_tab_url(url: str) -> str:
+    """URL of the newest-first videos tab for a bare channel URL; tab URLs are returned as-is.
+
+    A bare channel URL lists its tabs (Videos, Shorts, Live) as nested playlists
+    when extracted flat, so flat listings need an explicit tab.
+    """
+    stripped = (url or "").rstrip("/")
+    if not is_channel_url(stripped):
+        return url
+    if re.search(r"/(?:" + "|".join(CHANNEL_TAB_SUFFIXES) + r")$", stripped, re.IGNORECASE):
+        return url
+    return stripped + "/videos"
+
+
 def is_nested_playlist_entry(entry: Dict[str, Any]) -> bool:
     """True when a flat-playlist entry points to an album/playlist, not a video."""
     entry_id = entry.get("id") or entry.get("video_id") or ""
@@ -38,6 +38,16 @@ def output_has_403(stdout: str = "", stderr: str = "") -> bool:
     return "http error 403" in text or "forbidden" in text
 
 
+def output_has_429(stdout: str = "", stderr: str = "") -> bool:
+    text = f"{stdout or ''}\n{stderr or ''}".lower()
+    return "http error 429" in text or "too many requests" in text
+
+
+def output_is_throttled(stdout: str = "", stderr: str = "") -> bool:
+    """True for the 403/429 answers YouTube uses when it rate-limits a client."""
+    return output_has_403(stdout, stderr) or output_has_429(stdout, stderr)
+
+
 def output_has_format_gate(stdout: str = "", stderr: str = "") -> bool:
     """True when yt-dlp skipped formats (often a silent 403 via --check-formats)."""
     text = f"{stdout or ''}\n{stderr or ''}".lower()
@@ -0,0 +1,166 @@
+"""Shared request pacing for in-process yt-dlp calls.
+
+Every ``YoutubeDL.extract_info`` against YouTube takes a token from one
+process-wide bucket per host, so concurrent quick syncs together stay under a
+steady request rate instead of bursting. Outcomes are recorded in a sliding
+window; callers that run work in parallel (the group sync coordinator) read
+the throttled share from it to decide how many channels to run at once.
+
+A call counts as throttled when yt-dlp reported an HTTP 403 or 429
+(``utils.ytdlp_format_retry.output_is_throttled``). With ``ignoreerrors``
+yt-dlp reports errors through its logger instead of raising, so
+``ThrottleLogger`` is passed as the ``logger`` option to see them.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, Optional, Tuple
+
+from utils.ytdlp_format_retry import output_is_throttled
+
+YOUTUBE_HOST = "youtube.com"
+
+# Sustained yt-dlp extractions per second per host, and how many may burst
+YTDLP_RATE_PER_SECOND = 1.0
+YTDLP_BURST = 4
+# Outcomes kept for the throttled-share calculation
+THROTTLE_WINDOW_SIZE = 20
+
+
+class TokenBucket:
+    """Thread-safe token bucket: ``rate`` tokens per second, at most ``capacity`` banked."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waited_seconds = 0.0
+        self.acquired = 0
+
+    def _refill_locked(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """Block until ``tokens`` are available; False if ``timeout`` runs out first."""
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill_locked(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    self.acquired += 1
+                    self.waited_seconds += now - started
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+            if timeout is not None and now - started + wait > timeout:
+                return False
+            time.sleep(min(wait, 1.0))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "rate_per_second": self.rate,
+                "capacity": self.capacity,
+                "acquired": self.acquired,
+                "waited_seconds": round(self.waited_seconds, 2),
+            }
+
+
+class ThrottleMonitor:
+    """Sliding window of (timestamp, throttled) outcomes plus running totals."""
+
+    def __init__(self, window: int = THROTTLE_WINDOW_SIZE):
+        self._outcomes: Deque[Tuple[float, bool]] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.total = 0
+        self.throttled = 0
+
+    def record(self, throttled: bool) -> None:
+        with self._lock:
+            self._outcomes.append((time.monotonic(), bool(throttled)))
+            self.total += 1
+            self.throttled += int(bool(throttled))
+
+    def throttle_rate(self, since: float = 0.0) -> Tuple[float, int]:
+        """(throttled share, sample count) over the window, ignoring outcomes before ``since``."""
+        with self._lock:
+            samples = [t for ts, t in self._outcomes if ts >= since]
+        if not samples:
+            return 0.0, 0
+        return sum(samples) / len(samples), len(samples)
+
+    def totals(self) -> Dict[str, int]:
+        with self._lock:
+            return {"calls": self.total, "throttled": self.throttled}
+
+
+class ThrottleLogger:
+    """yt-dlp ``logger`` that stays quiet and remembers whether a 403/429 was reported."""
+
+    def __init__(self):
+        self.throttled = False
+        self.last_error = ""
+
+    def debug(self, msg: str) -> None:
+        pass
+
+    def info(self, msg: str) -> None:
+        pass
+
+    def warning(self, msg: str) -> None:
+        if output_is_throttled(stderr=msg):
+            self.throttled = True
+
+    def error(self, msg: str) -> None:
+        self.last_error = msg
+        if output_is_throttled(stderr=msg):
+            self.throttled = True
+
+
+_registry_lock = threading.Lock()
+_buckets: Dict[str, TokenBucket] = {}
+_monitors: Dict[str, ThrottleMonitor] = {}
+
+
+def get_rate_limiter(host: str = YOUTUBE_HOST) -> TokenBucket:
+    with _registry_lock:
+        bucket = _buckets.get(host)
+        if bucket is None:
+            bucket = _buckets[host] = TokenBucket(YTDLP_RATE_PER_SECOND, YTDLP_BURST)
+        return bucket
+
+
+def get_throttle_monitor(host: str = YOUTUBE_HOST) -> ThrottleMonitor:
+    with _registry_lock:
+        monitor = _monitors.get(host)
+        if monitor is None:
+            monitor = _monitors[host] = ThrottleMonitor()
+        return monitor
+
+
+@contextmanager
+def ytdlp_request(host: str = YOUTUBE_HOST) -> Iterator[ThrottleLogger]:
+    """Pace one yt-dlp call and record whether it was throttled.
+
+    Usage::
+
+        with ytdlp_request() as logger:
+            with YoutubeDL({**opts, "logger": logger}) as ydl:
+                info = ydl.extract_info(url, download=False)
+    """
+    get_rate_limiter(host).acquire()
+    logger = ThrottleLogger()
+    try:
+        yield logger
+    except Exception as e:
+        get_throttle_monitor(host).record(logger.throttled or output_is_throttled(stderr=str(e)))
+        raise
+    get_throttle_monitor(host).record(logger.throttled)